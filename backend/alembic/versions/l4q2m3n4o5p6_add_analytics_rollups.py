@@ -0,0 +1,150 @@
+"""add analytics rollup tables
+
+Revision ID: l4q2m3n4o5p6
+Revises: k3p1l2m3n4o5
+Create Date: 2026-03-02 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers, used by Alembic.
+revision = "l4q2m3n4o5p6"
+down_revision = "k3p1l2m3n4o5"
+branch_labels = None
+depends_on = None
+
+
+def _rollup_columns() -> list[sa.Column]:
+    return [
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "clinic_id",
+            sa.Uuid(),
+            sa.ForeignKey("clinics.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column(
+            "refreshed_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analytics_daily_clinic_stats",
+        *_rollup_columns(),
+        sa.Column("conversations", sa.Integer(), nullable=True),
+        sa.Column("ai_mode_conversations", sa.Integer(), nullable=True),
+        sa.Column("manual_conversations", sa.Integer(), nullable=True),
+        sa.Column("status_counts", JSONB(), nullable=True),
+        sa.Column("conversations_with_messages", sa.Integer(), nullable=True),
+        sa.Column("messages", sa.Integer(), nullable=True),
+        sa.Column("satisfaction_sum", sa.Integer(), nullable=True),
+        sa.Column("satisfaction_count", sa.Integer(), nullable=True),
+        sa.Column("bookings", sa.Integer(), nullable=True),
+        sa.Column("payments", sa.Integer(), nullable=True),
+        sa.Column("payment_amount", sa.Numeric(14, 2), nullable=True),
+        sa.Column("paid_count", sa.Integer(), nullable=True),
+        sa.Column("paid_amount", sa.Numeric(14, 2), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_analytics_daily_clinic_stats_clinic_day",
+        "analytics_daily_clinic_stats",
+        ["clinic_id", "day"],
+        unique=True,
+    )
+
+    op.create_table(
+        "analytics_daily_funnel",
+        *_rollup_columns(),
+        sa.Column("country_code", sa.String(10), nullable=False),
+        sa.Column("channel", sa.String(20), nullable=True),
+        sa.Column("conversations", sa.Integer(), nullable=True),
+        sa.Column("bookings", sa.Integer(), nullable=True),
+        sa.Column("payments", sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_analytics_daily_funnel_clinic_day",
+        "analytics_daily_funnel",
+        ["clinic_id", "day"],
+    )
+
+    op.create_table(
+        "analytics_daily_procedure",
+        *_rollup_columns(),
+        sa.Column(
+            "clinic_procedure_id",
+            sa.Uuid(),
+            sa.ForeignKey("clinic_procedures.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("case_count", sa.Integer(), nullable=True),
+        sa.Column("revenue", sa.Numeric(14, 2), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_analytics_daily_procedure_clinic_day",
+        "analytics_daily_procedure",
+        ["clinic_id", "day"],
+    )
+
+    op.create_table(
+        "analytics_hourly_revenue",
+        *_rollup_columns(),
+        sa.Column("hour", sa.Integer(), nullable=False),
+        sa.Column("payment_count", sa.Integer(), nullable=True),
+        sa.Column("amount", sa.Numeric(14, 2), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_analytics_hourly_revenue_clinic_day",
+        "analytics_hourly_revenue",
+        ["clinic_id", "day"],
+    )
+
+    op.create_table(
+        "analytics_daily_customer_revenue",
+        *_rollup_columns(),
+        sa.Column(
+            "customer_id",
+            sa.Uuid(),
+            sa.ForeignKey("customers.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("payment_count", sa.Integer(), nullable=True),
+        sa.Column("amount", sa.Numeric(14, 2), nullable=True),
+        sa.Column("booked_payment_count", sa.Integer(), nullable=True),
+        sa.Column("booked_amount", sa.Numeric(14, 2), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_analytics_daily_customer_revenue_clinic_day",
+        "analytics_daily_customer_revenue",
+        ["clinic_id", "day"],
+    )
+
+    # Change scans for incremental rollup refresh
+    op.create_index("ix_conversations_updated_at", "conversations", ["updated_at"])
+    op.create_index("ix_bookings_updated_at", "bookings", ["updated_at"])
+    op.create_index("ix_payments_updated_at", "payments", ["updated_at"])
+    op.create_index("ix_messages_created_at", "messages", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_messages_created_at", table_name="messages")
+    op.drop_index("ix_payments_updated_at", table_name="payments")
+    op.drop_index("ix_bookings_updated_at", table_name="bookings")
+    op.drop_index("ix_conversations_updated_at", table_name="conversations")
+    op.drop_table("analytics_daily_customer_revenue")
+    op.drop_table("analytics_hourly_revenue")
+    op.drop_table("analytics_daily_procedure")
+    op.drop_table("analytics_daily_funnel")
+    op.drop_table("analytics_daily_clinic_stats")
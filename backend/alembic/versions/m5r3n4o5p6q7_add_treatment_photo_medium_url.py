@@ -0,0 +1,25 @@
+"""add medium_url to treatment_photos
+
+Revision ID: m5r3n4o5p6q7
+Revises: l4q2m3n4o5p6
+Create Date: 2026-03-09 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "m5r3n4o5p6q7"
+down_revision = "l4q2m3n4o5p6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "treatment_photos", sa.Column("medium_url", sa.String(500), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("treatment_photos", "medium_url")
@@ -0,0 +1,29 @@
+"""add invoice_url and invoice_digest to settlements
+
+Revision ID: n6s4o5p6q7r8
+Revises: m5r3n4o5p6q7
+Create Date: 2026-03-12 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "n6s4o5p6q7r8"
+down_revision = "m5r3n4o5p6q7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "settlements", sa.Column("invoice_url", sa.String(500), nullable=True)
+    )
+    op.add_column(
+        "settlements", sa.Column("invoice_digest", sa.String(64), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("settlements", "invoice_digest")
+    op.drop_column("settlements", "invoice_url")
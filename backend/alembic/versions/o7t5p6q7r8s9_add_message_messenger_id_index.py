@@ -0,0 +1,26 @@
+"""index messages.messenger_message_id for webhook dedup
+
+Revision ID: o7t5p6q7r8s9
+Revises: n6s4o5p6q7r8
+Create Date: 2026-03-14 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "o7t5p6q7r8s9"
+down_revision = "n6s4o5p6q7r8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f("ix_messages_messenger_message_id"),
+        "messages",
+        ["messenger_message_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_messages_messenger_message_id"), table_name="messages")
@@ -0,0 +1,35 @@
+"""add keyset pagination indexes
+
+Revision ID: p8u6q7r8s9t0
+Revises: o7t5p6q7r8s9
+Create Date: 2026-03-21 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "p8u6q7r8s9t0"
+down_revision = "o7t5p6q7r8s9"
+branch_labels = None
+depends_on = None
+
+CREATED_AT_TABLES = ("treatment_photos", "medical_documents", "translation_reports")
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_conversations_clinic_inbox",
+        "conversations",
+        ["clinic_id", sa.text("last_message_at DESC NULLS LAST"), sa.text("id DESC")],
+    )
+    for table in CREATED_AT_TABLES:
+        op.create_index(
+            f"ix_{table}_clinic_created", table, ["clinic_id", "created_at", "id"]
+        )
+
+
+def downgrade() -> None:
+    for table in CREATED_AT_TABLES:
+        op.drop_index(f"ix_{table}_clinic_created", table_name=table)
+    op.drop_index("ix_conversations_clinic_inbox", table_name="conversations")
@@ -0,0 +1,26 @@
+"""add messages (conversation_id, created_at, id) index for windowed history
+
+Revision ID: q9v7r8s9t0u1
+Revises: p8u6q7r8s9t0
+Create Date: 2026-03-24 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "q9v7r8s9t0u1"
+down_revision = "p8u6q7r8s9t0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_messages_conversation_created",
+        "messages",
+        ["conversation_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_messages_conversation_created", table_name="messages")
@@ -0,0 +1,31 @@
+"""add cache_read_tokens and cache_write_tokens to llm_usages
+
+Revision ID: r0w8s9t0u1v2
+Revises: q9v7r8s9t0u1
+Create Date: 2026-03-26 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "r0w8s9t0u1v2"
+down_revision = "q9v7r8s9t0u1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "llm_usages",
+        sa.Column("cache_read_tokens", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "llm_usages",
+        sa.Column("cache_write_tokens", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("llm_usages", "cache_write_tokens")
+    op.drop_column("llm_usages", "cache_read_tokens")
@@ -0,0 +1,34 @@
+"""add analytics_rollup_watermarks
+
+Revision ID: s1x9t0u1v2w3
+Revises: r0w8s9t0u1v2
+Create Date: 2026-03-27 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "s1x9t0u1v2w3"
+down_revision = "r0w8s9t0u1v2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analytics_rollup_watermarks",
+        sa.Column("name", sa.String(50), nullable=False),
+        sa.Column("watermark", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    # Carry on from the previous implicit watermark instead of rebuilding
+    op.execute(
+        "INSERT INTO analytics_rollup_watermarks (name, watermark) "
+        "SELECT 'daily_rollups', max(refreshed_at) FROM analytics_daily_clinic_stats "
+        "HAVING max(refreshed_at) IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("analytics_rollup_watermarks")
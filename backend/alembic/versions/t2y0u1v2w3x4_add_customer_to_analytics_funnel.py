@@ -0,0 +1,71 @@
+"""per-customer rows in analytics_daily_funnel
+
+Revision ID: t2y0u1v2w3x4
+Revises: s1x9t0u1v2w3
+Create Date: 2026-03-28 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "t2y0u1v2w3x4"
+down_revision = "s1x9t0u1v2w3"
+branch_labels = None
+depends_on = None
+
+# Same aggregation as AnalyticsRollupService._insert_funnel, for every day at once
+BACKFILL = """
+INSERT INTO analytics_daily_funnel
+    (id, clinic_id, day, customer_id, country_code, channel,
+     conversations, bookings, payments)
+SELECT gen_random_uuid(), clinic_id, day, customer_id, country_code, channel,
+       max(conversations), max(bookings), max(payments)
+FROM (
+    SELECT c.clinic_id, c.created_at::date AS day, c.customer_id,
+           coalesce(cu.country_code, 'unknown') AS country_code,
+           ma.messenger_type AS channel,
+           1 AS conversations, 0 AS bookings, 0 AS payments
+    FROM conversations c
+    JOIN customers cu ON cu.id = c.customer_id
+    JOIN messenger_accounts ma ON ma.id = c.messenger_account_id
+    UNION ALL
+    SELECT b.clinic_id, b.created_at::date, b.customer_id,
+           coalesce(cu.country_code, 'unknown'), ma.messenger_type, 0, 1, 0
+    FROM bookings b
+    JOIN customers cu ON cu.id = b.customer_id
+    LEFT JOIN conversations c ON c.id = b.conversation_id
+    LEFT JOIN messenger_accounts ma ON ma.id = c.messenger_account_id
+    UNION ALL
+    SELECT p.clinic_id, p.created_at::date, p.customer_id,
+           coalesce(cu.country_code, 'unknown'), ma.messenger_type, 0, 0, 1
+    FROM payments p
+    JOIN customers cu ON cu.id = p.customer_id
+    LEFT JOIN bookings b ON b.id = p.booking_id
+    LEFT JOIN conversations c ON c.id = b.conversation_id
+    LEFT JOIN messenger_accounts ma ON ma.id = c.messenger_account_id
+    WHERE p.status = 'completed'
+) AS stages
+GROUP BY clinic_id, day, customer_id, country_code, channel
+"""
+
+
+def upgrade() -> None:
+    # Per-day distinct counts cannot be turned into per-customer rows; rebuild
+    op.execute("DELETE FROM analytics_daily_funnel")
+    op.add_column(
+        "analytics_daily_funnel",
+        sa.Column(
+            "customer_id",
+            sa.Uuid(),
+            sa.ForeignKey("customers.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    # Back to per-day distinct counts; the next nightly rebuild refills them
+    op.execute("DELETE FROM analytics_daily_funnel")
+    op.drop_column("analytics_daily_funnel", "customer_id")
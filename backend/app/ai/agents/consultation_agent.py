@@ -16,9 +16,6 @@ for a cosmetic clinic.
 
 Your personality: {persona_personality}
 
-## Knowledge Context
-{rag_results}
-
 ## Clinic Manual
 {clinic_manual}
 
@@ -34,6 +31,13 @@ or needs human help.
 - Never make up medical information not in the knowledge context.
 - Respond naturally in the customer's language."""
 
+# Retrieved knowledge changes every turn, so it rides with the customer message
+# and the system prompt stays a stable, cacheable per-clinic prefix.
+AGENT_HUMAN_PROMPT = """## Knowledge Context
+{rag_results}
+
+{input}"""
+
 
 class ConsultationAgent:
     """Tool-calling agent for medical consultation with booking/payment capabilities."""
@@ -42,7 +46,7 @@ class ConsultationAgent:
         prompt = ChatPromptTemplate.from_messages([
             ("system", AGENT_SYSTEM_PROMPT),
             MessagesPlaceholder("chat_history"),
-            ("human", "{input}"),
+            ("human", AGENT_HUMAN_PROMPT),
             MessagesPlaceholder("agent_scratchpad"),
         ])
         agent = create_tool_calling_agent(llm, tools, prompt)
@@ -1,11 +1,15 @@
 """ConsultationService — main orchestrator for AI consultations."""
 
+import asyncio
+import contextlib
 import logging
 import uuid
 from dataclasses import dataclass
 
 from app.ai.agents.escalation import EscalationDetector, EscalationLevel
 from app.ai.chains.response_chain import ResponseChain
+from app.ai.chains.streaming import TokenCallback
+from app.ai.tracked_llm import tracked_as
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +25,9 @@ class ConsultationResult:
     escalated: bool
     escalation_level: EscalationLevel
     conversation_id: uuid.UUID | None = None
+    # Language the response is written in; None means Korean source text
+    # that still needs outgoing translation
+    language: str | None = None
 
 
 class ConsultationService:
@@ -50,14 +57,52 @@ class ConsultationService:
         conversation_history: str,
         sales_context: dict,
         protocol_context: str | None = None,
+        on_token: TokenCallback | None = None,
     ) -> ConsultationResult:
-        # Step 1: Check escalation
-        escalation_level = await self.escalation_detector.detect(
-            query, use_llm=True
-        )
+        # Step 1: Escalation check. The LLM classification runs concurrently
+        # with response generation; generation is discarded if it escalates.
+        with tracked_as("escalation"):
+            escalation_task = asyncio.create_task(
+                self.escalation_detector.detect(query, use_llm=True)
+            )
+        # Give the detector one step so its keyword fast path can short-circuit
+        # before any generation tokens are spent.
+        await asyncio.sleep(0)
+
+        generation_task = None
+        if not escalation_task.done() or (
+            escalation_task.result() != EscalationLevel.ESCALATE
+        ):
+            generation_task = asyncio.create_task(
+                self._generate(
+                    query=query,
+                    conversation_id=conversation_id,
+                    rag_results=rag_results,
+                    clinic_manual=clinic_manual,
+                    country_code=country_code,
+                    language_code=language_code,
+                    cultural_profile=cultural_profile,
+                    persona=persona,
+                    conversation_history=conversation_history,
+                    sales_context=sales_context,
+                    protocol_context=protocol_context,
+                    on_token=on_token,
+                )
+            )
+
+        try:
+            escalation_level = await escalation_task
+        except BaseException:
+            if generation_task:
+                generation_task.cancel()
+            raise
 
         # Step 2: If ESCALATE, return auto-message without AI response
         if escalation_level == EscalationLevel.ESCALATE:
+            if generation_task:
+                generation_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await generation_task
             auto_message = ESCALATION_MESSAGE_TEMPLATE.format(
                 persona_name=persona.get("name", "상담사"),
             )
@@ -66,12 +111,42 @@ class ConsultationService:
                 escalated=True,
                 escalation_level=escalation_level,
                 conversation_id=conversation_id,
+                language="ko",
             )
 
+        response = await generation_task
+        # The agent and every chain mode write in the customer's language
+        return ConsultationResult(
+            response=response,
+            escalated=False,
+            escalation_level=escalation_level,
+            conversation_id=conversation_id,
+            language=language_code,
+        )
+
+    async def _generate(
+        self,
+        query: str,
+        conversation_id: uuid.UUID,
+        rag_results: str,
+        clinic_manual: str,
+        country_code: str,
+        language_code: str,
+        cultural_profile: dict,
+        persona: dict,
+        conversation_history: str,
+        sales_context: dict,
+        protocol_context: str | None,
+        on_token: TokenCallback | None = None,
+    ) -> str:
+        """Produce the reply text: agent first (if configured), then the chain.
+
+        Only the chain streams to on_token.
+        """
         # Step 3: Try agent if available
         if self.agent:
             try:
-                response = await self.agent.ainvoke(
+                return await self.agent.ainvoke(
                     input=query,
                     chat_history=[],
                     persona_name=persona.get("name", "상담사"),
@@ -81,12 +156,6 @@ class ConsultationService:
                     language_code=language_code,
                     cultural_context=cultural_profile.get("style_prompt", ""),
                 )
-                return ConsultationResult(
-                    response=response,
-                    escalated=False,
-                    escalation_level=escalation_level,
-                    conversation_id=conversation_id,
-                )
             except Exception:
                 logger.exception(
                     "Agent failed for conversation %s, falling back to chain",
@@ -96,7 +165,7 @@ class ConsultationService:
         # Step 4: Fallback to 3-layer response chain
         if protocol_context:
             rag_results = f"{rag_results}\n\n[상담 프로토콜]\n{protocol_context}"
-        response = await self.response_chain.ainvoke(
+        return await self.response_chain.ainvoke(
             query=query,
             rag_results=rag_results,
             clinic_manual=clinic_manual,
@@ -106,11 +175,5 @@ class ConsultationService:
             persona=persona,
             conversation_history=conversation_history,
             sales_context=sales_context,
-        )
-
-        return ConsultationResult(
-            response=response,
-            escalated=False,
-            escalation_level=escalation_level,
-            conversation_id=conversation_id,
+            on_token=on_token,
         )
@@ -0,0 +1,175 @@
+"""FusedResponseChain — knowledge grounding, styling and sales in one call.
+
+Used by ResponseChain's "fused" and "two_pass" modes. The model first lists
+the facts it relies on inside <facts> (kept internal), then writes the
+customer-facing reply in the target language inside <reply>.
+"""
+
+import json
+import re
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+
+from app.ai.chains.streaming import TokenCallback, ainvoke_streaming
+
+# The system message is the per-clinic stable prefix (persona, rules, clinic
+# manual, style guide, sales strategy) and is cached by the provider; the
+# per-turn knowledge, history and question go in the human message.
+FUSED_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """당신은 {clinic_name}의 {persona_name}입니다. ({persona_personality})
+
+[지식 우선순위]
+1순위: 클리닉 자체 매뉴얼
+2순위: 검색된 의학 정보
+
+[지식 규칙]
+- 클리닉 매뉴얼에 있는 정보가 교과서와 다르면 클리닉 매뉴얼을 따른다
+- 내부 전용 정보(재료비, 마진, 난이도 등)는 절대 포함하지 않는다
+- 확실하지 않은 의료 정보는 "담당 의료진에게 확인해 드리겠습니다"로 안내
+- 위험한 부작용 정보는 반드시 포함한다
+
+[클리닉 매뉴얼]
+{clinic_manual}
+
+[문화 스타일 가이드 - {country_name}]
+{style_prompt}
+- 선호 표현: {preferred_expressions}
+- 피해야 할 표현: {avoided_expressions}
+- 이모지 사용 수준: {emoji_level}
+- 격식 수준: {formality_level}
+
+[세일즈 전략]
+- 추천 우선순위 시술: {top_procedures}
+- 현재 이벤트: {active_events}
+- 크로스셀링 기회: {cross_sell_options}
+- 가격 질문 → 부위 먼저 질문 → 맞춤 가격 → 예약 유도
+- 망설임 감지 → 이벤트/혜택 강조
+- 경쟁 병원 언급 → 차별점 강조
+- "생각해볼게요" → 부담 없는 상담 예약 제안
+- 노골적 세일즈 금지, 예약 유도는 자연스러운 질문 형태로
+- 내부 세일즈 점수, 마진 정보 절대 노출 금지"""),
+    ("human", """{knowledge}
+
+[현재 대화 상황]
+{conversation_history}
+
+고객 질문: {query}
+
+다음 형식으로만 답하세요:
+<facts>답변에 사용할 의학 정보를 위 지식에서만 간단히 정리 (한국어, 고객에게 보이지 않음)</facts>
+<reply>최종 답변</reply>
+
+최종 답변은 {language_code} 언어로, 위 문화 스타일과 세일즈 전략을 자연스럽게 적용하세요."""),
+])
+
+RETRIEVED_KNOWLEDGE = """[검색된 의학 정보]
+{rag_results}"""
+
+EXTRACTED_KNOWLEDGE = """[추출된 의학 정보]
+{knowledge_output}"""
+
+_REPLY_RE = re.compile(r"<reply>(.*?)(?:</reply>|$)", re.DOTALL)
+_FACTS_RE = re.compile(r"<facts>.*?(?:</facts>|$)", re.DOTALL)
+
+
+def extract_reply(output: str) -> str:
+    """The <reply> section of the model output; the whole output minus
+    <facts> if the model ignored the format."""
+    match = _REPLY_RE.search(output)
+    if match:
+        return match.group(1).strip()
+    return _FACTS_RE.sub("", output).strip()
+
+
+class ReplyStreamFilter:
+    """Forwards only the text inside <reply> from a streamed fused output."""
+
+    _OPEN, _CLOSE = "<reply>", "</reply>"
+
+    def __init__(self, on_token: TokenCallback):
+        self.on_token = on_token
+        self._output = ""
+        self._sent = 0
+
+    def __call__(self, chunk: str) -> None:
+        self._output += chunk
+        start = self._output.find(self._OPEN)
+        if start == -1:
+            return
+        body = self._output[start + len(self._OPEN):].lstrip()
+        end = body.find(self._CLOSE)
+        # Hold back a tail that could be the start of </reply>
+        ready = end if end != -1 else max(len(body) - len(self._CLOSE) + 1, 0)
+        if ready > self._sent:
+            self.on_token(body[self._sent:ready])
+            self._sent = ready
+
+
+def _json_list(values: list) -> str:
+    return json.dumps(values, ensure_ascii=False) if values else "(없음)"
+
+
+class FusedResponseChain:
+    """Single-call consultation reply: grounding, cultural style and sales."""
+
+    def __init__(self, llm: BaseChatModel, clinic_name: str = "클리닉"):
+        self.llm = llm
+        self.clinic_name = clinic_name
+        self.prompt = FUSED_PROMPT
+        self._chain = self.prompt | self.llm | StrOutputParser()
+
+    async def ainvoke(
+        self,
+        query: str,
+        country_code: str,
+        language_code: str,
+        cultural_profile: dict,
+        persona: dict,
+        conversation_history: str,
+        sales_context: dict,
+        rag_results: str = "",
+        clinic_manual: str = "",
+        knowledge_output: str | None = None,
+        on_token: TokenCallback | None = None,
+    ) -> str:
+        """Reply in language_code.
+
+        Grounds on clinic_manual plus rag_results, or plus knowledge_output when
+        KnowledgeChain has already extracted it (two-pass mode). on_token
+        receives the reply text only, never the <facts> section.
+        """
+        if knowledge_output is not None:
+            knowledge = EXTRACTED_KNOWLEDGE.format(knowledge_output=knowledge_output)
+        else:
+            knowledge = RETRIEVED_KNOWLEDGE.format(
+                rag_results=rag_results or "(검색 결과 없음)"
+            )
+
+        if on_token is not None:
+            on_token = ReplyStreamFilter(on_token)
+        output = await ainvoke_streaming(self._chain, {
+            "clinic_name": self.clinic_name,
+            "persona_name": persona.get("name", "상담사"),
+            "persona_personality": persona.get("personality", ""),
+            "clinic_manual": clinic_manual or "(매뉴얼 없음)",
+            "knowledge": knowledge,
+            "country_name": cultural_profile.get("country_name", country_code),
+            "style_prompt": cultural_profile.get("style_prompt", ""),
+            "preferred_expressions": _json_list(
+                cultural_profile.get("preferred_expressions", [])
+            ),
+            "avoided_expressions": _json_list(
+                cultural_profile.get("avoided_expressions", [])
+            ),
+            "emoji_level": cultural_profile.get("emoji_level", "medium"),
+            "formality_level": cultural_profile.get("formality_level", "polite"),
+            "conversation_history": conversation_history or "(새 대화)",
+            "top_procedures": _json_list(sales_context.get("top_procedures", [])),
+            "active_events": _json_list(sales_context.get("active_events", [])),
+            "cross_sell_options": _json_list(sales_context.get("cross_sell_options", [])),
+            "query": query,
+            "language_code": language_code,
+        }, on_token)
+        return extract_reply(output)
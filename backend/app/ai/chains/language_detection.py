@@ -0,0 +1,214 @@
+"""Offline language identification for the supported customer languages.
+
+LanguageDetector tries this first and only asks the LLM when the result is
+ambiguous. Two signals:
+
+- Script histogram: Hangul → ko, kana → ja, Thai → th, Han → zh-CN/zh-TW
+  (told apart by characters that only exist in one of the two scripts),
+  Latin → en/vi/id.
+- For Latin text, Vietnamese-only letters (đ, ơ, ư, tone-marked vowels)
+  settle vi; otherwise a character-trigram model trained on the seed texts
+  below scores en, id and unaccented vi.
+
+detect_language() returns (language, confidence); language is None when
+there is nothing to go on (emoji, digits, stickers).
+"""
+
+import math
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+
+# --- Scripts ---
+
+_CJK_WEIGHT = 2  # one Hangul/Han/kana character carries about a word's worth
+
+
+def _script(ch: str) -> str | None:
+    code = ord(ch)
+    if 0xAC00 <= code <= 0xD7A3 or 0x1100 <= code <= 0x11FF or 0x3130 <= code <= 0x318F:
+        return "hangul"
+    if 0x3040 <= code <= 0x30FF or 0x31F0 <= code <= 0x31FF or 0xFF66 <= code <= 0xFF9F:
+        return "kana"
+    if 0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF or 0xF900 <= code <= 0xFAFF:
+        return "han"
+    if 0x0E00 <= code <= 0x0E7F:
+        return "thai"
+    if ch.isalpha() and (code < 0x0250 or 0x1E00 <= code <= 0x1EFF):
+        return "latin"
+    return None
+
+
+def script_histogram(text: str) -> Counter:
+    """Letters per script, with CJK characters weighted as words."""
+    counts: Counter = Counter()
+    for ch in text:
+        script = _script(ch)
+        if script is not None:
+            counts[script] += 1 if script in ("latin", "thai") else _CJK_WEIGHT
+    return counts
+
+
+# --- Simplified vs Traditional Chinese ---
+
+# Common characters whose simplified and traditional forms differ, paired
+# position by position; the clinic-consultation vocabulary is well covered.
+_SIMPLIFIED = (
+    "这们个来时为说国会对么后过发还学问见经进关开门间书长现点价钱医疗术预请谢吗样费"
+    "诊约电话号码该应当觉让给没实办几员听试场内处线头脸颈双眼鼻颊疤痘斑肤针剂疗贵问"
+    "术后肿疼痛恢复预约时间区别效果维持多久哪里产品"
+)
+_TRADITIONAL = (
+    "這們個來時為說國會對麼後過發還學問見經進關開門間書長現點價錢醫療術預請謝嗎樣費"
+    "診約電話號碼該應當覺讓給沒實辦幾員聽試場內處線頭臉頸雙眼鼻頰疤痘斑膚針劑療貴問"
+    "術後腫疼痛恢復預約時間區別效果維持多久哪裡產品"
+)
+SIMPLIFIED_ONLY = frozenset(s for s, t in zip(_SIMPLIFIED, _TRADITIONAL) if s != t)
+TRADITIONAL_ONLY = frozenset(t for s, t in zip(_SIMPLIFIED, _TRADITIONAL) if s != t)
+
+
+def _chinese_variant(text: str) -> tuple[str, float]:
+    simplified = sum(ch in SIMPLIFIED_ONLY for ch in text)
+    traditional = sum(ch in TRADITIONAL_ONLY for ch in text)
+    if simplified == traditional:
+        return "zh-CN", 0.5
+    if simplified > traditional:
+        return "zh-CN", simplified / (simplified + traditional)
+    return "zh-TW", traditional / (simplified + traditional)
+
+
+# --- Latin-script languages ---
+
+_VIETNAMESE_LETTERS = frozenset("đơưăĐƠƯĂ")
+
+_SEED_TEXTS = {
+    "en": (
+        "how much is botox for the forehead and the jaw line. i would like to book "
+        "an appointment next week if there is a slot available. what is the price of "
+        "the filler and how long does it last. do you have an english speaking doctor "
+        "at the clinic. is there any swelling or pain after the procedure and when can "
+        "i wash my face. thank you for your help, please let me know the total cost "
+        "including the consultation. can i change my reservation to the afternoon. "
+        "where is the clinic located and how do i get there from the station. "
+        "we are traveling from the united states and staying for five days. "
+        "the laser treatment was great but my skin is still a little red. "
+        "what should i do before the surgery and should i stop taking any medicine. "
+        "hello, i saw your clinic on instagram and wanted to ask about the package "
+        "with skin booster and ten sessions of laser toning. could you send me the "
+        "price list and the available times this month. my friend recommended this "
+        "doctor. is it possible to pay by credit card and do you offer a tax refund "
+        "for foreigners. i have sensitive skin so i am worried about side effects. "
+        "please confirm my booking for tomorrow morning at ten. sorry i will be late "
+        "by about twenty minutes because of traffic. okay thanks, see you soon."
+    ),
+    "id": (
+        "berapa harga botox untuk dahi dan rahang. saya ingin membuat janji minggu "
+        "depan kalau masih ada jadwal yang kosong. berapa harga filler dan berapa lama "
+        "hasilnya bertahan. apakah ada dokter yang bisa berbahasa inggris di klinik. "
+        "apakah ada bengkak atau sakit setelah tindakan dan kapan saya boleh mencuci "
+        "muka. terima kasih atas bantuannya, tolong beri tahu saya total biaya termasuk "
+        "konsultasi. bisakah saya mengubah reservasi ke sore hari. di mana lokasi klinik "
+        "dan bagaimana cara ke sana dari stasiun. kami datang dari jakarta dan tinggal "
+        "selama lima hari. perawatan laser sangat bagus tetapi kulit saya masih sedikit "
+        "merah. apa yang harus saya lakukan sebelum operasi dan apakah saya harus "
+        "berhenti minum obat. halo, saya melihat klinik anda di instagram dan ingin "
+        "bertanya tentang paket skin booster dan sepuluh kali laser toning. tolong "
+        "kirimkan daftar harga dan jadwal yang tersedia bulan ini. teman saya "
+        "merekomendasikan dokter ini. apakah bisa bayar dengan kartu kredit dan "
+        "apakah ada pengembalian pajak untuk orang asing. kulit saya sensitif jadi "
+        "saya khawatir dengan efek sampingnya. mohon konfirmasi pemesanan saya untuk "
+        "besok pagi jam sepuluh. maaf saya akan terlambat sekitar dua puluh menit "
+        "karena macet. baik terima kasih, sampai jumpa."
+    ),
+    "vi": (
+        "tiêm botox trán và hàm giá bao nhiêu. tôi muốn đặt lịch hẹn vào tuần sau nếu "
+        "còn chỗ trống. giá filler là bao nhiêu và hiệu quả kéo dài bao lâu. phòng khám "
+        "có bác sĩ nói tiếng anh không. sau khi làm có bị sưng hay đau không và khi nào "
+        "tôi có thể rửa mặt. cảm ơn bạn đã giúp đỡ, vui lòng cho tôi biết tổng chi phí "
+        "bao gồm cả tư vấn. tôi có thể đổi lịch hẹn sang buổi chiều được không. phòng "
+        "khám ở đâu và đi từ nhà ga như thế nào. chúng tôi đến từ hà nội và ở lại năm "
+        "ngày. điều trị laser rất tốt nhưng da tôi vẫn còn hơi đỏ. tôi nên làm gì trước "
+        "khi phẫu thuật và có cần ngừng uống thuốc không. xin chào, tôi thấy phòng "
+        "khám của bạn trên instagram và muốn hỏi về gói tiêm dưỡng da và mười lần "
+        "laser toning. bạn gửi cho tôi bảng giá và lịch trống trong tháng này nhé. "
+        "bạn tôi giới thiệu bác sĩ này. có thể thanh toán bằng thẻ tín dụng không và "
+        "người nước ngoài có được hoàn thuế không. da tôi nhạy cảm nên tôi lo về tác "
+        "dụng phụ. vui lòng xác nhận lịch hẹn của tôi sáng mai lúc mười giờ. xin lỗi "
+        "tôi sẽ đến muộn khoảng hai mươi phút vì kẹt xe. vâng cảm ơn, hẹn gặp lại."
+    ),
+}
+
+
+def _strip_accents(text: str) -> str:
+    decomposed = unicodedata.normalize("NFD", text.replace("đ", "d").replace("Đ", "D"))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _trigrams(text: str) -> list[str]:
+    grams = []
+    for word in "".join(ch if ch.isalpha() else " " for ch in text.lower()).split():
+        padded = f" {word} "
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+@lru_cache(maxsize=1)
+def _trigram_model() -> tuple[dict[str, dict[str, float]], dict[str, float]]:
+    """Per-language trigram log-probabilities, add-one smoothed over a shared vocabulary."""
+    counts = {
+        language: Counter(_trigrams(_strip_accents(seed)))
+        for language, seed in _SEED_TEXTS.items()
+    }
+    vocabulary = len(set().union(*counts.values())) + 1
+    model: dict[str, dict[str, float]] = {}
+    unseen: dict[str, float] = {}
+    for language, grams in counts.items():
+        total = sum(grams.values()) + vocabulary
+        model[language] = {g: math.log((n + 1) / total) for g, n in grams.items()}
+        unseen[language] = math.log(1 / total)
+    return model, unseen
+
+
+def _latin_language(text: str) -> tuple[str, float]:
+    if any(ch in _VIETNAMESE_LETTERS or 0x1EA0 <= ord(ch) <= 0x1EF9 for ch in text):
+        return "vi", 1.0
+
+    grams = _trigrams(_strip_accents(text))
+    if not grams:
+        return "en", 0.0
+    model, unseen = _trigram_model()
+    scores = {
+        language: sum(probs.get(g, unseen[language]) for g in grams)
+        for language, probs in model.items()
+    }
+    best = max(scores, key=scores.get)
+    # Posterior over the three languages, discounted for very short texts
+    top = scores[best]
+    posterior = 1 / sum(math.exp(score - top) for score in scores.values())
+    return best, posterior * min(1.0, len(grams) / 12)
+
+
+def detect_language(text: str) -> tuple[str | None, float]:
+    """Return (language code, confidence in [0, 1]) without calling a model."""
+    histogram = script_histogram(text)
+    total = sum(histogram.values())
+    if not total:
+        return None, 0.0
+
+    # Japanese mixes kanji with kana; any real amount of kana decides it
+    if histogram["kana"] and histogram["kana"] * 10 >= histogram["han"]:
+        return "ja", (histogram["kana"] + histogram["han"]) / total
+
+    script, count = histogram.most_common(1)[0]
+    share = count / total
+    if script == "hangul":
+        return "ko", share
+    if script == "thai":
+        return "th", share
+    if script == "han":
+        language, confidence = _chinese_variant(text)
+        return language, share * confidence
+    if script == "kana":
+        return "ja", share
+    language, confidence = _latin_language(text)
+    return language, share * confidence
@@ -1,25 +1,56 @@
-"""ResponseChain — 3-layer pipeline orchestrator.
+"""ResponseChain — consultation reply pipeline orchestrator.
 
-Executes: KnowledgeChain → StyleChain → SalesSkillChain
+Modes (settings.ai_pipeline_mode):
+- "layered": KnowledgeChain → StyleChain → SalesSkillChain (three calls)
+- "two_pass": KnowledgeChain → FusedResponseChain (style and sales in one call)
+- "fused": FusedResponseChain alone (one call)
+
+Every mode replies in the customer's language. Compare modes offline with
+app.ai.pipeline_benchmark.
 """
 
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from app.ai.chains.fused_response_chain import FusedResponseChain
 from app.ai.chains.knowledge_chain import KnowledgeChain
 from app.ai.chains.sales_skill_chain import SalesSkillChain
+from app.ai.chains.streaming import TokenCallback
 from app.ai.chains.style_chain import StyleChain
 
+PIPELINE_MODES = ("layered", "two_pass", "fused")
+
 
 class ResponseChain:
-    """Orchestrates the 3-layer AI response pipeline."""
+    """Orchestrates the AI response pipeline."""
 
     def __init__(
         self,
         knowledge_chain: KnowledgeChain,
         style_chain: StyleChain,
         sales_chain: SalesSkillChain,
+        fused_chain: FusedResponseChain | None = None,
+        mode: str = "layered",
     ):
+        if mode not in PIPELINE_MODES:
+            raise ValueError(f"Unknown pipeline mode: {mode}")
+        if mode != "layered" and fused_chain is None:
+            raise ValueError(f"Pipeline mode {mode} requires a fused chain")
         self.knowledge_chain = knowledge_chain
         self.style_chain = style_chain
         self.sales_chain = sales_chain
+        self.fused_chain = fused_chain
+        self.mode = mode
+
+    @classmethod
+    def from_llm(cls, llm: BaseChatModel, mode: str = "layered") -> "ResponseChain":
+        """Build every layer on one model."""
+        return cls(
+            KnowledgeChain(llm),
+            StyleChain(llm),
+            SalesSkillChain(llm),
+            fused_chain=FusedResponseChain(llm),
+            mode=mode,
+        )
 
     async def ainvoke(
         self,
@@ -32,7 +63,23 @@ class ResponseChain:
         persona: dict,
         conversation_history: str,
         sales_context: dict,
+        on_token: TokenCallback | None = None,
     ) -> str:
+        """Generate the reply; on_token receives the final stage's text as it streams."""
+        if self.mode == "fused":
+            return await self.fused_chain.ainvoke(
+                query=query,
+                rag_results=rag_results,
+                clinic_manual=clinic_manual,
+                country_code=country_code,
+                language_code=language_code,
+                cultural_profile=cultural_profile,
+                persona=persona,
+                conversation_history=conversation_history,
+                sales_context=sales_context,
+                on_token=on_token,
+            )
+
         # Layer 1: Knowledge extraction
         knowledge_output = await self.knowledge_chain.ainvoke(
             query=query,
@@ -40,6 +87,21 @@ class ResponseChain:
             clinic_manual=clinic_manual,
         )
 
+        if self.mode == "two_pass":
+            # Layers 2-3 in one call
+            return await self.fused_chain.ainvoke(
+                query=query,
+                clinic_manual=clinic_manual,
+                knowledge_output=knowledge_output,
+                country_code=country_code,
+                language_code=language_code,
+                cultural_profile=cultural_profile,
+                persona=persona,
+                conversation_history=conversation_history,
+                sales_context=sales_context,
+                on_token=on_token,
+            )
+
         # Layer 2: Cultural styling + translation
         styled_output = await self.style_chain.ainvoke(
             knowledge_output=knowledge_output,
@@ -54,6 +116,7 @@ class ResponseChain:
             styled_output=styled_output,
             conversation_history=conversation_history,
             sales_context=sales_context,
+            on_token=on_token,
         )
 
         return final_output
@@ -0,0 +1,26 @@
+"""Token streaming for the final consultation stage.
+
+The last chain of a ResponseChain mode accepts an on_token callback and
+feeds it the reply text as the model produces it; AIResponseService hands
+in DraftStream.push (app.websocket.draft_stream).
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+from langchain_core.runnables import Runnable
+
+TokenCallback = Callable[[str], None]
+
+
+async def ainvoke_streaming(
+    chain: Runnable, inputs: dict[str, Any], on_token: TokenCallback | None
+) -> str:
+    """Run a text chain, passing each chunk to on_token as it arrives."""
+    if on_token is None:
+        return await chain.ainvoke(inputs)
+    chunks = []
+    async for chunk in chain.astream(inputs):
+        chunks.append(chunk)
+        on_token(chunk)
+    return "".join(chunks)
@@ -1,12 +1,19 @@
 """Translation pipeline — language detection, medical term matching, AI translation."""
 
 import re
+import uuid
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 
+from app.ai.chains.language_detection import detect_language
+from app.ai.chains.translation_memory import TranslationMemory
+from app.config import settings
+from app.middleware.metrics import LANGUAGE_DETECTIONS
+
 # --- Language Detection ---
 
 SUPPORTED_LANGUAGES = ("ko", "ja", "en", "zh-CN", "zh-TW", "vi", "th", "id")
@@ -21,14 +28,27 @@ DETECT_PROMPT = ChatPromptTemplate.from_messages([
 
 
 class LanguageDetector:
-    """Detects the language of input text using LLM."""
+    """Detects the language of input text, asking the LLM only when unsure.
+
+    The offline detector (language_detection.detect_language) settles most
+    messages; ambiguous ones (short Latin text, zh-CN vs zh-TW without
+    distinguishing characters, mixed scripts) go to the LLM.
+    """
 
     def __init__(self, llm: BaseChatModel):
         self._chain = DETECT_PROMPT | llm | StrOutputParser()
 
     async def detect(self, text: str, known_language: str | None = None) -> str:
         if known_language:
+            LANGUAGE_DETECTIONS.labels(method="known").inc()
             return known_language
+        if settings.language_detection_local_enabled:
+            language, confidence = detect_language(text)
+            if language and confidence >= settings.language_detection_min_confidence:
+                LANGUAGE_DETECTIONS.labels(method="local").inc()
+                return language
+
+        LANGUAGE_DETECTIONS.labels(method="llm").inc()
         result = await self._chain.ainvoke({"text": text})
         raw = result.strip()
         return _LANG_LOOKUP.get(raw.lower(), raw)
@@ -39,24 +59,100 @@ class LanguageDetector:
 TERM_PATTERN = re.compile(r"\[TERM:(.+?)\]")
 
 
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Regex source matching any of terms, longest first, built from a trie.
+
+    Alternatives share their prefixes, so at each text position the regex
+    engine only follows branches matching the next character instead of
+    trying every term in turn.
+    """
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}  # a term ends here
+    return _node_pattern(trie)
+
+
+def _node_pattern(node: dict) -> str:
+    branches = [
+        re.escape(char) + _node_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+    if not branches:
+        return ""
+    if len(branches) == 1 and "" not in node:
+        return branches[0]
+    group = "(?:" + "|".join(branches) + ")"
+    # Greedy optional: prefer the longer term, fall back to the one ending here
+    return group + "?" if "" in node else group
+
+
+@dataclass(frozen=True)
+class CompiledTerms:
+    """One language's glossary compiled into a single case-insensitive regex."""
+
+    terms: dict[str, str]
+    pattern: re.Pattern | None
+    # Lower-cased foreign term -> Korean term
+    lookup: dict[str, str]
+
+    @classmethod
+    def compile(cls, terms: dict[str, str]) -> "CompiledTerms":
+        lookup = {foreign.lower(): korean for foreign, korean in terms.items() if foreign}
+        pattern = re.compile(_trie_pattern(lookup), re.IGNORECASE) if lookup else None
+        return cls(terms=terms, pattern=pattern, lookup=lookup)
+
+    def replace(self, text: str) -> str:
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(self._markup, text)
+
+    def _markup(self, match: re.Match) -> str:
+        found = match.group(0)
+        korean = self.lookup.get(found.lower())
+        if korean is None:
+            # Case folding the regex applies but str.lower() doesn't
+            korean = next(
+                (k for f, k in self.lookup.items() if re.fullmatch(re.escape(f), found, re.I)),
+                None,
+            )
+        return f"[TERM:{korean}]" if korean is not None else found
+
+
 class MedicalTermMatcher:
-    """Replaces medical terms with markup for accurate translation."""
+    """Replaces medical terms with markup for accurate translation.
+
+    Each language's terms are compiled once, on first use, into one regex;
+    replace_terms is then a single pass over the text whatever the glossary
+    size. Pass the matcher being replaced as previous to carry over compiled
+    languages whose terms did not change.
+    """
 
-    def __init__(self, term_dict: dict[str, dict[str, str]]):
+    def __init__(
+        self,
+        term_dict: dict[str, dict[str, str]],
+        previous: "MedicalTermMatcher | None" = None,
+    ):
         """term_dict: {language_code: {foreign_term: korean_term}}"""
         self._term_dict = term_dict
+        self._compiled: dict[str, CompiledTerms] = {}
+        if previous is not None:
+            for language, compiled in previous._compiled.items():
+                if term_dict.get(language) == compiled.terms:
+                    self._compiled[language] = compiled
 
     def replace_terms(self, text: str, language: str) -> str:
         """Replace foreign medical terms with [TERM:korean] markup."""
-        terms = self._term_dict.get(language, {})
-        if not terms:
-            return text
-
-        result = text
-        for foreign_term, korean_term in sorted(terms.items(), key=lambda x: -len(x[0])):
-            pattern = re.compile(re.escape(foreign_term), re.IGNORECASE)
-            result = pattern.sub(f"[TERM:{korean_term}]", result)
-        return result
+        compiled = self._compiled.get(language)
+        if compiled is None:
+            terms = self._term_dict.get(language)
+            if not terms:
+                return text
+            compiled = self._compiled[language] = CompiledTerms.compile(terms)
+        return compiled.replace(text)
 
     def restore_terms(self, text: str) -> str:
         """Remove [TERM:...] markup, keeping the Korean term."""
@@ -71,6 +167,7 @@ class TranslationResult:
     source_language: str
     target_language: str
     skipped: bool = False
+    from_memory: bool = False
 
 
 # --- Translation Chain ---
@@ -103,17 +200,48 @@ class TranslationChain:
         translation_llm: BaseChatModel,
         detection_llm: BaseChatModel,
         term_dict: dict[str, dict[str, str]],
+        memory: TranslationMemory | None = None,
     ):
         self._detector = LanguageDetector(detection_llm)
         self._matcher = MedicalTermMatcher(term_dict)
         self._translate_chain = TRANSLATE_PROMPT | translation_llm | StrOutputParser()
+        self._memory = memory
+
+    async def _translate(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        clinic_id: uuid.UUID | None,
+    ) -> tuple[str, bool]:
+        """Translate text as sent to the LLM; returns (translation, from_memory)."""
+        if self._memory is not None:
+            remembered = await self._memory.get(text, source_lang, target_lang, clinic_id)
+            if remembered is not None:
+                return remembered, True
+
+        translated = await self._translate_chain.ainvoke({
+            "text": text,
+            "target_language_name": LANGUAGE_NAMES.get(target_lang, target_lang),
+        })
+        if self._memory is not None:
+            await self._memory.set(text, source_lang, target_lang, translated, clinic_id)
+        return translated, False
 
     async def translate_incoming(
         self,
         text: str,
         known_language: str | None = None,
+        term_matcher: MedicalTermMatcher | None = None,
+        clinic_id: uuid.UUID | None = None,
     ) -> TranslationResult:
-        """Translate incoming message (foreign → Korean)."""
+        """Translate incoming message (foreign → Korean).
+
+        term_matcher: the clinic's compiled glossary; defaults to the chain's
+        own term_dict.
+        clinic_id: selects the clinic's reviewed corrections in translation memory.
+        """
+        matcher = term_matcher or self._matcher
         source_lang = await self._detector.detect(text, known_language)
 
         if source_lang == "ko":
@@ -124,23 +252,24 @@ class TranslationChain:
                 skipped=True,
             )
 
-        marked = self._matcher.replace_terms(text, source_lang)
-        translated = await self._translate_chain.ainvoke({
-            "text": marked,
-            "target_language_name": "한국어",
-        })
-        restored = self._matcher.restore_terms(translated)
+        marked = matcher.replace_terms(text, source_lang)
+        translated, from_memory = await self._translate(
+            marked, source_lang, "ko", clinic_id
+        )
+        restored = matcher.restore_terms(translated)
 
         return TranslationResult(
             translated_text=restored,
             source_language=source_lang,
             target_language="ko",
+            from_memory=from_memory,
         )
 
     async def translate_outgoing(
         self,
         text: str,
         target_language: str,
+        clinic_id: uuid.UUID | None = None,
     ) -> TranslationResult:
         """Translate outgoing message (Korean → foreign)."""
         if target_language == "ko":
@@ -151,14 +280,13 @@ class TranslationChain:
                 skipped=True,
             )
 
-        lang_name = LANGUAGE_NAMES.get(target_language, target_language)
-        translated = await self._translate_chain.ainvoke({
-            "text": text,
-            "target_language_name": lang_name,
-        })
+        translated, from_memory = await self._translate(
+            text, "ko", target_language, clinic_id
+        )
 
         return TranslationResult(
             translated_text=translated,
             source_language="ko",
             target_language=target_language,
+            from_memory=from_memory,
         )
@@ -0,0 +1,153 @@
+"""Translation memory — reuse translations of texts seen before.
+
+Outgoing replies repeat a lot: escalation templates, greetings, disclosures
+and stock FAQ answers. TranslationChain asks the memory before calling the
+LLM and stores what the LLM returns.
+
+Entries are keyed by the text exactly as it would be sent to the LLM, so the
+glossary is part of the key: incoming text is keyed after medical-term
+markup, and a glossary change that touches the text yields a new key.
+Texts are NFKC-normalized with whitespace collapsed.
+
+Tiers:
+- In process: a bounded LRU whose entries live for
+  translation_memory_local_ttl_seconds, so corrections made elsewhere are
+  picked up quickly.
+- Redis: shared across workers with a TTL.
+
+Reviewed corrections from translation reports are stored per clinic and take
+precedence over the shared LLM entry for that clinic (see correct()).
+"""
+
+import hashlib
+import logging
+import time
+import unicodedata
+import uuid
+from collections import OrderedDict
+
+import orjson
+
+from app.config import settings
+from app.core.cache import cache_set
+from app.core.redis import pipelined
+from app.middleware.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+SHARED_SCOPE = "shared"
+
+
+def normalize_text(text: str) -> str:
+    """NFKC-fold and collapse whitespace; case and punctuation are kept."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class TranslationMemory:
+    """Two-tier exact-match translation memory with per-clinic corrections."""
+
+    KEY_PREFIX = "translation:memory:"
+
+    def __init__(
+        self,
+        max_size: int | None = None,
+        ttl_seconds: int | None = None,
+        local_ttl_seconds: float | None = None,
+    ):
+        self.max_size = max_size or settings.translation_memory_size
+        self.ttl_seconds = ttl_seconds or settings.translation_memory_ttl_seconds
+        self.local_ttl_seconds = (
+            local_ttl_seconds or settings.translation_memory_local_ttl_seconds
+        )
+        # (clinic id, shared key) -> (expiry on the monotonic clock, translation)
+        self._local: OrderedDict[tuple[str, str], tuple[float, str]] = OrderedDict()
+
+    def _key(self, scope: str, text: str, source: str, target: str) -> str:
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{self.KEY_PREFIX}{scope}:{source}:{target}:{digest}"
+
+    async def get(
+        self,
+        text: str,
+        source: str,
+        target: str,
+        clinic_id: uuid.UUID | None = None,
+    ) -> str | None:
+        """Return the remembered translation, preferring the clinic's correction."""
+        local_key = (str(clinic_id), self._key(SHARED_SCOPE, text, source, target))
+        translation = self._local_get(local_key)
+        if translation is not None:
+            CACHE_REQUESTS.labels(cache="translation_memory", result="local_hit").inc()
+            return translation
+
+        keys = [self._key(SHARED_SCOPE, text, source, target)]
+        if clinic_id is not None:
+            keys.insert(0, self._key(str(clinic_id), text, source, target))
+        try:
+            values = await pipelined("mget", *keys)
+        except Exception:
+            logger.debug("Translation memory read failed")
+            values = []
+
+        raw = next((v for v in values if v is not None), None)
+        if raw is None:
+            CACHE_REQUESTS.labels(cache="translation_memory", result="miss").inc()
+            return None
+        CACHE_REQUESTS.labels(cache="translation_memory", result="hit").inc()
+        translation = orjson.loads(raw)
+        self._remember(local_key, translation)
+        return translation
+
+    async def set(
+        self,
+        text: str,
+        source: str,
+        target: str,
+        translation: str,
+        clinic_id: uuid.UUID | None = None,
+    ) -> None:
+        """Remember an LLM translation for every clinic."""
+        key = self._key(SHARED_SCOPE, text, source, target)
+        self._remember((str(clinic_id), key), translation)
+        await cache_set(key, translation, ttl_seconds=self.ttl_seconds)
+
+    async def correct(
+        self,
+        text: str,
+        source: str,
+        target: str,
+        translation: str,
+        clinic_id: uuid.UUID,
+    ) -> None:
+        """Make a reviewed translation the answer for this text at one clinic."""
+        key = self._key(str(clinic_id), text, source, target)
+        self._remember(
+            (str(clinic_id), self._key(SHARED_SCOPE, text, source, target)), translation
+        )
+        await cache_set(
+            key, translation, ttl_seconds=settings.translation_memory_correction_ttl_seconds
+        )
+
+    def clear(self) -> None:
+        self._local.clear()
+
+    def _local_get(self, key: tuple[str, str]) -> str | None:
+        item = self._local.get(key)
+        if item is None:
+            return None
+        expires_at, translation = item
+        if expires_at <= time.monotonic():
+            self._local.pop(key, None)
+            return None
+        self._local.move_to_end(key)
+        return translation
+
+    def _remember(self, key: tuple[str, str], translation: str) -> None:
+        self._local[key] = (time.monotonic() + self.local_ttl_seconds, translation)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+
+# Process-wide instance used by TranslationChain
+translation_memory = TranslationMemory()
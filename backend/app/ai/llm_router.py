@@ -6,9 +6,17 @@ Usage:
     consultation_llm = get_consultation_llm()   # Claude → GPT-4o → Gemini
     light_llm = get_light_llm()                 # GPT-4o-mini → Gemini Flash
     embeddings = get_embeddings()               # Azure text-embedding-3-small
+
+Prompt caching: the consultation prompts keep everything stable per clinic
+(rules, clinic manual, persona, style guide) in the system message and put
+per-turn input in the human message. Claude gets a cache breakpoint on the
+system prompt (PromptCachingChatAnthropic); Azure OpenAI and Gemini cache
+identical prompt prefixes on their own. Cached tokens are recorded by
+UsageTracker (through tracked_llm.track_usage for the consultation chains).
 """
 
 from functools import lru_cache
+from typing import Any
 
 from langchain_anthropic import ChatAnthropic
 from langchain_core.language_models.chat_models import BaseChatModel
@@ -18,8 +26,24 @@ from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
 from app.config import settings
 
 
+class PromptCachingChatAnthropic(ChatAnthropic):
+    """ChatAnthropic that caches the prompt up to the end of the system message."""
+
+    def _get_request_payload(self, input_: Any, *, stop: list[str] | None = None, **kwargs):
+        payload = super()._get_request_payload(input_, stop=stop, **kwargs)
+        system = payload.get("system")
+        if isinstance(system, str) and system:
+            payload["system"] = [
+                {"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}
+            ]
+        elif isinstance(system, list) and system and isinstance(system[-1], dict):
+            system[-1] = {**system[-1], "cache_control": {"type": "ephemeral"}}
+        return payload
+
+
 def _build_claude() -> ChatAnthropic:
-    return ChatAnthropic(
+    model_class = PromptCachingChatAnthropic if settings.ai_prompt_caching else ChatAnthropic
+    return model_class(
         model="claude-sonnet-4-5-20250929",
         api_key=settings.anthropic_api_key,
         temperature=settings.ai_temperature,
@@ -35,6 +59,8 @@ def _build_gpt4o() -> AzureChatOpenAI:
         api_version=settings.azure_openai_api_version,
         temperature=settings.ai_temperature,
         max_tokens=settings.ai_max_tokens,
+        # Usage on streamed replies too (draft streaming), for UsageTracker
+        stream_usage=True,
     )
 
 
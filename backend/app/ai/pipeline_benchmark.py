@@ -0,0 +1,273 @@
+"""Offline comparison of ResponseChain pipeline modes on recorded turns.
+
+Usage:
+    python -m app.ai.pipeline_benchmark turns.jsonl --modes layered,two_pass,fused
+
+Each line of the input is one recorded consultation turn holding the
+arguments of ResponseChain.ainvoke (query, rag_results, clinic_manual,
+country_code, language_code, cultural_profile, persona,
+conversation_history, sales_context) and optionally an "id".
+
+Every mode replays every turn against the consultation LLM. Per mode the
+report gives latency (p50/p95), LLM calls, tokens (and the prompt-cached
+share) and cost per turn, and
+parity with the baseline mode's reply for the same turn:
+- similarity: difflib ratio of the two replies
+- figure recall: share of the baseline's numbers (prices, doses,
+  durations) that the reply also states
+Parity is lexical only; read a sample of the replies before switching
+settings.ai_pipeline_mode.
+"""
+
+import argparse
+import asyncio
+import difflib
+import json
+import math
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import LLMResult
+
+from app.ai.chains.response_chain import PIPELINE_MODES, ResponseChain
+from app.ai.usage_tracker import cache_token_counts, calculate_cost
+
+_FIGURE_RE = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+@dataclass
+class RecordedTurn:
+    id: str
+    query: str
+    country_code: str
+    language_code: str
+    rag_results: str = ""
+    clinic_manual: str = ""
+    cultural_profile: dict = field(default_factory=dict)
+    persona: dict = field(default_factory=dict)
+    conversation_history: str = ""
+    sales_context: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict, index: int = 0) -> "RecordedTurn":
+        return cls(
+            id=str(data.get("id", index)),
+            query=data["query"],
+            country_code=data.get("country_code", "KR"),
+            language_code=data.get("language_code", "ko"),
+            rag_results=data.get("rag_results", ""),
+            clinic_manual=data.get("clinic_manual", ""),
+            cultural_profile=data.get("cultural_profile", {}),
+            persona=data.get("persona", {}),
+            conversation_history=data.get("conversation_history", ""),
+            sales_context=data.get("sales_context", {}),
+        )
+
+    def chain_kwargs(self) -> dict[str, Any]:
+        kwargs = asdict(self)
+        kwargs.pop("id")
+        return kwargs
+
+
+@dataclass
+class TurnRun:
+    turn_id: str
+    mode: str
+    reply: str
+    latency_ms: float
+    llm_calls: int
+    input_tokens: int
+    output_tokens: int
+    cost_usd: float
+    cache_read_tokens: int = 0
+
+
+@dataclass
+class ModeSummary:
+    mode: str
+    turns: int
+    p50_ms: float
+    p95_ms: float
+    llm_calls: float
+    input_tokens: float
+    output_tokens: float
+    cost_usd: float
+    similarity: float
+    figure_recall: float
+    cache_read_tokens: float = 0.0
+
+
+class _UsageCounter(BaseCallbackHandler):
+    """Counts LLM calls, tokens and cost for one pipeline run."""
+
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cost_usd = 0.0
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        self.calls += 1
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or {}
+                metadata = getattr(message, "response_metadata", None) or {}
+                model = metadata.get("model_name") or metadata.get("model") or "unknown"
+                input_tokens = usage.get("input_tokens", 0)
+                output_tokens = usage.get("output_tokens", 0)
+                cache_read, cache_write = cache_token_counts(usage)
+                self.input_tokens += input_tokens
+                self.output_tokens += output_tokens
+                self.cache_read_tokens += cache_read
+                self.cost_usd += calculate_cost(
+                    model, input_tokens, output_tokens, cache_read, cache_write
+                )
+
+
+async def run_mode(llm: BaseChatModel, mode: str, turns: list[RecordedTurn]) -> list[TurnRun]:
+    """Replay the turns through ResponseChain in one mode, one at a time."""
+    runs = []
+    for turn in turns:
+        counter = _UsageCounter()
+        chain = ResponseChain.from_llm(llm.with_config(callbacks=[counter]), mode=mode)
+        started = time.perf_counter()
+        reply = await chain.ainvoke(**turn.chain_kwargs())
+        runs.append(TurnRun(
+            turn_id=turn.id,
+            mode=mode,
+            reply=reply,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            llm_calls=counter.calls,
+            input_tokens=counter.input_tokens,
+            output_tokens=counter.output_tokens,
+            cost_usd=counter.cost_usd,
+            cache_read_tokens=counter.cache_read_tokens,
+        ))
+    return runs
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+def _mean(values: list[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def figure_recall(reply: str, reference: str) -> float:
+    """Share of the reference's numbers that also appear in the reply."""
+    expected = set(_FIGURE_RE.findall(reference))
+    if not expected:
+        return 1.0
+    return len(expected & set(_FIGURE_RE.findall(reply))) / len(expected)
+
+
+def summarize(runs: list[TurnRun], baseline: list[TurnRun]) -> ModeSummary:
+    """Aggregate one mode's runs; parity is against baseline, matched by turn."""
+    references = {run.turn_id: run.reply for run in baseline}
+    similarity, recall = [], []
+    for run in runs:
+        reference = references.get(run.turn_id)
+        if reference is None:
+            continue
+        similarity.append(difflib.SequenceMatcher(None, run.reply, reference).ratio())
+        recall.append(figure_recall(run.reply, reference))
+
+    latencies = [run.latency_ms for run in runs]
+    return ModeSummary(
+        mode=runs[0].mode if runs else "",
+        turns=len(runs),
+        p50_ms=_percentile(latencies, 0.50) if runs else 0.0,
+        p95_ms=_percentile(latencies, 0.95) if runs else 0.0,
+        llm_calls=_mean([run.llm_calls for run in runs]),
+        input_tokens=_mean([run.input_tokens for run in runs]),
+        output_tokens=_mean([run.output_tokens for run in runs]),
+        cost_usd=_mean([run.cost_usd for run in runs]),
+        similarity=_mean(similarity),
+        figure_recall=_mean(recall),
+        cache_read_tokens=_mean([run.cache_read_tokens for run in runs]),
+    )
+
+
+async def compare_modes(
+    llm: BaseChatModel,
+    turns: list[RecordedTurn],
+    modes: list[str],
+    baseline: str | None = None,
+) -> tuple[list[ModeSummary], dict[str, list[TurnRun]]]:
+    """Run every mode and summarize each against the baseline (first mode by default)."""
+    baseline = baseline or modes[0]
+    for mode in [*modes, baseline]:
+        if mode not in PIPELINE_MODES:
+            raise ValueError(f"Unknown pipeline mode: {mode}")
+
+    runs = {}
+    for mode in dict.fromkeys([baseline, *modes]):
+        runs[mode] = await run_mode(llm, mode, turns)
+    summaries = [summarize(runs[mode], runs[baseline]) for mode in modes]
+    return summaries, runs
+
+
+def load_turns(path: Path) -> list[RecordedTurn]:
+    turns = []
+    with path.open(encoding="utf-8") as f:
+        for index, line in enumerate(f):
+            if line.strip():
+                turns.append(RecordedTurn.from_dict(json.loads(line), index))
+    return turns
+
+
+def format_report(summaries: list[ModeSummary], baseline: str) -> str:
+    header = (
+        f"{'mode':<10} {'turns':>5} {'p50 ms':>8} {'p95 ms':>8} {'calls':>6} "
+        f"{'in tok':>8} {'cached':>8} {'out tok':>8} {'cost $':>9} {'sim':>5} {'figs':>5}"
+    )
+    lines = [header, "-" * len(header)]
+    for s in summaries:
+        lines.append(
+            f"{s.mode:<10} {s.turns:>5} {s.p50_ms:>8.0f} {s.p95_ms:>8.0f} "
+            f"{s.llm_calls:>6.1f} {s.input_tokens:>8.0f} {s.cache_read_tokens:>8.0f} "
+            f"{s.output_tokens:>8.0f} "
+            f"{s.cost_usd:>9.5f} {s.similarity:>5.2f} {s.figure_recall:>5.2f}"
+        )
+    lines.append(f"(per-turn means; sim and figs are against {baseline})")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("turns", type=Path, help="JSONL file of recorded turns")
+    parser.add_argument("--modes", default=",".join(PIPELINE_MODES))
+    parser.add_argument("--baseline", default="layered")
+    parser.add_argument("--replies", type=Path, help="write every reply here as JSONL")
+    args = parser.parse_args(argv)
+
+    from app.ai.llm_router import get_consultation_llm
+
+    turns = load_turns(args.turns)
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    summaries, runs = asyncio.run(
+        compare_modes(get_consultation_llm(), turns, modes, baseline=args.baseline)
+    )
+
+    if args.replies:
+        with args.replies.open("w", encoding="utf-8") as f:
+            for mode_runs in runs.values():
+                for run in mode_runs:
+                    f.write(json.dumps(asdict(run), ensure_ascii=False) + "\n")
+    print(format_report(summaries, args.baseline))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Query embedding cache — in-process LRU in front of a shared Redis tier.
+
+Customer questions repeat constantly ("가격이 얼마예요?"), so query embeddings
+are cached by normalized text. The in-process tier answers repeats within a
+worker; the Redis tier shares vectors across workers and restarts.
+"""
+
+import hashlib
+import logging
+import re
+import unicodedata
+from collections import OrderedDict
+
+from app.config import settings
+from app.core.cache import cache_get, cache_set
+
+logger = logging.getLogger(__name__)
+
+_TRAILING_PUNCT = re.compile(r"[\s?!.,~…？！。、]+$")
+
+
+def normalize_query(query: str) -> str:
+    """Normalize query text for cache keying.
+
+    NFKC-folds full-width characters, lowercases, collapses whitespace and
+    drops trailing punctuation so trivially different spellings share a key.
+    """
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = " ".join(text.split())
+    return _TRAILING_PUNCT.sub("", text)
+
+
+class EmbeddingCache:
+    """Bounded two-tier cache of query embeddings keyed by normalized text."""
+
+    KEY_PREFIX = "embedding:query:"
+
+    def __init__(self, max_size: int | None = None, ttl_seconds: int | None = None):
+        self.max_size = max_size or settings.embedding_cache_size
+        self.ttl_seconds = ttl_seconds or settings.embedding_cache_ttl_seconds
+        self._local: OrderedDict[str, list[float]] = OrderedDict()
+
+    def _key(self, normalized: str) -> str:
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"{self.KEY_PREFIX}{settings.azure_openai_embedding_deployment}:{digest}"
+
+    async def get(self, query: str) -> list[float] | None:
+        """Return a cached embedding, checking the local tier before Redis."""
+        key = self._key(normalize_query(query))
+        vector = self._local.get(key)
+        if vector is not None:
+            self._local.move_to_end(key)
+            return vector
+
+        vector = await cache_get(key)
+        if vector is not None:
+            self._remember(key, vector)
+        return vector
+
+    async def set(self, query: str, vector: list[float]) -> None:
+        """Store an embedding in both tiers."""
+        key = self._key(normalize_query(query))
+        self._remember(key, vector)
+        await cache_set(key, vector, ttl_seconds=self.ttl_seconds)
+
+    def clear(self) -> None:
+        self._local.clear()
+
+    def _remember(self, key: str, vector: list[float]) -> None:
+        self._local[key] = vector
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+
+# Process-wide instance shared by all VectorRetriever objects
+embedding_cache = EmbeddingCache()
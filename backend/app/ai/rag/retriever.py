@@ -1,4 +1,8 @@
-"""Vector retriever — cosine similarity search against pgvector embeddings."""
+"""Vector retriever — cosine similarity search against pgvector embeddings.
+
+Each search accepts a precomputed ``query_embedding`` so callers that run
+several searches for one message embed the query once via embed_query().
+"""
 
 import logging
 import uuid
@@ -7,6 +11,7 @@ from sqlalchemy import or_, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.ai.llm_router import get_embeddings
+from app.ai.rag.embedding_cache import EmbeddingCache, embedding_cache
 from app.models.medical_term import MedicalTerm
 from app.models.procedure import Procedure
 from app.models.response_library import ResponseLibrary
@@ -17,18 +22,26 @@ logger = logging.getLogger(__name__)
 class VectorRetriever:
     """Performs vector similarity search over knowledge base tables."""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, cache: EmbeddingCache | None = None):
         self.db = db
         self.embeddings = get_embeddings()
+        self.cache = cache if cache is not None else embedding_cache
+
+    def bind(self, db: AsyncSession) -> "VectorRetriever":
+        """Return a retriever sharing this one's embedding cache on another session."""
+        return VectorRetriever(db, cache=self.cache)
 
     async def search_response_library(
         self,
         clinic_id: uuid.UUID,
         query: str,
         limit: int = 5,
+        *,
+        query_embedding: list[float] | None = None,
     ) -> list[ResponseLibrary]:
         """Search response_library by vector cosine similarity."""
-        query_embedding = await self._embed_query(query)
+        if query_embedding is None:
+            query_embedding = await self.embed_query(query)
         if query_embedding is None:
             return []
 
@@ -49,9 +62,12 @@ class VectorRetriever:
         clinic_id: uuid.UUID,
         query: str,
         limit: int = 5,
+        *,
+        query_embedding: list[float] | None = None,
     ) -> list[Procedure]:
         """Search procedures by vector cosine similarity."""
-        query_embedding = await self._embed_query(query)
+        if query_embedding is None:
+            query_embedding = await self.embed_query(query)
         if query_embedding is None:
             return []
 
@@ -71,9 +87,12 @@ class VectorRetriever:
         clinic_id: uuid.UUID,
         query: str,
         limit: int = 10,
+        *,
+        query_embedding: list[float] | None = None,
     ) -> list[MedicalTerm]:
         """Search medical terms by vector cosine similarity."""
-        query_embedding = await self._embed_query(query)
+        if query_embedding is None:
+            query_embedding = await self.embed_query(query)
         if query_embedding is None:
             return []
 
@@ -92,10 +111,20 @@ class VectorRetriever:
         )
         return list(result.scalars().all())
 
-    async def _embed_query(self, query: str) -> list[float] | None:
-        """Generate query embedding, returning None on failure."""
+    async def embed_query(self, query: str) -> list[float] | None:
+        """Return the query embedding (cached by normalized text), or None on failure."""
+        if not query.strip():
+            return None
+
+        cached = await self.cache.get(query)
+        if cached is not None:
+            return cached
+
         try:
-            return await self.embeddings.aembed_query(query)
+            vector = await self.embeddings.aembed_query(query)
         except Exception:
             logger.exception("Failed to generate query embedding")
             return None
+
+        await self.cache.set(query, vector)
+        return vector
@@ -1,10 +1,26 @@
-"""Tracked LLM invocation — wraps ainvoke to capture usage metadata."""
+"""Tracked LLM invocation — wraps ainvoke to capture usage metadata.
 
+tracked_ainvoke records a single LLM call. For chains that call several
+models internally (the consultation pipeline), track_usage records every
+LLM call made inside it through a callback handler that LangChain attaches
+to all runs started in the current context; tracked_as files part of that
+work (the escalation check) under its own operation.
+"""
+
+import asyncio
+import contextlib
 import logging
 import time
+import uuid
+from collections.abc import Iterator
+from contextvars import ContextVar
 from typing import Any
 
-from app.ai.usage_tracker import UsageTracker
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+
+from app.ai.usage_tracker import UsageTracker, cache_token_counts
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +60,7 @@ async def tracked_ainvoke(
     usage = getattr(result, "usage_metadata", None) or {}
     input_tokens = usage.get("input_tokens", 0) if isinstance(usage, dict) else 0
     output_tokens = usage.get("output_tokens", 0) if isinstance(usage, dict) else 0
+    cache_read, cache_write = cache_token_counts(usage if isinstance(usage, dict) else None)
 
     # Extract model name from response metadata (actual model used)
     resp_meta = getattr(result, "response_metadata", None) or {}
@@ -62,6 +79,8 @@ async def tracked_ainvoke(
         operation=operation,
         input_tokens=input_tokens,
         output_tokens=output_tokens,
+        cache_read_tokens=cache_read,
+        cache_write_tokens=cache_write,
         latency_ms=elapsed_ms,
         success=True,
     )
@@ -79,3 +98,102 @@ def _detect_provider(model_name: str) -> str:
     if "gemini" in name:
         return "google"
     return "unknown"
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """Records every LLM call it sees on a UsageTracker."""
+
+    # record() only buffers; no need to hop to an executor thread
+    run_inline = True
+
+    def __init__(self, tracker: UsageTracker, operation: str):
+        self.tracker = tracker
+        self.operation = operation
+        self._started: dict[uuid.UUID, tuple[float, str]] = {}
+
+    def _start(self, run_id: uuid.UUID, invocation_params: dict[str, Any] | None) -> None:
+        params = invocation_params or {}
+        model = params.get("model") or params.get("model_name") or "unknown"
+        self._started[run_id] = (time.monotonic(), str(model))
+
+    def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: Any, *, run_id: uuid.UUID, **kwargs: Any
+    ) -> None:
+        self._start(run_id, kwargs.get("invocation_params"))
+
+    def on_llm_start(
+        self, serialized: dict[str, Any], prompts: list[str], *, run_id: uuid.UUID, **kwargs: Any
+    ) -> None:
+        self._start(run_id, kwargs.get("invocation_params"))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: uuid.UUID, **kwargs: Any) -> None:
+        started, model = self._started.pop(run_id, (None, "unknown"))
+        latency_ms = int((time.monotonic() - started) * 1000) if started else None
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or {}
+                resp_meta = getattr(message, "response_metadata", None) or {}
+                actual_model = str(resp_meta.get("model_name") or resp_meta.get("model") or model)
+                cache_read, cache_write = cache_token_counts(usage)
+                self.tracker.record(
+                    provider=_detect_provider(actual_model),
+                    model_name=actual_model,
+                    operation=self.operation,
+                    input_tokens=usage.get("input_tokens", 0),
+                    output_tokens=usage.get("output_tokens", 0),
+                    cache_read_tokens=cache_read,
+                    cache_write_tokens=cache_write,
+                    latency_ms=latency_ms,
+                    success=True,
+                )
+
+    def on_llm_error(self, error: BaseException, *, run_id: uuid.UUID, **kwargs: Any) -> None:
+        started, model = self._started.pop(run_id, (None, "unknown"))
+        if isinstance(error, asyncio.CancelledError):
+            # Discarded on purpose (e.g. generation superseded by escalation)
+            return
+        self.tracker.record(
+            provider=_detect_provider(model),
+            model_name=model,
+            operation=self.operation,
+            latency_ms=int((time.monotonic() - started) * 1000) if started else None,
+            success=False,
+            error_message=str(error)[:500],
+        )
+
+
+_usage_handler: ContextVar[UsageCallbackHandler | None] = ContextVar(
+    "llm_usage_handler", default=None
+)
+register_configure_hook(_usage_handler, inheritable=True)
+
+
+@contextlib.contextmanager
+def track_usage(tracker: UsageTracker, operation: str) -> Iterator[None]:
+    """Record every LLM call made inside the block, tasks it spawns included.
+
+    Do not nest tracked_ainvoke inside: its call would be recorded twice.
+    """
+    token = _usage_handler.set(UsageCallbackHandler(tracker, operation))
+    try:
+        yield
+    finally:
+        _usage_handler.reset(token)
+
+
+@contextlib.contextmanager
+def tracked_as(operation: str) -> Iterator[None]:
+    """Inside a track_usage block, record the block's LLM calls under operation.
+
+    Applies to tasks created inside the block too. Does nothing untracked.
+    """
+    handler = _usage_handler.get()
+    if handler is None:
+        yield
+        return
+    token = _usage_handler.set(UsageCallbackHandler(handler.tracker, operation))
+    try:
+        yield
+    finally:
+        _usage_handler.reset(token)
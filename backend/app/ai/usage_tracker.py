@@ -31,17 +31,56 @@ COST_PER_1K_TOKENS: dict[str, dict[str, float]] = {
 # Fallback for unknown models
 _DEFAULT_COST = {"input": 0.002, "output": 0.008}
 
+# Prompt-cache pricing as a multiple of the input price — cache reads / cache writes.
+# Anthropic bills explicit cache writes at a premium; OpenAI and Gemini cache
+# prefixes automatically and only discount the reads.
+CACHE_PRICE_MULTIPLIERS: dict[str, dict[str, float]] = {
+    "claude": {"read": 0.1, "write": 1.25},
+    "gpt": {"read": 0.5, "write": 1.0},
+    "gemini": {"read": 0.25, "write": 1.0},
+}
+
+_NO_CACHE_DISCOUNT = {"read": 1.0, "write": 1.0}
+
+
+def calculate_cost(
+    model_name: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+) -> float:
+    """Calculate USD cost from model name and token counts.
 
-def calculate_cost(model_name: str, input_tokens: int, output_tokens: int) -> float:
-    """Calculate USD cost from model name and token counts."""
+    input_tokens is the whole prompt, cached part included (as LangChain
+    reports it); cache_read_tokens and cache_write_tokens are billed at the
+    model's cache rates instead of the input rate.
+    """
     # Match by prefix (e.g. "claude-3-5-sonnet-20241022" -> "claude-3-5-sonnet")
+    name = model_name.lower()
     costs = _DEFAULT_COST
     for key, val in COST_PER_1K_TOKENS.items():
-        if key in model_name.lower():
+        if key in name:
             costs = val
             break
+    cache = next(
+        (val for key, val in CACHE_PRICE_MULTIPLIERS.items() if key in name),
+        _NO_CACHE_DISCOUNT,
+    )
 
-    return (input_tokens * costs["input"] + output_tokens * costs["output"]) / 1000
+    uncached = max(input_tokens - cache_read_tokens - cache_write_tokens, 0)
+    input_cost = costs["input"] * (
+        uncached
+        + cache_read_tokens * cache["read"]
+        + cache_write_tokens * cache["write"]
+    )
+    return (input_cost + output_tokens * costs["output"]) / 1000
+
+
+def cache_token_counts(usage_metadata: dict | None) -> tuple[int, int]:
+    """(cache_read, cache_write) tokens from a LangChain usage_metadata dict."""
+    details = (usage_metadata or {}).get("input_token_details") or {}
+    return details.get("cache_read") or 0, details.get("cache_creation") or 0
 
 
 class UsageTracker:
@@ -68,13 +107,17 @@ class UsageTracker:
         operation: str,
         input_tokens: int = 0,
         output_tokens: int = 0,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
         latency_ms: int | None = None,
         success: bool = True,
         error_message: str | None = None,
     ) -> None:
         """Buffer a single usage record."""
         total_tokens = input_tokens + output_tokens
-        cost = calculate_cost(model_name, input_tokens, output_tokens)
+        cost = calculate_cost(
+            model_name, input_tokens, output_tokens, cache_read_tokens, cache_write_tokens
+        )
 
         self._records.append(
             LLMUsage(
@@ -87,6 +130,8 @@ class UsageTracker:
                 operation=operation,
                 input_tokens=input_tokens,
                 output_tokens=output_tokens,
+                cache_read_tokens=cache_read_tokens,
+                cache_write_tokens=cache_write_tokens,
                 total_tokens=total_tokens,
                 cost_usd=cost,
                 latency_ms=latency_ms,
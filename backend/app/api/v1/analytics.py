@@ -1,23 +1,38 @@
+"""Clinic analytics endpoints.
+
+Period reports read the per-day rollups in app.models.analytics_rollup
+(refreshed every few minutes by the refresh_analytics_rollups task) rather
+than aggregating raw rows per request.
+"""
+
+import uuid
 from datetime import date, timedelta
+from decimal import Decimal
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
+from sqlalchemy import Date, cast, extract, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from sqlalchemy.orm import selectinload
 
-from app.core.cache import cache_get, cache_set
+from app.core.cache import cached
 from app.core.database import get_db
 from app.core.exceptions import NotFoundError
 from app.dependencies import get_current_user
 from app.models.ab_test import ABTest, ABTestResult, ABTestVariant
+from app.models.analytics_rollup import (
+    DailyClinicStats,
+    DailyCustomerRevenue,
+    DailyFunnelStats,
+    DailyProcedureStats,
+    HourlyRevenueStats,
+)
 from app.models.booking import Booking
 from app.models.clinic_procedure import ClinicProcedure
 from app.models.consultation_performance import ConsultationPerformance
 from app.models.conversation import Conversation
 from app.models.customer import Customer
 from app.models.message import Message
-from app.models.messenger_account import MessengerAccount
 from app.models.payment import Payment
 from app.models.procedure import Procedure
 from app.models.user import User
@@ -32,53 +47,54 @@ router = APIRouter(prefix="/analytics", tags=["analytics"])
 @router.get("/overview", response_model=AnalyticsOverviewResponse)
 async def get_overview(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
 ):
-    clinic_id = current_user.clinic_id
-    cache_key = f"analytics:overview:{clinic_id}"
+    return AnalyticsOverviewResponse(**await _load_overview(current_user.clinic_id))
 
-    # Check cache first
-    cached = await cache_get(cache_key)
-    if cached:
-        return AnalyticsOverviewResponse(**cached)
 
-    # Conversations
-    conv_result = await db.execute(
-        select(
-            func.count(Conversation.id).label("total"),
-            func.count(Conversation.id)
-            .filter(Conversation.status == "active")
-            .label("active"),
-            func.count(Conversation.id)
-            .filter(Conversation.status == "resolved")
-            .label("resolved"),
-        ).where(Conversation.clinic_id == clinic_id)
-    )
-    conv_row = conv_result.one()
+@cached(
+    "analytics:overview:{clinic_id}",
+    ttl=300,
+    stale_ttl=60,
+    tags=["analytics", "analytics:{clinic_id}"],
+)
+async def _load_overview(clinic_id: uuid.UUID) -> dict:
+    # Own session: a stale entry is refreshed after the request has finished
+    from app.core.database import async_session_factory
 
-    # Bookings
-    booking_result = await db.execute(
-        select(func.count(Booking.id)).where(Booking.clinic_id == clinic_id)
-    )
-    total_bookings = booking_result.scalar() or 0
+    async with async_session_factory() as db:
+        # Conversations
+        conv_result = await db.execute(
+            select(
+                func.count(Conversation.id).label("total"),
+                func.count(Conversation.id)
+                .filter(Conversation.status == "active")
+                .label("active"),
+                func.count(Conversation.id)
+                .filter(Conversation.status == "resolved")
+                .label("resolved"),
+            ).where(Conversation.clinic_id == clinic_id)
+        )
+        conv_row = conv_result.one()
 
-    # Payments
-    payment_result = await db.execute(
-        select(func.count(Payment.id)).where(Payment.clinic_id == clinic_id)
-    )
-    total_payments = payment_result.scalar() or 0
-
-    result = AnalyticsOverviewResponse(
-        total_conversations=conv_row.total,
-        active_conversations=conv_row.active,
-        resolved_conversations=conv_row.resolved,
-        total_bookings=total_bookings,
-        total_payments=total_payments,
-    )
+        # Bookings
+        booking_result = await db.execute(
+            select(func.count(Booking.id)).where(Booking.clinic_id == clinic_id)
+        )
+        total_bookings = booking_result.scalar() or 0
 
-    # Cache for 5 minutes
-    await cache_set(cache_key, result.model_dump(), ttl_seconds=300)
-    return result
+        # Payments
+        payment_result = await db.execute(
+            select(func.count(Payment.id)).where(Payment.clinic_id == clinic_id)
+        )
+        total_payments = payment_result.scalar() or 0
+
+    return {
+        "total_conversations": conv_row.total,
+        "active_conversations": conv_row.active,
+        "resolved_conversations": conv_row.resolved,
+        "total_bookings": total_bookings,
+        "total_payments": total_payments,
+    }
 
 
 @router.get(
@@ -157,71 +173,39 @@ async def get_conversation_analytics(
     clinic_id = current_user.clinic_id
     cutoff = date.today() - timedelta(days=days)
 
-    # Daily conversation counts
-    daily_result = await db.execute(
-        select(
-            func.date(Conversation.created_at).label("day"),
-            func.count(Conversation.id).label("total"),
-            func.count(Conversation.id)
-            .filter(Conversation.ai_mode.is_(True))
-            .label("ai_mode"),
-            func.count(Conversation.id)
-            .filter(Conversation.ai_mode.is_(False))
-            .label("manual_mode"),
-        )
+    result = await db.execute(
+        select(DailyClinicStats)
         .where(
-            Conversation.clinic_id == clinic_id,
-            func.date(Conversation.created_at) >= cutoff,
+            DailyClinicStats.clinic_id == clinic_id,
+            DailyClinicStats.day >= cutoff,
         )
-        .group_by(func.date(Conversation.created_at))
-        .order_by(func.date(Conversation.created_at))
+        .order_by(DailyClinicStats.day)
     )
+    rows = result.scalars().all()
+
     daily_data = [
         {
             "date": str(row.day),
-            "total": row.total,
-            "ai_mode": row.ai_mode,
-            "manual_mode": row.manual_mode,
+            "total": row.conversations,
+            "ai_mode": row.ai_mode_conversations,
+            "manual_mode": row.manual_conversations,
         }
-        for row in daily_result.all()
+        for row in rows
+        if row.conversations
     ]
 
-    # Status distribution
-    status_result = await db.execute(
-        select(
-            Conversation.status,
-            func.count(Conversation.id).label("count"),
-        )
-        .where(
-            Conversation.clinic_id == clinic_id,
-            func.date(Conversation.created_at) >= cutoff,
-        )
-        .group_by(Conversation.status)
-    )
-    status_distribution = {row.status: row.count for row in status_result.all()}
+    status_distribution: dict[str, int] = {}
+    for row in rows:
+        for status, count in (row.status_counts or {}).items():
+            status_distribution[status] = status_distribution.get(status, 0) + count
 
-    # Average messages per conversation
-    avg_result = await db.execute(
-        select(func.avg(func.count(Message.id)))
-        .select_from(Message)
-        .join(Conversation, Conversation.id == Message.conversation_id)
-        .where(
-            Conversation.clinic_id == clinic_id,
-            func.date(Conversation.created_at) >= cutoff,
-        )
-        .group_by(Message.conversation_id)
-    )
-    avg_messages = avg_result.scalar()
-
-    # Average satisfaction
-    sat_result = await db.execute(
-        select(func.avg(Conversation.satisfaction_score)).where(
-            Conversation.clinic_id == clinic_id,
-            Conversation.satisfaction_score.isnot(None),
-            func.date(Conversation.created_at) >= cutoff,
-        )
-    )
-    avg_satisfaction = sat_result.scalar()
+    with_messages = sum(row.conversations_with_messages for row in rows)
+    message_count = sum(row.messages for row in rows)
+    avg_messages = message_count / with_messages if with_messages else None
+
+    sat_count = sum(row.satisfaction_count for row in rows)
+    sat_sum = sum(row.satisfaction_sum for row in rows)
+    avg_satisfaction = sat_sum / sat_count if sat_count else None
 
     return {
         "days": days,
@@ -242,76 +226,46 @@ async def get_sales_performance(
     clinic_id = current_user.clinic_id
     cutoff = date.today() - timedelta(days=days)
 
-    # Total conversations in period
-    conv_count_result = await db.execute(
-        select(func.count(Conversation.id)).where(
-            Conversation.clinic_id == clinic_id,
-            func.date(Conversation.created_at) >= cutoff,
-        )
-    )
-    total_conversations = conv_count_result.scalar() or 0
-
-    # Total bookings in period
-    booking_count_result = await db.execute(
-        select(func.count(Booking.id)).where(
-            Booking.clinic_id == clinic_id,
-            func.date(Booking.created_at) >= cutoff,
+    result = await db.execute(
+        select(DailyClinicStats)
+        .where(
+            DailyClinicStats.clinic_id == clinic_id,
+            DailyClinicStats.day >= cutoff,
         )
+        .order_by(DailyClinicStats.day)
     )
-    total_bookings = booking_count_result.scalar() or 0
+    rows = result.scalars().all()
 
-    # Total payments in period
-    payment_result = await db.execute(
-        select(
-            func.count(Payment.id).label("count"),
-            func.coalesce(func.sum(Payment.amount), 0).label("total_amount"),
-        ).where(
-            Payment.clinic_id == clinic_id,
-            Payment.status == "completed",
-            func.date(Payment.created_at) >= cutoff,
-        )
-    )
-    payment_row = payment_result.one()
+    total_conversations = sum(row.conversations for row in rows)
+    total_bookings = sum(row.bookings for row in rows)
+    total_payments = sum(row.payments for row in rows)
+    total_amount = sum((row.payment_amount for row in rows), Decimal("0"))
 
     # Daily revenue trend
-    revenue_result = await db.execute(
-        select(
-            func.date(Payment.paid_at).label("day"),
-            func.count(Payment.id).label("count"),
-            func.sum(Payment.amount).label("amount"),
-        )
-        .where(
-            Payment.clinic_id == clinic_id,
-            Payment.status == "completed",
-            Payment.paid_at.isnot(None),
-            func.date(Payment.paid_at) >= cutoff,
-        )
-        .group_by(func.date(Payment.paid_at))
-        .order_by(func.date(Payment.paid_at))
-    )
     revenue_daily = [
         {
             "date": str(row.day),
-            "count": row.count,
-            "amount": float(row.amount or 0),
+            "count": row.paid_count,
+            "amount": float(row.paid_amount or 0),
         }
-        for row in revenue_result.all()
+        for row in rows
+        if row.paid_count
     ]
 
     booking_rate = round(total_bookings / total_conversations * 100, 1) if total_conversations > 0 else 0
-    payment_rate = round(payment_row.count / total_bookings * 100, 1) if total_bookings > 0 else 0
+    payment_rate = round(total_payments / total_bookings * 100, 1) if total_bookings > 0 else 0
 
     return {
         "days": days,
         "funnel": {
             "conversations": total_conversations,
             "bookings": total_bookings,
-            "payments": payment_row.count,
+            "payments": total_payments,
             "booking_conversion_rate": booking_rate,
             "payment_conversion_rate": payment_rate,
         },
         "revenue": {
-            "total_amount": float(payment_row.total_amount),
+            "total_amount": float(total_amount),
             "daily": revenue_daily,
         },
     }
@@ -410,206 +364,59 @@ async def get_conversion_funnel(
 
 
 async def _funnel_by_nationality(db: AsyncSession, clinic_id, cutoff):
-    # Conversations per country
-    conv_result = await db.execute(
-        select(
-            Customer.country_code,
-            func.count(func.distinct(Conversation.customer_id)).label("conversations"),
-        )
-        .join(Customer, Conversation.customer_id == Customer.id)
-        .where(
-            Conversation.clinic_id == clinic_id,
-            func.date(Conversation.created_at) >= cutoff,
-        )
-        .group_by(Customer.country_code)
+    return await _funnel_groups(
+        db, clinic_id, cutoff, (DailyFunnelStats.country_code,), channel_only=False
     )
-    conv_data = {row.country_code or "unknown": row.conversations for row in conv_result.all()}
-
-    # Bookings per country
-    booking_result = await db.execute(
-        select(
-            Customer.country_code,
-            func.count(func.distinct(Booking.customer_id)).label("bookings"),
-        )
-        .join(Customer, Booking.customer_id == Customer.id)
-        .where(
-            Booking.clinic_id == clinic_id,
-            func.date(Booking.created_at) >= cutoff,
-        )
-        .group_by(Customer.country_code)
-    )
-    booking_data = {row.country_code or "unknown": row.bookings for row in booking_result.all()}
-
-    # Payments per country
-    payment_result = await db.execute(
-        select(
-            Customer.country_code,
-            func.count(func.distinct(Payment.customer_id)).label("payments"),
-        )
-        .join(Customer, Payment.customer_id == Customer.id)
-        .where(
-            Payment.clinic_id == clinic_id,
-            Payment.status == "completed",
-            func.date(Payment.created_at) >= cutoff,
-        )
-        .group_by(Customer.country_code)
-    )
-    payment_data = {row.country_code or "unknown": row.payments for row in payment_result.all()}
-
-    all_dims = set(conv_data.keys()) | set(booking_data.keys())
-    groups = []
-    for dim in sorted(all_dims):
-        convs = conv_data.get(dim, 0)
-        bkgs = booking_data.get(dim, 0)
-        pmts = payment_data.get(dim, 0)
-        groups.append({
-            "dimension": dim,
-            "conversations": convs,
-            "bookings": bkgs,
-            "payments": pmts,
-            "booking_rate": round(bkgs / convs * 100, 1) if convs > 0 else 0,
-            "payment_rate": round(pmts / bkgs * 100, 1) if bkgs > 0 else 0,
-        })
-    return groups
 
 
 async def _funnel_by_channel(db: AsyncSession, clinic_id, cutoff):
-    conv_result = await db.execute(
-        select(
-            MessengerAccount.messenger_type,
-            func.count(func.distinct(Conversation.customer_id)).label("conversations"),
-        )
-        .join(MessengerAccount, Conversation.messenger_account_id == MessengerAccount.id)
-        .where(
-            Conversation.clinic_id == clinic_id,
-            func.date(Conversation.created_at) >= cutoff,
-        )
-        .group_by(MessengerAccount.messenger_type)
-    )
-    conv_data = {row.messenger_type: row.conversations for row in conv_result.all()}
+    return await _funnel_groups(db, clinic_id, cutoff, (DailyFunnelStats.channel,))
 
-    # For bookings/payments by channel, join through conversation
-    booking_result = await db.execute(
-        select(
-            MessengerAccount.messenger_type,
-            func.count(func.distinct(Booking.customer_id)).label("bookings"),
-        )
-        .select_from(Booking)
-        .join(Conversation, Booking.conversation_id == Conversation.id)
-        .join(MessengerAccount, Conversation.messenger_account_id == MessengerAccount.id)
-        .where(
-            Booking.clinic_id == clinic_id,
-            func.date(Booking.created_at) >= cutoff,
-        )
-        .group_by(MessengerAccount.messenger_type)
-    )
-    booking_data = {row.messenger_type: row.bookings for row in booking_result.all()}
 
-    payment_result = await db.execute(
-        select(
-            MessengerAccount.messenger_type,
-            func.count(func.distinct(Payment.customer_id)).label("payments"),
-        )
-        .select_from(Payment)
-        .join(Booking, Payment.booking_id == Booking.id)
-        .join(Conversation, Booking.conversation_id == Conversation.id)
-        .join(MessengerAccount, Conversation.messenger_account_id == MessengerAccount.id)
-        .where(
-            Payment.clinic_id == clinic_id,
-            Payment.status == "completed",
-            func.date(Payment.created_at) >= cutoff,
-        )
-        .group_by(MessengerAccount.messenger_type)
+async def _funnel_by_both(db: AsyncSession, clinic_id, cutoff):
+    return await _funnel_groups(
+        db, clinic_id, cutoff, (DailyFunnelStats.country_code, DailyFunnelStats.channel)
     )
-    payment_data = {row.messenger_type: row.payments for row in payment_result.all()}
 
-    all_dims = set(conv_data.keys()) | set(booking_data.keys())
-    groups = []
-    for dim in sorted(all_dims):
-        convs = conv_data.get(dim, 0)
-        bkgs = booking_data.get(dim, 0)
-        pmts = payment_data.get(dim, 0)
-        groups.append({
-            "dimension": dim,
-            "conversations": convs,
-            "bookings": bkgs,
-            "payments": pmts,
-            "booking_rate": round(bkgs / convs * 100, 1) if convs > 0 else 0,
-            "payment_rate": round(pmts / bkgs * 100, 1) if bkgs > 0 else 0,
-        })
-    return groups
 
+def _reached(stage):
+    """Distinct customers with a funnel stage flag set on any day in the filter."""
+    return func.count(func.distinct(DailyFunnelStats.customer_id)).filter(stage > 0)
 
-async def _funnel_by_both(db: AsyncSession, clinic_id, cutoff):
-    conv_result = await db.execute(
-        select(
-            Customer.country_code,
-            MessengerAccount.messenger_type,
-            func.count(func.distinct(Conversation.customer_id)).label("conversations"),
-        )
-        .join(Customer, Conversation.customer_id == Customer.id)
-        .join(MessengerAccount, Conversation.messenger_account_id == MessengerAccount.id)
-        .where(
-            Conversation.clinic_id == clinic_id,
-            func.date(Conversation.created_at) >= cutoff,
-        )
-        .group_by(Customer.country_code, MessengerAccount.messenger_type)
-    )
-    conv_data = {}
-    for row in conv_result.all():
-        key = f"{row.country_code or 'unknown'}|{row.messenger_type}"
-        conv_data[key] = row.conversations
 
-    booking_result = await db.execute(
-        select(
-            Customer.country_code,
-            MessengerAccount.messenger_type,
-            func.count(func.distinct(Booking.customer_id)).label("bookings"),
-        )
-        .select_from(Booking)
-        .join(Customer, Booking.customer_id == Customer.id)
-        .join(Conversation, Booking.conversation_id == Conversation.id)
-        .join(MessengerAccount, Conversation.messenger_account_id == MessengerAccount.id)
-        .where(
-            Booking.clinic_id == clinic_id,
-            func.date(Booking.created_at) >= cutoff,
-        )
-        .group_by(Customer.country_code, MessengerAccount.messenger_type)
-    )
-    booking_data = {}
-    for row in booking_result.all():
-        key = f"{row.country_code or 'unknown'}|{row.messenger_type}"
-        booking_data[key] = row.bookings
+async def _funnel_groups(
+    db: AsyncSession, clinic_id, cutoff, dimensions: tuple, channel_only: bool = True
+):
+    """Distinct customers reaching each funnel stage over the period, per dimension.
 
-    payment_result = await db.execute(
+    Channel breakdowns only count bookings/payments linked to a conversation.
+    """
+    filters = [
+        DailyFunnelStats.clinic_id == clinic_id,
+        DailyFunnelStats.day >= cutoff,
+    ]
+    if channel_only:
+        filters.append(DailyFunnelStats.channel.isnot(None))
+
+    result = await db.execute(
         select(
-            Customer.country_code,
-            MessengerAccount.messenger_type,
-            func.count(func.distinct(Payment.customer_id)).label("payments"),
+            *dimensions,
+            _reached(DailyFunnelStats.conversations).label("conversations"),
+            _reached(DailyFunnelStats.bookings).label("bookings"),
+            _reached(DailyFunnelStats.payments).label("payments"),
         )
-        .select_from(Payment)
-        .join(Booking, Payment.booking_id == Booking.id)
-        .join(Customer, Payment.customer_id == Customer.id)
-        .join(Conversation, Booking.conversation_id == Conversation.id)
-        .join(MessengerAccount, Conversation.messenger_account_id == MessengerAccount.id)
-        .where(
-            Payment.clinic_id == clinic_id,
-            Payment.status == "completed",
-            func.date(Payment.created_at) >= cutoff,
-        )
-        .group_by(Customer.country_code, MessengerAccount.messenger_type)
+        .where(*filters)
+        .group_by(*dimensions)
     )
-    payment_data = {}
-    for row in payment_result.all():
-        key = f"{row.country_code or 'unknown'}|{row.messenger_type}"
-        payment_data[key] = row.payments
 
-    all_dims = set(conv_data.keys()) | set(booking_data.keys())
     groups = []
-    for dim in sorted(all_dims):
-        convs = conv_data.get(dim, 0)
-        bkgs = booking_data.get(dim, 0)
-        pmts = payment_data.get(dim, 0)
+    for row in result.all():
+        dim = "|".join(row[: len(dimensions)])
+        convs = int(row.conversations or 0)
+        bkgs = int(row.bookings or 0)
+        pmts = int(row.payments or 0)
+        if not convs and not bkgs:
+            continue
         groups.append({
             "dimension": dim,
             "conversations": convs,
@@ -618,6 +425,7 @@ async def _funnel_by_both(db: AsyncSession, clinic_id, cutoff):
             "booking_rate": round(bkgs / convs * 100, 1) if convs > 0 else 0,
             "payment_rate": round(pmts / bkgs * 100, 1) if bkgs > 0 else 0,
         })
+    groups.sort(key=lambda g: g["dimension"])
     return groups
 
 
@@ -638,37 +446,35 @@ async def get_procedure_profitability(
         select(
             Procedure.id.label("procedure_id"),
             Procedure.name_ko.label("procedure_name"),
-            func.count(Payment.id).label("case_count"),
-            func.coalesce(func.sum(Payment.amount), 0).label("total_revenue"),
-            func.coalesce(func.avg(Payment.amount), 0).label("avg_ticket"),
+            func.sum(DailyProcedureStats.case_count).label("case_count"),
+            func.coalesce(func.sum(DailyProcedureStats.revenue), 0).label("total_revenue"),
             ClinicProcedure.material_cost,
         )
-        .select_from(Payment)
-        .join(Booking, Payment.booking_id == Booking.id)
-        .join(ClinicProcedure, Booking.clinic_procedure_id == ClinicProcedure.id)
+        .select_from(DailyProcedureStats)
+        .join(ClinicProcedure, DailyProcedureStats.clinic_procedure_id == ClinicProcedure.id)
         .join(Procedure, ClinicProcedure.procedure_id == Procedure.id)
         .where(
-            Payment.clinic_id == clinic_id,
-            Payment.status == "completed",
-            func.date(Payment.created_at) >= cutoff,
+            DailyProcedureStats.clinic_id == clinic_id,
+            DailyProcedureStats.day >= cutoff,
         )
         .group_by(Procedure.id, Procedure.name_ko, ClinicProcedure.material_cost)
-        .order_by(func.sum(Payment.amount).desc())
+        .order_by(func.sum(DailyProcedureStats.revenue).desc())
     )
     rows = result.all()
 
     procedures = []
     for row in rows:
+        case_count = int(row.case_count)
         revenue = float(row.total_revenue)
-        material = float(row.material_cost or 0) * row.case_count
+        material = float(row.material_cost or 0) * case_count
         margin = revenue - material
         margin_rate = round(margin / revenue * 100, 1) if revenue > 0 else 0
         procedures.append({
             "procedure_id": str(row.procedure_id),
             "procedure_name": row.procedure_name,
-            "case_count": row.case_count,
+            "case_count": case_count,
             "total_revenue": revenue,
-            "avg_ticket": round(float(row.avg_ticket), 0),
+            "avg_ticket": round(revenue / case_count, 0) if case_count else 0,
             "total_material_cost": material,
             "gross_margin": margin,
             "margin_rate": margin_rate,
@@ -689,37 +495,56 @@ async def get_customer_lifetime_value(
     """Customer lifetime value analysis with nationality breakdown."""
     clinic_id = current_user.clinic_id
     cutoff = date.today() - timedelta(days=days)
+    in_period = (
+        DailyCustomerRevenue.clinic_id == clinic_id,
+        DailyCustomerRevenue.day >= cutoff,
+    )
 
+    booked_total = func.sum(DailyCustomerRevenue.booked_amount)
     result = await db.execute(
         select(
             Customer.id.label("customer_id"),
             Customer.name.label("customer_name"),
             Customer.country_code,
-            func.coalesce(func.sum(Payment.amount), 0).label("total_payments"),
-            func.count(func.distinct(Booking.booking_date)).label("visit_count"),
-            func.min(Booking.booking_date).label("first_visit"),
-            func.max(Booking.booking_date).label("last_visit"),
-            func.coalesce(func.avg(Payment.amount), 0).label("avg_ticket"),
-        )
-        .select_from(Customer)
-        .join(Payment, Payment.customer_id == Customer.id)
-        .join(Booking, Payment.booking_id == Booking.id)
-        .where(
-            Payment.clinic_id == clinic_id,
-            Payment.status == "completed",
-            func.date(Payment.created_at) >= cutoff,
+            booked_total.label("total_payments"),
+            func.sum(DailyCustomerRevenue.booked_payment_count).label("payment_count"),
         )
+        .select_from(DailyCustomerRevenue)
+        .join(Customer, DailyCustomerRevenue.customer_id == Customer.id)
+        .where(*in_period, DailyCustomerRevenue.booked_payment_count > 0)
         .group_by(Customer.id, Customer.name, Customer.country_code)
-        .order_by(func.sum(Payment.amount).desc())
+        .order_by(booked_total.desc())
         .limit(top_n)
     )
     rows = result.all()
 
+    # Visit history only for the top customers
+    visits = {}
+    if rows:
+        visit_result = await db.execute(
+            select(
+                Payment.customer_id,
+                func.count(func.distinct(Booking.booking_date)).label("visit_count"),
+                func.min(Booking.booking_date).label("first_visit"),
+                func.max(Booking.booking_date).label("last_visit"),
+            )
+            .join(Booking, Payment.booking_id == Booking.id)
+            .where(
+                Payment.clinic_id == clinic_id,
+                Payment.customer_id.in_([row.customer_id for row in rows]),
+                Payment.status == "completed",
+                Payment.created_at >= cast(cutoff, Date),
+            )
+            .group_by(Payment.customer_id)
+        )
+        visits = {row.customer_id: row for row in visit_result.all()}
+
     customers = []
     for row in rows:
         total = float(row.total_payments)
-        first_visit = row.first_visit
-        last_visit = row.last_visit
+        visit = visits.get(row.customer_id)
+        first_visit = visit.first_visit if visit else None
+        last_visit = visit.last_visit if visit else None
         months_active = 1
         if first_visit and last_visit and last_visit > first_visit:
             delta = last_visit - first_visit
@@ -731,42 +556,42 @@ async def get_customer_lifetime_value(
             "customer_name": row.customer_name,
             "country_code": row.country_code or "unknown",
             "total_payments": total,
-            "visit_count": row.visit_count,
+            "visit_count": visit.visit_count if visit else 0,
             "first_visit": str(first_visit) if first_visit else None,
             "last_visit": str(last_visit) if last_visit else None,
-            "avg_ticket": round(float(row.avg_ticket), 0),
+            "avg_ticket": round(total / int(row.payment_count), 0),
             "predicted_annual_value": predicted_annual,
         })
 
     # Nationality average CLV
-    nat_agg_result = await db.execute(
+    per_customer = (
         select(
-            Customer.country_code,
-            func.sum(Payment.amount).label("customer_total"),
-        )
-        .select_from(Customer)
-        .join(Payment, Payment.customer_id == Customer.id)
-        .where(
-            Payment.clinic_id == clinic_id,
-            Payment.status == "completed",
-            func.date(Payment.created_at) >= cutoff,
+            DailyCustomerRevenue.customer_id,
+            func.sum(DailyCustomerRevenue.amount).label("customer_total"),
         )
-        .group_by(Customer.id, Customer.country_code)
+        .where(*in_period)
+        .group_by(DailyCustomerRevenue.customer_id)
+        .subquery()
+    )
+    country = func.coalesce(Customer.country_code, "unknown")
+    nat_result = await db.execute(
+        select(
+            country.label("country_code"),
+            func.avg(per_customer.c.customer_total).label("avg_clv"),
+            func.count().label("customer_count"),
+        )
+        .select_from(per_customer)
+        .join(Customer, Customer.id == per_customer.c.customer_id)
+        .group_by(country)
+        .order_by(country)
     )
-    nat_data: dict[str, list[float]] = {}
-    for row in nat_agg_result.all():
-        cc = row.country_code or "unknown"
-        if cc not in nat_data:
-            nat_data[cc] = []
-        nat_data[cc].append(float(row.customer_total or 0))
-
     nationality_avg = [
         {
-            "country_code": cc,
-            "avg_clv": round(sum(vals) / len(vals), 0) if vals else 0,
-            "customer_count": len(vals),
+            "country_code": row.country_code,
+            "avg_clv": round(float(row.avg_clv or 0), 0),
+            "customer_count": row.customer_count,
         }
-        for cc, vals in sorted(nat_data.items())
+        for row in nat_result.all()
     ]
 
     return {
@@ -787,23 +612,19 @@ async def get_revenue_heatmap(
     clinic_id = current_user.clinic_id
     cutoff = date.today() - timedelta(days=days)
 
+    day_of_week = extract("dow", HourlyRevenueStats.day)
     result = await db.execute(
         select(
-            func.extract("dow", Payment.paid_at).label("day_of_week"),
-            func.extract("hour", Payment.paid_at).label("hour"),
-            func.count(Payment.id).label("count"),
-            func.coalesce(func.sum(Payment.amount), 0).label("total_amount"),
+            day_of_week.label("day_of_week"),
+            HourlyRevenueStats.hour,
+            func.sum(HourlyRevenueStats.payment_count).label("count"),
+            func.coalesce(func.sum(HourlyRevenueStats.amount), 0).label("total_amount"),
         )
         .where(
-            Payment.clinic_id == clinic_id,
-            Payment.status == "completed",
-            Payment.paid_at.isnot(None),
-            func.date(Payment.paid_at) >= cutoff,
-        )
-        .group_by(
-            func.extract("dow", Payment.paid_at),
-            func.extract("hour", Payment.paid_at),
+            HourlyRevenueStats.clinic_id == clinic_id,
+            HourlyRevenueStats.day >= cutoff,
         )
+        .group_by(day_of_week, HourlyRevenueStats.hour)
     )
     rows = result.all()
 
@@ -812,7 +633,7 @@ async def get_revenue_heatmap(
         heatmap.append({
             "day_of_week": int(row.day_of_week),
             "hour": int(row.hour),
-            "count": row.count,
+            "count": int(row.count),
             "total_amount": float(row.total_amount),
         })
 
@@ -15,6 +15,7 @@ from app.schemas.clinic_procedure import (
     ClinicProcedureResponse,
     ClinicProcedureUpdate,
 )
+from app.services.knowledge_snapshot import publish_knowledge_changed
 from app.services.procedure_service import MERGE_FIELDS, get_merged_procedure
 
 router = APIRouter(prefix="/clinic-procedures", tags=["clinic-procedures"])
@@ -57,6 +58,8 @@ async def create_clinic_procedure(
     )
     db.add(cp)
     await db.flush()
+    await db.commit()
+    await publish_knowledge_changed(current_user.clinic_id)
     return cp
 
 
@@ -97,6 +100,8 @@ async def update_clinic_procedure(
         setattr(cp, field, value)
     await db.flush()
     await db.refresh(cp)
+    await db.commit()
+    await publish_knowledge_changed(current_user.clinic_id)
     return cp
 
 
@@ -113,7 +118,10 @@ async def reset_field_to_default(
     cp = await _get_clinic_procedure(db, cp_id, current_user.clinic_id)
     setattr(cp, f"custom_{field_name}", None)
     await db.flush()
-    return await get_merged_procedure(db, cp)
+    merged = await get_merged_procedure(db, cp)
+    await db.commit()
+    await publish_knowledge_changed(current_user.clinic_id)
+    return merged
 
 
 @router.delete("/{cp_id}", status_code=204)
@@ -125,3 +133,5 @@ async def delete_clinic_procedure(
     cp = await _get_clinic_procedure(db, cp_id, current_user.clinic_id)
     cp.is_active = False
     await db.flush()
+    await db.commit()
+    await publish_knowledge_changed(current_user.clinic_id)
@@ -1,14 +1,16 @@
 import uuid
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from pydantic import BaseModel
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.config import settings
 from app.core.database import get_db
-from app.core.exceptions import NotFoundError
+from app.core.exceptions import BadRequestError, NotFoundError
+from app.core.pagination import Keyset, paginate_keyset
 from app.dependencies import get_current_user, get_pagination
 from app.models.conversation import Conversation
 from app.models.message import Message
@@ -19,8 +21,15 @@ from app.schemas.conversation import (
     MessageResponse,
     SendMessageRequest,
 )
-from app.schemas.pagination import PaginatedResponse, PaginationParams
+from app.schemas.pagination import (
+    CursorPage,
+    CursorParams,
+    PaginatedResponse,
+    PaginationParams,
+    TotalMode,
+)
 from app.services.audit_service import log_action
+from app.services.message_service import MessageService
 
 router = APIRouter(prefix="/conversations", tags=["conversations"])
 
@@ -40,30 +49,76 @@ async def _get_conversation(
     return conv
 
 
+# Inbox order; served by ix_conversations_clinic_inbox
+INBOX_KEYSET = Keyset(Conversation.last_message_at, Conversation.id, nulls_last=True)
+
+
+def _conversation_item(conv: Conversation) -> ConversationListResponse:
+    customer = conv.customer
+    account = conv.messenger_account
+    return ConversationListResponse(
+        id=conv.id,
+        clinic_id=conv.clinic_id,
+        customer_id=conv.customer_id,
+        messenger_account_id=conv.messenger_account_id,
+        status=conv.status,
+        ai_mode=conv.ai_mode,
+        satisfaction_score=conv.satisfaction_score,
+        satisfaction_level=conv.satisfaction_level,
+        last_message_at=conv.last_message_at,
+        last_message_preview=conv.last_message_preview,
+        unread_count=conv.unread_count,
+        created_at=conv.created_at,
+        customer_name=customer.display_name or customer.name,
+        customer_country=customer.country_code,
+        customer_language=customer.language_code,
+        messenger_type=account.messenger_type,
+    )
+
+
 @router.get("")
 async def list_conversations(
     status: str | None = Query(None),
+    cursor: str | None = Query(None, description="Keyset pagination; empty for page 1"),
+    total: TotalMode = Query("none"),
     pagination: PaginationParams = Depends(get_pagination),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
-) -> PaginatedResponse[ConversationListResponse]:
+) -> PaginatedResponse[ConversationListResponse] | CursorPage[ConversationListResponse]:
     base_query = select(Conversation).where(
         Conversation.clinic_id == current_user.clinic_id,
     )
     if status:
         base_query = base_query.where(Conversation.status == status)
 
+    # Eager loading to avoid N+1
+    options = (
+        selectinload(Conversation.customer),
+        selectinload(Conversation.messenger_account),
+    )
+
+    if cursor is not None:
+        page = await paginate_keyset(
+            db,
+            base_query.options(*options),
+            INBOX_KEYSET,
+            CursorParams(limit=pagination.limit, cursor=cursor, total=total),
+        )
+        return CursorPage(
+            items=[_conversation_item(conv) for conv in page.items],
+            limit=page.limit,
+            next_cursor=page.next_cursor,
+            total=page.total,
+        )
+
     # Count total
     count_stmt = select(func.count()).select_from(base_query.subquery())
-    total = (await db.execute(count_stmt)).scalar() or 0
+    total_count = (await db.execute(count_stmt)).scalar() or 0
 
-    # Fetch page with eager loading to avoid N+1
+    # Fetch page
     query = (
-        base_query.options(
-            selectinload(Conversation.customer),
-            selectinload(Conversation.messenger_account),
-        )
-        .order_by(Conversation.last_message_at.desc().nulls_last())
+        base_query.options(*options)
+        .order_by(*INBOX_KEYSET.order_by())
         .offset(pagination.offset)
         .limit(pagination.limit)
     )
@@ -71,31 +126,9 @@ async def list_conversations(
     result = await db.execute(query)
     conversations = result.scalars().all()
 
-    items = []
-    for conv in conversations:
-        customer = conv.customer
-        account = conv.messenger_account
-        items.append(ConversationListResponse(
-            id=conv.id,
-            clinic_id=conv.clinic_id,
-            customer_id=conv.customer_id,
-            messenger_account_id=conv.messenger_account_id,
-            status=conv.status,
-            ai_mode=conv.ai_mode,
-            satisfaction_score=conv.satisfaction_score,
-            satisfaction_level=conv.satisfaction_level,
-            last_message_at=conv.last_message_at,
-            last_message_preview=conv.last_message_preview,
-            unread_count=conv.unread_count,
-            created_at=conv.created_at,
-            customer_name=customer.display_name or customer.name,
-            customer_country=customer.country_code,
-            customer_language=customer.language_code,
-            messenger_type=account.messenger_type,
-        ))
     return PaginatedResponse(
-        items=items,
-        total=total,
+        items=[_conversation_item(conv) for conv in conversations],
+        total=total_count,
         limit=pagination.limit,
         offset=pagination.offset,
     )
@@ -113,21 +146,39 @@ async def get_conversation(
 @router.get("/{conversation_id}/messages", response_model=list[MessageResponse])
 async def get_messages(
     conversation_id: uuid.UUID,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    before: uuid.UUID | None = Query(None, description="Older history preceding this message"),
+    after: uuid.UUID | None = Query(None, description="Messages following this message"),
+    since: uuid.UUID | None = Query(
+        None, description="Delta sync: messages newer than the last one the client holds"
+    ),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    """A window of the thread, oldest first: the latest `limit` messages by default.
+
+    X-Has-More tells whether more messages lie beyond the window: older ones
+    for the default window and `before`, newer ones for `after` and `since`.
+    A `since` delta can repeat messages the client already holds (see
+    MessageService.get_history); merge it by id.
+    """
+    if sum(cursor is not None for cursor in (before, after, since)) > 1:
+        raise BadRequestError("Use only one of before, after and since")
     conv = await _get_conversation(db, conversation_id, current_user.clinic_id)
 
-    result = await db.execute(
-        select(Message)
-        .where(Message.conversation_id == conversation_id)
-        .order_by(Message.created_at.asc())
+    # A delta larger than a page is paged forward with after=
+    delta_limit = max(limit, settings.message_delta_max_messages) if since else limit
+    messages, has_more = await MessageService(db).get_history(
+        conversation_id, delta_limit, before=before, after=after, since=since
     )
-    messages = result.scalars().all()
+    response.headers["X-Has-More"] = "true" if has_more else "false"
 
-    # Mark as read
-    conv.unread_count = 0
-    await db.flush()
+    # Mark as read once the newest message has been served
+    reached_latest = before is None and not (has_more and (after or since))
+    if reached_latest and conv.unread_count != 0:
+        conv.unread_count = 0
+        await db.flush()
 
     return messages
 
@@ -153,6 +204,7 @@ async def send_message(
         sender_id=current_user.id,
         content=body.content,
         content_type="text",
+        created_at=datetime.now(timezone.utc),
     )
     db.add(message)
     await db.flush()
@@ -37,6 +37,8 @@ async def get_monthly_summary(
             func.count(LLMUsage.id).label("count"),
             func.sum(LLMUsage.input_tokens).label("input_tokens"),
             func.sum(LLMUsage.output_tokens).label("output_tokens"),
+            func.sum(LLMUsage.cache_read_tokens).label("cache_read_tokens"),
+            func.sum(LLMUsage.cache_write_tokens).label("cache_write_tokens"),
             func.sum(LLMUsage.total_tokens).label("total_tokens"),
             func.sum(LLMUsage.cost_usd).label("cost_usd"),
         )
@@ -62,6 +64,8 @@ async def get_monthly_summary(
             "count": row.count,
             "input_tokens": int(row.input_tokens or 0),
             "output_tokens": int(row.output_tokens or 0),
+            "cache_read_tokens": int(row.cache_read_tokens or 0),
+            "cache_write_tokens": int(row.cache_write_tokens or 0),
             "total_tokens": tokens,
             "cost_usd": round(cost, 6),
         })
@@ -13,6 +13,7 @@ from app.schemas.medical_document import (
     DocumentStatusUpdate,
     MedicalDocumentResponse,
 )
+from app.schemas.pagination import CursorParams, TotalMode
 from app.services.medical_document_service import MedicalDocumentService
 
 router = APIRouter(prefix="/medical-documents", tags=["medical-documents"])
@@ -63,10 +64,27 @@ async def list_medical_documents(
     document_type: str | None = Query(None),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="Keyset pagination; empty for page 1"),
+    total: TotalMode = Query("none"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     svc = MedicalDocumentService(db)
+    if cursor is not None:
+        page = await svc.page_documents(
+            clinic_id=current_user.clinic_id,
+            page=CursorParams(limit=limit, cursor=cursor, total=total),
+            customer_id=customer_id,
+            booking_id=booking_id,
+            document_type=document_type,
+        )
+        return {
+            "items": [_doc_to_response(d) for d in page.items],
+            "limit": page.limit,
+            "next_cursor": page.next_cursor,
+            "total": page.total,
+        }
+
     docs, total = await svc.list_documents(
         clinic_id=current_user.clinic_id,
         customer_id=customer_id,
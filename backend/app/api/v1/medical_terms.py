@@ -15,6 +15,7 @@ from app.schemas.medical_term import (
     MedicalTermResponse,
     MedicalTermUpdate,
 )
+from app.services.knowledge_snapshot import publish_knowledge_changed
 
 router = APIRouter(prefix="/medical-terms", tags=["medical-terms"])
 
@@ -52,6 +53,8 @@ async def create_medical_term(
     )
     db.add(term)
     await db.flush()
+    await db.commit()
+    await publish_knowledge_changed(term.clinic_id)
     return term
 
 
@@ -102,6 +105,9 @@ async def update_medical_term(
     # Mark for re-indexing
     term.embedding = None
     await db.flush()
+    await db.commit()
+    # Global terms (clinic_id None) invalidate every clinic's snapshot
+    await publish_knowledge_changed(term.clinic_id)
     return term
 
 
@@ -112,5 +118,8 @@ async def delete_medical_term(
     db: AsyncSession = Depends(get_db),
 ):
     term = await _get_term(db, term_id, current_user.clinic_id)
+    scope = term.clinic_id
     await db.delete(term)
     await db.flush()
+    await db.commit()
+    await publish_knowledge_changed(scope)
@@ -15,6 +15,7 @@ from app.schemas.messenger import (
     MessengerAccountResponse,
     MessengerAccountUpdate,
 )
+from app.services.messenger_account_cache import publish_messenger_account_changed
 
 router = APIRouter(prefix="/messenger-accounts", tags=["messenger-accounts"])
 
@@ -85,6 +86,8 @@ async def update_messenger_account(
         setattr(account, field, value)
 
     await db.flush()
+    await db.commit()
+    await publish_messenger_account_changed(account.id)
     return account
 
 
@@ -97,6 +100,8 @@ async def delete_messenger_account(
     account = await _get_account(db, account_id, current_user.clinic_id)
     await db.delete(account)
     await db.flush()
+    await db.commit()
+    await publish_messenger_account_changed(account_id)
 
 
 async def _get_account(
@@ -15,6 +15,7 @@ from app.schemas.procedure import (
     ProcedureResponse,
     ProcedureUpdate,
 )
+from app.services.knowledge_snapshot import publish_knowledge_changed
 
 router = APIRouter(prefix="/procedures", tags=["procedures"])
 
@@ -91,4 +92,7 @@ async def update_procedure(
     proc.embedding = None
     await db.flush()
     await db.refresh(proc)
+    await db.commit()
+    # Procedures are global: every clinic's snapshot merges their base fields
+    await publish_knowledge_changed(None)
     return proc
@@ -15,6 +15,7 @@ from app.schemas.response_library import (
     ResponseLibraryResponse,
     ResponseLibraryUpdate,
 )
+from app.services.knowledge_snapshot import publish_knowledge_changed
 
 router = APIRouter(prefix="/response-library", tags=["response-library"])
 
@@ -51,6 +52,8 @@ async def create_response_library(
     )
     db.add(entry)
     await db.flush()
+    await db.commit()
+    await publish_knowledge_changed(current_user.clinic_id)
     return entry
 
 
@@ -98,6 +101,8 @@ async def update_response_library(
     # Mark for re-indexing
     entry.embedding = None
     await db.flush()
+    await db.commit()
+    await publish_knowledge_changed(current_user.clinic_id)
     return entry
 
 
@@ -110,3 +115,5 @@ async def delete_response_library(
     entry = await _get_entry(db, entry_id, current_user.clinic_id)
     await db.delete(entry)
     await db.flush()
+    await db.commit()
+    await publish_knowledge_changed(current_user.clinic_id)
@@ -16,7 +16,7 @@ from app.models.settlement import Settlement
 from app.models.user import User
 from app.schemas.pagination import PaginatedResponse, PaginationParams
 from app.schemas.settlement import SettlementGenerate, SettlementResponse
-from app.services.invoice_service import InvoiceService
+from app.services.invoice_service import InvoiceService, invoice_renderer
 from app.services.settlement_service import SettlementService
 
 router = APIRouter(prefix="/settlements", tags=["settlements"])
@@ -145,8 +145,10 @@ async def download_invoice(
     )
     clinic = clinic_result.scalar_one()
 
-    invoice_service = InvoiceService()
-    pdf_bytes = invoice_service.generate_pdf(settlement, clinic)
+    # Served from storage unless the settlement changed since it was rendered
+    invoice_service = InvoiceService(renderer=invoice_renderer)
+    pdf_bytes = await invoice_service.get_pdf(settlement, clinic)
+    await db.flush()
 
     period = f"{settlement.period_year}-{settlement.period_month:02d}"
     return StreamingResponse(
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.dependencies import get_current_user
 from app.models.user import User
+from app.schemas.pagination import CursorParams, TotalMode
 from app.schemas.translation_report import (
     TranslationReportCreate,
     TranslationReportResponse,
@@ -39,10 +40,26 @@ async def list_reports(
     severity: str | None = Query(None),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="Keyset pagination; empty for page 1"),
+    total: TotalMode = Query("none"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     svc = TranslationReportService(db)
+    if cursor is not None:
+        page = await svc.page_reports(
+            clinic_id=current_user.clinic_id,
+            page=CursorParams(limit=limit, cursor=cursor, total=total),
+            status=status,
+            severity=severity,
+        )
+        return {
+            "items": [TranslationReportResponse.model_validate(r) for r in page.items],
+            "limit": page.limit,
+            "next_cursor": page.next_cursor,
+            "total": page.total,
+        }
+
     reports, total = await svc.list_reports(
         clinic_id=current_user.clinic_id,
         status=status,
@@ -87,6 +104,7 @@ async def review_report(
         corrected_text=body.corrected_text,
     )
     await db.commit()
+    await svc.seed_translation_memory(report)
     return report
 
 
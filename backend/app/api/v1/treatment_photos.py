@@ -7,15 +7,29 @@ from app.core.database import get_db
 from app.core.exceptions import NotFoundError
 from app.dependencies import get_current_user
 from app.models.user import User
+from app.schemas.pagination import CursorParams, TotalMode
 from app.schemas.treatment_photo import (
     TreatmentPhotoResponse,
     TreatmentPhotoUpdate,
 )
-from app.services.storage_service import ALLOWED_IMAGE_TYPES, storage_service
+from app.services.photo_derivatives import PHOTO_SIZES, variant_url
+from app.services.storage_service import (
+    ALLOWED_IMAGE_TYPES,
+    iter_upload_file,
+    storage_service,
+)
 from app.services.treatment_photo_service import TreatmentPhotoService
 
 router = APIRouter(prefix="/treatment-photos", tags=["treatment-photos"])
 
+SIZE_PATTERN = f"^({'|'.join(PHOTO_SIZES)})$"
+
+
+def _photo_response(photo, size: str) -> TreatmentPhotoResponse:
+    response = TreatmentPhotoResponse.model_validate(photo)
+    response.display_url = variant_url(photo, size)
+    return response
+
 
 @router.post("/upload", response_model=TreatmentPhotoResponse, status_code=201)
 async def upload_treatment_photo(
@@ -35,9 +49,8 @@ async def upload_treatment_photo(
     if file.content_type not in ALLOWED_IMAGE_TYPES:
         raise ValueError(f"Unsupported file type: {file.content_type}")
 
-    file_data = await file.read()
-    url = await storage_service.upload(
-        file_data,
+    url = await storage_service.upload_stream(
+        iter_upload_file(file),
         file.filename or "photo.jpg",
         file.content_type or "image/jpeg",
         current_user.clinic_id,
@@ -59,6 +72,10 @@ async def upload_treatment_photo(
         pair_id=pair_id,
     )
     await db.commit()
+
+    from app.tasks.media import generate_photo_derivatives
+
+    generate_photo_derivatives.delay(str(photo.id))
     return photo
 
 
@@ -68,12 +85,31 @@ async def list_treatment_photos(
     booking_id: uuid.UUID | None = Query(None),
     photo_type: str | None = Query(None),
     portfolio_only: bool = Query(False),
+    size: str = Query("thumb", pattern=SIZE_PATTERN),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="Keyset pagination; empty for page 1"),
+    total: TotalMode = Query("none"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     svc = TreatmentPhotoService(db)
+    if cursor is not None:
+        page = await svc.page_photos(
+            clinic_id=current_user.clinic_id,
+            page=CursorParams(limit=limit, cursor=cursor, total=total),
+            customer_id=customer_id,
+            booking_id=booking_id,
+            photo_type=photo_type,
+            portfolio_only=portfolio_only,
+        )
+        return {
+            "items": [_photo_response(p, size) for p in page.items],
+            "limit": page.limit,
+            "next_cursor": page.next_cursor,
+            "total": page.total,
+        }
+
     photos, total = await svc.list_photos(
         clinic_id=current_user.clinic_id,
         customer_id=customer_id,
@@ -84,7 +120,7 @@ async def list_treatment_photos(
         offset=offset,
     )
     return {
-        "items": [TreatmentPhotoResponse.model_validate(p) for p in photos],
+        "items": [_photo_response(p, size) for p in photos],
         "total": total,
         "limit": limit,
         "offset": offset,
@@ -94,6 +130,7 @@ async def list_treatment_photos(
 @router.get("/pairs")
 async def list_photo_pairs(
     customer_id: uuid.UUID | None = Query(None),
+    size: str = Query("medium", pattern=SIZE_PATTERN),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
     current_user: User = Depends(get_current_user),
@@ -111,8 +148,8 @@ async def list_photo_pairs(
     for pair in pairs:
         result.append({
             "pair_id": str(pair["pair_id"]),
-            "before": TreatmentPhotoResponse.model_validate(pair["before"]) if pair["before"] else None,
-            "after": TreatmentPhotoResponse.model_validate(pair["after"]) if pair["after"] else None,
+            "before": _photo_response(pair["before"], size) if pair["before"] else None,
+            "after": _photo_response(pair["after"], size) if pair["after"] else None,
         })
     return result
 
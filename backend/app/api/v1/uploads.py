@@ -12,7 +12,8 @@ from app.models.user import User
 from app.services.storage_service import (
     ALLOWED_FILE_TYPES,
     ALLOWED_IMAGE_TYPES,
-    MAX_FILE_SIZE,
+    FileTooLargeError,
+    iter_upload_file,
     storage_service,
 )
 
@@ -31,17 +32,16 @@ async def upload_image(
             f"Invalid file type. Allowed: {', '.join(ALLOWED_IMAGE_TYPES)}"
         )
 
-    data = await file.read()
-    if len(data) > MAX_FILE_SIZE:
-        raise BadRequestError(f"File too large (max {MAX_FILE_SIZE // 1024 // 1024}MB)")
-
-    url = await storage_service.upload(
-        file_data=data,
-        filename=file.filename or "image",
-        content_type=file.content_type,
-        clinic_id=current_user.clinic_id,
-        category="images",
-    )
+    try:
+        url = await storage_service.upload_stream(
+            iter_upload_file(file),
+            filename=file.filename or "image",
+            content_type=file.content_type,
+            clinic_id=current_user.clinic_id,
+            category="images",
+        )
+    except FileTooLargeError as e:
+        raise BadRequestError(str(e))
     return {"url": url, "filename": file.filename, "content_type": file.content_type}
 
 
@@ -57,15 +57,14 @@ async def upload_file(
             f"Invalid file type. Allowed: {', '.join(ALLOWED_FILE_TYPES)}"
         )
 
-    data = await file.read()
-    if len(data) > MAX_FILE_SIZE:
-        raise BadRequestError(f"File too large (max {MAX_FILE_SIZE // 1024 // 1024}MB)")
-
-    url = await storage_service.upload(
-        file_data=data,
-        filename=file.filename or "file",
-        content_type=file.content_type,
-        clinic_id=current_user.clinic_id,
-        category="files",
-    )
+    try:
+        url = await storage_service.upload_stream(
+            iter_upload_file(file),
+            filename=file.filename or "file",
+            content_type=file.content_type,
+            clinic_id=current_user.clinic_id,
+            category="files",
+        )
+    except FileTooLargeError as e:
+        raise BadRequestError(str(e))
     return {"url": url, "filename": file.filename, "content_type": file.content_type}
@@ -7,15 +7,16 @@ import logging
 import uuid
 
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.core.database import get_db
 from app.core.exceptions import NotFoundError, PermissionDeniedError
 from app.messenger.kakao import KakaoAdapter
-from app.models.messenger_account import MessengerAccount
 from app.services.ai_response_background import broadcast_incoming_message
 from app.services.message_service import MessageService
+from app.services.messenger_account_cache import messenger_accounts
+from app.services.webhook_ingest import enqueue_webhook
 from app.tasks.ai_response import generate_ai_response
 
 logger = logging.getLogger(__name__)
@@ -32,10 +33,7 @@ async def kakao_webhook(
     db: AsyncSession = Depends(get_db),
 ):
     """Handle incoming KakaoTalk webhook events."""
-    result = await db.execute(
-        select(MessengerAccount).where(MessengerAccount.id == account_id)
-    )
-    account = result.scalar_one_or_none()
+    account = await messenger_accounts.get(db, account_id)
     if account is None:
         raise NotFoundError("Messenger account not found")
     if not account.is_active:
@@ -49,6 +47,11 @@ async def kakao_webhook(
     if not is_valid:
         raise PermissionDeniedError("Invalid webhook verification")
 
+    # Fast-ack mode: queue the verified body for webhook_consumer to persist
+    if settings.webhook_ingest_mode == "stream":
+        await enqueue_webhook("kakao", account.id, body)
+        return {"status": "ok"}
+
     # Parse and process
     payload = await request.json()
     messages = await adapter.parse_webhook(account, payload)
@@ -7,15 +7,16 @@ import logging
 import uuid
 
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.core.database import get_db
 from app.core.exceptions import NotFoundError, PermissionDeniedError
 from app.messenger.line import LineAdapter
-from app.models.messenger_account import MessengerAccount
 from app.services.ai_response_background import broadcast_incoming_message
 from app.services.message_service import MessageService
+from app.services.messenger_account_cache import messenger_accounts
+from app.services.webhook_ingest import enqueue_webhook
 from app.tasks.ai_response import generate_ai_response
 
 logger = logging.getLogger(__name__)
@@ -32,24 +33,27 @@ async def line_webhook(
     db: AsyncSession = Depends(get_db),
 ):
     """Handle incoming LINE webhook events."""
-    result = await db.execute(
-        select(MessengerAccount).where(MessengerAccount.id == account_id)
-    )
-    account = result.scalar_one_or_none()
+    account = await messenger_accounts.get(db, account_id)
     if account is None:
         raise NotFoundError("Messenger account not found")
     if not account.is_active:
         raise PermissionDeniedError("Messenger account is inactive")
 
-    # Verify X-Line-Signature
+    # Verify X-Line-Signature with the cached channel-secret key
     body = await request.body()
     headers = dict(request.headers)
-    channel_secret = account.credentials.get("channel_secret", account.webhook_secret or "")
 
-    is_valid = await adapter.verify_webhook(body, headers, secret=channel_secret)
+    is_valid = await adapter.verify_webhook(
+        body, headers, signing_key=account.signing_key
+    )
     if not is_valid:
         raise PermissionDeniedError("Invalid webhook signature")
 
+    # Fast-ack mode: queue the verified body for webhook_consumer to persist
+    if settings.webhook_ingest_mode == "stream":
+        await enqueue_webhook("line", account.id, body)
+        return {"status": "ok"}
+
     # Parse and process
     payload = await request.json()
     messages = await adapter.parse_webhook(account, payload)
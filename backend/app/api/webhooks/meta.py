@@ -8,15 +8,19 @@ import logging
 import uuid
 
 from fastapi import APIRouter, Depends, Query, Request, Response
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.core.database import get_db
 from app.core.exceptions import NotFoundError, PermissionDeniedError
 from app.messenger.factory import MessengerAdapterFactory
-from app.models.messenger_account import MessengerAccount
 from app.services.ai_response_background import broadcast_incoming_message
 from app.services.message_service import MessageService
+from app.services.messenger_account_cache import (
+    MessengerAccountSnapshot,
+    messenger_accounts,
+)
+from app.services.webhook_ingest import enqueue_webhook
 from app.tasks.ai_response import generate_ai_response
 
 logger = logging.getLogger(__name__)
@@ -24,11 +28,10 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/webhooks/meta", tags=["webhooks"])
 
 
-async def _get_account(db: AsyncSession, account_id: uuid.UUID) -> MessengerAccount:
-    result = await db.execute(
-        select(MessengerAccount).where(MessengerAccount.id == account_id)
-    )
-    account = result.scalar_one_or_none()
+async def _get_account(
+    db: AsyncSession, account_id: uuid.UUID
+) -> MessengerAccountSnapshot:
+    account = await messenger_accounts.get(db, account_id)
     if account is None:
         raise NotFoundError("Messenger account not found")
     if not account.is_active:
@@ -62,16 +65,22 @@ async def meta_webhook_post(
     """Handle incoming Meta webhook events (Instagram, Facebook, WhatsApp)."""
     account = await _get_account(db, account_id)
 
-    # Verify HMAC-SHA256 signature
+    # Verify HMAC-SHA256 signature with the cached app-secret key
     body = await request.body()
     headers = dict(request.headers)
-    app_secret = account.credentials.get("app_secret", "")
 
     adapter = MessengerAdapterFactory.get_adapter(account.messenger_type)
-    is_valid = await adapter.verify_webhook(body, headers, secret=app_secret)
+    is_valid = await adapter.verify_webhook(
+        body, headers, signing_key=account.signing_key
+    )
     if not is_valid:
         raise PermissionDeniedError("Invalid webhook signature")
 
+    # Fast-ack mode: queue the verified body for webhook_consumer to persist
+    if settings.webhook_ingest_mode == "stream":
+        await enqueue_webhook("meta", account.id, body)
+        return {"status": "ok"}
+
     # Parse and process
     payload = await request.json()
     messages = await adapter.parse_webhook(account, payload)
@@ -2,15 +2,16 @@ import logging
 import uuid
 
 from fastapi import APIRouter, Depends, Request
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.core.database import get_db
 from app.core.exceptions import NotFoundError, PermissionDeniedError
 from app.messenger.telegram import TelegramAdapter
-from app.models.messenger_account import MessengerAccount
 from app.services.ai_response_background import broadcast_incoming_message
 from app.services.message_service import MessageService
+from app.services.messenger_account_cache import messenger_accounts
+from app.services.webhook_ingest import enqueue_webhook
 from app.tasks.ai_response import generate_ai_response
 
 logger = logging.getLogger(__name__)
@@ -27,10 +28,7 @@ async def telegram_webhook(
     db: AsyncSession = Depends(get_db),
 ):
     # 1. Find account
-    result = await db.execute(
-        select(MessengerAccount).where(MessengerAccount.id == account_id)
-    )
-    account = result.scalar_one_or_none()
+    account = await messenger_accounts.get(db, account_id)
     if account is None:
         raise NotFoundError("Messenger account not found")
 
@@ -44,6 +42,11 @@ async def telegram_webhook(
     if not is_valid:
         raise PermissionDeniedError("Invalid webhook signature")
 
+    # Fast-ack mode: queue the verified body for webhook_consumer to persist
+    if settings.webhook_ingest_mode == "stream":
+        await enqueue_webhook("telegram", account.id, body)
+        return {"status": "ok"}
+
     # 3. Parse webhook
     payload = await request.json()
     messages = await adapter.parse_webhook(account, payload)
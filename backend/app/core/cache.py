@@ -1,34 +1,70 @@
-"""Simple Redis cache utility for application-level caching."""
+"""Application cache: in-process LRU in front of Redis.
 
-import json
+Plain helpers:
+- cache_get / cache_set: JSON values under a key, with a TTL.
+- cache_delete: pattern delete via SCAN. Prefer tags for anything hot.
+
+Loader-based caching (Cache.get_or_load and the @cached decorator) adds:
+- Two tiers. Entries are kept briefly in process (cache_local_ttl_seconds)
+  and shared across workers through Redis.
+- Single-flight. Concurrent misses for a key share one load in process, and
+  a short Redis lock keeps other processes waiting for that result instead
+  of recomputing it.
+- Stale-while-revalidate. With stale_ttl, an expired entry is still served
+  for that long while one caller refreshes it in the background.
+- Tags. Each tag has a version counter in Redis and entries record the
+  versions they were built with. invalidate_tags() bumps the counters, which
+  retires every entry carrying the tag without SCAN. The entry and its tag
+  versions come back in a single MGET.
+
+Values go through orjson, so callers always receive JSON types (UUIDs and
+datetimes as strings). Redis errors degrade to calling the loader directly.
+Connections come from the shared pool in app.core.redis.
+"""
+
+import asyncio
+import functools
+import inspect
 import logging
+import secrets
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
 from typing import Any
 
+import orjson
 import redis.asyncio as aioredis
 
 from app.config import settings
+from app.core.redis import get_redis, pipelined
+from app.middleware.metrics import CACHE_REQUESTS
 
 logger = logging.getLogger(__name__)
 
-_redis_client: aioredis.Redis | None = None
+ENTRY_PREFIX = "cache:entry:"
+TAG_PREFIX = "cache:tag:"
+LOCK_PREFIX = "cache:lock:"
+
+# Poll interval while another process holds the load lock
+LOCK_POLL_SECONDS = 0.05
 
 
 async def _get_redis() -> aioredis.Redis:
-    global _redis_client
-    if _redis_client is None:
-        _redis_client = aioredis.from_url(
-            settings.redis_url, decode_responses=True
-        )
-    return _redis_client
+    return get_redis()
+
+
+def _dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=str)
 
 
 async def cache_get(key: str) -> Any | None:
     """Get a cached value by key. Returns None on miss or error."""
     try:
-        r = await _get_redis()
-        data = await r.get(key)
+        # Auto-pipelined: lookups made concurrently share a round trip
+        data = await pipelined("get", key)
         if data is not None:
-            return json.loads(data)
+            return orjson.loads(data)
     except Exception:
         logger.debug("Cache get failed for key=%s", key)
     return None
@@ -38,13 +74,16 @@ async def cache_set(key: str, value: Any, ttl_seconds: int = 300) -> None:
     """Set a cached value with TTL. Fails silently."""
     try:
         r = await _get_redis()
-        await r.set(key, json.dumps(value, default=str), ex=ttl_seconds)
+        await r.set(key, _dumps(value), ex=ttl_seconds)
     except Exception:
         logger.debug("Cache set failed for key=%s", key)
 
 
 async def cache_delete(pattern: str) -> None:
-    """Delete cached keys matching pattern. Fails silently."""
+    """Delete cached keys matching pattern. Fails silently.
+
+    Walks the keyspace with SCAN; use tags with Cache/@cached instead on hot paths.
+    """
     try:
         r = await _get_redis()
         keys = []
@@ -54,3 +93,294 @@ async def cache_delete(pattern: str) -> None:
             await r.delete(*keys)
     except Exception:
         logger.debug("Cache delete failed for pattern=%s", pattern)
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    fresh_until: float
+    tags: dict[str, int] = field(default_factory=dict)
+
+    def encode(self) -> bytes:
+        return _dumps({"v": self.value, "f": self.fresh_until, "t": self.tags})
+
+    @classmethod
+    def decode(cls, data: bytes | str) -> "CacheEntry":
+        raw = orjson.loads(data)
+        return cls(value=raw["v"], fresh_until=raw["f"], tags=raw["t"])
+
+
+class Cache:
+    """Two-tier loader cache with single-flight, stale-while-revalidate and tags."""
+
+    def __init__(
+        self,
+        local_max_entries: int | None = None,
+        local_ttl_seconds: float | None = None,
+    ):
+        self.local_max_entries = local_max_entries or settings.cache_local_max_entries
+        self.local_ttl_seconds = local_ttl_seconds or settings.cache_local_ttl_seconds
+        # key -> (local expiry on the monotonic clock, encoded entry)
+        self._local: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        # Foreground loads callers can join, and background stale refreshes
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._refreshing: dict[str, asyncio.Task] = {}
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        *,
+        ttl: int = 300,
+        stale_ttl: int = 0,
+        tags: Iterable[str] = (),
+        name: str = "default",
+    ) -> Any:
+        """Return the cached value for key, calling loader on a miss."""
+        tags = sorted(set(tags))
+
+        entry = self._local_get(key)
+        if entry is not None:
+            CACHE_REQUESTS.labels(cache=name, result="local_hit").inc()
+            return entry.value
+
+        entry, versions = await self._read(key, tags)
+        if entry is not None and entry.tags == versions:
+            if entry.fresh_until > time.time():
+                CACHE_REQUESTS.labels(cache=name, result="hit").inc()
+                self._local_put(key, entry)
+                return entry.value
+            if stale_ttl:
+                CACHE_REQUESTS.labels(cache=name, result="stale").inc()
+                self._refresh_in_background(key, loader, ttl, stale_ttl, versions)
+                return entry.value
+
+        CACHE_REQUESTS.labels(cache=name, result="miss").inc()
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start(
+                self._inflight, key, self._load(key, loader, ttl, stale_ttl, versions)
+            )
+        # Shield so a cancelled caller doesn't cancel the load others are awaiting
+        return await asyncio.shield(task)
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        """Retire every entry carrying any of the tags, here and in Redis."""
+        if not tags:
+            return
+        for key, (_, data) in list(self._local.items()):
+            if any(tag in CacheEntry.decode(data).tags for tag in tags):
+                self._local.pop(key, None)
+        try:
+            r = await _get_redis()
+            async with r.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.incr(f"{TAG_PREFIX}{tag}")
+                await pipe.execute()
+        except Exception:
+            logger.warning("Cache tag invalidation failed for tags=%s", tags)
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+    # --- Loading ---
+
+    @staticmethod
+    def _start(
+        registry: dict[str, asyncio.Task], key: str, coro: Awaitable[Any]
+    ) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        registry[key] = task
+        task.add_done_callback(lambda _: registry.pop(key, None))
+        return task
+
+    def _refresh_in_background(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        versions: dict[str, int],
+    ) -> None:
+        if key in self._inflight or key in self._refreshing:
+            return
+        task = self._start(
+            self._refreshing,
+            key,
+            self._load(key, loader, ttl, stale_ttl, versions, wait=False),
+        )
+        task.add_done_callback(self._log_refresh_failure)
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Background cache refresh failed", exc_info=task.exception())
+
+    async def _load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        versions: dict[str, int],
+        wait: bool = True,
+    ) -> Any:
+        token = await self._acquire_lock(key)
+        if token is None:
+            # Another process is loading this key
+            if not wait:
+                return None
+            entry = await self._wait_for_fill(key, versions)
+            if entry is not None:
+                self._local_put(key, entry)
+                return entry.value
+
+        try:
+            value = orjson.loads(_dumps(await loader()))
+            entry = CacheEntry(value=value, fresh_until=time.time() + ttl, tags=versions)
+            await self._write(key, entry, ttl + stale_ttl)
+            self._local_put(key, entry)
+            return value
+        finally:
+            if token:
+                await self._release_lock(key, token)
+
+    async def _wait_for_fill(
+        self, key: str, versions: dict[str, int]
+    ) -> CacheEntry | None:
+        deadline = time.monotonic() + settings.cache_lock_wait_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_SECONDS)
+            entry, current = await self._read(key, list(versions))
+            if (
+                entry is not None
+                and entry.tags == current
+                and entry.fresh_until > time.time()
+            ):
+                return entry
+        return None
+
+    # --- Redis tier ---
+
+    async def _read(
+        self, key: str, tags: list[str]
+    ) -> tuple[CacheEntry | None, dict[str, int]]:
+        """Fetch the entry and the current tag versions in one round trip."""
+        try:
+            r = await _get_redis()
+            data, *tag_versions = await r.mget(
+                f"{ENTRY_PREFIX}{key}", *(f"{TAG_PREFIX}{t}" for t in tags)
+            )
+        except Exception:
+            logger.debug("Cache read failed for key=%s", key)
+            return None, {t: 0 for t in tags}
+        versions = {t: int(v or 0) for t, v in zip(tags, tag_versions)}
+        entry = CacheEntry.decode(data) if data is not None else None
+        return entry, versions
+
+    async def _write(self, key: str, entry: CacheEntry, expire_seconds: int) -> None:
+        try:
+            r = await _get_redis()
+            await r.set(f"{ENTRY_PREFIX}{key}", entry.encode(), ex=expire_seconds)
+        except Exception:
+            logger.debug("Cache write failed for key=%s", key)
+
+    async def _acquire_lock(self, key: str) -> str | None:
+        """Take the cross-process load lock. Returns a token, "" if Redis is
+        unavailable (load without a lock), or None if another process holds it."""
+        token = secrets.token_hex(8)
+        try:
+            r = await _get_redis()
+            acquired = await r.set(
+                f"{LOCK_PREFIX}{key}",
+                token,
+                nx=True,
+                px=int(settings.cache_lock_timeout_seconds * 1000),
+            )
+        except Exception:
+            return ""
+        return token if acquired else None
+
+    async def _release_lock(self, key: str, token: str) -> None:
+        # Not atomic; the lock's expiry bounds the window in which it matters
+        try:
+            r = await _get_redis()
+            if await r.get(f"{LOCK_PREFIX}{key}") == token:
+                await r.delete(f"{LOCK_PREFIX}{key}")
+        except Exception:
+            logger.debug("Cache lock release failed for key=%s", key)
+
+    # --- Local tier ---
+
+    def _local_get(self, key: str) -> CacheEntry | None:
+        item = self._local.get(key)
+        if item is None:
+            return None
+        expires_at, data = item
+        if expires_at <= time.monotonic():
+            self._local.pop(key, None)
+            return None
+        self._local.move_to_end(key)
+        return CacheEntry.decode(data)
+
+    def _local_put(self, key: str, entry: CacheEntry) -> None:
+        remaining = entry.fresh_until - time.time()
+        lifetime = min(self.local_ttl_seconds, remaining)
+        if lifetime <= 0:
+            return
+        self._local[key] = (time.monotonic() + lifetime, entry.encode())
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_max_entries:
+            self._local.popitem(last=False)
+
+
+# Process-wide cache
+app_cache = Cache()
+
+
+async def invalidate_tags(*tags: str) -> None:
+    """Invalidate entries tagged with any of tags in the process-wide cache."""
+    await app_cache.invalidate_tags(*tags)
+
+
+def cached(
+    key: str,
+    *,
+    ttl: int = 300,
+    stale_ttl: int = 0,
+    tags: Iterable[str] = (),
+):
+    """Cache an async function's (JSON-serializable) result in app_cache.
+
+    key and tags are str.format templates over the function's arguments:
+
+        @cached("analytics:overview:{clinic_id}", ttl=300, stale_ttl=60,
+                tags=["analytics:{clinic_id}"])
+        async def load_overview(clinic_id: uuid.UUID) -> dict: ...
+
+    With stale_ttl the function may run in the background after the caller
+    has returned, so it must not depend on request-scoped resources such as
+    the request's DB session.
+    """
+    tag_templates = tuple(tags)
+
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+            return await app_cache.get_or_load(
+                key.format(**arguments),
+                functools.partial(func, *args, **kwargs),
+                ttl=ttl,
+                stale_ttl=stale_ttl,
+                tags=[t.format(**arguments) for t in tag_templates],
+                name=func.__name__,
+            )
+
+        return wrapper
+
+    return decorator
@@ -1,7 +1,39 @@
-from sqlalchemy import Select, func, select
+"""Offset and keyset (cursor) pagination for list endpoints.
+
+paginate() runs COUNT(*) and OFFSET/LIMIT, so its cost grows with the table
+and with page depth. Large lists also offer keyset pagination: a client that
+sends ``cursor`` (empty for the first page) gets a CursorPage whose
+next_cursor is an opaque token holding the (sort key, id) of the last row.
+The following page is ``WHERE (key, id) < (...)``, which an index on
+(filter columns, key, id) answers by reading just that page.
+
+Totals are optional in keyset mode (CursorParams.total):
+- "none": no count
+- "estimate": the planner's row estimate, from EXPLAIN
+- "exact": COUNT(*), cached in app_cache for pagination_count_cache_ttl_seconds
+"""
+
+import base64
+import binascii
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+import orjson
+from sqlalchemy import ColumnElement, Select, and_, func, or_, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
-from app.schemas.pagination import PaginatedResponse, PaginationParams
+from app.config import settings
+from app.core.cache import app_cache
+from app.core.exceptions import BadRequestError
+from app.schemas.pagination import (
+    CursorPage,
+    CursorParams,
+    PaginatedResponse,
+    PaginationParams,
+)
 
 
 async def paginate(
@@ -24,3 +56,126 @@ async def paginate(
         limit=pagination.limit,
         offset=pagination.offset,
     )
+
+
+@dataclass(frozen=True)
+class Keyset:
+    """Sort order of a keyset-paginated list: key, then id as the tiebreaker.
+
+    With nulls_last the key column is nullable and rows without a key come
+    after all others, e.g. conversations that never received a message.
+    """
+
+    key: InstrumentedAttribute
+    id: InstrumentedAttribute
+    descending: bool = True
+    nulls_last: bool = False
+
+    def order_by(self) -> list[ColumnElement]:
+        if self.descending:
+            key, id_ = self.key.desc(), self.id.desc()
+        else:
+            key, id_ = self.key.asc(), self.id.asc()
+        if self.nulls_last:
+            key = key.nulls_last()
+        return [key, id_]
+
+    def after(self, cursor: str) -> ColumnElement[bool]:
+        """Predicate selecting the rows that follow the cursor."""
+        return self.after_row(*self._decode(cursor))
+
+    def after_row(self, key: Any, id_: Any) -> ColumnElement[bool]:
+        """Predicate selecting the rows that follow the row with this key and id."""
+        if key is None:
+            # Only reachable with nulls_last: the rest of the keyless tail
+            id_beyond = self.id < id_ if self.descending else self.id > id_
+            return and_(self.key.is_(None), id_beyond)
+        row = tuple_(self.key, self.id)
+        beyond = row < (key, id_) if self.descending else row > (key, id_)
+        if self.nulls_last:
+            return or_(beyond, self.key.is_(None))
+        return beyond
+
+    def cursor_for(self, row: Any) -> str:
+        values = [getattr(row, self.key.key), getattr(row, self.id.key)]
+        raw = orjson.dumps(values, default=str)  # asyncpg returns its own UUID type
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+    def _decode(self, cursor: str) -> tuple[Any, Any]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            key, id_ = orjson.loads(raw)
+            return _load(self.key, key), _load(self.id, id_)
+        except (binascii.Error, orjson.JSONDecodeError, TypeError, ValueError):
+            raise BadRequestError("Invalid cursor")
+
+
+def _load(column: InstrumentedAttribute, value: Any) -> Any:
+    """Restore a cursor value to the column's Python type."""
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+
+async def paginate_keyset(
+    db: AsyncSession,
+    stmt: Select,
+    keyset: Keyset,
+    params: CursorParams,
+) -> CursorPage:
+    """Fetch the page after params.cursor; stmt must not be ordered or limited."""
+    paged_stmt = stmt.order_by(*keyset.order_by()).limit(params.limit + 1)
+    if params.cursor:
+        paged_stmt = paged_stmt.where(keyset.after(params.cursor))
+    result = await db.execute(paged_stmt)
+    items = list(result.scalars().all())
+
+    next_cursor = None
+    if len(items) > params.limit:
+        items = items[: params.limit]
+        next_cursor = keyset.cursor_for(items[-1])
+
+    total = None
+    if params.total == "estimate":
+        total = await estimate_count(db, stmt)
+    elif params.total == "exact":
+        total = await cached_count(db, stmt)
+
+    return CursorPage(
+        items=items,
+        limit=params.limit,
+        next_cursor=next_cursor,
+        total=total,
+    )
+
+
+async def estimate_count(db: AsyncSession, stmt: Select) -> int:
+    """Planner estimate of the rows stmt returns; no rows are read."""
+    conn = await db.connection()
+    compiled = stmt.compile(dialect=conn.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+    return int(result.scalar()[0]["Plan"]["Plan Rows"])
+
+
+async def cached_count(db: AsyncSession, stmt: Select) -> int:
+    """COUNT(*) of stmt, shared across requests for a short TTL."""
+    count_stmt = select(func.count()).select_from(stmt.subquery())
+    conn = await db.connection()
+    compiled = count_stmt.compile(dialect=conn.dialect)
+    fingerprint = hashlib.sha1(
+        repr((str(compiled), sorted(compiled.params.items()))).encode()
+    ).hexdigest()
+
+    async def load() -> int:
+        return (await db.execute(count_stmt)).scalar() or 0
+
+    return await app_cache.get_or_load(
+        f"pagination:count:{fingerprint}",
+        load,
+        ttl=settings.pagination_count_cache_ttl_seconds,
+        name="pagination_count",
+    )
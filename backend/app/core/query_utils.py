@@ -1,5 +1,9 @@
 """Query helper utilities for safe SQL construction."""
 
+from datetime import date
+
+from sqlalchemy import Date, Text, cast, func, literal
+
 
 def escape_like(value: str) -> str:
     """Escape SQL LIKE/ILIKE wildcard characters in user input.
@@ -12,3 +16,21 @@ def escape_like(value: str) -> str:
         .replace("%", "\\%")
         .replace("_", "\\_")
     )
+
+
+def in_month(column, year: int, month: int) -> tuple:
+    """Index-friendly filter for column falling in the given month.
+
+    A half-open range instead of extract('year'/'month', column), which
+    cannot use an index on the column. Like extract, month boundaries are
+    taken in the session timezone.
+    """
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return column >= literal(start, Date), column < literal(end, Date)
+
+
+def in_shard(column, shard: int, shards: int):
+    """Filter rows whose *column* hashes to shard number *shard* of *shards*."""
+    bucket = func.hashtext(cast(column, Text)).op("&")(0x7FFFFFFF)
+    return bucket % shards == shard
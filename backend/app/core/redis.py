@@ -0,0 +1,224 @@
+"""Shared Redis connections.
+
+Provides:
+- redis_pools: process-wide registry of Redis clients, one bounded connection
+  pool per event loop (Celery task classes run their own loops)
+- get_redis: the shared async client for the running loop
+- get_listener_redis: a client on a separate pool for connections held
+  open indefinitely (Pub/Sub listeners, blocking stream reads), so they
+  never take connections away from request traffic
+- pipelined: run one command through the loop's auto-pipeline, so commands
+  issued concurrently (e.g. the WebSocket publishes and cache reads of one
+  AI reply) go out in a single round trip
+- redis_pools.sync_pool(): the pool synchronous clients (slowapi's limiter) use
+
+Every Redis user in the app goes through here instead of calling from_url,
+so the process holds a known, bounded number of connections and pool
+utilization shows up in the redis_pool_connections gauge.
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+import redis
+import redis.asyncio as aioredis
+
+from app.config import settings
+from app.middleware.metrics import REDIS_AUTO_PIPELINE_SIZE, REDIS_POOL_CONNECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+def _build_client(max_connections: int) -> aioredis.Redis:
+    # No socket read timeout: Pub/Sub listeners block on reads indefinitely
+    pool = aioredis.BlockingConnectionPool.from_url(
+        settings.redis_url,
+        max_connections=max_connections,
+        timeout=settings.redis_pool_timeout_seconds,
+        socket_connect_timeout=settings.redis_connect_timeout_seconds,
+        health_check_interval=settings.redis_health_check_interval_seconds,
+        decode_responses=True,
+    )
+    return aioredis.Redis.from_pool(pool)
+
+
+class AutoPipeline:
+    """Send the commands queued during one event-loop iteration as one pipeline.
+
+    Each caller still awaits its own result; a failing command only fails
+    its caller. Nothing is transactional.
+    """
+
+    def __init__(self, client: aioredis.Redis):
+        self._client = client
+        self._pending: list[tuple[str, tuple, dict, asyncio.Future]] = []
+        self._flush_scheduled = False
+        self._tasks: set[asyncio.Task] = set()
+
+    async def execute(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((command, args, kwargs, future))
+        if not self._flush_scheduled:
+            # Runs after the callbacks already queued, so the other coroutines
+            # that are ready this iteration get to queue their commands first
+            self._flush_scheduled = True
+            loop.call_soon(self._start_flush)
+        return await future
+
+    def _start_flush(self) -> None:
+        batch, self._pending, self._flush_scheduled = self._pending, [], False
+        task = asyncio.ensure_future(self._flush(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, batch: list[tuple[str, tuple, dict, asyncio.Future]]) -> None:
+        REDIS_AUTO_PIPELINE_SIZE.observe(len(batch))
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for command, args, kwargs, _ in batch:
+                    getattr(pipe, command)(*args, **kwargs)
+                results = await pipe.execute(raise_on_error=False)
+        except Exception as exc:
+            results = [exc] * len(batch)
+        for (*_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class RedisPoolRegistry:
+    """Process-wide Redis clients, one connection pool per event loop.
+
+    redis.asyncio connections are bound to the loop they were opened on, so
+    like http_clients the async client is kept per loop and clients of
+    closed loops are discarded.
+    """
+
+    def __init__(self):
+        self._clients: dict[
+            int, tuple[asyncio.AbstractEventLoop, aioredis.Redis, AutoPipeline]
+        ] = {}
+        self._listener_clients: dict[int, tuple[asyncio.AbstractEventLoop, aioredis.Redis]] = {}
+        self._sync_pool: redis.ConnectionPool | None = None
+
+    def client(self) -> aioredis.Redis:
+        """Return the shared async client for the running event loop."""
+        return self._entry()[1]
+
+    def auto_pipeline(self) -> AutoPipeline:
+        return self._entry()[2]
+
+    def listener_client(self) -> aioredis.Redis:
+        """Return the async client for long-lived connections on the running loop."""
+        loop = asyncio.get_running_loop()
+        entry = self._listener_clients.get(id(loop))
+        if entry is not None and entry[0] is loop:
+            return entry[1]
+
+        self._discard_closed_loops()
+        client = _build_client(settings.redis_listener_max_connections)
+        self._listener_clients[id(loop)] = (loop, client)
+        return client
+
+    def sync_pool(self) -> redis.ConnectionPool:
+        """Return the pool for synchronous clients, created on first use."""
+        if self._sync_pool is None:
+            self._sync_pool = redis.BlockingConnectionPool.from_url(
+                settings.redis_url,
+                max_connections=settings.redis_pool_max_connections,
+                timeout=settings.redis_pool_timeout_seconds,
+                socket_connect_timeout=settings.redis_connect_timeout_seconds,
+                health_check_interval=settings.redis_health_check_interval_seconds,
+            )
+        return self._sync_pool
+
+    def connection_count(self, state: str) -> int:
+        """Connections across the shared async pools: "in_use", "idle" or "max"."""
+        total = 0
+        for _, client, _ in list(self._clients.values()):
+            pool = client.connection_pool
+            if state == "in_use":
+                total += len(getattr(pool, "_in_use_connections", ()))
+            elif state == "idle":
+                total += len(getattr(pool, "_available_connections", ()))
+            else:
+                total += pool.max_connections
+        return total
+
+    async def aclose(self) -> None:
+        """Close the client owned by the running loop (app shutdown hook)."""
+        loop_id = id(asyncio.get_running_loop())
+        for clients in (self._clients, self._listener_clients):
+            entry = clients.pop(loop_id, None)
+            if entry is not None:
+                await entry[1].aclose()
+        self._discard_closed_loops()
+
+    def close_all(self) -> None:
+        """Close every client from outside any running loop (worker shutdown hook)."""
+        for clients in (self._clients, self._listener_clients):
+            for owner, client, *_ in clients.values():
+                if owner.is_closed() or owner.is_running():
+                    continue
+                try:
+                    owner.run_until_complete(client.aclose())
+                except Exception:
+                    logger.debug("Failed to close pooled Redis client", exc_info=True)
+            clients.clear()
+        if self._sync_pool is not None:
+            self._sync_pool.disconnect()
+            self._sync_pool = None
+
+    def _entry(self) -> tuple[asyncio.AbstractEventLoop, aioredis.Redis, AutoPipeline]:
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(id(loop))
+        if entry is not None and entry[0] is loop:
+            return entry
+
+        self._discard_closed_loops()
+        client = _build_client(settings.redis_pool_max_connections)
+        entry = (loop, client, AutoPipeline(client))
+        self._clients[id(loop)] = entry
+        return entry
+
+    def _discard_closed_loops(self) -> None:
+        for clients in (self._clients, self._listener_clients):
+            for key, (owner, *_) in list(clients.items()):
+                if owner.is_closed():
+                    del clients[key]
+
+
+# Process-wide registry
+redis_pools = RedisPoolRegistry()
+
+for _state in ("in_use", "idle", "max"):
+    REDIS_POOL_CONNECTIONS.labels(state=_state).set_function(
+        lambda state=_state: redis_pools.connection_count(state)
+    )
+
+
+def get_redis() -> aioredis.Redis:
+    """Return the shared async Redis client (decode_responses=True)."""
+    return redis_pools.client()
+
+
+def get_listener_redis() -> aioredis.Redis:
+    """Return the async Redis client for Pub/Sub listeners and blocking reads."""
+    return redis_pools.listener_client()
+
+
+async def pipelined(command: str, *args: Any, **kwargs: Any) -> Any:
+    """Run a Redis command, batched with any others issued concurrently.
+
+        await pipelined("publish", channel, payload)
+        version = await pipelined("get", key)
+
+    Use it for independent commands on hot paths; use get_redis().pipeline()
+    when a sequence of commands belongs together.
+    """
+    return await redis_pools.auto_pipeline().execute(command, *args, **kwargs)
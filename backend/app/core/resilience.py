@@ -4,8 +4,11 @@ Provides:
 - CircuitBreaker: lightweight async circuit breaker (CLOSED -> OPEN -> HALF_OPEN)
 - retry_async: tenacity-based decorator factory with exponential backoff
 - get_http_client: httpx.AsyncClient factory with configured timeout
+- http_clients: process-wide registry of pooled, long-lived httpx clients
 """
 
+import asyncio
+import importlib.util
 import logging
 import time
 from collections.abc import Callable, Coroutine
@@ -103,6 +106,34 @@ class CircuitBreaker:
         self.state = CircuitState.CLOSED
 
 
+class RateLimiter:
+    """Async token bucket: at most *rate* acquisitions per second.
+
+    Up to *burst* acquisitions may go through back to back after an idle
+    period; waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
 def retry_async(
     max_retries: int | None = None,
     retry_on: tuple[type[Exception], ...] = (
@@ -126,3 +157,79 @@ def get_http_client(**kwargs: Any) -> httpx.AsyncClient:
     """Return an httpx.AsyncClient with configured timeout."""
     timeout = httpx.Timeout(settings.http_timeout_seconds)
     return httpx.AsyncClient(timeout=timeout, **kwargs)
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 needs the optional ``h2`` package (``httpx[http2]``)."""
+    return settings.http2_enabled and importlib.util.find_spec("h2") is not None
+
+
+def _build_pooled_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.http_pool_max_connections,
+        max_keepalive_connections=settings.http_pool_max_keepalive,
+        keepalive_expiry=settings.http_keepalive_expiry_seconds,
+    )
+    return get_http_client(limits=limits, http2=_http2_enabled())
+
+
+class HTTPClientRegistry:
+    """Process-wide registry of long-lived httpx clients.
+
+    One client (and so one keep-alive connection pool) per named upstream,
+    e.g. "telegram" or "meta_graph_api", so outbound calls reuse TCP/TLS
+    connections instead of handshaking per request.
+
+    httpx clients are bound to the event loop they were first used on, and
+    Celery task classes each run their own loop, so clients are kept per
+    (name, loop). Clients of closed loops are discarded.
+    """
+
+    def __init__(self):
+        self._clients: dict[
+            tuple[str, int], tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]
+        ] = {}
+
+    def get(self, name: str = "default") -> httpx.AsyncClient:
+        """Return the shared client for *name* on the running event loop."""
+        loop = asyncio.get_running_loop()
+        key = (name, id(loop))
+        entry = self._clients.get(key)
+        if entry is not None:
+            owner, client = entry
+            if owner is loop and not client.is_closed:
+                return client
+
+        self._discard_closed_loops()
+        client = _build_pooled_client()
+        self._clients[key] = (loop, client)
+        return client
+
+    async def aclose(self) -> None:
+        """Close the clients owned by the running loop (app shutdown hook)."""
+        loop = asyncio.get_running_loop()
+        for key, (owner, client) in list(self._clients.items()):
+            if owner is loop:
+                del self._clients[key]
+                await client.aclose()
+        self._discard_closed_loops()
+
+    def close_all(self) -> None:
+        """Close every client from outside any running loop (worker shutdown hook)."""
+        for owner, client in self._clients.values():
+            if owner.is_closed() or owner.is_running():
+                continue
+            try:
+                owner.run_until_complete(client.aclose())
+            except Exception:
+                logger.debug("Failed to close pooled HTTP client", exc_info=True)
+        self._clients.clear()
+
+    def _discard_closed_loops(self) -> None:
+        for key, (owner, _client) in list(self._clients.items()):
+            if owner.is_closed():
+                del self._clients[key]
+
+
+# Process-wide registry used by messenger adapters
+http_clients = HTTPClientRegistry()
@@ -16,6 +16,8 @@ from slowapi.errors import RateLimitExceeded
 
 from app.config import settings
 from app.core.logging import setup_logging
+from app.core.redis import get_redis, redis_pools
+from app.core.resilience import http_clients
 from app.middleware.body_limit import BodyLimitMiddleware
 from app.middleware.metrics import setup_metrics
 from app.middleware.rate_limit import limiter
@@ -30,6 +32,11 @@ if os.path.exists("uploads") or settings.app_env == "development":
     from fastapi.staticfiles import StaticFiles
 
     os.makedirs("uploads", exist_ok=True)
+from app.services.invoice_service import invoice_renderer
+from app.services.knowledge_snapshot import knowledge_snapshots
+from app.services.messenger_account_cache import messenger_accounts
+from app.services.storage_service import storage_service
+from app.services.webhook_ingest import webhook_consumer
 from app.websocket.manager import manager as ws_manager
 
 logger = logging.getLogger(__name__)
@@ -56,6 +63,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type", "Accept", "Accept-Language", "X-Request-ID"],
+    expose_headers=["X-Has-More"],
 )
 
 # Prometheus metrics
@@ -77,11 +85,22 @@ if os.path.exists("uploads"):
 @app.on_event("startup")
 async def startup_event():
     await ws_manager.start_listener()
+    await knowledge_snapshots.start_listener()
+    await messenger_accounts.start_listener()
+    if settings.webhook_ingest_mode == "stream":
+        await webhook_consumer.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await webhook_consumer.stop()
     await ws_manager.stop_listener()
+    await knowledge_snapshots.stop_listener()
+    await messenger_accounts.stop_listener()
+    await http_clients.aclose()
+    await redis_pools.aclose()
+    await storage_service.aclose()
+    invoice_renderer.shutdown()
 
     # Drain DB connection pool
     from app.core.database import engine
@@ -120,12 +139,8 @@ async def health_check():
 
     # Redis check
     try:
-        import redis.asyncio as aioredis
-
         async with asyncio.timeout(5):
-            r = aioredis.from_url(settings.redis_url)
-            await r.ping()
-            await r.aclose()
+            await get_redis().ping()
         checks["redis"] = "ok"
     except Exception:
         checks["redis"] = "unavailable"
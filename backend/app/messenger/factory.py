@@ -2,20 +2,30 @@ from app.messenger.base import AbstractMessengerAdapter
 
 
 class MessengerAdapterFactory:
-    """Factory to get the correct messenger adapter by type."""
+    """Factory to get the correct messenger adapter by type.
+
+    Adapters are stateless (per-account data is passed to each call), so one
+    shared instance per messenger type is handed out.
+    """
 
     _adapters: dict[str, type[AbstractMessengerAdapter]] = {}
+    _instances: dict[str, AbstractMessengerAdapter] = {}
 
     @classmethod
     def register(cls, messenger_type: str, adapter_class: type[AbstractMessengerAdapter]):
         cls._adapters[messenger_type] = adapter_class
+        cls._instances.pop(messenger_type, None)
 
     @classmethod
     def get_adapter(cls, messenger_type: str) -> AbstractMessengerAdapter:
+        adapter = cls._instances.get(messenger_type)
+        if adapter is not None:
+            return adapter
         adapter_class = cls._adapters.get(messenger_type)
         if adapter_class is None:
             raise ValueError(f"Unsupported messenger type: {messenger_type}")
-        return adapter_class()
+        adapter = cls._instances[messenger_type] = adapter_class()
+        return adapter
 
     @classmethod
     def supported_types(cls) -> list[str]:
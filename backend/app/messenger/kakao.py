@@ -8,7 +8,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from app.core.resilience import CircuitBreaker, get_http_client
+from app.core.resilience import CircuitBreaker, http_clients
 from app.messenger.base import AbstractMessengerAdapter, StandardMessage
 from app.messenger.factory import MessengerAdapterFactory
 from app.models.messenger_account import MessengerAccount
@@ -16,6 +16,28 @@ from app.models.messenger_account import MessengerAccount
 KAKAO_API_BASE = "https://kapi.kakao.com"
 
 _circuit = CircuitBreaker("kakao")
+_HTTP_POOL = "kakao"
+
+
+def _message_id(block_id: str, suffix: str) -> str:
+    return f"kakao_{block_id}_{suffix}"
+
+
+def pin_to_delivery(
+    message: StandardMessage, delivery_id: str, received_at: datetime
+) -> StandardMessage:
+    """Derive the synthetic message ID and timestamp from a queued delivery.
+
+    parse_webhook stamps messages with the parse time, which is only
+    meaningful when parsing happens in the webhook request. When the body
+    was queued first, messages parsed from a backlog would share an ID;
+    keying on the queue entry keeps them apart and gives a reprocessed
+    entry the same ID again.
+    """
+    block_id = message.raw_data.get("userRequest", {}).get("block", {}).get("id", "")
+    message.messenger_message_id = _message_id(block_id, delivery_id)
+    message.timestamp = received_at
+    return message
 
 
 class KakaoAdapter(AbstractMessengerAdapter):
@@ -55,9 +77,10 @@ class KakaoAdapter(AbstractMessengerAdapter):
             content_type = "text"
             attachments = []
 
-        # Generate message ID from block + timestamp
+        # Skill payloads carry no message ID; generate one from block + timestamp
         block = user_request.get("block", {})
-        msg_id = f"kakao_{block.get('id', '')}_{int(datetime.now(tz=timezone.utc).timestamp())}"
+        now = int(datetime.now(tz=timezone.utc).timestamp())
+        msg_id = _message_id(block.get("id", ""), str(now))
 
         return [
             StandardMessage(
@@ -94,13 +117,13 @@ class KakaoAdapter(AbstractMessengerAdapter):
         }
 
         async def _send():
-            async with get_http_client() as client:
-                response = await client.post(
-                    url,
-                    json=payload,
-                    headers={"Authorization": f"Bearer {api_key}"},
-                )
-                response.raise_for_status()
+            client = http_clients.get(_HTTP_POOL)
+            response = await client.post(
+                url,
+                json=payload,
+                headers={"Authorization": f"Bearer {api_key}"},
+            )
+            response.raise_for_status()
 
         await _circuit.call(_send)
         return str(uuid.uuid4())
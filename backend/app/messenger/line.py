@@ -11,7 +11,7 @@ import hmac
 import uuid
 from datetime import datetime, timezone
 
-from app.core.resilience import CircuitBreaker, get_http_client
+from app.core.resilience import CircuitBreaker, http_clients
 from app.messenger.base import AbstractMessengerAdapter, StandardMessage
 from app.messenger.factory import MessengerAdapterFactory
 from app.models.messenger_account import MessengerAccount
@@ -19,23 +19,36 @@ from app.models.messenger_account import MessengerAccount
 LINE_API_BASE = "https://api.line.me/v2/bot"
 
 _circuit = CircuitBreaker("line")
+_HTTP_POOL = "line"
 
 
 class LineAdapter(AbstractMessengerAdapter):
     """LINE Messaging API adapter."""
 
     async def verify_webhook(
-        self, request_data: bytes, headers: dict, *, secret: str | None = None
+        self,
+        request_data: bytes,
+        headers: dict,
+        *,
+        secret: str | None = None,
+        signing_key: "hmac.HMAC | None" = None,
     ) -> bool:
-        """Verify X-Line-Signature (Base64 HMAC-SHA256)."""
-        if secret is None:
+        """Verify X-Line-Signature (Base64 HMAC-SHA256).
+
+        signing_key is an HMAC already keyed with the channel secret (see
+        MessengerAccountSnapshot); it is copied, never updated in place.
+        """
+        if signing_key is not None:
+            mac = signing_key.copy()
+        elif secret is not None:
+            mac = hmac.new(secret.encode(), digestmod=hashlib.sha256)
+        else:
             return False
         signature = headers.get("x-line-signature")
         if not signature:
             return False
-        expected = base64.b64encode(
-            hmac.new(secret.encode(), request_data, hashlib.sha256).digest()
-        ).decode()
+        mac.update(request_data)
+        expected = base64.b64encode(mac.digest()).decode()
         return hmac.compare_digest(expected, signature)
 
     async def parse_webhook(
@@ -112,13 +125,13 @@ class LineAdapter(AbstractMessengerAdapter):
         }
 
         async def _send():
-            async with get_http_client() as client:
-                response = await client.post(
-                    url,
-                    json=payload,
-                    headers={"Authorization": f"Bearer {token}"},
-                )
-                response.raise_for_status()
+            client = http_clients.get(_HTTP_POOL)
+            response = await client.post(
+                url,
+                json=payload,
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            response.raise_for_status()
 
         await _circuit.call(_send)
         # LINE Push API doesn't return message_id; generate one for tracking
@@ -138,12 +151,12 @@ class LineAdapter(AbstractMessengerAdapter):
         url = f"{LINE_API_BASE}/profile/{user_id}"
 
         async def _fetch():
-            async with get_http_client() as client:
-                response = await client.get(
-                    url, headers={"Authorization": f"Bearer {token}"}
-                )
-                response.raise_for_status()
-                return response.json()
+            client = http_clients.get(_HTTP_POOL)
+            response = await client.get(
+                url, headers={"Authorization": f"Bearer {token}"}
+            )
+            response.raise_for_status()
+            return response.json()
 
         return await _circuit.call(_fetch)
 
@@ -8,7 +8,7 @@ import hashlib
 import hmac
 from datetime import datetime, timezone
 
-from app.core.resilience import CircuitBreaker, get_http_client
+from app.core.resilience import CircuitBreaker, http_clients
 from app.messenger.base import AbstractMessengerAdapter, StandardMessage
 from app.messenger.factory import MessengerAdapterFactory
 from app.models.messenger_account import MessengerAccount
@@ -16,6 +16,7 @@ from app.models.messenger_account import MessengerAccount
 GRAPH_API_BASE = "https://graph.facebook.com/v21.0"
 
 _circuit = CircuitBreaker("meta_graph_api")
+_HTTP_POOL = "meta_graph_api"
 
 
 class MetaBaseAdapter(AbstractMessengerAdapter):
@@ -24,17 +25,29 @@ class MetaBaseAdapter(AbstractMessengerAdapter):
     messenger_type: str = ""  # Override in subclasses
 
     async def verify_webhook(
-        self, request_data: bytes, headers: dict, *, secret: str | None = None
+        self,
+        request_data: bytes,
+        headers: dict,
+        *,
+        secret: str | None = None,
+        signing_key: "hmac.HMAC | None" = None,
     ) -> bool:
-        """Verify X-Hub-Signature-256 HMAC-SHA256 signature."""
-        if secret is None:
+        """Verify X-Hub-Signature-256 HMAC-SHA256 signature.
+
+        signing_key is an HMAC already keyed with the app secret (see
+        MessengerAccountSnapshot); it is copied, never updated in place.
+        """
+        if signing_key is not None:
+            mac = signing_key.copy()
+        elif secret is not None:
+            mac = hmac.new(secret.encode(), digestmod=hashlib.sha256)
+        else:
             return False
         signature_header = headers.get("x-hub-signature-256")
         if not signature_header:
             return False
-        expected = "sha256=" + hmac.new(
-            secret.encode(), request_data, hashlib.sha256
-        ).hexdigest()
+        mac.update(request_data)
+        expected = "sha256=" + mac.hexdigest()
         return hmac.compare_digest(expected, signature_header)
 
     async def send_typing_indicator(
@@ -49,11 +62,11 @@ class MetaBaseAdapter(AbstractMessengerAdapter):
         }
 
         async def _send():
-            async with get_http_client() as client:
-                response = await client.post(
-                    url, json=payload, params={"access_token": token}
-                )
-                response.raise_for_status()
+            client = http_clients.get(_HTTP_POOL)
+            response = await client.post(
+                url, json=payload, params={"access_token": token}
+            )
+            response.raise_for_status()
 
         await _circuit.call(_send)
 
@@ -65,16 +78,16 @@ class MetaBaseAdapter(AbstractMessengerAdapter):
         url = f"{GRAPH_API_BASE}/{user_id}"
 
         async def _fetch():
-            async with get_http_client() as client:
-                response = await client.get(
-                    url,
-                    params={
-                        "fields": "name,profile_pic",
-                        "access_token": token,
-                    },
-                )
-                response.raise_for_status()
-                return response.json()
+            client = http_clients.get(_HTTP_POOL)
+            response = await client.get(
+                url,
+                params={
+                    "fields": "name,profile_pic",
+                    "access_token": token,
+                },
+            )
+            response.raise_for_status()
+            return response.json()
 
         return await _circuit.call(_fetch)
 
@@ -148,12 +161,12 @@ class InstagramAdapter(MetaBaseAdapter):
         }
 
         async def _send():
-            async with get_http_client() as client:
-                response = await client.post(
-                    url, json=payload, params={"access_token": token}
-                )
-                response.raise_for_status()
-                return response.json()
+            client = http_clients.get(_HTTP_POOL)
+            response = await client.post(
+                url, json=payload, params={"access_token": token}
+            )
+            response.raise_for_status()
+            return response.json()
 
         data = await _circuit.call(_send)
         return data.get("message_id", "")
@@ -227,12 +240,12 @@ class FacebookAdapter(MetaBaseAdapter):
         }
 
         async def _send():
-            async with get_http_client() as client:
-                response = await client.post(
-                    url, json=payload, params={"access_token": token}
-                )
-                response.raise_for_status()
-                return response.json()
+            client = http_clients.get(_HTTP_POOL)
+            response = await client.post(
+                url, json=payload, params={"access_token": token}
+            )
+            response.raise_for_status()
+            return response.json()
 
         data = await _circuit.call(_send)
         return data.get("message_id", "")
@@ -321,14 +334,14 @@ class WhatsAppAdapter(MetaBaseAdapter):
         }
 
         async def _send():
-            async with get_http_client() as client:
-                response = await client.post(
-                    url,
-                    json=payload,
-                    headers={"Authorization": f"Bearer {token}"},
-                )
-                response.raise_for_status()
-                return response.json()
+            client = http_clients.get(_HTTP_POOL)
+            response = await client.post(
+                url,
+                json=payload,
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            response.raise_for_status()
+            return response.json()
 
         data = await _circuit.call(_send)
         return data.get("messages", [{}])[0].get("id", "")
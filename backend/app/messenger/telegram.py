@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from app.core.resilience import CircuitBreaker, get_http_client
+from app.core.resilience import CircuitBreaker, http_clients
 from app.messenger.base import AbstractMessengerAdapter, StandardMessage
 from app.messenger.factory import MessengerAdapterFactory
 from app.models.messenger_account import MessengerAccount
@@ -8,6 +8,7 @@ from app.models.messenger_account import MessengerAccount
 TELEGRAM_API_BASE = "https://api.telegram.org/bot{token}"
 
 _circuit = CircuitBreaker("telegram")
+_HTTP_POOL = "telegram"
 
 
 class TelegramAdapter(AbstractMessengerAdapter):
@@ -103,10 +104,10 @@ class TelegramAdapter(AbstractMessengerAdapter):
         }
 
         async def _send():
-            async with get_http_client() as client:
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
-                return response.json()
+            client = http_clients.get(_HTTP_POOL)
+            response = await client.post(url, json=payload)
+            response.raise_for_status()
+            return response.json()
 
         data = await _circuit.call(_send)
         return str(data["result"]["message_id"])
@@ -122,9 +123,9 @@ class TelegramAdapter(AbstractMessengerAdapter):
         }
 
         async def _send():
-            async with get_http_client() as client:
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
+            client = http_clients.get(_HTTP_POOL)
+            response = await client.post(url, json=payload)
+            response.raise_for_status()
 
         await _circuit.call(_send)
 
@@ -135,10 +136,10 @@ class TelegramAdapter(AbstractMessengerAdapter):
         url = self._api_url(account, "getChat")
 
         async def _fetch():
-            async with get_http_client() as client:
-                response = await client.get(url, params={"chat_id": user_id})
-                response.raise_for_status()
-                return response.json()
+            client = http_clients.get(_HTTP_POOL)
+            response = await client.get(url, params={"chat_id": user_id})
+            response.raise_for_status()
+            return response.json()
 
         data = await _circuit.call(_fetch)
         return data["result"]
@@ -22,13 +22,56 @@ AI_RESPONSE_DURATION = Histogram(
     buckets=[0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0],
 )
 
+AI_PIPELINE_STAGE_DURATION = Histogram(
+    "ai_pipeline_stage_duration_seconds",
+    "Time spent in each stage of the AI response pipeline",
+    ["stage"],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0],
+)
+
+CACHE_REQUESTS = Counter(
+    "app_cache_requests_total",
+    "Application cache lookups by result (local_hit, hit, stale, miss)",
+    ["cache", "result"],
+)
+
+LANGUAGE_DETECTIONS = Counter(
+    "language_detections_total",
+    "Language detections by method (known, local, llm)",
+    ["method"],
+)
+
+REDIS_POOL_CONNECTIONS = Gauge(
+    "redis_pool_connections",
+    "Shared Redis pool connections by state (in_use, idle, max)",
+    ["state"],
+)
+
+REDIS_AUTO_PIPELINE_SIZE = Histogram(
+    "redis_auto_pipeline_commands",
+    "Commands sent per auto-pipelined Redis round trip",
+    buckets=[1, 2, 3, 5, 10, 20, 50],
+)
+
+WEBHOOK_INGEST_LAG = Histogram(
+    "webhook_ingest_lag_seconds",
+    "Time from webhook acknowledgement to the message being stored (stream mode)",
+    buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0],
+)
+
+WEBHOOK_INGEST_MESSAGES = Counter(
+    "webhook_ingest_messages_total",
+    "Queued webhook messages by outcome (stored, duplicate, failed)",
+    ["result"],
+)
+
 
 def setup_metrics(app):
     """Attach Prometheus metrics to the FastAPI app.
 
     Exposes /metrics endpoint with:
     - HTTP request count, latency, and size (auto-instrumented)
-    - Custom WebSocket, Celery, and AI metrics
+    - Custom WebSocket, Celery, AI, cache and Redis pool metrics
     """
     instrumentator = Instrumentator(
         should_group_status_codes=True,
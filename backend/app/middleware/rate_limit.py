@@ -2,10 +2,13 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 
 from app.config import settings
+from app.core.redis import redis_pools
 
 limiter = Limiter(
     key_func=get_remote_address,
     default_limits=[settings.rate_limit_default],
     storage_uri=settings.redis_url,
+    # limits' Redis storage is synchronous; share the process-wide sync pool
+    storage_options={"connection_pool": redis_pools.sync_pool()},
     enabled=settings.app_env != "test",
 )
@@ -1,5 +1,13 @@
 from app.models.ab_test import ABTest, ABTestResult, ABTestVariant
 from app.models.ai_persona import AIPersona
+from app.models.analytics_rollup import (
+    DailyClinicStats,
+    DailyCustomerRevenue,
+    DailyFunnelStats,
+    DailyProcedureStats,
+    HourlyRevenueStats,
+    RollupWatermark,
+)
 from app.models.audit_log import AuditLog
 from app.models.base import Base
 from app.models.booking import Booking
@@ -50,7 +58,12 @@ __all__ = [
     "CRMEvent",
     "CulturalProfile",
     "Customer",
+    "DailyClinicStats",
+    "DailyCustomerRevenue",
+    "DailyFunnelStats",
+    "DailyProcedureStats",
     "FollowupRule",
+    "HourlyRevenueStats",
     "LLMUsage",
     "MedicalDocument",
     "MedicalTerm",
@@ -64,6 +77,7 @@ __all__ = [
     "ProcedureCategory",
     "ProcedurePricing",
     "ResponseLibrary",
+    "RollupWatermark",
     "SatisfactionScore",
     "SatisfactionSurvey",
     "SimulationResult",
@@ -0,0 +1,140 @@
+"""Per-clinic per-day analytics rollups.
+
+Maintained by AnalyticsRollupService (refreshed from a Celery beat task) and
+read by the analytics router, so period queries scan one row per day instead
+of the raw conversations/bookings/payments/messages tables.
+"""
+
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, Numeric, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, UUIDPrimaryKeyMixin
+
+
+class RollupMixin(UUIDPrimaryKeyMixin):
+    clinic_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("clinics.id", ondelete="CASCADE"), nullable=False
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class DailyClinicStats(RollupMixin, Base):
+    """Daily totals. Conversation, booking and payment counts use the created day;
+    paid_count/paid_amount use the day of paid_at."""
+
+    __tablename__ = "analytics_daily_clinic_stats"
+    __table_args__ = (
+        Index("ix_analytics_daily_clinic_stats_clinic_day", "clinic_id", "day", unique=True),
+    )
+
+    conversations: Mapped[int] = mapped_column(Integer, default=0)
+    ai_mode_conversations: Mapped[int] = mapped_column(Integer, default=0)
+    manual_conversations: Mapped[int] = mapped_column(Integer, default=0)
+    status_counts: Mapped[dict] = mapped_column(JSONB, default=dict)
+    conversations_with_messages: Mapped[int] = mapped_column(Integer, default=0)
+    messages: Mapped[int] = mapped_column(Integer, default=0)
+    satisfaction_sum: Mapped[int] = mapped_column(Integer, default=0)
+    satisfaction_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    bookings: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Completed payments by created day
+    payments: Mapped[int] = mapped_column(Integer, default=0)
+    payment_amount: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0)
+    # Completed payments by paid day
+    paid_count: Mapped[int] = mapped_column(Integer, default=0)
+    paid_amount: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0)
+
+
+class DailyFunnelStats(RollupMixin, Base):
+    """Funnel stages a customer reached per day, by country and channel.
+
+    One row per customer, so a period's distinct customers per stage is a
+    COUNT(DISTINCT customer_id) over its days. The stage columns are 1 when
+    the customer reached the stage that day, else 0. channel is the
+    messenger type of the (booking's) conversation; NULL for bookings and
+    payments not linked to a conversation.
+    """
+
+    __tablename__ = "analytics_daily_funnel"
+    __table_args__ = (
+        Index("ix_analytics_daily_funnel_clinic_day", "clinic_id", "day"),
+    )
+
+    customer_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("customers.id", ondelete="CASCADE"), nullable=False
+    )
+    country_code: Mapped[str] = mapped_column(String(10), nullable=False)
+    channel: Mapped[str | None] = mapped_column(String(20))
+    conversations: Mapped[int] = mapped_column(Integer, default=0)
+    bookings: Mapped[int] = mapped_column(Integer, default=0)
+    payments: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class DailyProcedureStats(RollupMixin, Base):
+    """Completed payments per clinic procedure, by payment created day."""
+
+    __tablename__ = "analytics_daily_procedure"
+    __table_args__ = (
+        Index("ix_analytics_daily_procedure_clinic_day", "clinic_id", "day"),
+    )
+
+    clinic_procedure_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("clinic_procedures.id", ondelete="CASCADE"), nullable=False
+    )
+    case_count: Mapped[int] = mapped_column(Integer, default=0)
+    revenue: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0)
+
+
+class HourlyRevenueStats(RollupMixin, Base):
+    """Completed payments per hour of the paid day (revenue heatmap)."""
+
+    __tablename__ = "analytics_hourly_revenue"
+    __table_args__ = (
+        Index("ix_analytics_hourly_revenue_clinic_day", "clinic_id", "day"),
+    )
+
+    hour: Mapped[int] = mapped_column(Integer, nullable=False)
+    payment_count: Mapped[int] = mapped_column(Integer, default=0)
+    amount: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0)
+
+
+class DailyCustomerRevenue(RollupMixin, Base):
+    """Completed payments per customer, by payment created day.
+
+    booked_* cover only payments attached to a booking.
+    """
+
+    __tablename__ = "analytics_daily_customer_revenue"
+    __table_args__ = (
+        Index("ix_analytics_daily_customer_revenue_clinic_day", "clinic_id", "day"),
+    )
+
+    customer_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("customers.id", ondelete="CASCADE"), nullable=False
+    )
+    payment_count: Mapped[int] = mapped_column(Integer, default=0)
+    amount: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0)
+    booked_payment_count: Mapped[int] = mapped_column(Integer, default=0)
+    booked_amount: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0)
+
+
+class RollupWatermark(Base):
+    """How far incremental refreshes have read the raw tables.
+
+    One row per rollup job; refresh_changed re-reads rows changed after the
+    watermark and moves it to its own start time.
+    """
+
+    __tablename__ = "analytics_rollup_watermarks"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    watermark: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -2,7 +2,7 @@ import uuid
 from datetime import date, time
 from decimal import Decimal
 
-from sqlalchemy import Date, ForeignKey, Numeric, String, Text, Time
+from sqlalchemy import Date, ForeignKey, Index, Numeric, String, Text, Time
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -11,6 +11,10 @@ from app.models.base import Base, TimestampMixin, UUIDPrimaryKeyMixin
 
 class Booking(UUIDPrimaryKeyMixin, TimestampMixin, Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Change scan for analytics rollup refresh
+        Index("ix_bookings_updated_at", "updated_at"),
+    )
 
     clinic_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("clinics.id"), nullable=False, index=True
@@ -1,7 +1,17 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import ARRAY, Boolean, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    ARRAY,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, UUIDPrimaryKeyMixin
@@ -9,6 +19,17 @@ from app.models.base import Base, TimestampMixin, UUIDPrimaryKeyMixin
 
 class Conversation(UUIDPrimaryKeyMixin, TimestampMixin, Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Change scan for analytics rollup refresh
+        Index("ix_conversations_updated_at", "updated_at"),
+        # Inbox keyset pagination (app.api.v1.conversations.INBOX_KEYSET)
+        Index(
+            "ix_conversations_clinic_inbox",
+            "clinic_id",
+            text("last_message_at DESC NULLS LAST"),
+            text("id DESC"),
+        ),
+    )
 
     clinic_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("clinics.id"), nullable=False, index=True
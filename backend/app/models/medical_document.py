@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, Index, String
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -10,6 +10,10 @@ from app.models.base import Base, TimestampMixin, UUIDPrimaryKeyMixin
 
 class MedicalDocument(UUIDPrimaryKeyMixin, TimestampMixin, Base):
     __tablename__ = "medical_documents"
+    __table_args__ = (
+        # Keyset pagination by (created_at, id) within a clinic
+        Index("ix_medical_documents_clinic_created", "clinic_id", "created_at", "id"),
+    )
 
     clinic_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("clinics.id"), nullable=False, index=True
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -10,6 +10,10 @@ from app.models.base import Base, UUIDPrimaryKeyMixin
 
 class Message(UUIDPrimaryKeyMixin, Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Windowed thread history (MessageService.get_history)
+        Index("ix_messages_conversation_created", "conversation_id", "created_at", "id"),
+    )
 
     conversation_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("conversations.id"), nullable=False, index=True
@@ -35,7 +39,7 @@ class Message(UUIDPrimaryKeyMixin, Base):
 
     # Messenger info
     messenger_type: Mapped[str | None] = mapped_column(String(20))
-    messenger_message_id: Mapped[str | None] = mapped_column(String(200))
+    messenger_message_id: Mapped[str | None] = mapped_column(String(200), index=True)
 
     # AI metadata
     ai_metadata: Mapped[dict | None] = mapped_column(JSONB)
@@ -52,6 +56,7 @@ class Message(UUIDPrimaryKeyMixin, Base):
         DateTime(timezone=True),
         server_default="now()",
         nullable=False,
+        index=True,
     )
 
     # Relationships
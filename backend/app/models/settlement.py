@@ -56,6 +56,10 @@ class Settlement(UUIDPrimaryKeyMixin, TimestampMixin, Base):
     # Notes
     notes: Mapped[str | None] = mapped_column(Text)
 
+    # Stored invoice PDF and the content digest it was rendered from
+    invoice_url: Mapped[str | None] = mapped_column(String(500))
+    invoice_digest: Mapped[str | None] = mapped_column(String(64))
+
     # Timestamps
     confirmed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     paid_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, UUIDPrimaryKeyMixin
@@ -9,6 +9,10 @@ from app.models.base import Base, TimestampMixin, UUIDPrimaryKeyMixin
 
 class TranslationReport(UUIDPrimaryKeyMixin, TimestampMixin, Base):
     __tablename__ = "translation_reports"
+    __table_args__ = (
+        # Keyset pagination by (created_at, id) within a clinic
+        Index("ix_translation_reports_clinic_created", "clinic_id", "created_at", "id"),
+    )
 
     clinic_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("clinics.id"), nullable=False, index=True
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, TimestampMixin, UUIDPrimaryKeyMixin
@@ -9,6 +9,10 @@ from app.models.base import Base, TimestampMixin, UUIDPrimaryKeyMixin
 
 class TreatmentPhoto(UUIDPrimaryKeyMixin, TimestampMixin, Base):
     __tablename__ = "treatment_photos"
+    __table_args__ = (
+        # Keyset pagination by (created_at, id) within a clinic
+        Index("ix_treatment_photos_clinic_created", "clinic_id", "created_at", "id"),
+    )
 
     clinic_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("clinics.id"), nullable=False, index=True
@@ -27,7 +31,9 @@ class TreatmentPhoto(UUIDPrimaryKeyMixin, TimestampMixin, Base):
     photo_type: Mapped[str] = mapped_column(String(20), nullable=False)
     # before / after / progress
     photo_url: Mapped[str] = mapped_column(String(500), nullable=False)
+    # Derivatives generated after upload (app.tasks.media)
     thumbnail_url: Mapped[str | None] = mapped_column(String(500))
+    medium_url: Mapped[str | None] = mapped_column(String(500))
     description: Mapped[str | None] = mapped_column(Text)
 
     # Timing
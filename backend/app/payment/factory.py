@@ -23,15 +23,23 @@ _ROUTING: dict[tuple[str, str], str] = {
 }
 
 
+# Shared provider instances — providers hold no per-request state
+_INSTANCES: dict[str, AbstractPaymentProvider] = {}
+
+
 class PaymentProviderFactory:
     """Factory to get the correct payment provider."""
 
     @staticmethod
     def get_provider(provider_type: str) -> AbstractPaymentProvider:
+        provider = _INSTANCES.get(provider_type)
+        if provider is not None:
+            return provider
         provider_class = _PROVIDERS.get(provider_type)
         if provider_class is None:
             raise ValueError(f"Unsupported payment provider: {provider_type}")
-        return provider_class()
+        provider = _INSTANCES[provider_type] = provider_class()
+        return provider
 
     @staticmethod
     def get_provider_for(
@@ -46,10 +54,10 @@ class PaymentProviderFactory:
             key = (country_code.upper(), payment_method)
             provider_type = _ROUTING.get(key)
             if provider_type:
-                return provider_type, _PROVIDERS[provider_type]()
+                return provider_type, PaymentProviderFactory.get_provider(provider_type)
 
         # Fallback to stripe
-        return "stripe", StripeProvider()
+        return "stripe", PaymentProviderFactory.get_provider("stripe")
 
     @staticmethod
     def supported_providers() -> list[str]:
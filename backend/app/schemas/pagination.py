@@ -1,10 +1,13 @@
 from collections.abc import Sequence
-from typing import Generic, TypeVar
+from typing import Generic, Literal, TypeVar
 
 from pydantic import BaseModel, Field
 
 T = TypeVar("T")
 
+# Keyset pagination totals: skipped, planner estimate, or cached COUNT(*)
+TotalMode = Literal["none", "estimate", "exact"]
+
 
 class PaginationParams(BaseModel):
     limit: int = Field(default=20, ge=1, le=100)
@@ -16,3 +19,17 @@ class PaginatedResponse(BaseModel, Generic[T]):
     total: int
     limit: int
     offset: int
+
+
+class CursorParams(BaseModel):
+    limit: int = Field(default=20, ge=1, le=100)
+    # Opaque next_cursor of the previous page; empty for the first page
+    cursor: str = ""
+    total: TotalMode = "none"
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: Sequence[T]
+    limit: int
+    next_cursor: str | None
+    total: int | None = None
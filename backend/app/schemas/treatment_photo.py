@@ -25,6 +25,9 @@ class TreatmentPhotoResponse(BaseModel):
     photo_type: str
     photo_url: str
     thumbnail_url: str | None
+    medium_url: str | None = None
+    # Smallest variant adequate for the requested size (list endpoints)
+    display_url: str | None = None
     description: str | None
     taken_at: datetime | None
     days_after_procedure: int | None
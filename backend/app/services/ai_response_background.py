@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from app.ai.agents.consultation_service import ConsultationService
 from app.ai.agents.escalation import EscalationDetector
 from app.ai.chains.response_chain import ResponseChain
+from app.config import settings
 from app.services.ai_response_service import AIResponseService
 from app.websocket.manager import manager
 
@@ -42,33 +43,33 @@ def _build_consultation_service() -> ConsultationService:
 
     Lazy import to avoid circular imports and defer LLM initialization.
     """
-    from app.ai.chains.knowledge_chain import KnowledgeChain
-    from app.ai.chains.sales_skill_chain import SalesSkillChain
-    from app.ai.chains.style_chain import StyleChain
     from app.ai.llm_router import get_consultation_llm, get_light_llm
 
     llm = get_consultation_llm()
     light_llm = get_light_llm()
 
-    knowledge_chain = KnowledgeChain(llm)
-    style_chain = StyleChain(llm)
-    sales_chain = SalesSkillChain(llm)
-    response_chain = ResponseChain(knowledge_chain, style_chain, sales_chain)
+    response_chain = ResponseChain.from_llm(llm, mode=settings.ai_pipeline_mode)
     escalation_detector = EscalationDetector(light_llm)
 
     return ConsultationService(response_chain, escalation_detector)
 
 
 def _build_translation_chain():
-    """Build TranslationChain with LLM. Returns None if setup fails."""
+    """Build TranslationChain with LLM. Returns None if setup fails.
+
+    The glossary is per clinic: AIResponseService passes the clinic's
+    compiled MedicalTermMatcher on each call.
+    """
     try:
         from app.ai.chains.translation_chain import TranslationChain
+        from app.ai.chains.translation_memory import translation_memory
         from app.ai.llm_router import get_consultation_llm, get_light_llm
 
         return TranslationChain(
             translation_llm=get_consultation_llm(),
             detection_llm=get_light_llm(),
             term_dict={},
+            memory=translation_memory if settings.translation_memory_enabled else None,
         )
     except Exception:
         logger.warning("TranslationChain setup failed, translations disabled")
@@ -95,6 +96,9 @@ async def process_ai_response_background(
                 db=db,
                 consultation_service=consultation_service,
                 translation_chain=translation_chain,
+                session_factory=session_factory
+                if settings.ai_concurrent_side_work
+                else None,
             )
             await service.generate_response(
                 message_id=message_id,
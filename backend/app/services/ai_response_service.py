@@ -3,15 +3,25 @@
 Coordinates: translation, knowledge assembly, cultural profiling, consultation,
 humanlike behaviors, messenger delivery, and satisfaction tracking.
 Also provides suggestion generation for manual (human) mode.
+
+Only translation -> knowledge -> consultation sits on the reply's critical
+path. Staff-alert checks (side effects, contraindications) run beside it on
+their own sessions, and post-reply analytics (satisfaction, summary, A/B
+outcome) can be handed to a low-priority task. Per-stage timings are kept in
+AIResponseService.stage_timings and exported to Prometheus.
 """
 
 import asyncio
+import contextlib
 import json
 import logging
+import time
 import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
 
 from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.ai.ab_test_engine import ABTestEngine
 from app.ai.agents.consultation_service import ConsultationService
@@ -19,8 +29,13 @@ from app.ai.usage_tracker import UsageTracker
 from app.ai.humanlike.delay import HumanLikeDelay
 from app.ai.humanlike.disclosure import get_ai_disclosure
 from app.ai.humanlike.greeting import get_time_greeting
+from app.ai.rag.retriever import VectorRetriever
 from app.ai.satisfaction.analyzer import SatisfactionAnalyzer
+from app.ai.tracked_llm import track_usage
+from app.config import settings
+from app.core.database import async_session_factory
 from app.messenger.factory import MessengerAdapterFactory
+from app.middleware.metrics import AI_PIPELINE_STAGE_DURATION, AI_RESPONSE_DURATION
 from app.models.ab_test import ABTest
 from app.models.ai_persona import AIPersona
 from app.models.conversation import Conversation
@@ -29,6 +44,8 @@ from app.models.customer import Customer
 from app.models.message import Message
 from app.models.messenger_account import MessengerAccount
 from app.services.knowledge_service import KnowledgeService
+from app.services.knowledge_snapshot import clinic_term_matcher, knowledge_snapshots
+from app.websocket.draft_stream import DraftStream
 from app.websocket.manager import manager
 
 SUGGESTION_PROMPT = """You are a helpful medical consultation AI assistant.
@@ -49,6 +66,61 @@ Respond ONLY with the JSON array, no other text.
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class PendingDelivery:
+    """An AI reply that has been persisted but not yet sent to the messenger.
+
+    Produced by AIResponseService in deferred-delivery mode. The caller must
+    commit the session before calling schedule(), so the delivery task can
+    load the message row.
+    """
+
+    message_id: uuid.UUID
+    account_id: uuid.UUID
+    recipient_id: str
+    messenger_type: str
+    delay_seconds: float
+
+    def schedule(self) -> None:
+        """Hand the send off to the delivery queue, firing after the typing delay."""
+        from app.tasks.message_delivery import deliver_ai_message
+
+        deliver_ai_message.apply_async(
+            args=[
+                str(self.message_id),
+                str(self.account_id),
+                self.recipient_id,
+                self.messenger_type,
+            ],
+            countdown=self.delay_seconds,
+        )
+
+
+@dataclass
+class PendingAnalytics:
+    """Post-reply analytics to run outside the reply path.
+
+    Produced by AIResponseService in deferred-analytics mode. Like
+    PendingDelivery, schedule() must be called after the session is committed.
+    """
+
+    conversation_id: uuid.UUID
+    message_id: uuid.UUID
+    ab_test_id: uuid.UUID | None = None
+    ab_variant_id: uuid.UUID | None = None
+
+    def schedule(self) -> None:
+        """Queue satisfaction scoring, summarization and A/B outcome recording."""
+        from app.tasks.analytics import analyze_ai_reply
+
+        analyze_ai_reply.delay(
+            str(self.conversation_id),
+            str(self.message_id),
+            str(self.ab_test_id) if self.ab_test_id else None,
+            str(self.ab_variant_id) if self.ab_variant_id else None,
+        )
+
+
 class AIResponseService:
     """Generates and delivers AI auto-responses for incoming customer messages."""
 
@@ -57,10 +129,27 @@ class AIResponseService:
         db: AsyncSession,
         consultation_service: ConsultationService,
         translation_chain=None,
+        deferred_delivery: bool = False,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+        deferred_analytics: bool = False,
     ):
         self.db = db
         self.consultation_service = consultation_service
         self.translation_chain = translation_chain
+        # When True, the typing delay and messenger send are not performed here;
+        # the reply is saved and described by self.pending_delivery instead.
+        self.deferred_delivery = deferred_delivery
+        self.pending_delivery: PendingDelivery | None = None
+        # With a session factory, staff-alert checks run concurrently with
+        # knowledge assembly and consultation, each on its own session.
+        self.session_factory = session_factory
+        # When True, post-reply analytics are described by self.pending_analytics
+        # instead of running inline.
+        self.deferred_analytics = deferred_analytics
+        self.pending_analytics: PendingAnalytics | None = None
+        # Stage name -> seconds, filled in by generate_response
+        self.stage_timings: dict[str, float] = {}
+        self._side_work_task: asyncio.Task | None = None
 
     async def generate_response(
         self,
@@ -71,6 +160,31 @@ class AIResponseService:
 
         Returns the saved AI Message, or None if skipped.
         """
+        self.stage_timings = {}
+        try:
+            with self._timed("total"):
+                return await self._generate_response(message_id, conversation_id)
+        finally:
+            if self._side_work_task is not None:
+                await self._side_work_task
+                self._side_work_task = None
+            if self.stage_timings.get("reply_ready") is not None:
+                logger.info(
+                    "AI pipeline timings conversation=%s %s",
+                    conversation_id,
+                    " ".join(
+                        f"{stage}={seconds * 1000:.0f}ms"
+                        for stage, seconds in self.stage_timings.items()
+                    ),
+                )
+
+    async def _generate_response(
+        self,
+        message_id: uuid.UUID,
+        conversation_id: uuid.UUID,
+    ) -> Message | None:
+        pipeline_started = time.perf_counter()
+
         # 0. Usage tracker
         tracker: UsageTracker | None = None
 
@@ -107,8 +221,14 @@ class AIResponseService:
         query = incoming_message.content or ""
         if self.translation_chain and language_code != "ko":
             try:
+                tr_started = time.perf_counter()
                 tr_result = await self.translation_chain.translate_incoming(
-                    query, known_language=language_code
+                    query,
+                    known_language=language_code,
+                    term_matcher=await clinic_term_matcher(
+                        self.db, conversation.clinic_id
+                    ),
+                    clinic_id=conversation.clinic_id,
                 )
                 if not tr_result.skipped:
                     incoming_message.translated_content = tr_result.translated_text
@@ -116,12 +236,22 @@ class AIResponseService:
                     query = tr_result.translated_text
             except Exception:
                 logger.exception("Translation failed, using original text")
+            finally:
+                self._record_stage("translate_incoming", tr_started)
 
-        # 5. Assemble knowledge
-        knowledge_svc = KnowledgeService(self.db)
-        knowledge = await knowledge_svc.assemble_knowledge(
-            conversation.clinic_id, query
+        # 4.5 Staff-alert side work (off the critical path when concurrent)
+        side_work_args = (
+            query, conversation.clinic_id, conversation_id, customer.id, language_code
         )
+        if self.session_factory is not None:
+            self._side_work_task = asyncio.create_task(self._side_work(*side_work_args))
+
+        # 5. Assemble knowledge
+        with self._timed("knowledge"):
+            knowledge_svc = self._knowledge_service()
+            knowledge = await knowledge_svc.assemble_knowledge(
+                conversation.clinic_id, query
+            )
 
         # 6. Load cultural profile + persona
         cultural_profile = await self._load_cultural_profile(country_code)
@@ -135,64 +265,42 @@ class AIResponseService:
             conversation.clinic_id, conversation_id, persona
         )
 
-        # 7.6 Side-effect keyword detection (staff alert only)
-        try:
-            from app.services.followup_service import FollowupService
+        # 7.6-7.7 Side-effect detection + contraindication screening (sequential mode)
+        if self._side_work_task is None:
+            await self._side_work(*side_work_args)
 
-            followup_svc = FollowupService(self.db)
-            side_effect = await followup_svc.check_side_effects(
-                query, conversation.clinic_id, language_code
-            )
-            if side_effect:
-                await manager.broadcast_to_clinic(
-                    conversation.clinic_id,
-                    {
-                        "type": "side_effect_alert",
-                        "conversation_id": str(conversation_id),
-                        "customer_id": str(customer.id),
-                        "matched_keywords": side_effect["matched_keywords"],
-                        "severity": side_effect["severity"],
-                        "message_preview": query[:200],
-                    },
-                )
-        except Exception:
-            logger.exception("Side-effect detection failed")
-
-        # 7.7 Real-time contraindication auto-screening
+        # 8. Run consultation, streaming the draft to the dashboard
+        draft = (
+            DraftStream(conversation.clinic_id, conversation_id)
+            if settings.ai_draft_streaming
+            else None
+        )
         try:
-            from app.services.contraindication_screening_service import (
-                ContraindicationScreeningService,
-            )
-
-            screening_svc = ContraindicationScreeningService(self.db)
-            contra_alert = await screening_svc.screen_message(
-                query, conversation_id, conversation.clinic_id
-            )
-            if contra_alert:
-                await manager.broadcast_to_clinic(
-                    conversation.clinic_id, contra_alert
+            consult_started = time.perf_counter()
+            with track_usage(tracker, "consultation"):
+                result = await self.consultation_service.consult(
+                    query=query,
+                    conversation_id=conversation_id,
+                    clinic_id=conversation.clinic_id,
+                    rag_results=knowledge["rag_results"],
+                    clinic_manual=knowledge["clinic_manual"],
+                    country_code=country_code,
+                    language_code=language_code,
+                    cultural_profile=cultural_profile,
+                    persona=persona,
+                    conversation_history=conversation_history,
+                    sales_context={},
+                    on_token=draft.push if draft else None,
                 )
-        except Exception:
-            logger.exception("Contraindication screening failed")
-
-        # 8. Run consultation
-        try:
-            result = await self.consultation_service.consult(
-                query=query,
-                conversation_id=conversation_id,
-                clinic_id=conversation.clinic_id,
-                rag_results=knowledge["rag_results"],
-                clinic_manual=knowledge["clinic_manual"],
-                country_code=country_code,
-                language_code=language_code,
-                cultural_profile=cultural_profile,
-                persona=persona,
-                conversation_history=conversation_history,
-                sales_context={},
-            )
         except Exception:
             logger.exception("Consultation failed for conversation %s", conversation_id)
+            if draft:
+                await draft.close(discarded=True)
             return None
+        finally:
+            self._record_stage("consult", consult_started)
+        if draft:
+            await draft.close(discarded=result.escalated)
 
         # 9. Handle escalation
         if result.escalated:
@@ -216,22 +324,35 @@ class AIResponseService:
             disclosure = get_ai_disclosure(language_code)
             response_text = f"{greeting} {disclosure}\n\n{response_text}"
 
-        # 11. Translate outgoing (if not Korean)
-        if self.translation_chain and language_code != "ko":
+        # 11. Translate outgoing (if not Korean and not already in the customer's language)
+        if (
+            self.translation_chain
+            and language_code != "ko"
+            and result.language != language_code
+        ):
             try:
+                out_started = time.perf_counter()
                 out_result = await self.translation_chain.translate_outgoing(
-                    response_text, language_code
+                    response_text, language_code, clinic_id=conversation.clinic_id
                 )
                 if not out_result.skipped:
                     response_text = out_result.translated_text
             except Exception:
                 logger.exception("Outgoing translation failed")
+            finally:
+                self._record_stage("translate_outgoing", out_started)
 
-        # 12. Typing delay
+        # Time-to-reply excludes the deliberate typing delay below
+        self._record_stage("reply_ready", pipeline_started)
+        AI_RESPONSE_DURATION.observe(self.stage_timings["reply_ready"])
+
+        # 12. Typing delay (deferred mode: applied by the delivery task countdown)
         delay = HumanLikeDelay.calculate_delay(response_text)
-        await asyncio.sleep(delay)
+        if not self.deferred_delivery:
+            await asyncio.sleep(delay)
 
-        # 13. Save AI message
+        # 13. Save AI message, stamped now rather than with the transaction's
+        # now(), which dates from before the LLM calls
         ai_message = Message(
             id=uuid.uuid4(),
             conversation_id=conversation_id,
@@ -240,6 +361,7 @@ class AIResponseService:
             content=response_text,
             content_type="text",
             messenger_type=messenger_account.messenger_type,
+            created_at=datetime.now(timezone.utc),
         )
         self.db.add(ai_message)
 
@@ -247,51 +369,52 @@ class AIResponseService:
         conversation.last_message_preview = response_text[:200]
         await self.db.flush()
 
-        # 14. Send via messenger
-        try:
-            adapter = MessengerAdapterFactory.get_adapter(
-                messenger_account.messenger_type
+        # 14-15. Send via messenger + WebSocket broadcast
+        if self.deferred_delivery:
+            self.pending_delivery = PendingDelivery(
+                message_id=ai_message.id,
+                account_id=messenger_account.id,
+                recipient_id=customer.messenger_user_id,
+                messenger_type=messenger_account.messenger_type,
+                delay_seconds=delay,
             )
-            await adapter.send_typing_indicator(
-                messenger_account, customer.messenger_user_id
-            )
-            msg_id = await adapter.send_message(
-                messenger_account,
-                customer.messenger_user_id,
-                response_text,
+        else:
+            await self._deliver_now(
+                ai_message, conversation, messenger_account, customer, response_text
             )
-            ai_message.messenger_message_id = msg_id
-        except Exception:
-            logger.exception("Failed to send message via messenger")
-            # Queue for retry delivery
-            from app.tasks.message_delivery import retry_message_delivery
 
-            retry_message_delivery.delay(
-                str(ai_message.id),
-                str(messenger_account.id),
-                customer.messenger_user_id,
-                response_text,
-                messenger_account.messenger_type,
+        # 16-17. Post-reply analytics (deferred mode: low-priority task)
+        if self.deferred_analytics:
+            self.pending_analytics = PendingAnalytics(
+                conversation_id=conversation_id,
+                message_id=message_id,
+                ab_test_id=ab_variant["test_id"] if ab_variant else None,
+                ab_variant_id=ab_variant["variant_id"] if ab_variant else None,
             )
+        else:
+            with self._timed("analytics"):
+                await self.analyze_reply(conversation, ab_variant, tracker=tracker)
 
-        # 15. WebSocket broadcast
-        await manager.broadcast_to_clinic(
-            conversation.clinic_id,
-            {
-                "type": "new_message",
-                "conversation_id": str(conversation_id),
-                "message": {
-                    "id": str(ai_message.id),
-                    "sender_type": "ai",
-                    "content": response_text,
-                    "content_type": "text",
-                    "created_at": ai_message.created_at.isoformat()
-                    if ai_message.created_at
-                    else None,
-                },
-            },
-        )
+        # 18. Flush LLM usage records
+        if tracker:
+            try:
+                await tracker.flush()
+            except Exception:
+                logger.exception("LLM usage flush failed")
+
+        return ai_message
 
+    async def analyze_reply(
+        self,
+        conversation: Conversation,
+        ab_variant: dict | None = None,
+        *,
+        tracker: UsageTracker | None = None,
+    ) -> None:
+        """Post-reply analytics: satisfaction, auto-summary and A/B outcome.
+
+        Each step fails silently; none of them affects the reply itself.
+        """
         # 16. Satisfaction analysis
         try:
             await self._update_satisfaction(conversation, tracker=tracker)
@@ -311,15 +434,6 @@ class AIResponseService:
             except Exception:
                 logger.exception("A/B test outcome recording failed")
 
-        # 18. Flush LLM usage records
-        if tracker:
-            try:
-                await tracker.flush()
-            except Exception:
-                logger.exception("LLM usage flush failed")
-
-        return ai_message
-
     async def generate_suggestions(self, conversation_id: uuid.UUID) -> list[dict]:
         """Generate 3 candidate responses for manual mode."""
         conversation = await self._load_conversation(conversation_id)
@@ -330,7 +444,7 @@ class AIResponseService:
             return []  # Suggestions are only for manual mode
 
         # Assemble context
-        knowledge_svc = KnowledgeService(self.db)
+        knowledge_svc = self._knowledge_service()
         knowledge = await knowledge_svc.assemble_knowledge(
             conversation.clinic_id, ""
         )
@@ -362,6 +476,131 @@ class AIResponseService:
 
     # --- Private helpers ---
 
+    @contextlib.contextmanager
+    def _timed(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record_stage(stage, started)
+
+    def _record_stage(self, stage: str, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        self.stage_timings[stage] = elapsed
+        AI_PIPELINE_STAGE_DURATION.labels(stage=stage).observe(elapsed)
+
+    async def _side_work(
+        self,
+        query: str,
+        clinic_id: uuid.UUID,
+        conversation_id: uuid.UUID,
+        customer_id: uuid.UUID,
+        language_code: str,
+    ) -> None:
+        """Staff-alert checks on the incoming message. Nothing here feeds the reply."""
+        checks = [
+            self._run_side_check(
+                "Side-effect detection",
+                self._detect_side_effects,
+                query, clinic_id, conversation_id, customer_id, language_code,
+            ),
+            self._run_side_check(
+                "Contraindication screening",
+                self._screen_contraindications,
+                query, clinic_id, conversation_id,
+            ),
+        ]
+        with self._timed("side_work"):
+            if self.session_factory is None:
+                for check in checks:
+                    await check
+            else:
+                await asyncio.gather(*checks)
+
+    async def _run_side_check(self, label: str, check, *args) -> None:
+        """Run one side check on its own session (or self.db). Fails silently."""
+        try:
+            if self.session_factory is None:
+                await check(self.db, *args)
+                return
+            async with self.session_factory() as db:
+                try:
+                    await check(db, *args)
+                    await db.commit()
+                except Exception:
+                    await db.rollback()
+                    raise
+        except Exception:
+            logger.exception("%s failed", label)
+
+    async def _detect_side_effects(
+        self,
+        db: AsyncSession,
+        query: str,
+        clinic_id: uuid.UUID,
+        conversation_id: uuid.UUID,
+        customer_id: uuid.UUID,
+        language_code: str,
+    ) -> None:
+        """Side-effect keyword detection (staff alert only)."""
+        from app.services.followup_service import FollowupService
+
+        followup_svc = FollowupService(db)
+        side_effect = await followup_svc.check_side_effects(
+            query, clinic_id, language_code
+        )
+        if side_effect:
+            await manager.broadcast_to_clinic(
+                clinic_id,
+                {
+                    "type": "side_effect_alert",
+                    "conversation_id": str(conversation_id),
+                    "customer_id": str(customer_id),
+                    "matched_keywords": side_effect["matched_keywords"],
+                    "severity": side_effect["severity"],
+                    "message_preview": query[:200],
+                },
+            )
+
+    async def _screen_contraindications(
+        self,
+        db: AsyncSession,
+        query: str,
+        clinic_id: uuid.UUID,
+        conversation_id: uuid.UUID,
+    ) -> None:
+        """Real-time contraindication auto-screening."""
+        from app.services.contraindication_screening_service import (
+            ContraindicationScreeningService,
+        )
+
+        screening_svc = ContraindicationScreeningService(db)
+        contra_alert = await screening_svc.screen_message(
+            query, conversation_id, clinic_id
+        )
+        if contra_alert:
+            await manager.broadcast_to_clinic(clinic_id, contra_alert)
+
+    def _knowledge_service(self) -> KnowledgeService:
+        return KnowledgeService(
+            self.db,
+            vector_retriever=self._vector_retriever(),
+            session_factory=async_session_factory
+            if settings.knowledge_concurrent_assembly
+            else None,
+            snapshot_store=knowledge_snapshots
+            if settings.knowledge_snapshot_enabled
+            else None,
+        )
+
+    def _vector_retriever(self) -> VectorRetriever | None:
+        """Vector search for knowledge assembly; None leaves it keyword-only."""
+        try:
+            return VectorRetriever(self.db)
+        except Exception:
+            logger.debug("Vector retriever unavailable, knowledge search is keyword-only")
+            return None
+
     async def _load_conversation(self, conversation_id: uuid.UUID) -> Conversation | None:
         result = await self.db.execute(
             select(Conversation).where(Conversation.id == conversation_id)
@@ -460,6 +699,59 @@ class AIResponseService:
             history = f"[이전 대화 요약]\n{summary}\n\n{history}"
         return history
 
+    async def _deliver_now(
+        self,
+        ai_message: Message,
+        conversation: Conversation,
+        messenger_account: MessengerAccount,
+        customer: Customer,
+        response_text: str,
+    ) -> None:
+        """Send the saved AI reply via messenger and broadcast it to the dashboard."""
+        try:
+            adapter = MessengerAdapterFactory.get_adapter(
+                messenger_account.messenger_type
+            )
+            await adapter.send_typing_indicator(
+                messenger_account, customer.messenger_user_id
+            )
+            msg_id = await adapter.send_message(
+                messenger_account,
+                customer.messenger_user_id,
+                response_text,
+            )
+            ai_message.messenger_message_id = msg_id
+        except Exception:
+            logger.exception("Failed to send message via messenger")
+            # Queue for retry delivery
+            from app.tasks.message_delivery import retry_message_delivery
+
+            retry_message_delivery.delay(
+                str(ai_message.id),
+                str(messenger_account.id),
+                customer.messenger_user_id,
+                response_text,
+                messenger_account.messenger_type,
+            )
+
+        # WebSocket broadcast
+        await manager.broadcast_to_clinic(
+            conversation.clinic_id,
+            {
+                "type": "new_message",
+                "conversation_id": str(conversation.id),
+                "message": {
+                    "id": str(ai_message.id),
+                    "sender_type": "ai",
+                    "content": response_text,
+                    "content_type": "text",
+                    "created_at": ai_message.created_at.isoformat()
+                    if ai_message.created_at
+                    else None,
+                },
+            },
+        )
+
     async def _is_first_ai_message(self, conversation_id: uuid.UUID) -> bool:
         result = await self.db.execute(
             select(func.count(Message.id)).where(
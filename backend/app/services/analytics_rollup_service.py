@@ -0,0 +1,499 @@
+"""Maintenance of the per-day analytics rollup tables (app.models.analytics_rollup).
+
+A day is refreshed by deleting its rollup rows and re-aggregating the raw rows
+created (or paid) that day, inside the caller's transaction, so readers see
+either the old or the new day, never a half-written one. Transaction-level
+advisory locks serialize refreshes of the same (clinic, day) until the caller
+commits: a refresh of every clinic holds the day exclusively, one of some
+clinics shares the day and holds each of its (clinic, day) pairs.
+
+Incremental refresh finds the (clinic, day) pairs touched since the last run
+from updated_at/created_at and recomputes only those days. The watermark is
+the start time of the last run, kept in analytics_rollup_watermarks so it
+advances even when a run changed nothing; each run reads back a small overlap
+for transactions that were still in flight during the previous one.
+"""
+
+import uuid
+from collections import defaultdict
+from collections.abc import Collection, Iterable
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import (
+    Date,
+    Integer,
+    cast,
+    delete,
+    extract,
+    func,
+    literal,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.analytics_rollup import (
+    DailyClinicStats,
+    DailyCustomerRevenue,
+    DailyFunnelStats,
+    DailyProcedureStats,
+    HourlyRevenueStats,
+    RollupWatermark,
+)
+from app.models.booking import Booking
+from app.models.conversation import Conversation
+from app.models.customer import Customer
+from app.models.message import Message
+from app.models.messenger_account import MessengerAccount
+from app.models.payment import Payment
+
+ROLLUP_MODELS = (
+    DailyClinicStats,
+    DailyFunnelStats,
+    DailyProcedureStats,
+    HourlyRevenueStats,
+    DailyCustomerRevenue,
+)
+
+WATERMARK_NAME = "daily_rollups"
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+def _on_day(column, day: date) -> tuple:
+    """Index-friendly filter for column falling on day (session timezone)."""
+    return (
+        column >= literal(day, Date),
+        column < literal(day + timedelta(days=1), Date),
+    )
+
+
+def _in_clinics(column, clinic_ids: Collection[uuid.UUID] | None) -> tuple:
+    return () if clinic_ids is None else (column.in_(list(clinic_ids)),)
+
+
+def _empty_clinic_stats() -> dict:
+    return {
+        "conversations": 0,
+        "ai_mode_conversations": 0,
+        "manual_conversations": 0,
+        "status_counts": {},
+        "conversations_with_messages": 0,
+        "messages": 0,
+        "satisfaction_sum": 0,
+        "satisfaction_count": 0,
+        "bookings": 0,
+        "payments": 0,
+        "payment_amount": Decimal("0"),
+        "paid_count": 0,
+        "paid_amount": Decimal("0"),
+    }
+
+
+class AnalyticsRollupService:
+    """Rebuilds analytics rollup rows for given days. The caller commits."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        # Clinics touched by this service's refreshes; None means all clinics
+        self.refreshed_clinic_ids: set[uuid.UUID] | None = set()
+
+    async def refresh_days(
+        self,
+        days: Iterable[date],
+        clinic_ids: Collection[uuid.UUID] | None = None,
+    ) -> int:
+        """Recompute the given days (for all clinics, or only clinic_ids)."""
+        count = 0
+        for day in sorted(set(days)):
+            await self.refresh_day(day, clinic_ids)
+            count += 1
+        return count
+
+    async def refresh_day(
+        self, day: date, clinic_ids: Collection[uuid.UUID] | None = None
+    ) -> None:
+        if clinic_ids is None:
+            self.refreshed_clinic_ids = None
+        elif self.refreshed_clinic_ids is not None:
+            self.refreshed_clinic_ids.update(clinic_ids)
+
+        await self._lock_day(day, clinic_ids)
+        for model in ROLLUP_MODELS:
+            await self.db.execute(
+                delete(model).where(
+                    model.day == day, *_in_clinics(model.clinic_id, clinic_ids)
+                )
+            )
+        await self._insert_clinic_stats(day, clinic_ids)
+        await self._insert_funnel(day, clinic_ids)
+        await self._insert_procedures(day, clinic_ids)
+        await self._insert_hourly_revenue(day, clinic_ids)
+        await self._insert_customer_revenue(day, clinic_ids)
+
+    async def _lock_day(
+        self, day: date, clinic_ids: Collection[uuid.UUID] | None
+    ) -> None:
+        # Days are refreshed in order and clinics locked sorted, so concurrent
+        # refreshes always take their locks in the same order
+        day_key = f"analytics_rollup:{day.isoformat()}"
+        if clinic_ids is None:
+            await self.db.execute(
+                text("SELECT pg_advisory_xact_lock(hashtextextended(:key, 0))"),
+                {"key": day_key},
+            )
+            return
+        await self.db.execute(
+            text("SELECT pg_advisory_xact_lock_shared(hashtextextended(:key, 0))"),
+            {"key": day_key},
+        )
+        await self.db.execute(
+            text(
+                "SELECT pg_advisory_xact_lock(hashtextextended(k, 0)) "
+                "FROM unnest(CAST(:keys AS text[])) AS k ORDER BY k"
+            ),
+            {"keys": sorted(f"{day_key}:{clinic_id}" for clinic_id in clinic_ids)},
+        )
+
+    async def rebuild(self, days: int | None = None) -> int:
+        """Recompute the trailing window of days (default analytics_rollup_rebuild_days)."""
+        days = days or settings.analytics_rollup_rebuild_days
+        today = date.today()
+        return await self.refresh_days(today - timedelta(days=n) for n in range(days + 1))
+
+    async def refresh_changed(self) -> int:
+        """Recompute days touched since the last refresh; rebuild if there was none."""
+        # Database clock, like the updated_at/created_at values compared against it
+        started_at = (await self.db.execute(select(func.now()))).scalar_one()
+        watermark = await self.watermark()
+        if watermark is None:
+            count = await self.rebuild()
+        else:
+            changed = await self.changed_days(watermark - WATERMARK_OVERLAP)
+            for day, clinic_ids in sorted(changed.items()):
+                await self.refresh_day(day, clinic_ids)
+            count = len(changed)
+        await self._set_watermark(started_at)
+        return count
+
+    async def watermark(self) -> datetime | None:
+        result = await self.db.execute(
+            select(RollupWatermark.watermark).where(RollupWatermark.name == WATERMARK_NAME)
+        )
+        return result.scalar_one_or_none()
+
+    async def _set_watermark(self, watermark: datetime) -> None:
+        stmt = insert(RollupWatermark).values(name=WATERMARK_NAME, watermark=watermark)
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[RollupWatermark.name],
+                set_={"watermark": stmt.excluded.watermark},
+            )
+        )
+
+    async def changed_days(self, since: datetime) -> dict[date, set[uuid.UUID]]:
+        """(day -> clinic ids) whose rollups are affected by rows changed since `since`."""
+        queries = [
+            select(Conversation.clinic_id, func.date(Conversation.created_at))
+            .where(Conversation.updated_at >= since),
+            # Messages count toward the day their conversation was created
+            select(Conversation.clinic_id, func.date(Conversation.created_at))
+            .join(Message, Message.conversation_id == Conversation.id)
+            .where(Message.created_at >= since),
+            select(Booking.clinic_id, func.date(Booking.created_at))
+            .where(Booking.updated_at >= since),
+            select(Payment.clinic_id, func.date(Payment.created_at))
+            .where(Payment.updated_at >= since),
+            select(Payment.clinic_id, func.date(Payment.paid_at))
+            .where(Payment.updated_at >= since, Payment.paid_at.isnot(None)),
+        ]
+        result = await self.db.execute(union_all(*queries))
+
+        changed: dict[date, set[uuid.UUID]] = defaultdict(set)
+        for clinic_id, day in result.all():
+            changed[day].add(clinic_id)
+        return dict(changed)
+
+    # --- Per-table aggregation ---
+
+    async def _insert_clinic_stats(
+        self, day: date, clinic_ids: Collection[uuid.UUID] | None
+    ) -> None:
+        stats: dict[uuid.UUID, dict] = defaultdict(_empty_clinic_stats)
+        conv_filter = (
+            *_on_day(Conversation.created_at, day),
+            *_in_clinics(Conversation.clinic_id, clinic_ids),
+        )
+
+        conv_result = await self.db.execute(
+            select(
+                Conversation.clinic_id,
+                func.count(Conversation.id).label("total"),
+                func.count(Conversation.id)
+                .filter(Conversation.ai_mode.is_(True))
+                .label("ai_mode"),
+                func.count(Conversation.id)
+                .filter(Conversation.ai_mode.is_(False))
+                .label("manual_mode"),
+                func.coalesce(func.sum(Conversation.satisfaction_score), 0).label("sat_sum"),
+                func.count(Conversation.satisfaction_score).label("sat_count"),
+            )
+            .where(*conv_filter)
+            .group_by(Conversation.clinic_id)
+        )
+        for row in conv_result.all():
+            stats[row.clinic_id].update(
+                conversations=row.total,
+                ai_mode_conversations=row.ai_mode,
+                manual_conversations=row.manual_mode,
+                satisfaction_sum=row.sat_sum,
+                satisfaction_count=row.sat_count,
+            )
+
+        status_result = await self.db.execute(
+            select(
+                Conversation.clinic_id,
+                Conversation.status,
+                func.count(Conversation.id).label("count"),
+            )
+            .where(*conv_filter)
+            .group_by(Conversation.clinic_id, Conversation.status)
+        )
+        for row in status_result.all():
+            stats[row.clinic_id]["status_counts"][row.status] = row.count
+
+        msg_result = await self.db.execute(
+            select(
+                Conversation.clinic_id,
+                func.count(func.distinct(Message.conversation_id)).label("conversations"),
+                func.count(Message.id).label("messages"),
+            )
+            .select_from(Message)
+            .join(Conversation, Conversation.id == Message.conversation_id)
+            .where(*conv_filter)
+            .group_by(Conversation.clinic_id)
+        )
+        for row in msg_result.all():
+            stats[row.clinic_id].update(
+                conversations_with_messages=row.conversations,
+                messages=row.messages,
+            )
+
+        booking_result = await self.db.execute(
+            select(Booking.clinic_id, func.count(Booking.id).label("count"))
+            .where(
+                *_on_day(Booking.created_at, day),
+                *_in_clinics(Booking.clinic_id, clinic_ids),
+            )
+            .group_by(Booking.clinic_id)
+        )
+        for row in booking_result.all():
+            stats[row.clinic_id]["bookings"] = row.count
+
+        payment_result = await self.db.execute(
+            select(
+                Payment.clinic_id,
+                func.count(Payment.id).label("count"),
+                func.coalesce(func.sum(Payment.amount), 0).label("amount"),
+            )
+            .where(
+                Payment.status == "completed",
+                *_on_day(Payment.created_at, day),
+                *_in_clinics(Payment.clinic_id, clinic_ids),
+            )
+            .group_by(Payment.clinic_id)
+        )
+        for row in payment_result.all():
+            stats[row.clinic_id].update(payments=row.count, payment_amount=row.amount)
+
+        paid_result = await self.db.execute(
+            select(
+                Payment.clinic_id,
+                func.count(Payment.id).label("count"),
+                func.coalesce(func.sum(Payment.amount), 0).label("amount"),
+            )
+            .where(
+                Payment.status == "completed",
+                *_on_day(Payment.paid_at, day),
+                *_in_clinics(Payment.clinic_id, clinic_ids),
+            )
+            .group_by(Payment.clinic_id)
+        )
+        for row in paid_result.all():
+            stats[row.clinic_id].update(paid_count=row.count, paid_amount=row.amount)
+
+        if stats:
+            await self.db.execute(
+                insert(DailyClinicStats),
+                [
+                    {"id": uuid.uuid4(), "clinic_id": clinic_id, "day": day, **values}
+                    for clinic_id, values in stats.items()
+                ],
+            )
+
+    async def _insert_funnel(
+        self, day: date, clinic_ids: Collection[uuid.UUID] | None
+    ) -> None:
+        country = func.coalesce(Customer.country_code, "unknown")
+        zero, one = literal(0), literal(1)
+
+        conversations = (
+            select(
+                Conversation.clinic_id.label("clinic_id"),
+                Conversation.customer_id.label("customer_id"),
+                country.label("country_code"),
+                MessengerAccount.messenger_type.label("channel"),
+                one.label("conversations"),
+                zero.label("bookings"),
+                zero.label("payments"),
+            )
+            .join(Customer, Conversation.customer_id == Customer.id)
+            .join(MessengerAccount, Conversation.messenger_account_id == MessengerAccount.id)
+            .where(
+                *_on_day(Conversation.created_at, day),
+                *_in_clinics(Conversation.clinic_id, clinic_ids),
+            )
+        )
+        bookings = (
+            select(
+                Booking.clinic_id,
+                Booking.customer_id,
+                country,
+                MessengerAccount.messenger_type,
+                zero,
+                one,
+                zero,
+            )
+            .select_from(Booking)
+            .join(Customer, Booking.customer_id == Customer.id)
+            .outerjoin(Conversation, Booking.conversation_id == Conversation.id)
+            .outerjoin(MessengerAccount, Conversation.messenger_account_id == MessengerAccount.id)
+            .where(
+                *_on_day(Booking.created_at, day),
+                *_in_clinics(Booking.clinic_id, clinic_ids),
+            )
+        )
+        payments = (
+            select(
+                Payment.clinic_id,
+                Payment.customer_id,
+                country,
+                MessengerAccount.messenger_type,
+                zero,
+                zero,
+                one,
+            )
+            .select_from(Payment)
+            .join(Customer, Payment.customer_id == Customer.id)
+            .outerjoin(Booking, Payment.booking_id == Booking.id)
+            .outerjoin(Conversation, Booking.conversation_id == Conversation.id)
+            .outerjoin(MessengerAccount, Conversation.messenger_account_id == MessengerAccount.id)
+            .where(
+                Payment.status == "completed",
+                *_on_day(Payment.created_at, day),
+                *_in_clinics(Payment.clinic_id, clinic_ids),
+            )
+        )
+        stages = union_all(conversations, bookings, payments).subquery("stages")
+
+        await self.db.execute(
+            insert(DailyFunnelStats).from_select(
+                ["id", "clinic_id", "day", "customer_id", "country_code", "channel",
+                 "conversations", "bookings", "payments"],
+                select(
+                    func.gen_random_uuid(),
+                    stages.c.clinic_id,
+                    literal(day, Date),
+                    stages.c.customer_id,
+                    stages.c.country_code,
+                    stages.c.channel,
+                    func.max(stages.c.conversations),
+                    func.max(stages.c.bookings),
+                    func.max(stages.c.payments),
+                ).group_by(
+                    stages.c.clinic_id,
+                    stages.c.customer_id,
+                    stages.c.country_code,
+                    stages.c.channel,
+                ),
+            )
+        )
+
+    async def _insert_procedures(
+        self, day: date, clinic_ids: Collection[uuid.UUID] | None
+    ) -> None:
+        await self.db.execute(
+            insert(DailyProcedureStats).from_select(
+                ["id", "clinic_id", "day", "clinic_procedure_id", "case_count", "revenue"],
+                select(
+                    func.gen_random_uuid(),
+                    Payment.clinic_id,
+                    literal(day, Date),
+                    Booking.clinic_procedure_id,
+                    func.count(Payment.id),
+                    func.sum(Payment.amount),
+                )
+                .join(Booking, Payment.booking_id == Booking.id)
+                .where(
+                    Payment.status == "completed",
+                    Booking.clinic_procedure_id.isnot(None),
+                    *_on_day(Payment.created_at, day),
+                    *_in_clinics(Payment.clinic_id, clinic_ids),
+                )
+                .group_by(Payment.clinic_id, Booking.clinic_procedure_id),
+            )
+        )
+
+    async def _insert_hourly_revenue(
+        self, day: date, clinic_ids: Collection[uuid.UUID] | None
+    ) -> None:
+        hour = cast(extract("hour", Payment.paid_at), Integer)
+        await self.db.execute(
+            insert(HourlyRevenueStats).from_select(
+                ["id", "clinic_id", "day", "hour", "payment_count", "amount"],
+                select(
+                    func.gen_random_uuid(),
+                    Payment.clinic_id,
+                    literal(day, Date),
+                    hour,
+                    func.count(Payment.id),
+                    func.sum(Payment.amount),
+                )
+                .where(
+                    Payment.status == "completed",
+                    *_on_day(Payment.paid_at, day),
+                    *_in_clinics(Payment.clinic_id, clinic_ids),
+                )
+                .group_by(Payment.clinic_id, hour),
+            )
+        )
+
+    async def _insert_customer_revenue(
+        self, day: date, clinic_ids: Collection[uuid.UUID] | None
+    ) -> None:
+        booked = Payment.booking_id.isnot(None)
+        await self.db.execute(
+            insert(DailyCustomerRevenue).from_select(
+                ["id", "clinic_id", "day", "customer_id", "payment_count", "amount",
+                 "booked_payment_count", "booked_amount"],
+                select(
+                    func.gen_random_uuid(),
+                    Payment.clinic_id,
+                    literal(day, Date),
+                    Payment.customer_id,
+                    func.count(Payment.id),
+                    func.sum(Payment.amount),
+                    func.count(Payment.id).filter(booked),
+                    func.coalesce(func.sum(Payment.amount).filter(booked), 0),
+                )
+                .where(
+                    Payment.status == "completed",
+                    *_on_day(Payment.created_at, day),
+                    *_in_clinics(Payment.clinic_id, clinic_ids),
+                )
+                .group_by(Payment.clinic_id, Payment.customer_id),
+            )
+        )
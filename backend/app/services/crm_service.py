@@ -1,11 +1,14 @@
 import uuid
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import select
+from sqlalchemy import case, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from app.core.exceptions import BadRequestError, NotFoundError
 from app.models.booking import Booking
+from app.models.conversation import Conversation
 from app.models.crm_event import CRMEvent
 from app.models.payment import Payment
 
@@ -84,6 +87,81 @@ class CRMService:
         )
         return list(result.scalars().all())
 
+    async def claim_due_events(self, limit: int) -> list[CRMEvent]:
+        """Lock up to *limit* due events for this transaction, oldest first.
+
+        Rows locked by another worker's open batch are skipped rather than
+        waited on, so concurrent sweeps never pick up the same event.
+        """
+        now = datetime.now(timezone.utc)
+        result = await self.db.execute(
+            select(CRMEvent)
+            .where(
+                CRMEvent.status == "scheduled",
+                CRMEvent.scheduled_at <= now,
+            )
+            .order_by(CRMEvent.scheduled_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(result.scalars().all())
+
+    async def load_dispatch_targets(
+        self, events: list[CRMEvent]
+    ) -> dict[tuple[uuid.UUID, uuid.UUID], Conversation]:
+        """Each (clinic_id, customer_id)'s most recent conversation, in one query.
+
+        Conversations come with their customer and messenger account loaded.
+        """
+        keys = {(event.clinic_id, event.customer_id) for event in events}
+        if not keys:
+            return {}
+        result = await self.db.execute(
+            select(Conversation)
+            .options(
+                joinedload(Conversation.customer),
+                joinedload(Conversation.messenger_account),
+            )
+            .where(tuple_(Conversation.clinic_id, Conversation.customer_id).in_(keys))
+            .distinct(Conversation.clinic_id, Conversation.customer_id)
+            .order_by(
+                Conversation.clinic_id,
+                Conversation.customer_id,
+                Conversation.last_message_at.desc().nulls_last(),
+            )
+        )
+        return {(c.clinic_id, c.customer_id): c for c in result.scalars().all()}
+
+    async def record_outcomes(self, outcomes: dict[uuid.UUID, str | None]) -> None:
+        """Mark events sent (None) or failed (error message) in one UPDATE."""
+        if not outcomes:
+            return
+        errors = {
+            event_id: error for event_id, error in outcomes.items() if error is not None
+        }
+        status = "sent"
+        response = CRMEvent.response
+        if errors:
+            status = case((CRMEvent.id.in_(errors), "failed"), else_="sent")
+            response = case(
+                {
+                    event_id: literal({"error": error}, JSONB)
+                    for event_id, error in errors.items()
+                },
+                value=CRMEvent.id,
+                else_=CRMEvent.response,
+            )
+        await self.db.execute(
+            update(CRMEvent)
+            .where(CRMEvent.id.in_(outcomes))
+            .values(
+                status=status,
+                executed_at=datetime.now(timezone.utc),
+                response=response,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
     async def mark_sent(self, event_id: uuid.UUID) -> CRMEvent:
         """Mark event as sent after execution."""
         result = await self.db.execute(
@@ -1,8 +1,23 @@
-"""Invoice PDF generation service using ReportLab."""
+"""Invoice PDF generation service using ReportLab.
 
+Rendering is CPU-bound, so API requests never render on the event loop:
+InvoiceService hands the work to invoice_renderer, a process pool whose
+workers build the stylesheet once at start-up. Celery workers render in
+their own process instead (see app.tasks.analytics.render_settlement_invoices).
+
+Rendered PDFs are content-addressed: InvoiceData.digest() hashes everything
+printed on the invoice, and a settlement keeps the URL and digest of its
+stored PDF, so an unchanged invoice is served from storage.
+"""
+
+import asyncio
+import hashlib
 import logging
-from datetime import datetime, timezone
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import astuple, dataclass
 from decimal import Decimal
+from functools import lru_cache
 from io import BytesIO
 
 from reportlab.lib import colors
@@ -11,119 +26,276 @@ from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.lib.units import mm
 from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
 
+from app.config import settings
 from app.models.clinic import Clinic
 from app.models.settlement import Settlement
+from app.services.storage_service import storage_service
 
 logger = logging.getLogger(__name__)
 
+# Bump when the layout changes so stored PDFs are re-rendered
+INVOICE_TEMPLATE_VERSION = 1
+
+_INFO_TABLE_STYLE = TableStyle([
+    ("FONTSIZE", (0, 0), (-1, -1), 10),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("TEXTCOLOR", (0, 0), (0, -1), colors.grey),
+])
+
+_PARTY_TABLE_STYLE = TableStyle([
+    ("FONTSIZE", (0, 0), (-1, -1), 10),
+    ("FONTSIZE", (0, 0), (-1, 0), 11),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#333333")),
+    ("LINEBELOW", (0, 0), (-1, 0), 1, colors.grey),
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("TOPPADDING", (0, 0), (-1, -1), 4),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+])
+
+_DETAIL_TABLE_STYLE = TableStyle([
+    ("FONTSIZE", (0, 0), (-1, -1), 10),
+    ("FONTSIZE", (0, 0), (-1, 0), 11),
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f0f0f0")),
+    ("LINEBELOW", (0, 0), (-1, 0), 1, colors.grey),
+    ("LINEBELOW", (0, -1), (-1, -1), 2, colors.black),
+    ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("TOPPADDING", (0, 0), (-1, -1), 6),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.lightgrey),
+])
+
+
+@lru_cache(maxsize=1)
+def _paragraph_styles() -> tuple[ParagraphStyle, ParagraphStyle]:
+    """(title, normal) paragraph styles, built once per process."""
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        "InvoiceTitle",
+        parent=styles["Title"],
+        fontSize=18,
+        spaceAfter=12,
+    )
+    return title_style, styles["Normal"]
+
+
+@dataclass(frozen=True)
+class InvoiceData:
+    """Everything printed on an invoice; picklable for the render pool."""
+
+    invoice_no: str
+    issue_date: str
+    period: str
+    clinic_name: str
+    business_number: str | None
+    address: str | None
+    total_payment_amount: Decimal
+    total_payment_count: int
+    commission_rate: Decimal
+    commission_amount: Decimal
+    vat_amount: Decimal
+    total_settlement: Decimal
+    notes: str | None
+
+    @classmethod
+    def from_settlement(cls, settlement: Settlement, clinic: Clinic) -> "InvoiceData":
+        period = f"{settlement.period_year}-{settlement.period_month:02d}"
+        # Issued on confirmation, so the same settlement always renders alike
+        issued_at = settlement.confirmed_at or settlement.created_at
+        return cls(
+            invoice_no=f"INV-{period}-{str(settlement.id)[:8]}",
+            issue_date=issued_at.strftime("%Y-%m-%d"),
+            period=period,
+            clinic_name=clinic.name,
+            business_number=clinic.business_number,
+            address=clinic.address,
+            total_payment_amount=settlement.total_payment_amount,
+            total_payment_count=settlement.total_payment_count,
+            commission_rate=settlement.commission_rate,
+            commission_amount=settlement.commission_amount,
+            vat_amount=settlement.vat_amount,
+            total_settlement=settlement.total_settlement,
+            notes=settlement.notes,
+        )
+
+    def digest(self) -> str:
+        """Content address of the rendered PDF."""
+        content = repr((INVOICE_TEMPLATE_VERSION, astuple(self)))
+        return hashlib.sha256(content.encode()).hexdigest()
+
+
+def render_invoice(data: InvoiceData) -> bytes:
+    """Render a tax invoice PDF. Deterministic: equal data gives equal bytes."""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        topMargin=20 * mm,
+        bottomMargin=20 * mm,
+        leftMargin=20 * mm,
+        rightMargin=20 * mm,
+        invariant=1,  # no creation timestamp or random document ID
+    )
+    title_style, normal_style = _paragraph_styles()
+
+    elements = []
+
+    # Title
+    elements.append(Paragraph(
+        "Tax Invoice / 세금계산서",
+        title_style,
+    ))
+    elements.append(Spacer(1, 10 * mm))
+
+    # Invoice info
+    info_data = [
+        ["Invoice No.", data.invoice_no],
+        ["Issue Date", data.issue_date],
+        ["Period", data.period],
+    ]
+    info_table = Table(info_data, colWidths=[40 * mm, 80 * mm])
+    info_table.setStyle(_INFO_TABLE_STYLE)
+    elements.append(info_table)
+    elements.append(Spacer(1, 10 * mm))
+
+    # Supplier and receiver
+    party_data = [
+        ["Supplier (Platform)", "Receiver (Clinic)"],
+        ["Centurion Medical Platform", data.clinic_name],
+        ["", f"Business No: {data.business_number or 'N/A'}"],
+        ["", f"Address: {data.address or 'N/A'}"],
+    ]
+    party_table = Table(party_data, colWidths=[80 * mm, 80 * mm])
+    party_table.setStyle(_PARTY_TABLE_STYLE)
+    elements.append(party_table)
+    elements.append(Spacer(1, 10 * mm))
+
+    # Settlement details table
+    def fmt(val: Decimal) -> str:
+        return f"{val:,.2f}"
+
+    detail_data = [
+        ["Item", "Amount"],
+        ["Total Payment Amount", fmt(data.total_payment_amount)],
+        ["Total Payment Count", str(data.total_payment_count)],
+        [f"Commission ({data.commission_rate}%)", fmt(data.commission_amount)],
+        ["VAT (10%)", fmt(data.vat_amount)],
+        ["Total Settlement", fmt(data.total_settlement)],
+    ]
+    detail_table = Table(detail_data, colWidths=[100 * mm, 60 * mm])
+    detail_table.setStyle(_DETAIL_TABLE_STYLE)
+    elements.append(detail_table)
+    elements.append(Spacer(1, 15 * mm))
+
+    # Notes
+    if data.notes:
+        elements.append(Paragraph(f"Notes: {data.notes}", normal_style))
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def _warm_up() -> None:
+    """Pool worker initializer: load fonts and styles before the first job."""
+    _paragraph_styles()
+
+
+class InvoiceRenderer:
+    """Process pool for render_invoice, created on first use."""
+
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max_workers
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers or settings.invoice_render_workers,
+                # Forking a process with a running event loop and threads is unsafe
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_up,
+            )
+        return self._executor
+
+    async def render(self, data: InvoiceData) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(), render_invoice, data)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
 
 class InvoiceService:
-    """Generates tax invoice PDFs for settlements."""
+    """Generates tax invoice PDFs for settlements.
+
+    With a renderer, PDFs are rendered in its process pool; without one
+    (Celery workers) they are rendered in the calling process.
+    """
+
+    def __init__(self, renderer: InvoiceRenderer | None = None):
+        self.renderer = renderer
 
     def generate_pdf(self, settlement: Settlement, clinic: Clinic) -> bytes:
         """Generate a tax invoice PDF for a settlement."""
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            topMargin=20 * mm,
-            bottomMargin=20 * mm,
-            leftMargin=20 * mm,
-            rightMargin=20 * mm,
-        )
+        return render_invoice(InvoiceData.from_settlement(settlement, clinic))
 
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            "InvoiceTitle",
-            parent=styles["Title"],
-            fontSize=18,
-            spaceAfter=12,
-        )
-        normal_style = styles["Normal"]
+    async def get_pdf(self, settlement: Settlement, clinic: Clinic) -> bytes:
+        """The settlement's invoice PDF, from storage when still current.
 
-        elements = []
+        A (re-)rendered PDF is stored and recorded on the settlement; the
+        caller commits.
+        """
+        data = InvoiceData.from_settlement(settlement, clinic)
+        digest = data.digest()
+        if self._is_current(settlement, digest):
+            try:
+                return await storage_service.read(settlement.invoice_url)
+            except Exception:
+                logger.warning(
+                    "Stored invoice unavailable, re-rendering: settlement=%s",
+                    settlement.id,
+                )
+        return await self._render_and_store(settlement, data, digest)
 
-        # Title
-        elements.append(Paragraph(
-            "Tax Invoice / \uc138\uae08\uacc4\uc0b0\uc11c",
-            title_style,
-        ))
-        elements.append(Spacer(1, 10 * mm))
+    async def store_pdf(self, settlement: Settlement, clinic: Clinic) -> bool:
+        """Render and store the invoice unless the stored one is current.
 
-        # Invoice info
-        period = f"{settlement.period_year}-{settlement.period_month:02d}"
-        now = datetime.now(timezone.utc)
-        info_data = [
-            ["Invoice No.", f"INV-{period}-{str(settlement.id)[:8]}"],
-            ["Issue Date", now.strftime("%Y-%m-%d")],
-            ["Period", period],
-        ]
-        info_table = Table(info_data, colWidths=[40 * mm, 80 * mm])
-        info_table.setStyle(TableStyle([
-            ("FONTSIZE", (0, 0), (-1, -1), 10),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("TEXTCOLOR", (0, 0), (0, -1), colors.grey),
-        ]))
-        elements.append(info_table)
-        elements.append(Spacer(1, 10 * mm))
-
-        # Supplier and receiver
-        party_data = [
-            ["Supplier (Platform)", "Receiver (Clinic)"],
-            ["Centurion Medical Platform", clinic.name],
-            [
-                "",
-                f"Business No: {clinic.business_number or 'N/A'}",
-            ],
-            ["", f"Address: {clinic.address or 'N/A'}"],
-        ]
-        party_table = Table(party_data, colWidths=[80 * mm, 80 * mm])
-        party_table.setStyle(TableStyle([
-            ("FONTSIZE", (0, 0), (-1, -1), 10),
-            ("FONTSIZE", (0, 0), (-1, 0), 11),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#333333")),
-            ("LINEBELOW", (0, 0), (-1, 0), 1, colors.grey),
-            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-            ("TOPPADDING", (0, 0), (-1, -1), 4),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-        ]))
-        elements.append(party_table)
-        elements.append(Spacer(1, 10 * mm))
-
-        # Settlement details table
-        def fmt(val: Decimal) -> str:
-            return f"{val:,.2f}"
-
-        detail_data = [
-            ["Item", "Amount"],
-            ["Total Payment Amount", fmt(settlement.total_payment_amount)],
-            ["Total Payment Count", str(settlement.total_payment_count)],
-            [
-                f"Commission ({settlement.commission_rate}%)",
-                fmt(settlement.commission_amount),
-            ],
-            ["VAT (10%)", fmt(settlement.vat_amount)],
-            ["Total Settlement", fmt(settlement.total_settlement)],
-        ]
-        detail_table = Table(detail_data, colWidths=[100 * mm, 60 * mm])
-        detail_table.setStyle(TableStyle([
-            ("FONTSIZE", (0, 0), (-1, -1), 10),
-            ("FONTSIZE", (0, 0), (-1, 0), 11),
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f0f0f0")),
-            ("LINEBELOW", (0, 0), (-1, 0), 1, colors.grey),
-            ("LINEBELOW", (0, -1), (-1, -1), 2, colors.black),
-            ("ALIGN", (1, 0), (1, -1), "RIGHT"),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("TOPPADDING", (0, 0), (-1, -1), 6),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ]))
-        elements.append(detail_table)
-        elements.append(Spacer(1, 15 * mm))
-
-        # Notes
-        if settlement.notes:
-            elements.append(Paragraph(f"Notes: {settlement.notes}", normal_style))
-
-        doc.build(elements)
-        return buffer.getvalue()
+        Returns whether a PDF was rendered; the caller commits.
+        """
+        data = InvoiceData.from_settlement(settlement, clinic)
+        digest = data.digest()
+        if self._is_current(settlement, digest):
+            return False
+        await self._render_and_store(settlement, data, digest)
+        return True
+
+    @staticmethod
+    def _is_current(settlement: Settlement, digest: str) -> bool:
+        return bool(settlement.invoice_url) and settlement.invoice_digest == digest
+
+    async def _render_and_store(
+        self, settlement: Settlement, data: InvoiceData, digest: str
+    ) -> bytes:
+        if self.renderer is not None:
+            pdf = await self.renderer.render(data)
+        else:
+            pdf = render_invoice(data)
+
+        previous_url = settlement.invoice_url
+        settlement.invoice_url = await storage_service.upload(
+            pdf,
+            f"invoice-{data.period}.pdf",
+            "application/pdf",
+            settlement.clinic_id,
+            category="invoices",
+        )
+        settlement.invoice_digest = digest
+        if previous_url:
+            await storage_service.delete(previous_url)
+        return pdf
+
+
+# Singleton (API processes)
+invoice_renderer = InvoiceRenderer()
@@ -2,54 +2,172 @@
 
 Uses hybrid search: vector similarity first, keyword fallback when embeddings
 are unavailable or return insufficient results.
+
+When built with a session factory, the four lookups (FAQ, procedures, medical
+terms, clinic manual) run concurrently on their own sessions, each bounded by a
+per-source timeout; a slow or failing source contributes an empty result
+instead of failing the whole assembly. The query embedding they share is
+bounded by the same timeout; past it the searches fall back to keywords.
+
+When built with a snapshot store, keyword searches and the clinic manual are
+served from a per-clinic in-memory snapshot (see knowledge_snapshot), so only
+vector searches reach Postgres.
 """
 
+import asyncio
 import logging
 import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
 
 from sqlalchemy import or_, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import joinedload
 
+from app.config import settings
 from app.core.query_utils import escape_like
 from app.models.clinic_procedure import ClinicProcedure
 from app.models.medical_term import MedicalTerm
 from app.models.procedure import Procedure
 from app.models.response_library import ResponseLibrary
+from app.services.knowledge_snapshot import ClinicKnowledgeSnapshot, KnowledgeSnapshotStore
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CLINIC_MANUAL = "클리닉 매뉴얼이 등록되지 않았습니다."
+
 
 class KnowledgeService:
     """Assembles knowledge context from response_library, procedures, and medical_terms."""
 
-    def __init__(self, db: AsyncSession, vector_retriever=None):
+    def __init__(
+        self,
+        db: AsyncSession,
+        vector_retriever=None,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+        source_timeout: float | None = None,
+        snapshot_store: KnowledgeSnapshotStore | None = None,
+    ):
         self.db = db
         self._retriever = vector_retriever
+        self._session_factory = session_factory
+        self._source_timeout = source_timeout or settings.knowledge_source_timeout_seconds
+        self._snapshot_store = snapshot_store
+        self._snapshot: ClinicKnowledgeSnapshot | None = None
 
     async def assemble_knowledge(self, clinic_id: uuid.UUID, query: str) -> dict:
         """Build knowledge context for an AI consultation query.
 
         Returns {"rag_results": str, "clinic_manual": str}.
         """
-        faqs = await self._search_response_library(clinic_id, query)
-        procedures = await self._search_procedures(clinic_id, query)
-        terms = await self._search_medical_terms(clinic_id, query)
+        if self._snapshot_store is not None:
+            try:
+                self._snapshot = await self._snapshot_store.get(self.db, clinic_id)
+            except Exception:
+                logger.exception("Knowledge snapshot load failed, querying directly")
+
+        # With a snapshot and no retriever there is no DB work left to fan out
+        needs_db = self._snapshot is None or self._retriever is not None
+        if self._session_factory is not None and needs_db:
+            return await self._assemble_concurrently(clinic_id, query)
+
+        # Embed once and share the vector across all three vector searches
+        query_embedding = await self._embed_query(query)
+
+        faqs = await self._search_response_library(clinic_id, query, query_embedding)
+        procedures = await self._search_procedures(clinic_id, query, query_embedding)
+        terms = await self._search_medical_terms(clinic_id, query, query_embedding)
 
         return {
             "rag_results": self._format_rag_results(faqs, procedures, terms),
             "clinic_manual": await self._load_clinic_manual(clinic_id),
         }
 
+    async def _assemble_concurrently(self, clinic_id: uuid.UUID, query: str) -> dict:
+        """Fan the four lookups out on separate sessions with per-source timeouts."""
+        # The manual does not depend on the query, so start it before embedding
+        manual_task = asyncio.create_task(
+            self._run_isolated(
+                "clinic_manual", lambda svc: svc._load_clinic_manual(clinic_id), ""
+            )
+        )
+        query_embedding = await self._embed_query(query)
+
+        faqs, procedures, terms = await asyncio.gather(
+            self._run_isolated(
+                "response_library",
+                lambda svc: svc._search_response_library(clinic_id, query, query_embedding),
+                [],
+            ),
+            self._run_isolated(
+                "procedures",
+                lambda svc: svc._search_procedures(clinic_id, query, query_embedding),
+                [],
+            ),
+            self._run_isolated(
+                "medical_terms",
+                lambda svc: svc._search_medical_terms(clinic_id, query, query_embedding),
+                [],
+            ),
+        )
+
+        return {
+            "rag_results": self._format_rag_results(faqs, procedures, terms),
+            "clinic_manual": await manual_task,
+        }
+
+    async def _run_isolated(
+        self,
+        source: str,
+        lookup: Callable[["KnowledgeService"], Awaitable[Any]],
+        fallback: Any,
+    ) -> Any:
+        """Run one lookup on its own session; return *fallback* on timeout or error."""
+        try:
+            async with asyncio.timeout(self._source_timeout):
+                async with self._session_factory() as session:
+                    retriever = self._retriever.bind(session) if self._retriever else None
+                    scoped = KnowledgeService(session, vector_retriever=retriever)
+                    scoped._snapshot = self._snapshot
+                    return await lookup(scoped)
+        except TimeoutError:
+            logger.warning(
+                "Knowledge source %s timed out after %.1fs", source, self._source_timeout
+            )
+        except Exception:
+            logger.exception("Knowledge source %s failed", source)
+        return fallback
+
+    async def _embed_query(self, query: str) -> list[float] | None:
+        """Embed the query once for all vector searches.
+
+        None without a retriever, or when embedding fails or exceeds the
+        source timeout.
+        """
+        if not self._retriever:
+            return None
+        try:
+            async with asyncio.timeout(self._source_timeout):
+                return await self._retriever.embed_query(query)
+        except TimeoutError:
+            logger.warning("Query embedding timed out after %.1fs", self._source_timeout)
+            return None
+        except Exception:
+            logger.exception("Query embedding failed")
+            return None
+
     async def _search_response_library(
-        self, clinic_id: uuid.UUID, query: str
+        self,
+        clinic_id: uuid.UUID,
+        query: str,
+        query_embedding: list[float] | None = None,
     ) -> list[ResponseLibrary]:
         """Hybrid search: vector first, keyword fallback."""
         vector_results = []
-        if self._retriever:
+        if self._retriever and query_embedding is not None:
             try:
                 vector_results = await self._retriever.search_response_library(
-                    clinic_id, query, limit=5
+                    clinic_id, query, limit=5, query_embedding=query_embedding
                 )
             except Exception:
                 logger.exception("Vector search failed for response_library")
@@ -76,6 +194,8 @@ class KnowledgeService:
         keywords = self._extract_keywords(query)
         if not keywords:
             return []
+        if self._snapshot is not None:
+            return self._snapshot.search_faqs(keywords, limit=5)
 
         conditions = [
             or_(
@@ -97,14 +217,17 @@ class KnowledgeService:
         return list(result.scalars().all())
 
     async def _search_procedures(
-        self, clinic_id: uuid.UUID, query: str
+        self,
+        clinic_id: uuid.UUID,
+        query: str,
+        query_embedding: list[float] | None = None,
     ) -> list[dict]:
         """Hybrid search for procedures linked to the clinic."""
         vector_procs = []
-        if self._retriever:
+        if self._retriever and query_embedding is not None:
             try:
                 vector_procs = await self._retriever.search_procedures(
-                    clinic_id, query, limit=5
+                    clinic_id, query, limit=5, query_embedding=query_embedding
                 )
             except Exception:
                 logger.exception("Vector search failed for procedures")
@@ -146,6 +269,8 @@ class KnowledgeService:
         keywords = self._extract_keywords(query)
         if not keywords:
             return []
+        if self._snapshot is not None:
+            return self._snapshot.search_procedures(keywords, limit=5)
 
         conditions = []
         for kw in keywords:
@@ -187,14 +312,17 @@ class KnowledgeService:
         return results
 
     async def _search_medical_terms(
-        self, clinic_id: uuid.UUID, query: str
+        self,
+        clinic_id: uuid.UUID,
+        query: str,
+        query_embedding: list[float] | None = None,
     ) -> list[MedicalTerm]:
         """Hybrid search for medical terms."""
         vector_results = []
-        if self._retriever:
+        if self._retriever and query_embedding is not None:
             try:
                 vector_results = await self._retriever.search_medical_terms(
-                    clinic_id, query, limit=10
+                    clinic_id, query, limit=10, query_embedding=query_embedding
                 )
             except Exception:
                 logger.exception("Vector search failed for medical_terms")
@@ -221,6 +349,8 @@ class KnowledgeService:
         keywords = self._extract_keywords(query)
         if not keywords:
             return []
+        if self._snapshot is not None:
+            return self._snapshot.search_terms(keywords, limit=10)
 
         conditions = [
             MedicalTerm.term_ko.ilike(f"%{escape_like(kw)}%", escape="\\")
@@ -281,6 +411,9 @@ class KnowledgeService:
 
     async def _load_clinic_manual(self, clinic_id: uuid.UUID) -> str:
         """Load clinic manual from response_library general entries."""
+        if self._snapshot is not None:
+            return self._snapshot.manual
+
         result = await self.db.execute(
             select(ResponseLibrary)
             .where(
@@ -288,11 +421,13 @@ class KnowledgeService:
                 ResponseLibrary.is_active.is_(True),
                 ResponseLibrary.category == "general",
             )
+            # Same order as the snapshot, so the prompt prefix stays byte-identical
+            .order_by(ResponseLibrary.created_at, ResponseLibrary.id)
             .limit(20)
         )
         entries = result.scalars().all()
         if not entries:
-            return "클리닉 매뉴얼이 등록되지 않았습니다."
+            return DEFAULT_CLINIC_MANUAL
 
         lines = [f"Q: {e.question}\nA: {e.answer}" for e in entries]
         return "\n\n".join(lines)
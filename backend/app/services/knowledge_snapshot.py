@@ -0,0 +1,341 @@
+"""Per-clinic knowledge snapshots held in worker memory.
+
+A snapshot holds everything KnowledgeService's keyword searches and clinic
+manual need for one clinic: the manual text, active FAQ entries, active clinic
+procedures with their overrides already merged, and clinic + global medical
+terms. Keyword matching then runs in-process instead of ILIKE-scanning
+Postgres on every message. It also carries the clinic's compiled translation
+glossary (MedicalTermMatcher); on reload, languages whose terms did not
+change keep their compiled pattern.
+
+Invalidation:
+- CRUD routers call publish_knowledge_changed() after committing. This bumps
+  a Redis version counter and publishes on KNOWLEDGE_CHANGED_CHANNEL.
+- Processes running the pub/sub listener (the API) drop snapshots as soon as
+  the event arrives.
+- Processes without a listener (Celery workers) compare the snapshot version
+  with the Redis counter on each read, one GET instead of three queries.
+- Every snapshot also expires after knowledge_snapshot_ttl_seconds as a
+  safety net when Redis is unavailable.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.ai.chains.translation_chain import MedicalTermMatcher
+from app.config import settings
+from app.core.redis import get_listener_redis, get_redis, pipelined
+from app.models.clinic_procedure import ClinicProcedure
+from app.models.medical_term import MedicalTerm
+from app.models.procedure import Procedure
+from app.models.response_library import ResponseLibrary
+from app.services.term_service import build_term_dict, load_term_dict
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_CHANGED_CHANNEL = "knowledge:changed"
+VERSION_KEY_PREFIX = "knowledge:version:"
+GLOBAL_SCOPE = "global"
+
+MANUAL_ENTRY_LIMIT = 20
+
+
+@dataclass(frozen=True)
+class FaqEntry:
+    id: uuid.UUID
+    category: str
+    question: str
+    answer: str
+
+
+@dataclass(frozen=True)
+class TermEntry:
+    id: uuid.UUID
+    term_ko: str
+    description: str | None
+
+
+@dataclass(frozen=True)
+class ProcedureEntry:
+    info: dict
+    # Base procedure fields matched by keyword search (name_ko/en/ja, description_ko)
+    search_fields: tuple[str, ...]
+
+
+def _matches(fields: tuple[str | None, ...], keywords: list[str]) -> bool:
+    """Case-insensitive substring match, mirroring ``ILIKE '%kw%'``."""
+    lowered = [f.lower() for f in fields if f]
+    return any(kw.lower() in f for kw in keywords for f in lowered)
+
+
+@dataclass
+class ClinicKnowledgeSnapshot:
+    """Immutable view of one clinic's keyword-searchable knowledge."""
+
+    clinic_id: uuid.UUID
+    version: tuple[int, int] | None
+    loaded_at: float
+    manual: str
+    faqs: list[FaqEntry] = field(default_factory=list)
+    procedures: list[ProcedureEntry] = field(default_factory=list)
+    terms: list[TermEntry] = field(default_factory=list)
+    term_matcher: MedicalTermMatcher = field(
+        default_factory=lambda: MedicalTermMatcher({})
+    )
+
+    def search_faqs(self, keywords: list[str], limit: int = 5) -> list[FaqEntry]:
+        if not keywords:
+            return []
+        hits = [f for f in self.faqs if _matches((f.question, f.answer), keywords)]
+        return hits[:limit]
+
+    def search_procedures(self, keywords: list[str], limit: int = 5) -> list[dict]:
+        if not keywords:
+            return []
+        hits = [p.info for p in self.procedures if _matches(p.search_fields, keywords)]
+        return [dict(info) for info in hits[:limit]]
+
+    def search_terms(self, keywords: list[str], limit: int = 10) -> list[TermEntry]:
+        if not keywords:
+            return []
+        hits = [t for t in self.terms if _matches((t.term_ko,), keywords)]
+        return hits[:limit]
+
+
+async def load_snapshot(
+    db: AsyncSession,
+    clinic_id: uuid.UUID,
+    version: tuple[int, int] | None = None,
+    previous_matcher: MedicalTermMatcher | None = None,
+) -> ClinicKnowledgeSnapshot:
+    """Load a clinic's knowledge from Postgres into a snapshot (3 queries)."""
+    faq_rows = await db.execute(
+        select(
+            ResponseLibrary.id,
+            ResponseLibrary.category,
+            ResponseLibrary.question,
+            ResponseLibrary.answer,
+        )
+        .where(
+            ResponseLibrary.clinic_id == clinic_id,
+            ResponseLibrary.is_active.is_(True),
+        )
+        .order_by(ResponseLibrary.created_at, ResponseLibrary.id)
+    )
+    faqs = [FaqEntry(*row) for row in faq_rows.all()]
+
+    cp_result = await db.execute(
+        select(ClinicProcedure)
+        .where(
+            ClinicProcedure.clinic_id == clinic_id,
+            ClinicProcedure.is_active.is_(True),
+        )
+        .options(joinedload(ClinicProcedure.procedure).defer(Procedure.embedding))
+        .order_by(ClinicProcedure.created_at, ClinicProcedure.id)
+    )
+    procedures = []
+    for cp in cp_result.unique().scalars().all():
+        proc = cp.procedure
+        procedures.append(
+            ProcedureEntry(
+                info={
+                    "name": proc.name_ko,
+                    "name_en": proc.name_en,
+                    "description": cp.custom_description or proc.description_ko or "",
+                    "effects": cp.custom_effects or proc.effects_ko or "",
+                    "duration_minutes": cp.custom_duration_minutes or proc.duration_minutes,
+                    "downtime_days": cp.custom_downtime_days or proc.downtime_days,
+                    "precautions_after": cp.custom_precautions_after
+                    or proc.precautions_after
+                    or "",
+                },
+                search_fields=(
+                    proc.name_ko,
+                    proc.name_en or "",
+                    proc.name_ja or "",
+                    proc.description_ko or "",
+                ),
+            )
+        )
+
+    term_rows = await db.execute(
+        select(
+            MedicalTerm.id,
+            MedicalTerm.term_ko,
+            MedicalTerm.description,
+            MedicalTerm.clinic_id,
+            MedicalTerm.translations,
+        )
+        .where(
+            or_(
+                MedicalTerm.clinic_id == clinic_id,
+                MedicalTerm.clinic_id.is_(None),
+            ),
+            MedicalTerm.is_active.is_(True),
+        )
+        .order_by(MedicalTerm.created_at, MedicalTerm.id)
+    )
+    term_rows = term_rows.all()
+    terms = [TermEntry(row.id, row.term_ko, row.description) for row in term_rows]
+    # Globals first so clinic terms override them, as in load_term_dict
+    term_dict = build_term_dict(
+        sorted(term_rows, key=lambda row: row.clinic_id is not None)
+    )
+
+    manual_entries = [f for f in faqs if f.category == "general"][:MANUAL_ENTRY_LIMIT]
+    if manual_entries:
+        manual = "\n\n".join(f"Q: {e.question}\nA: {e.answer}" for e in manual_entries)
+    else:
+        manual = "클리닉 매뉴얼이 등록되지 않았습니다."
+
+    return ClinicKnowledgeSnapshot(
+        clinic_id=clinic_id,
+        version=version,
+        loaded_at=time.monotonic(),
+        manual=manual,
+        faqs=faqs,
+        procedures=procedures,
+        terms=terms,
+        term_matcher=MedicalTermMatcher(term_dict, previous=previous_matcher),
+    )
+
+
+class KnowledgeSnapshotStore:
+    """Bounded per-process store of clinic knowledge snapshots."""
+
+    def __init__(self, max_clinics: int | None = None, ttl_seconds: int | None = None):
+        self.max_clinics = max_clinics or settings.knowledge_snapshot_max_clinics
+        self.ttl_seconds = ttl_seconds or settings.knowledge_snapshot_ttl_seconds
+        self._snapshots: OrderedDict[uuid.UUID, ClinicKnowledgeSnapshot] = OrderedDict()
+        # Outlive invalidation so a reload only recompiles changed languages
+        self._term_matchers: OrderedDict[uuid.UUID, MedicalTermMatcher] = OrderedDict()
+        self._pubsub = None
+        self._listener_task: asyncio.Task | None = None
+
+    @property
+    def listening(self) -> bool:
+        return self._listener_task is not None and not self._listener_task.done()
+
+    async def get(
+        self, db: AsyncSession, clinic_id: uuid.UUID
+    ) -> ClinicKnowledgeSnapshot:
+        """Return a fresh snapshot for the clinic, loading it on miss or staleness."""
+        cached = self._snapshots.get(clinic_id)
+        fresh = cached is not None and (
+            time.monotonic() - cached.loaded_at < self.ttl_seconds
+        )
+        if fresh and self.listening:
+            self._snapshots.move_to_end(clinic_id)
+            return cached
+
+        version = await self._read_version(clinic_id)
+        if fresh and cached.version == version:
+            self._snapshots.move_to_end(clinic_id)
+            return cached
+
+        snapshot = await load_snapshot(
+            db, clinic_id, version, self._term_matchers.get(clinic_id)
+        )
+        for store, value in (
+            (self._snapshots, snapshot),
+            (self._term_matchers, snapshot.term_matcher),
+        ):
+            store[clinic_id] = value
+            store.move_to_end(clinic_id)
+            while len(store) > self.max_clinics:
+                store.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, clinic_id: uuid.UUID | None = None) -> None:
+        """Drop one clinic's snapshot, or all snapshots when clinic_id is None."""
+        if clinic_id is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(clinic_id, None)
+
+    async def _read_version(self, clinic_id: uuid.UUID) -> tuple[int, int] | None:
+        """Read (global, clinic) version counters; None if Redis is unavailable."""
+        try:
+            # Auto-pipelined with the other lookups of the same knowledge assembly
+            global_v, clinic_v = await pipelined(
+                "mget",
+                f"{VERSION_KEY_PREFIX}{GLOBAL_SCOPE}",
+                f"{VERSION_KEY_PREFIX}{clinic_id}",
+            )
+            return int(global_v or 0), int(clinic_v or 0)
+        except Exception:
+            logger.debug("Knowledge version read failed for clinic=%s", clinic_id)
+            return None
+
+    async def start_listener(self):
+        """Subscribe to knowledge-changed events and evict snapshots on arrival."""
+        self._pubsub = get_listener_redis().pubsub()
+        await self._pubsub.subscribe(KNOWLEDGE_CHANGED_CHANNEL)
+        self._listener_task = asyncio.create_task(self._listen())
+        logger.info("Knowledge snapshot invalidation listener started")
+
+    async def stop_listener(self):
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        if self._pubsub:
+            await self._pubsub.unsubscribe()
+            await self._pubsub.aclose()
+
+    async def _listen(self):
+        try:
+            async for message in self._pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                scope = message["data"]
+                if scope == GLOBAL_SCOPE:
+                    self.invalidate(None)
+                else:
+                    try:
+                        self.invalidate(uuid.UUID(scope))
+                    except ValueError:
+                        logger.warning("Ignoring knowledge event with scope=%s", scope)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Knowledge snapshot listener crashed")
+
+
+# Process-wide store
+knowledge_snapshots = KnowledgeSnapshotStore()
+
+
+async def clinic_term_matcher(db: AsyncSession, clinic_id: uuid.UUID) -> MedicalTermMatcher:
+    """The clinic's compiled glossary, kept on its knowledge snapshot when enabled."""
+    if settings.knowledge_snapshot_enabled:
+        return (await knowledge_snapshots.get(db, clinic_id)).term_matcher
+    return MedicalTermMatcher(await load_term_dict(db, clinic_id))
+
+
+async def publish_knowledge_changed(clinic_id: uuid.UUID | None) -> None:
+    """Announce that a clinic's (or, with None, the global) knowledge changed.
+
+    Call after the change is committed. Also evicts the local snapshot so the
+    current process never serves stale data. Fails silently.
+    """
+    scope = GLOBAL_SCOPE if clinic_id is None else str(clinic_id)
+    knowledge_snapshots.invalidate(clinic_id)
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.incr(f"{VERSION_KEY_PREFIX}{scope}")
+            pipe.publish(KNOWLEDGE_CHANGED_CHANNEL, scope)
+            await pipe.execute()
+    except Exception:
+        logger.debug("Knowledge changed publish failed for scope=%s", scope)
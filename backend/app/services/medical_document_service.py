@@ -3,20 +3,25 @@ import logging
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import func, select
+from sqlalchemy import Select, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.exceptions import NotFoundError
+from app.core.pagination import Keyset, paginate_keyset
 from app.models.booking import Booking
 from app.models.clinic_procedure import ClinicProcedure
 from app.models.conversation import Conversation
 from app.models.medical_document import MedicalDocument
 from app.models.message import Message
 from app.models.procedure import Procedure
+from app.schemas.pagination import CursorPage, CursorParams
 
 logger = logging.getLogger(__name__)
 
+# Newest first; served by ix_medical_documents_clinic_created
+DOCUMENT_KEYSET = Keyset(MedicalDocument.created_at, MedicalDocument.id)
+
 CHART_DRAFT_PROMPT = """You are a medical chart assistant. Extract clinical information from the following consultation conversation.
 Return a JSON object with these fields:
 - chief_complaint: patient's main concern
@@ -179,51 +184,67 @@ class MedicalDocumentService:
         await self.db.flush()
         return doc
 
-    async def list_documents(
+    def _document_query(
         self,
         clinic_id: uuid.UUID,
         customer_id: uuid.UUID | None = None,
         booking_id: uuid.UUID | None = None,
         document_type: str | None = None,
-        limit: int = 20,
-        offset: int = 0,
-    ) -> tuple[list[MedicalDocument], int]:
-        """List medical documents with filters."""
+    ) -> Select:
         query = select(MedicalDocument).where(
             MedicalDocument.clinic_id == clinic_id
         )
-        count_query = select(func.count(MedicalDocument.id)).where(
-            MedicalDocument.clinic_id == clinic_id
-        )
-
         if customer_id:
             query = query.where(MedicalDocument.customer_id == customer_id)
-            count_query = count_query.where(
-                MedicalDocument.customer_id == customer_id
-            )
         if booking_id:
             query = query.where(MedicalDocument.booking_id == booking_id)
-            count_query = count_query.where(
-                MedicalDocument.booking_id == booking_id
-            )
         if document_type:
             query = query.where(MedicalDocument.document_type == document_type)
-            count_query = count_query.where(
-                MedicalDocument.document_type == document_type
-            )
+        return query
 
-        total_result = await self.db.execute(count_query)
+    async def list_documents(
+        self,
+        clinic_id: uuid.UUID,
+        customer_id: uuid.UUID | None = None,
+        booking_id: uuid.UUID | None = None,
+        document_type: str | None = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> tuple[list[MedicalDocument], int]:
+        """List medical documents with filters."""
+        query = self._document_query(clinic_id, customer_id, booking_id, document_type)
+
+        total_result = await self.db.execute(
+            select(func.count()).select_from(query.subquery())
+        )
         total = total_result.scalar() or 0
 
         result = await self.db.execute(
             query.options(selectinload(MedicalDocument.customer))
-            .order_by(MedicalDocument.created_at.desc())
+            .order_by(*DOCUMENT_KEYSET.order_by())
             .limit(limit)
             .offset(offset)
         )
         docs = list(result.scalars().all())
         return docs, total
 
+    async def page_documents(
+        self,
+        clinic_id: uuid.UUID,
+        page: CursorParams,
+        customer_id: uuid.UUID | None = None,
+        booking_id: uuid.UUID | None = None,
+        document_type: str | None = None,
+    ) -> CursorPage:
+        """Keyset-paginated list_documents."""
+        query = self._document_query(clinic_id, customer_id, booking_id, document_type)
+        return await paginate_keyset(
+            self.db,
+            query.options(selectinload(MedicalDocument.customer)),
+            DOCUMENT_KEYSET,
+            page,
+        )
+
     async def update_status(
         self,
         document_id: uuid.UUID,
@@ -1,15 +1,22 @@
 import uuid
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.core.exceptions import NotFoundError
+from app.core.pagination import Keyset
 from app.messenger.base import StandardMessage
 from app.models.conversation import Conversation
 from app.models.customer import Customer
 from app.models.message import Message
 
+# Thread order, newest first and oldest first; served by ix_messages_conversation_created
+NEWEST_FIRST = Keyset(Message.created_at, Message.id)
+OLDEST_FIRST = Keyset(Message.created_at, Message.id, descending=False)
+
 
 @dataclass
 class ProcessingResult:
@@ -34,7 +41,9 @@ class MessageService:
         # 2. Conversation upsert
         conversation, is_new = await self._get_or_create_conversation(msg, customer)
 
-        # 3. Save message
+        # 3. Save message, stamped here: a webhook batch shares one transaction,
+        # so now() would give its messages equal created_at
+        received_at = datetime.now(timezone.utc)
         message = Message(
             id=uuid.uuid4(),
             conversation_id=conversation.id,
@@ -47,11 +56,12 @@ class MessageService:
             messenger_message_id=msg.messenger_message_id,
             original_language=customer.language_code,
             attachments=msg.attachments if msg.attachments else [],
+            created_at=received_at,
         )
         self.db.add(message)
 
         # 4. Update conversation metadata
-        conversation.last_message_at = datetime.now(timezone.utc)
+        conversation.last_message_at = received_at
         conversation.last_message_preview = msg.content[:200] if msg.content else ""
         conversation.unread_count = Conversation.unread_count + 1
 
@@ -117,3 +127,64 @@ class MessageService:
             return conversation, True
 
         return conversation, False
+
+    async def get_history(
+        self,
+        conversation_id: uuid.UUID,
+        limit: int,
+        before: uuid.UUID | None = None,
+        after: uuid.UUID | None = None,
+        since: uuid.UUID | None = None,
+    ) -> tuple[list[Message], bool]:
+        """A window of a conversation's messages, oldest first.
+
+        Without a cursor, the latest `limit` messages. With `before`, the
+        `limit` messages preceding that message; with `after`, the `limit`
+        messages following it. Returns (messages, has_more), where has_more
+        says whether the thread continues beyond the window in the
+        direction being read.
+
+        `since` is `after` for delta sync. created_at is stamped before the
+        writing transaction commits, so a message can become visible after
+        a later-stamped one the client already holds; since also returns
+        messages stamped up to message_delta_overlap_seconds before that
+        message, and the client drops the ones it has.
+        """
+        keyset = OLDEST_FIRST if after or since else NEWEST_FIRST
+        query = (
+            select(Message)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(*keyset.order_by())
+            .limit(limit + 1)
+        )
+        anchor = after or before
+        if anchor:
+            query = query.where(
+                keyset.after_row(*await self._position(conversation_id, anchor))
+            )
+        elif since:
+            created_at, _ = await self._position(conversation_id, since)
+            overlap = timedelta(seconds=settings.message_delta_overlap_seconds)
+            query = query.where(Message.created_at > created_at - overlap, Message.id != since)
+
+        result = await self.db.execute(query)
+        messages = list(result.scalars().all())
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if keyset is NEWEST_FIRST:
+            messages.reverse()
+        return messages, has_more
+
+    async def _position(
+        self, conversation_id: uuid.UUID, message_id: uuid.UUID
+    ) -> tuple[datetime, uuid.UUID]:
+        result = await self.db.execute(
+            select(Message.created_at, Message.id).where(
+                Message.id == message_id,
+                Message.conversation_id == conversation_id,
+            )
+        )
+        position = result.one_or_none()
+        if position is None:
+            raise NotFoundError("Message not found")
+        return position.created_at, position.id
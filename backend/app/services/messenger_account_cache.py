@@ -0,0 +1,181 @@
+"""In-process cache of messenger accounts for the webhook routes.
+
+Every webhook delivery starts by resolving its account; accounts almost
+never change, so the routes read a MessengerAccountSnapshot from
+messenger_accounts instead of querying Postgres per event. A snapshot
+carries what verification and parsing need: the credentials and, for the
+HMAC-signed platforms (Meta, LINE), a keyed HMAC object that each request
+copies instead of re-deriving the key.
+
+Invalidation follows app.services.knowledge_snapshot:
+- The messenger-accounts router calls publish_messenger_account_changed()
+  after committing an update or delete, which evicts the local entry and
+  publishes on MESSENGER_ACCOUNT_CHANGED_CHANNEL.
+- API processes run the pub/sub listener and evict on arrival.
+- Entries expire after messenger_account_cache_ttl_seconds regardless, as
+  a safety net when Redis is unavailable.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.redis import get_listener_redis, get_redis
+from app.models.messenger_account import MessengerAccount
+
+logger = logging.getLogger(__name__)
+
+MESSENGER_ACCOUNT_CHANGED_CHANNEL = "messenger_accounts:changed"
+ALL_ACCOUNTS = "all"
+
+META_MESSENGER_TYPES = frozenset({"instagram", "facebook", "whatsapp"})
+
+
+@dataclass(frozen=True)
+class MessengerAccountSnapshot:
+    """Read-only view of a MessengerAccount; adapters accept it in its place."""
+
+    id: uuid.UUID
+    clinic_id: uuid.UUID
+    messenger_type: str
+    credentials: Mapping
+    webhook_secret: str | None
+    is_active: bool
+    signing_key: "hmac.HMAC | None"
+    loaded_at: float
+
+    @classmethod
+    def from_account(cls, account: MessengerAccount) -> "MessengerAccountSnapshot":
+        credentials = dict(account.credentials or {})
+        return cls(
+            id=account.id,
+            clinic_id=account.clinic_id,
+            messenger_type=account.messenger_type,
+            credentials=MappingProxyType(credentials),
+            webhook_secret=account.webhook_secret,
+            is_active=account.is_active,
+            signing_key=_signing_key(
+                account.messenger_type, credentials, account.webhook_secret
+            ),
+            loaded_at=time.monotonic(),
+        )
+
+
+def _signing_key(
+    messenger_type: str, credentials: dict, webhook_secret: str | None
+) -> "hmac.HMAC | None":
+    """Keyed HMAC-SHA256 for webhook signatures, or None if not HMAC-signed."""
+    if messenger_type in META_MESSENGER_TYPES:
+        secret = credentials.get("app_secret", "")
+    elif messenger_type == "line":
+        secret = credentials.get("channel_secret", webhook_secret or "")
+    else:
+        return None
+    return hmac.new(secret.encode(), digestmod=hashlib.sha256)
+
+
+class MessengerAccountCache:
+    """Bounded per-process TTL cache of MessengerAccountSnapshots."""
+
+    def __init__(self, max_entries: int | None = None, ttl_seconds: int | None = None):
+        self.max_entries = max_entries or settings.messenger_account_cache_max_entries
+        self.ttl_seconds = ttl_seconds or settings.messenger_account_cache_ttl_seconds
+        self._entries: OrderedDict[uuid.UUID, MessengerAccountSnapshot] = OrderedDict()
+        self._pubsub = None
+        self._listener_task: asyncio.Task | None = None
+
+    async def get(
+        self, db: AsyncSession, account_id: uuid.UUID
+    ) -> MessengerAccountSnapshot | None:
+        """Return the account's snapshot, loading it on miss or expiry."""
+        cached = self._entries.get(account_id)
+        if cached is not None and time.monotonic() - cached.loaded_at < self.ttl_seconds:
+            self._entries.move_to_end(account_id)
+            return cached
+
+        result = await db.execute(
+            select(MessengerAccount).where(MessengerAccount.id == account_id)
+        )
+        account = result.scalar_one_or_none()
+        if account is None:
+            self._entries.pop(account_id, None)
+            return None
+
+        snapshot = MessengerAccountSnapshot.from_account(account)
+        self._entries[account_id] = snapshot
+        self._entries.move_to_end(account_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, account_id: uuid.UUID | None = None) -> None:
+        """Drop one account, or every account when account_id is None."""
+        if account_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(account_id, None)
+
+    async def start_listener(self):
+        """Subscribe to account-changed events and evict entries on arrival."""
+        self._pubsub = get_listener_redis().pubsub()
+        await self._pubsub.subscribe(MESSENGER_ACCOUNT_CHANGED_CHANNEL)
+        self._listener_task = asyncio.create_task(self._listen())
+        logger.info("Messenger account cache invalidation listener started")
+
+    async def stop_listener(self):
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        if self._pubsub:
+            await self._pubsub.unsubscribe()
+            await self._pubsub.aclose()
+
+    async def _listen(self):
+        try:
+            async for message in self._pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                scope = message["data"]
+                if scope == ALL_ACCOUNTS:
+                    self.invalidate(None)
+                else:
+                    try:
+                        self.invalidate(uuid.UUID(scope))
+                    except ValueError:
+                        logger.warning("Ignoring account event with scope=%s", scope)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Messenger account cache listener crashed")
+
+
+# Singleton
+messenger_accounts = MessengerAccountCache()
+
+
+async def publish_messenger_account_changed(account_id: uuid.UUID) -> None:
+    """Announce that an account changed or was deleted.
+
+    Call after the change is committed. Also evicts the local entry so the
+    current process never serves stale data. Fails silently.
+    """
+    messenger_accounts.invalidate(account_id)
+    try:
+        await get_redis().publish(MESSENGER_ACCOUNT_CHANGED_CHANNEL, str(account_id))
+    except Exception:
+        logger.debug("Messenger account changed publish failed for account=%s", account_id)
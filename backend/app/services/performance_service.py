@@ -1,9 +1,11 @@
 import uuid
 from decimal import Decimal
 
-from sqlalchemy import extract, func, select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.query_utils import in_month, in_shard
 from app.models.booking import Booking
 from app.models.clinic import Clinic
 from app.models.consultation_performance import ConsultationPerformance
@@ -53,31 +55,116 @@ class PerformanceService:
         if perf is not None:
             return perf
 
-        # Count consultations (conversations created in period)
+        # Count consultations, bookings and completed payments in period
         consult_count = await self._count(
             Conversation.id,
             Conversation.clinic_id == clinic_id,
-            extract("year", Conversation.created_at) == year,
-            extract("month", Conversation.created_at) == month,
+            *in_month(Conversation.created_at, year, month),
         )
-
-        # Count bookings in period
         booking_count = await self._count(
             Booking.id,
             Booking.clinic_id == clinic_id,
-            extract("year", Booking.created_at) == year,
-            extract("month", Booking.created_at) == month,
+            *in_month(Booking.created_at, year, month),
         )
-
-        # Count completed payments in period
         payment_count = await self._count(
             Payment.id,
             Payment.clinic_id == clinic_id,
             Payment.status == "completed",
-            extract("year", Payment.paid_at) == year,
-            extract("month", Payment.paid_at) == month,
+            *in_month(Payment.paid_at, year, month),
+        )
+
+        perf = ConsultationPerformance(
+            **self._performance_values(
+                clinic_id, year, month, consult_count, booking_count, payment_count
+            )
         )
+        self.db.add(perf)
+        await self.db.flush()
+        return perf
+
+    async def calculate_all_performance(
+        self,
+        year: int,
+        month: int,
+        shard: int = 0,
+        shards: int = 1,
+    ) -> list[ConsultationPerformance]:
+        """Calculate or return existing performance for all active clinics.
+
+        Each metric is one grouped query across the clinics still missing a
+        row for the period, and the new rows go in with a single INSERT.
+        With shards > 1 only clinics hashing to *shard* are handled.
+        """
+        clinic_filters = [Clinic.is_active.is_(True)]
+        if shards > 1:
+            clinic_filters.append(in_shard(Clinic.id, shard, shards))
+
+        calculated = select(ConsultationPerformance.id).where(
+            ConsultationPerformance.clinic_id == Clinic.id,
+            ConsultationPerformance.period_year == year,
+            ConsultationPerformance.period_month == month,
+        )
+        pending = await self.db.execute(
+            select(Clinic.id).where(*clinic_filters, ~calculated.exists())
+        )
+        clinic_ids = list(pending.scalars().all())
+
+        if clinic_ids:
+            consults = await self._count_by_clinic(
+                Conversation.clinic_id,
+                Conversation.clinic_id.in_(clinic_ids),
+                *in_month(Conversation.created_at, year, month),
+            )
+            bookings = await self._count_by_clinic(
+                Booking.clinic_id,
+                Booking.clinic_id.in_(clinic_ids),
+                *in_month(Booking.created_at, year, month),
+            )
+            payments = await self._count_by_clinic(
+                Payment.clinic_id,
+                Payment.clinic_id.in_(clinic_ids),
+                Payment.status == "completed",
+                *in_month(Payment.paid_at, year, month),
+            )
+            # A concurrent or retried run may have calculated a clinic meanwhile
+            await self.db.execute(
+                insert(ConsultationPerformance).on_conflict_do_nothing(
+                    index_elements=["clinic_id", "period_year", "period_month"]
+                ),
+                [
+                    self._performance_values(
+                        clinic_id,
+                        year,
+                        month,
+                        consults.get(clinic_id, 0),
+                        bookings.get(clinic_id, 0),
+                        payments.get(clinic_id, 0),
+                    )
+                    for clinic_id in clinic_ids
+                ],
+            )
 
+        result = await self.db.execute(
+            select(ConsultationPerformance)
+            .join(Clinic, Clinic.id == ConsultationPerformance.clinic_id)
+            .where(
+                *clinic_filters,
+                ConsultationPerformance.period_year == year,
+                ConsultationPerformance.period_month == month,
+            )
+        )
+        return list(result.scalars().all())
+
+    def _performance_values(
+        self,
+        clinic_id: uuid.UUID,
+        year: int,
+        month: int,
+        consult_count: int,
+        booking_count: int,
+        payment_count: int,
+    ) -> dict:
+        """Rates and scores for a period's counts, as column values."""
         # Calculate rates
         booking_rate = (
             (booking_count / consult_count * 100) if consult_count > 0 else 0.0
@@ -98,29 +185,33 @@ class PerformanceService:
         payment_score = Decimal(
             str(rate_to_score(payment_rate, self.PAYMENT_THRESHOLDS))
         )
-        total_score = sales_mix_score + booking_score + payment_score
 
-        perf = ConsultationPerformance(
-            id=uuid.uuid4(),
-            clinic_id=clinic_id,
-            period_year=year,
-            period_month=month,
-            total_score=total_score,
-            sales_mix_score=sales_mix_score,
-            booking_conversion_score=booking_score,
-            booking_conversion_rate=Decimal(str(round(booking_rate, 2))),
-            payment_conversion_score=payment_score,
-            payment_conversion_rate=Decimal(str(round(payment_rate, 2))),
-            total_consultations=consult_count,
-            total_bookings=booking_count,
-            total_payments=payment_count,
-        )
-        self.db.add(perf)
-        await self.db.flush()
-        return perf
+        return {
+            "id": uuid.uuid4(),
+            "clinic_id": clinic_id,
+            "period_year": year,
+            "period_month": month,
+            "total_score": sales_mix_score + booking_score + payment_score,
+            "sales_mix_score": sales_mix_score,
+            "booking_conversion_score": booking_score,
+            "booking_conversion_rate": Decimal(str(round(booking_rate, 2))),
+            "payment_conversion_score": payment_score,
+            "payment_conversion_rate": Decimal(str(round(payment_rate, 2))),
+            "total_consultations": consult_count,
+            "total_bookings": booking_count,
+            "total_payments": payment_count,
+        }
 
     async def _count(self, column, *filters) -> int:
         result = await self.db.execute(
             select(func.count(column)).where(*filters)
         )
         return result.scalar() or 0
+
+    async def _count_by_clinic(self, clinic_column, *filters) -> dict[uuid.UUID, int]:
+        result = await self.db.execute(
+            select(clinic_column, func.count())
+            .where(*filters)
+            .group_by(clinic_column)
+        )
+        return dict(result.all())
@@ -0,0 +1,72 @@
+"""Resized, metadata-free variants of treatment photos for galleries.
+
+render_variants() is CPU-bound and runs in the Celery media workers (see
+app.tasks.media), never on the API event loop. Each variant is scaled to fit
+a square of the given edge, auto-rotated from its EXIF orientation and
+re-encoded without EXIF/GPS or other metadata.
+"""
+
+import io
+from dataclasses import dataclass
+
+from PIL import Image, ImageOps
+
+from app.config import settings
+
+# Variant name -> longest edge in pixels, smallest first
+VARIANT_EDGES = {"thumb": 320, "medium": 1280}
+
+# Sizes a client can ask for, smallest first; "original" is the upload
+PHOTO_SIZES = ("thumb", "medium", "original")
+
+_CONTENT_TYPES = {"WEBP": "image/webp", "JPEG": "image/jpeg"}
+
+
+@dataclass(frozen=True)
+class Variant:
+    name: str
+    data: bytes
+    content_type: str
+    extension: str
+
+
+def render_variants(data: bytes, image_format: str | None = None) -> list[Variant]:
+    """Decode an upload once and encode every variant in VARIANT_EDGES."""
+    image_format = (image_format or settings.photo_variant_format).upper()
+    with Image.open(io.BytesIO(data)) as original:
+        original.draft("RGB", (max(VARIANT_EDGES.values()),) * 2)  # fast JPEG downscale
+        image = ImageOps.exif_transpose(original).convert("RGB")
+
+    variants = []
+    for name, edge in VARIANT_EDGES.items():
+        resized = image.copy()
+        resized.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        # No exif= argument: nothing from the original's metadata is written
+        resized.save(buffer, image_format, quality=settings.photo_variant_quality)
+        variants.append(
+            Variant(
+                name=name,
+                data=buffer.getvalue(),
+                content_type=_CONTENT_TYPES[image_format],
+                extension=".webp" if image_format == "WEBP" else ".jpg",
+            )
+        )
+    return variants
+
+
+def variant_url(photo, size: str) -> str:
+    """URL of the smallest stored variant at least as large as *size*.
+
+    Falls back to larger variants (ultimately the original) while
+    derivatives are still being generated.
+    """
+    urls = {
+        "thumb": photo.thumbnail_url,
+        "medium": photo.medium_url,
+        "original": photo.photo_url,
+    }
+    for candidate in PHOTO_SIZES[PHOTO_SIZES.index(size):]:
+        if urls[candidate]:
+            return urls[candidate]
+    return photo.photo_url
@@ -10,9 +10,10 @@ Calculates churn risk score (0-100) for each customer based on:
 import uuid
 from datetime import date, datetime, timedelta, timezone
 
-from sqlalchemy import func, select
+import numpy as np
+from sqlalchemy import Integer, column, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.models.booking import Booking
 from app.models.clinic_procedure import ClinicProcedure
@@ -21,6 +22,9 @@ from app.models.payment import Payment
 from app.models.procedure import Procedure
 from app.models.satisfaction_survey import SatisfactionSurvey
 
+# Rows per bulk UPDATE statement (2 bind params each; asyncpg caps at 32767)
+SCORE_UPDATE_CHUNK = 5000
+
 
 class RevisitPredictionService:
     def __init__(self, db: AsyncSession):
@@ -32,112 +36,173 @@ class RevisitPredictionService:
         min_risk: int = 30,
         limit: int = 50,
     ) -> list[dict]:
-        """Get customers sorted by churn risk score."""
-        # Get all customers with completed bookings
-        result = await self.db.execute(
+        """Get customers sorted by churn risk score.
+
+        Features for every customer come from one query, scores are computed
+        for all customers at once, and the returned customers' cached
+        churn_risk_score is written back with a single bulk UPDATE.
+        """
+        rows = (await self.db.execute(self._churn_features_query(clinic_id))).all()
+        if not rows:
+            return []
+
+        today = date.today()
+        last_visits = np.array([r.last_visit for r in rows], dtype="datetime64[D]")
+        days_since = (np.datetime64(today, "D") - last_visits).astype(np.int64)
+        expected = np.array(
+            [r.min_interval_days or 0 for r in rows], dtype=np.int64
+        )
+        visit_counts = np.array([r.visit_count for r in rows], dtype=np.int64)
+        intentions = np.array([r.revisit_intention for r in rows], dtype=object)
+
+        scores = self._calculate_risk_scores(
+            days_since_last_visit=days_since,
+            expected_revisit_days=expected,
+            visit_count=visit_counts,
+            revisit_intention=intentions,
+        )
+        overdue = np.where(
+            (expected > 0) & (days_since > expected), days_since - expected, 0
+        )
+
+        # Highest risk first; stable so ties keep query order
+        selected = np.flatnonzero(scores >= min_risk)
+        selected = selected[np.argsort(-scores[selected], kind="stable")]
+
+        customers = []
+        for i in selected.tolist():
+            row = rows[i]
+            score = int(scores[i])
+            customers.append({
+                "customer_id": row.id,
+                "customer_name": row.name,
+                "country_code": row.country_code,
+                "last_visit": row.last_visit,
+                "days_since_last_visit": int(days_since[i]),
+                "visit_count": row.visit_count,
+                "total_payments": float(row.total_payments),
+                "procedure_name": row.procedure_name,
+                "expected_revisit_days": row.min_interval_days,
+                "overdue_days": int(overdue[i]),
+                "churn_risk_score": score,
+                "risk_level": self._risk_level(score),
+                "revisit_intention": row.revisit_intention,
+            })
+
+        customers = customers[:limit]
+
+        # Update cached scores on customer records
+        await self._store_scores(
+            [(c["customer_id"], c["churn_risk_score"]) for c in customers]
+        )
+
+        return customers
+
+    @staticmethod
+    def _churn_features_query(clinic_id: uuid.UUID):
+        """Per-customer churn features for a clinic, as a single statement.
+
+        Columns: id, name, country_code, last_visit, visit_count,
+        total_payments, procedure_name, min_interval_days, revisit_intention.
+        Only customers with at least one completed booking are returned.
+        """
+        completed = (
+            Booking.clinic_id == clinic_id,
+            Booking.status == "completed",
+        )
+
+        visits = (
             select(
-                Customer.id,
-                Customer.name,
-                Customer.country_code,
+                Booking.customer_id,
                 func.max(Booking.booking_date).label("last_visit"),
                 func.count(func.distinct(Booking.booking_date)).label("visit_count"),
-                func.coalesce(func.sum(Payment.amount), 0).label("total_payments"),
-            )
-            .select_from(Customer)
-            .join(Booking, Booking.customer_id == Customer.id)
-            .outerjoin(Payment, Payment.customer_id == Customer.id)
-            .where(
-                Customer.clinic_id == clinic_id,
-                Booking.clinic_id == clinic_id,
-                Booking.status == "completed",
             )
-            .group_by(Customer.id, Customer.name, Customer.country_code)
+            .where(*completed)
+            .group_by(Booking.customer_id)
+            .subquery("visits")
         )
-        rows = result.all()
-
-        customers = []
-        today = date.today()
 
-        for row in rows:
-            last_visit = row.last_visit
-            if not last_visit:
-                continue
+        # Procedure of each customer's most recent completed booking
+        last_procedure = (
+            select(
+                Booking.customer_id,
+                Procedure.name_ko.label("procedure_name"),
+                Procedure.min_interval_days,
+            )
+            .join(ClinicProcedure, Booking.clinic_procedure_id == ClinicProcedure.id)
+            .join(Procedure, ClinicProcedure.procedure_id == Procedure.id)
+            .where(*completed)
+            .distinct(Booking.customer_id)
+            .order_by(
+                Booking.customer_id,
+                Booking.booking_date.desc(),
+                Booking.created_at.desc(),
+            )
+            .subquery("last_procedure")
+        )
 
-            days_since = (today - last_visit).days
-
-            # Get last procedure's min_interval_days
-            proc_result = await self.db.execute(
-                select(Procedure.name_ko, Procedure.min_interval_days)
-                .select_from(Booking)
-                .join(ClinicProcedure, Booking.clinic_procedure_id == ClinicProcedure.id)
-                .join(Procedure, ClinicProcedure.procedure_id == Procedure.id)
-                .where(
-                    Booking.customer_id == row.id,
-                    Booking.clinic_id == clinic_id,
-                    Booking.status == "completed",
-                )
-                .order_by(Booking.booking_date.desc())
-                .limit(1)
+        # Latest answered revisit intention
+        last_survey = (
+            select(
+                SatisfactionSurvey.customer_id,
+                SatisfactionSurvey.revisit_intention,
             )
-            proc_row = proc_result.one_or_none()
-            procedure_name = proc_row.name_ko if proc_row else None
-            expected_days = proc_row.min_interval_days if proc_row else None
-
-            # Get revisit intention from latest survey
-            survey_result = await self.db.execute(
-                select(SatisfactionSurvey.revisit_intention)
-                .where(
-                    SatisfactionSurvey.customer_id == row.id,
-                    SatisfactionSurvey.clinic_id == clinic_id,
-                    SatisfactionSurvey.revisit_intention.isnot(None),
-                )
-                .order_by(SatisfactionSurvey.created_at.desc())
-                .limit(1)
+            .where(
+                SatisfactionSurvey.clinic_id == clinic_id,
+                SatisfactionSurvey.revisit_intention.isnot(None),
             )
-            revisit_intention = survey_result.scalar_one_or_none()
-
-            # Calculate churn risk score
-            score = self._calculate_risk_score(
-                days_since_last_visit=days_since,
-                expected_revisit_days=expected_days,
-                visit_count=row.visit_count,
-                revisit_intention=revisit_intention,
-                total_payments=float(row.total_payments),
+            .distinct(SatisfactionSurvey.customer_id)
+            .order_by(
+                SatisfactionSurvey.customer_id,
+                SatisfactionSurvey.created_at.desc(),
             )
+            .subquery("last_survey")
+        )
 
-            overdue = 0
-            if expected_days and days_since > expected_days:
-                overdue = days_since - expected_days
-
-            if score >= min_risk:
-                customers.append({
-                    "customer_id": row.id,
-                    "customer_name": row.name,
-                    "country_code": row.country_code,
-                    "last_visit": last_visit,
-                    "days_since_last_visit": days_since,
-                    "visit_count": row.visit_count,
-                    "total_payments": float(row.total_payments),
-                    "procedure_name": procedure_name,
-                    "expected_revisit_days": expected_days,
-                    "overdue_days": overdue,
-                    "churn_risk_score": score,
-                    "risk_level": self._risk_level(score),
-                    "revisit_intention": revisit_intention,
-                })
-
-        # Sort by risk score descending
-        customers.sort(key=lambda x: x["churn_risk_score"], reverse=True)
+        payments = (
+            select(
+                Payment.customer_id,
+                func.sum(Payment.amount).label("total_payments"),
+            )
+            .where(Payment.clinic_id == clinic_id)
+            .group_by(Payment.customer_id)
+            .subquery("payments")
+        )
 
-        # Update cached scores on customer records
-        for c in customers[:limit]:
-            await self.db.execute(
-                Customer.__table__.update()
-                .where(Customer.id == c["customer_id"])
-                .values(churn_risk_score=c["churn_risk_score"])
+        return (
+            select(
+                Customer.id,
+                Customer.name,
+                Customer.country_code,
+                visits.c.last_visit,
+                visits.c.visit_count,
+                func.coalesce(payments.c.total_payments, 0).label("total_payments"),
+                last_procedure.c.procedure_name,
+                last_procedure.c.min_interval_days,
+                last_survey.c.revisit_intention,
             )
+            .join(visits, visits.c.customer_id == Customer.id)
+            .outerjoin(last_procedure, last_procedure.c.customer_id == Customer.id)
+            .outerjoin(last_survey, last_survey.c.customer_id == Customer.id)
+            .outerjoin(payments, payments.c.customer_id == Customer.id)
+            .where(Customer.clinic_id == clinic_id)
+        )
 
-        return customers[:limit]
+    async def _store_scores(self, scores: list[tuple[uuid.UUID, int]]) -> None:
+        """Write churn_risk_score for many customers with one UPDATE ... FROM (VALUES)."""
+        for start in range(0, len(scores), SCORE_UPDATE_CHUNK):
+            chunk = scores[start:start + SCORE_UPDATE_CHUNK]
+            new_scores = values(
+                column("id", UUID(as_uuid=True)),
+                column("score", Integer),
+                name="new_scores",
+            ).data(chunk)
+            await self.db.execute(
+                update(Customer)
+                .where(Customer.id == new_scores.c.id)
+                .values(churn_risk_score=new_scores.c.score)
+                .execution_options(synchronize_session=False)
+            )
 
     async def get_revisit_summary(self, clinic_id: uuid.UUID) -> dict:
         """Get summary of revisit predictions."""
@@ -178,74 +243,63 @@ class RevisitPredictionService:
         }
 
     @staticmethod
-    def _calculate_risk_score(
+    def _calculate_risk_scores(
         *,
-        days_since_last_visit: int,
-        expected_revisit_days: int | None,
-        visit_count: int,
-        revisit_intention: str | None,
-        total_payments: float,
-    ) -> int:
-        """Calculate churn risk score (0-100).
+        days_since_last_visit: np.ndarray,
+        expected_revisit_days: np.ndarray,
+        visit_count: np.ndarray,
+        revisit_intention: np.ndarray,
+    ) -> np.ndarray:
+        """Churn risk scores (0-100) for arrays of customers.
 
         Factors:
         - Overdue ratio (40 points): How far past expected revisit
         - Visit frequency (20 points): Single visit = higher risk
         - Revisit intention (25 points): From satisfaction survey
         - Recency (15 points): Base time since last visit
+
+        expected_revisit_days uses 0 for "no interval data", which falls back
+        to a default 90-day cycle.
         """
-        score = 0
-
-        # 1. Overdue ratio (40 points)
-        if expected_revisit_days and expected_revisit_days > 0:
-            overdue_ratio = days_since_last_visit / expected_revisit_days
-            if overdue_ratio > 2.0:
-                score += 40
-            elif overdue_ratio > 1.5:
-                score += 30
-            elif overdue_ratio > 1.0:
-                score += 20
-            elif overdue_ratio > 0.8:
-                score += 10
-        else:
-            # No interval data — use default 90-day cycle
-            if days_since_last_visit > 180:
-                score += 40
-            elif days_since_last_visit > 120:
-                score += 30
-            elif days_since_last_visit > 90:
-                score += 20
-            elif days_since_last_visit > 60:
-                score += 10
+        days = days_since_last_visit
+        has_interval = expected_revisit_days > 0
+        overdue_ratio = np.divide(
+            days,
+            expected_revisit_days,
+            out=np.zeros(days.shape, dtype=float),
+            where=has_interval,
+        )
+
+        # 1. Overdue ratio (40 points), or the default 90-day cycle
+        overdue_points = np.where(
+            has_interval,
+            np.select(
+                [overdue_ratio > 2.0, overdue_ratio > 1.5, overdue_ratio > 1.0,
+                 overdue_ratio > 0.8],
+                [40, 30, 20, 10],
+                0,
+            ),
+            np.select([days > 180, days > 120, days > 90, days > 60], [40, 30, 20, 10], 0),
+        )
 
         # 2. Visit frequency (20 points)
-        if visit_count == 1:
-            score += 20  # Single-visit customers are highest risk
-        elif visit_count == 2:
-            score += 12
-        elif visit_count <= 4:
-            score += 5
-        # 5+ visits = loyal, no additional risk
-
-        # 3. Revisit intention (25 points)
-        if revisit_intention == "no":
-            score += 25
-        elif revisit_intention == "maybe":
-            score += 12
-        elif revisit_intention == "yes":
-            score += 0
-        else:
-            score += 8  # Unknown = some risk
+        frequency_points = np.select(
+            [visit_count == 1, visit_count == 2, visit_count <= 4], [20, 12, 5], 0
+        )
+
+        # 3. Revisit intention (25 points); unknown = 8
+        intention_points = np.select(
+            [revisit_intention == "no", revisit_intention == "maybe",
+             revisit_intention == "yes"],
+            [25, 12, 0],
+            8,
+        )
 
         # 4. Recency (15 points)
-        if days_since_last_visit > 365:
-            score += 15
-        elif days_since_last_visit > 180:
-            score += 10
-        elif days_since_last_visit > 90:
-            score += 5
-
-        return min(score, 100)
+        recency_points = np.select([days > 365, days > 180, days > 90], [15, 10, 5], 0)
+
+        total = overdue_points + frequency_points + intention_points + recency_points
+        return np.minimum(total, 100).astype(np.int64)
 
     @staticmethod
     def _risk_level(score: int) -> str:
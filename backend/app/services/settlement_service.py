@@ -1,13 +1,43 @@
 import uuid
 from decimal import Decimal
 
-from sqlalchemy import extract, func, select
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.query_utils import in_month, in_shard
 from app.models.clinic import Clinic
 from app.models.payment import Payment
 from app.models.settlement import Settlement
 
+VAT_RATE = Decimal("0.10")
+
+
+def _settlement_values(
+    clinic_id: uuid.UUID,
+    commission_rate: Decimal,
+    year: int,
+    month: int,
+    total_amount: Decimal,
+    total_count: int,
+) -> dict:
+    """Column values of a new pending settlement."""
+    commission = total_amount * (commission_rate / Decimal("100"))
+    vat = commission * VAT_RATE
+    return {
+        "id": uuid.uuid4(),
+        "clinic_id": clinic_id,
+        "period_year": year,
+        "period_month": month,
+        "total_payment_amount": total_amount,
+        "commission_rate": commission_rate,
+        "commission_amount": commission,
+        "vat_amount": vat,
+        "total_settlement": commission + vat,
+        "total_payment_count": total_count,
+        "status": "pending",
+    }
+
 
 class SettlementService:
     """Monthly settlement calculation for clinics."""
@@ -45,46 +75,87 @@ class SettlementService:
             ).where(
                 Payment.clinic_id == clinic_id,
                 Payment.status == "completed",
-                extract("year", Payment.paid_at) == year,
-                extract("month", Payment.paid_at) == month,
+                *in_month(Payment.paid_at, year, month),
             )
         )
         row = agg_result.one()
-        total_amount = row[0] or Decimal("0.00")
-        total_count = row[1] or 0
-
-        # Calculate commission and VAT
-        commission = total_amount * (clinic.commission_rate / Decimal("100"))
-        vat = commission * Decimal("0.10")
 
         settlement = Settlement(
-            id=uuid.uuid4(),
-            clinic_id=clinic_id,
-            period_year=year,
-            period_month=month,
-            total_payment_amount=total_amount,
-            commission_rate=clinic.commission_rate,
-            commission_amount=commission,
-            vat_amount=vat,
-            total_settlement=commission + vat,
-            total_payment_count=total_count,
-            status="pending",
+            **_settlement_values(
+                clinic_id,
+                clinic.commission_rate,
+                year,
+                month,
+                row[0] or Decimal("0.00"),
+                row[1] or 0,
+            )
         )
         self.db.add(settlement)
         await self.db.flush()
         return settlement
 
     async def generate_all_settlements(
-        self, year: int, month: int
+        self,
+        year: int,
+        month: int,
+        shard: int = 0,
+        shards: int = 1,
     ) -> list[Settlement]:
-        """Generate settlements for all active clinics."""
-        clinic_result = await self.db.execute(
-            select(Clinic).where(Clinic.is_active.is_(True))
+        """Generate settlements for all active clinics.
+
+        One grouped payment query covers every clinic still missing a
+        settlement for the period and the new rows go in with a single
+        INSERT, so the cost does not grow with a query per clinic. With
+        shards > 1 only clinics hashing to *shard* are handled, letting
+        several workers split the month-end run.
+        """
+        clinic_filters = [Clinic.is_active.is_(True)]
+        if shards > 1:
+            clinic_filters.append(in_shard(Clinic.id, shard, shards))
+
+        settled = select(Settlement.id).where(
+            Settlement.clinic_id == Clinic.id,
+            Settlement.period_year == year,
+            Settlement.period_month == month,
+        )
+        agg_result = await self.db.execute(
+            select(
+                Clinic.id,
+                Clinic.commission_rate,
+                func.coalesce(func.sum(Payment.amount), Decimal("0.00")),
+                func.count(Payment.id),
+            )
+            .outerjoin(
+                Payment,
+                and_(
+                    Payment.clinic_id == Clinic.id,
+                    Payment.status == "completed",
+                    *in_month(Payment.paid_at, year, month),
+                ),
+            )
+            .where(*clinic_filters, ~settled.exists())
+            .group_by(Clinic.id, Clinic.commission_rate)
         )
-        clinics = clinic_result.scalars().all()
+        values = [
+            _settlement_values(clinic_id, rate, year, month, total, count)
+            for clinic_id, rate, total, count in agg_result.all()
+        ]
+        if values:
+            # A concurrent or retried run may have settled a clinic meanwhile
+            await self.db.execute(
+                insert(Settlement).on_conflict_do_nothing(
+                    index_elements=["clinic_id", "period_year", "period_month"]
+                ),
+                values,
+            )
 
-        settlements = []
-        for clinic in clinics:
-            s = await self.generate_monthly_settlement(clinic.id, year, month)
-            settlements.append(s)
-        return settlements
+        result = await self.db.execute(
+            select(Settlement)
+            .join(Clinic, Clinic.id == Settlement.clinic_id)
+            .where(
+                *clinic_filters,
+                Settlement.period_year == year,
+                Settlement.period_month == month,
+            )
+        )
+        return list(result.scalars().all())
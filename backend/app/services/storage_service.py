@@ -1,10 +1,27 @@
-"""File storage service with Azure Blob Storage and local filesystem fallback."""
+"""File storage service with Azure Blob Storage and local filesystem fallback.
 
+Uploads are streamed: callers pass an async iterator of chunks (see
+iter_upload_file), so a file is never held in memory whole and no blob I/O
+runs on the event loop.
+
+Backends:
+- AzureBlobBackend: the async Azure SDK. Small files go up in one request;
+  larger ones are cut into storage_block_size_bytes blocks, staged with up
+  to storage_upload_concurrency uploads in flight and then committed.
+- LocalStorageBackend: development and tests. File I/O runs in worker
+  threads and a file only appears under its final name once complete.
+"""
+
+import asyncio
+import base64
 import logging
 import os
 import uuid
+from collections.abc import AsyncIterator
 from datetime import datetime
 
+from fastapi import UploadFile
+
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -18,21 +35,219 @@ ALLOWED_FILE_TYPES = ALLOWED_IMAGE_TYPES | {
 }
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
+READ_CHUNK_SIZE = 256 * 1024
+
+
+class FileTooLargeError(ValueError):
+    def __init__(self, max_size: int = MAX_FILE_SIZE):
+        super().__init__(f"File too large (max {max_size // 1024 // 1024}MB)")
+
+
+async def iter_upload_file(
+    file: UploadFile, chunk_size: int = READ_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Yield an uploaded file's content chunk by chunk."""
+    while chunk := await file.read(chunk_size):
+        yield chunk
 
-class StorageService:
-    """Abstraction for file storage. Uses Azure Blob in production, local FS in dev."""
 
-    def __init__(self):
-        self._blob_client = None
+async def _iter_bytes(data: bytes) -> AsyncIterator[bytes]:
+    yield data
 
-    def _get_blob_service(self):
-        if self._blob_client is None and settings.azure_storage_connection_string:
-            from azure.storage.blob import BlobServiceClient
 
-            self._blob_client = BlobServiceClient.from_connection_string(
-                settings.azure_storage_connection_string
+async def _limit_size(chunks: AsyncIterator[bytes], max_size: int) -> AsyncIterator[bytes]:
+    total = 0
+    async for chunk in chunks:
+        total += len(chunk)
+        if total > max_size:
+            raise FileTooLargeError(max_size)
+        yield chunk
+
+
+async def _rechunk(chunks: AsyncIterator[bytes], size: int) -> AsyncIterator[bytes]:
+    """Regroup arbitrary chunks into blocks of exactly *size* bytes (last may be short)."""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= size:
+            yield bytes(buffer[:size])
+            del buffer[:size]
+    if buffer:
+        yield bytes(buffer)
+
+
+class LocalStorageBackend:
+    """Files under *root*, served from *url_prefix* (development fallback)."""
+
+    def __init__(self, root: str = "uploads", url_prefix: str = "/static/uploads/"):
+        self.root = root
+        self.url_prefix = url_prefix
+
+    async def write(
+        self, blob_name: str, chunks: AsyncIterator[bytes], content_type: str
+    ) -> str:
+        filepath = os.path.join(self.root, blob_name)
+        partial = f"{filepath}.part"
+        await asyncio.to_thread(os.makedirs, os.path.dirname(filepath), exist_ok=True)
+        f = await asyncio.to_thread(open, partial, "wb")
+        try:
+            async for chunk in chunks:
+                await asyncio.to_thread(f.write, chunk)
+            await asyncio.to_thread(f.close)
+            await asyncio.to_thread(os.replace, partial, filepath)
+        except BaseException:
+            await asyncio.to_thread(self._discard, f, partial)
+            raise
+        return f"{self.url_prefix}{blob_name}"
+
+    async def read(self, url: str) -> bytes | None:
+        """Content of the file behind *url*; None if the URL is not one of ours."""
+        if not url.startswith(self.url_prefix):
+            return None
+        filepath = os.path.join(self.root, url[len(self.url_prefix):])
+        with await asyncio.to_thread(open, filepath, "rb") as f:
+            return await asyncio.to_thread(f.read)
+
+    async def delete(self, url: str) -> bool:
+        """Delete the file behind *url*; False if the URL is not one of ours."""
+        if not url.startswith(self.url_prefix):
+            return False
+        filepath = os.path.join(self.root, url[len(self.url_prefix):])
+        try:
+            await asyncio.to_thread(os.remove, filepath)
+        except FileNotFoundError:
+            pass
+        return True
+
+    @staticmethod
+    def _discard(f, path: str) -> None:
+        f.close()
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class AzureBlobBackend:
+    """Azure Blob Storage through the async SDK.
+
+    The SDK's aiohttp transport is bound to the event loop it was created
+    on, so like http_clients a service client is kept per loop.
+    """
+
+    def __init__(self, connection_string: str, container: str):
+        self.connection_string = connection_string
+        self.container = container
+        self._clients: dict[int, tuple[asyncio.AbstractEventLoop, object]] = {}
+
+    def _container_client(self):
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(id(loop))
+        if entry is None or entry[0] is not loop:
+            from azure.storage.blob.aio import BlobServiceClient
+
+            for key, (owner, _client) in list(self._clients.items()):
+                if owner.is_closed():
+                    del self._clients[key]
+            entry = (loop, BlobServiceClient.from_connection_string(self.connection_string))
+            self._clients[id(loop)] = entry
+        return entry[1].get_container_client(self.container)
+
+    async def write(
+        self, blob_name: str, chunks: AsyncIterator[bytes], content_type: str
+    ) -> str:
+        from azure.storage.blob import ContentSettings
+
+        blob_client = self._container_client().get_blob_client(blob_name)
+        content_settings = ContentSettings(content_type=content_type)
+        blocks = _rechunk(chunks, settings.storage_block_size_bytes)
+
+        first = await anext(blocks, b"")
+        second = await anext(blocks, None)
+        if second is None:
+            await blob_client.upload_blob(
+                first, overwrite=True, content_settings=content_settings
             )
-        return self._blob_client
+            return blob_client.url
+
+        block_ids: list[str] = []
+        staged: list[asyncio.Task] = []
+        slots = asyncio.Semaphore(settings.storage_upload_concurrency)
+
+        async def stage(block_id: str, data: bytes) -> None:
+            try:
+                await blob_client.stage_block(block_id, data)
+            finally:
+                slots.release()
+
+        async def all_blocks() -> AsyncIterator[bytes]:
+            yield first
+            yield second
+            async for block in blocks:
+                yield block
+
+        try:
+            async for block in all_blocks():
+                # At most storage_upload_concurrency blocks are held in memory
+                await slots.acquire()
+                for task in staged:
+                    if task.done() and task.exception():
+                        raise task.exception()
+                block_id = base64.b64encode(f"{len(block_ids):08d}".encode()).decode()
+                block_ids.append(block_id)
+                staged.append(asyncio.create_task(stage(block_id, block)))
+            await asyncio.gather(*staged)
+        except BaseException:
+            for task in staged:
+                task.cancel()
+            raise
+
+        # Uncommitted blocks of a failed upload expire on the Azure side
+        await blob_client.commit_block_list(block_ids, content_settings=content_settings)
+        return blob_client.url
+
+    async def read(self, url: str) -> bytes | None:
+        if f"{self.container}/" not in url:
+            return None
+        blob_name = url.split(f"{self.container}/", 1)[1]
+        downloader = await self._container_client().download_blob(blob_name)
+        return await downloader.readall()
+
+    async def delete(self, url: str) -> bool:
+        if f"{self.container}/" not in url:
+            return False
+        blob_name = url.split(f"{self.container}/", 1)[1]
+        try:
+            await self._container_client().delete_blob(blob_name)
+        except Exception:
+            logger.warning("Failed to delete blob: %s", url)
+        return True
+
+    async def aclose(self) -> None:
+        """Close the client owned by the running loop (app shutdown hook)."""
+        entry = self._clients.pop(id(asyncio.get_running_loop()), None)
+        if entry is not None:
+            await entry[1].close()
+
+
+class StorageService:
+    """Abstraction for file storage. Uses Azure Blob in production, local FS in dev."""
+
+    def __init__(self, backend: LocalStorageBackend | AzureBlobBackend | None = None):
+        self._backend = backend
+        self._local = LocalStorageBackend()
+
+    @property
+    def backend(self) -> LocalStorageBackend | AzureBlobBackend:
+        if self._backend is None:
+            if settings.azure_storage_connection_string:
+                self._backend = AzureBlobBackend(
+                    settings.azure_storage_connection_string,
+                    settings.azure_storage_container,
+                )
+            else:
+                self._backend = self._local
+        return self._backend
 
     def _generate_blob_name(self, clinic_id: uuid.UUID, category: str, filename: str) -> str:
         """Generate a unique blob name: clinic_id/category/date/uuid-filename."""
@@ -49,68 +264,59 @@ class StorageService:
         clinic_id: uuid.UUID,
         category: str = "general",
     ) -> str:
-        """Upload a file and return its URL.
+        """Upload in-memory bytes and return the URL; see upload_stream."""
+        if len(file_data) > MAX_FILE_SIZE:
+            raise FileTooLargeError()
+        return await self.upload_stream(
+            _iter_bytes(file_data), filename, content_type, clinic_id, category
+        )
+
+    async def upload_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        content_type: str,
+        clinic_id: uuid.UUID,
+        category: str = "general",
+        max_size: int = MAX_FILE_SIZE,
+    ) -> str:
+        """Stream a file to storage and return its URL.
 
         Args:
-            file_data: File content bytes.
+            chunks: File content, e.g. iter_upload_file(upload).
             filename: Original filename.
             content_type: MIME type.
             clinic_id: Clinic that owns the file.
             category: Storage category (e.g. 'avatars', 'attachments', 'logos').
+            max_size: Size limit; FileTooLargeError is raised as soon as the
+                stream passes it and nothing is stored.
 
         Returns:
             Public URL of the uploaded file.
         """
-        if len(file_data) > MAX_FILE_SIZE:
-            raise ValueError(f"File too large (max {MAX_FILE_SIZE // 1024 // 1024}MB)")
-
         blob_name = self._generate_blob_name(clinic_id, category, filename)
-
-        blob_service = self._get_blob_service()
-        if blob_service:
-            return await self._upload_azure(blob_service, blob_name, file_data, content_type)
-        else:
-            return await self._upload_local(blob_name, file_data)
-
-    async def _upload_azure(self, blob_service, blob_name: str, data: bytes, content_type: str) -> str:
-        """Upload to Azure Blob Storage."""
-        from azure.storage.blob import ContentSettings
-
-        container_client = blob_service.get_container_client(settings.azure_storage_container)
-        blob_client = container_client.get_blob_client(blob_name)
-        blob_client.upload_blob(
-            data,
-            overwrite=True,
-            content_settings=ContentSettings(content_type=content_type),
+        return await self.backend.write(
+            blob_name, _limit_size(chunks, max_size), content_type
         )
-        return blob_client.url
 
-    async def _upload_local(self, blob_name: str, data: bytes) -> str:
-        """Fallback: save to local filesystem for development."""
-        upload_dir = os.path.join("uploads", os.path.dirname(blob_name))
-        os.makedirs(upload_dir, exist_ok=True)
-        filepath = os.path.join("uploads", blob_name)
-        with open(filepath, "wb") as f:
-            f.write(data)
-        return f"/static/uploads/{blob_name}"
+    async def read(self, url: str) -> bytes:
+        """Download a stored file by its URL."""
+        data = await self.backend.read(url)
+        if data is None and self.backend is not self._local:
+            data = await self._local.read(url)
+        if data is None:
+            raise FileNotFoundError(url)
+        return data
 
     async def delete(self, url: str) -> None:
         """Delete a file by its URL."""
-        blob_service = self._get_blob_service()
-        if blob_service and settings.azure_storage_container in url:
-            try:
-                # Extract blob name from URL
-                blob_name = url.split(f"{settings.azure_storage_container}/")[1]
-                container_client = blob_service.get_container_client(
-                    settings.azure_storage_container
-                )
-                container_client.delete_blob(blob_name)
-            except Exception:
-                logger.warning("Failed to delete blob: %s", url)
-        elif url.startswith("/static/uploads/"):
-            filepath = url.replace("/static/uploads/", "uploads/")
-            if os.path.exists(filepath):
-                os.remove(filepath)
+        if not await self.backend.delete(url) and self.backend is not self._local:
+            # Files uploaded before Azure was configured
+            await self._local.delete(url)
+
+    async def aclose(self) -> None:
+        if isinstance(self._backend, AzureBlobBackend):
+            await self._backend.aclose()
 
 
 # Singleton
@@ -1,5 +1,7 @@
 """Loads medical terms from DB into the dict format needed by TranslationChain."""
 
+from collections.abc import Iterable
+
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -31,11 +33,17 @@ async def load_term_dict(
             MedicalTerm.clinic_id.asc().nulls_first()
         )
     )
-    terms = result.scalars().all()
+    return build_term_dict(result.scalars().all())
+
 
+def build_term_dict(terms: Iterable) -> dict[str, dict[str, str]]:
+    """Build the term dict from objects with term_ko and translations.
+
+    Later terms win, so pass globals before clinic terms.
+    """
     term_dict: dict[str, dict[str, str]] = {}
     for term in terms:
-        for lang_code, foreign_text in term.translations.items():
+        for lang_code, foreign_text in (term.translations or {}).items():
             if lang_code not in term_dict:
                 term_dict[lang_code] = {}
             term_dict[lang_code][foreign_text] = term.term_ko
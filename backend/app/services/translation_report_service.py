@@ -3,12 +3,22 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import func, select
+from sqlalchemy import Select, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.ai.chains.translation_memory import translation_memory
 from app.core.exceptions import NotFoundError
+from app.core.pagination import Keyset, paginate_keyset
 from app.models.message import Message
 from app.models.translation_report import TranslationReport
+from app.schemas.pagination import CursorPage, CursorParams
+from app.services.knowledge_snapshot import clinic_term_matcher
+
+# Review outcomes whose corrected_text becomes the clinic's translation
+CORRECTION_STATUSES = ("reviewed", "resolved")
+
+# Newest first; served by ix_translation_reports_clinic_created
+REPORT_KEYSET = Keyset(TranslationReport.created_at, TranslationReport.id)
 
 
 class TranslationReportService:
@@ -49,39 +59,55 @@ class TranslationReportService:
         await self.db.flush()
         return report
 
-    async def list_reports(
+    def _report_query(
         self,
         clinic_id: uuid.UUID,
         status: str | None = None,
         severity: str | None = None,
-        limit: int = 20,
-        offset: int = 0,
-    ) -> tuple[list[TranslationReport], int]:
+    ) -> Select:
         query = select(TranslationReport).where(
             TranslationReport.clinic_id == clinic_id
         )
-        count_query = select(func.count(TranslationReport.id)).where(
-            TranslationReport.clinic_id == clinic_id
-        )
-
         if status:
             query = query.where(TranslationReport.status == status)
-            count_query = count_query.where(TranslationReport.status == status)
         if severity:
             query = query.where(TranslationReport.severity == severity)
-            count_query = count_query.where(TranslationReport.severity == severity)
+        return query
+
+    async def list_reports(
+        self,
+        clinic_id: uuid.UUID,
+        status: str | None = None,
+        severity: str | None = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> tuple[list[TranslationReport], int]:
+        query = self._report_query(clinic_id, status, severity)
 
-        total_result = await self.db.execute(count_query)
+        total_result = await self.db.execute(
+            select(func.count()).select_from(query.subquery())
+        )
         total = total_result.scalar() or 0
 
         result = await self.db.execute(
-            query.order_by(TranslationReport.created_at.desc())
+            query.order_by(*REPORT_KEYSET.order_by())
             .limit(limit)
             .offset(offset)
         )
         reports = list(result.scalars().all())
         return reports, total
 
+    async def page_reports(
+        self,
+        clinic_id: uuid.UUID,
+        page: CursorParams,
+        status: str | None = None,
+        severity: str | None = None,
+    ) -> CursorPage:
+        """Keyset-paginated list_reports."""
+        query = self._report_query(clinic_id, status, severity)
+        return await paginate_keyset(self.db, query, REPORT_KEYSET, page)
+
     async def review_report(
         self,
         report_id: uuid.UUID,
@@ -110,6 +136,26 @@ class TranslationReportService:
         await self.db.flush()
         return report
 
+    async def seed_translation_memory(self, report: TranslationReport) -> None:
+        """Serve the report's corrected_text for its source text from now on.
+
+        Call after commit. Incoming text is keyed the way TranslationChain
+        sends it to the LLM, i.e. with the clinic's medical terms marked up.
+        """
+        if not report.corrected_text or report.status not in CORRECTION_STATUSES:
+            return
+        source_text = report.original_text
+        if report.target_language == "ko":
+            matcher = await clinic_term_matcher(self.db, report.clinic_id)
+            source_text = matcher.replace_terms(source_text, report.source_language)
+        await translation_memory.correct(
+            source_text,
+            report.source_language,
+            report.target_language,
+            report.corrected_text,
+            report.clinic_id,
+        )
+
     async def get_qa_stats(self, clinic_id: uuid.UUID, days: int = 30) -> dict:
         """Get translation QA statistics."""
         from datetime import date, timedelta
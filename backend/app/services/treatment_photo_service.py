@@ -2,14 +2,19 @@
 
 import uuid
 
-from sqlalchemy import func, select
+from sqlalchemy import Select, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.exceptions import NotFoundError
+from app.core.pagination import Keyset, paginate_keyset
 from app.models.customer import Customer
 from app.models.procedure import Procedure
 from app.models.treatment_photo import TreatmentPhoto
+from app.schemas.pagination import CursorPage, CursorParams
+
+# Newest first; served by ix_treatment_photos_clinic_created
+PHOTO_KEYSET = Keyset(TreatmentPhoto.created_at, TreatmentPhoto.id)
 
 
 class TreatmentPhotoService:
@@ -51,53 +56,72 @@ class TreatmentPhotoService:
         await self.db.flush()
         return photo
 
-    async def list_photos(
+    def _photo_query(
         self,
         clinic_id: uuid.UUID,
         customer_id: uuid.UUID | None = None,
         booking_id: uuid.UUID | None = None,
         photo_type: str | None = None,
         portfolio_only: bool = False,
-        limit: int = 50,
-        offset: int = 0,
-    ) -> tuple[list[TreatmentPhoto], int]:
+    ) -> Select:
         query = select(TreatmentPhoto).where(
             TreatmentPhoto.clinic_id == clinic_id
         )
-        count_query = select(func.count(TreatmentPhoto.id)).where(
-            TreatmentPhoto.clinic_id == clinic_id
-        )
-
         if customer_id:
             query = query.where(TreatmentPhoto.customer_id == customer_id)
-            count_query = count_query.where(TreatmentPhoto.customer_id == customer_id)
         if booking_id:
             query = query.where(TreatmentPhoto.booking_id == booking_id)
-            count_query = count_query.where(TreatmentPhoto.booking_id == booking_id)
         if photo_type:
             query = query.where(TreatmentPhoto.photo_type == photo_type)
-            count_query = count_query.where(TreatmentPhoto.photo_type == photo_type)
         if portfolio_only:
             query = query.where(
                 TreatmentPhoto.is_portfolio_approved.is_(True),
                 TreatmentPhoto.is_consent_given.is_(True),
             )
-            count_query = count_query.where(
-                TreatmentPhoto.is_portfolio_approved.is_(True),
-                TreatmentPhoto.is_consent_given.is_(True),
-            )
+        return query
+
+    async def list_photos(
+        self,
+        clinic_id: uuid.UUID,
+        customer_id: uuid.UUID | None = None,
+        booking_id: uuid.UUID | None = None,
+        photo_type: str | None = None,
+        portfolio_only: bool = False,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> tuple[list[TreatmentPhoto], int]:
+        query = self._photo_query(
+            clinic_id, customer_id, booking_id, photo_type, portfolio_only
+        )
 
-        total_result = await self.db.execute(count_query)
+        total_result = await self.db.execute(
+            select(func.count()).select_from(query.subquery())
+        )
         total = total_result.scalar() or 0
 
         result = await self.db.execute(
-            query.order_by(TreatmentPhoto.created_at.desc())
+            query.order_by(*PHOTO_KEYSET.order_by())
             .limit(limit)
             .offset(offset)
         )
         photos = list(result.scalars().all())
         return photos, total
 
+    async def page_photos(
+        self,
+        clinic_id: uuid.UUID,
+        page: CursorParams,
+        customer_id: uuid.UUID | None = None,
+        booking_id: uuid.UUID | None = None,
+        photo_type: str | None = None,
+        portfolio_only: bool = False,
+    ) -> CursorPage:
+        """Keyset-paginated list_photos."""
+        query = self._photo_query(
+            clinic_id, customer_id, booking_id, photo_type, portfolio_only
+        )
+        return await paginate_keyset(self.db, query, PHOTO_KEYSET, page)
+
     async def get_photo(
         self, photo_id: uuid.UUID, clinic_id: uuid.UUID
     ) -> TreatmentPhoto:
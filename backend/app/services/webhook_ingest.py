@@ -0,0 +1,330 @@
+"""Fast-ack ingestion of messenger webhooks through a Redis stream.
+
+With webhook_ingest_mode = "stream" a webhook handler only verifies the
+signature and appends the raw body to WEBHOOK_STREAM (enqueue_webhook), so
+the platform gets its 200 in a few milliseconds whatever the database is
+doing. webhook_consumer runs a pool of consumer-group readers in each API
+process that parse and persist the queued payloads in batches:
+
+- one transaction per batch, one savepoint per message
+- a transaction-level advisory lock per (account, messenger user) holds
+  off other consumers until the batch commits, so one user's messages
+  are stored one consumer at a time and in stream order, and the
+  customer and conversation upserts do not race
+- a message already stored under the same (account, messenger user,
+  messenger_message_id) is skipped, so platform retries are harmless
+- entries are acknowledged only after the batch commits, and not at all
+  when one of their messages failed; pending entries are reclaimed after
+  webhook_ingest_claim_idle_ms and dropped after
+  webhook_ingest_max_deliveries attempts
+- Kakao payloads carry no message ID, so Kakao messages take theirs from
+  the stream entry ID and their timestamp from received_at
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import orjson
+from redis.exceptions import ResponseError
+from sqlalchemy import String, cast, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.redis import get_listener_redis, get_redis
+from app.messenger.base import StandardMessage
+from app.messenger.kakao import pin_to_delivery
+from app.middleware.metrics import WEBHOOK_INGEST_LAG, WEBHOOK_INGEST_MESSAGES
+from app.models.conversation import Conversation
+from app.models.customer import Customer
+from app.models.message import Message
+from app.models.messenger_account import MessengerAccount
+from app.services.ai_response_background import broadcast_incoming_message
+from app.services.message_service import MessageService, ProcessingResult
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_STREAM = "webhooks:incoming"
+CONSUMER_GROUP = "webhook-consumers"
+
+
+async def enqueue_webhook(provider: str, account_id: uuid.UUID, body: bytes) -> str:
+    """Durably queue a verified webhook body; returns the stream entry id.
+
+    provider is the webhook route ("telegram", "line", "kakao", "meta") and
+    becomes the prefix of the AI task idempotency key, as on the sync path.
+    """
+    return await get_redis().xadd(
+        WEBHOOK_STREAM,
+        {
+            "provider": provider,
+            "account_id": str(account_id),
+            "body": body.decode("utf-8"),
+            "received_at": repr(time.time()),
+        },
+        maxlen=settings.webhook_stream_maxlen,
+        approximate=True,
+    )
+
+
+@dataclass
+class _Incoming:
+    entry_id: str
+    provider: str
+    received_at: float
+    message: StandardMessage
+
+    @property
+    def sender_key(self) -> str:
+        msg = self.message
+        return f"{msg.account_id}:{msg.messenger_user_id}"
+
+    @property
+    def dedup_key(self) -> str:
+        return f"{self.sender_key}:{self.message.messenger_message_id}"
+
+
+class WebhookConsumer:
+    """Pool of stream readers persisting queued webhooks."""
+
+    def __init__(self, consumers: int | None = None):
+        self.consumers = consumers
+        self._tasks: list[asyncio.Task] = []
+        self._name = f"{socket.gethostname()}-{os.getpid()}"
+
+    async def start(self) -> None:
+        try:
+            await get_redis().xgroup_create(
+                WEBHOOK_STREAM, CONSUMER_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+        count = self.consumers or settings.webhook_ingest_consumers
+        self._tasks = [
+            asyncio.create_task(self._consume(f"{self._name}-{i}")) for i in range(count)
+        ]
+        logger.info("Webhook stream consumers started: %d", count)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _consume(self, consumer: str) -> None:
+        # Blocking reads hold their connection, so keep them off the shared pool
+        redis = get_listener_redis()
+        claim_interval = settings.webhook_ingest_claim_idle_ms / 1000
+        last_claim = 0.0
+        while True:
+            try:
+                entries = []
+                if time.monotonic() - last_claim >= claim_interval:
+                    # Entries a crashed consumer read but never acknowledged
+                    last_claim = time.monotonic()
+                    claimed = await redis.xautoclaim(
+                        WEBHOOK_STREAM,
+                        CONSUMER_GROUP,
+                        consumer,
+                        min_idle_time=settings.webhook_ingest_claim_idle_ms,
+                        count=settings.webhook_ingest_batch_size,
+                    )
+                    entries = claimed[1]
+                if not entries:
+                    response = await redis.xreadgroup(
+                        CONSUMER_GROUP,
+                        consumer,
+                        {WEBHOOK_STREAM: ">"},
+                        count=settings.webhook_ingest_batch_size,
+                        block=settings.webhook_ingest_block_ms,
+                    )
+                    entries = response[0][1] if response else []
+                if entries:
+                    _, failed = await self._process_batch(entries)
+                    done = [entry_id for entry_id, _ in entries if entry_id not in failed]
+                    done += await self._exhausted(failed)
+                    if done:
+                        await redis.xack(WEBHOOK_STREAM, CONSUMER_GROUP, *done)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Unacknowledged entries are reclaimed once they have idled
+                logger.exception("Webhook stream consumer %s failed a batch", consumer)
+                await asyncio.sleep(1.0)
+
+    async def process_batch(self, entries: list[tuple[str, dict]]) -> int:
+        """Persist a batch of stream entries; returns the number of new messages."""
+        stored, _ = await self._process_batch(entries)
+        return stored
+
+    async def _process_batch(self, entries: list[tuple[str, dict]]) -> tuple[int, set[str]]:
+        """Returns the number of new messages and the IDs of entries that failed."""
+        from app.core.database import async_session_factory
+
+        async with async_session_factory() as db:
+            try:
+                incoming = await self._parse(db, entries)
+                results, failed = await self._persist(db, incoming)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+
+        now = time.time()
+        for item, result in results:
+            WEBHOOK_INGEST_LAG.observe(now - item.received_at)
+            await self._after_commit(item, result)
+        return len(results), failed
+
+    async def _exhausted(self, failed: Iterable[str]) -> list[str]:
+        """Failed entries that have used up their deliveries and are dropped."""
+        exhausted = []
+        for entry_id in failed:
+            pending = await get_redis().xpending_range(
+                WEBHOOK_STREAM, CONSUMER_GROUP, min=entry_id, max=entry_id, count=1
+            )
+            if pending and pending[0]["times_delivered"] >= settings.webhook_ingest_max_deliveries:
+                logger.error("Webhook entry dropped after repeated failures: entry=%s", entry_id)
+                exhausted.append(entry_id)
+        return exhausted
+
+    async def _parse(
+        self, db: AsyncSession, entries: list[tuple[str, dict]]
+    ) -> list[_Incoming]:
+        from app.messenger.factory import MessengerAdapterFactory
+
+        # Entries trimmed from the stream before being reclaimed have no fields
+        entries = [(entry_id, fields) for entry_id, fields in entries if fields]
+        account_ids = {uuid.UUID(fields["account_id"]) for _, fields in entries}
+        result = await db.execute(
+            select(MessengerAccount).where(MessengerAccount.id.in_(account_ids))
+        )
+        accounts = {account.id: account for account in result.scalars().all()}
+
+        incoming = []
+        for entry_id, fields in entries:
+            account = accounts.get(uuid.UUID(fields["account_id"]))
+            if account is None:
+                logger.warning("Dropping webhook for deleted account: entry=%s", entry_id)
+                continue
+            try:
+                adapter = MessengerAdapterFactory.get_adapter(account.messenger_type)
+                messages = await adapter.parse_webhook(account, orjson.loads(fields["body"]))
+            except Exception:
+                logger.exception(
+                    "Unparseable webhook dropped: provider=%s entry=%s",
+                    fields["provider"],
+                    entry_id,
+                )
+                continue
+            received_at = float(fields["received_at"])
+            if account.messenger_type == "kakao":
+                delivered = datetime.fromtimestamp(received_at, tz=timezone.utc)
+                messages = [pin_to_delivery(msg, entry_id, delivered) for msg in messages]
+            incoming.extend(
+                _Incoming(entry_id, fields["provider"], received_at, msg) for msg in messages
+            )
+        return incoming
+
+    async def _persist(
+        self, db: AsyncSession, incoming: list[_Incoming]
+    ) -> tuple[list[tuple[_Incoming, ProcessingResult]], set[str]]:
+        if not incoming:
+            return [], set()
+
+        keys = sorted({item.sender_key for item in incoming})
+        # Serialize consumers handling the same sender until this batch commits;
+        # a sorted lock order keeps concurrent batches from deadlocking
+        await db.execute(
+            text(
+                "SELECT pg_advisory_xact_lock(hashtextextended(k, 0)) "
+                "FROM unnest(CAST(:keys AS text[])) AS k ORDER BY k"
+            ),
+            {"keys": keys},
+        )
+        seen = await self._stored_keys(db, incoming)
+
+        message_service = MessageService(db)
+        results = []
+        failed = set()
+        for item in incoming:
+            if item.dedup_key in seen:
+                WEBHOOK_INGEST_MESSAGES.labels(result="duplicate").inc()
+                continue
+            try:
+                async with db.begin_nested():
+                    result = await message_service.process_incoming(item.message)
+            except Exception:
+                # Left pending: the entry is retried once it has idled
+                failed.add(item.entry_id)
+                WEBHOOK_INGEST_MESSAGES.labels(result="failed").inc()
+                logger.exception(
+                    "Webhook message processing failed: provider=%s account_id=%s "
+                    "messenger_user=%s",
+                    item.provider,
+                    item.message.account_id,
+                    item.message.messenger_user_id,
+                )
+                continue
+            seen.add(item.dedup_key)
+            WEBHOOK_INGEST_MESSAGES.labels(result="stored").inc()
+            results.append((item, result))
+        return results, failed
+
+    async def _stored_keys(self, db: AsyncSession, incoming: list[_Incoming]) -> set[str]:
+        """Dedup keys of the batch's messages that are already stored."""
+        key = func.concat(
+            cast(Conversation.messenger_account_id, String),
+            ":",
+            Customer.messenger_user_id,
+            ":",
+            Message.messenger_message_id,
+        )
+        result = await db.execute(
+            select(key)
+            .select_from(Message)
+            .join(Conversation, Conversation.id == Message.conversation_id)
+            .join(Customer, Customer.id == Message.sender_id)
+            .where(
+                Message.sender_type == "customer",
+                Message.messenger_message_id.in_(
+                    {item.message.messenger_message_id for item in incoming}
+                ),
+                Conversation.messenger_account_id.in_(
+                    {item.message.account_id for item in incoming}
+                ),
+            )
+        )
+        return set(result.scalars().all())
+
+    async def _after_commit(self, item: _Incoming, result: ProcessingResult) -> None:
+        from app.tasks.ai_response import generate_ai_response
+
+        msg = item.message
+        try:
+            await broadcast_incoming_message(result.message, msg.clinic_id)
+            if msg.content_type == "text" and msg.content:
+                generate_ai_response.delay(
+                    message_id=str(result.message.id),
+                    conversation_id=str(result.conversation.id),
+                    idempotency_key=f"{item.provider}-{result.message.id}",
+                )
+        except Exception:
+            logger.exception(
+                "Post-ingest dispatch failed: message=%s", result.message.id
+            )
+
+
+# Singleton
+webhook_consumer = WebhookConsumer()
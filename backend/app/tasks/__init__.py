@@ -2,6 +2,7 @@
 
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_shutdown
 
 from app.config import settings
 
@@ -39,9 +40,13 @@ celery_app.conf.update(
     # Task routing
     task_routes={
         "app.tasks.ai_response.*": {"queue": "ai"},
+        # Consumed by the dedicated single-slot celery-worker-low
+        "app.tasks.analytics.analyze_ai_reply": {"queue": "low"},
         "app.tasks.crm_execution.*": {"queue": "default"},
         "app.tasks.message_delivery.*": {"queue": "default"},
         "app.tasks.notifications.*": {"queue": "default"},
+        "app.tasks.media.*": {"queue": "media"},
+        "app.tasks.analytics.render_settlement_invoices": {"queue": "media"},
     },
 
     # Dead letter
@@ -72,6 +77,19 @@ celery_app.conf.update(
             "task": "app.tasks.analytics.generate_monthly_settlements",
             "schedule": crontab(day_of_month=1, hour=3, minute=0),
         },
+        "render-settlement-invoices": {
+            "task": "app.tasks.analytics.render_settlement_invoices",
+            "schedule": crontab(hour=5, minute=0),
+        },
+        "refresh-analytics-rollups": {
+            "task": "app.tasks.analytics.refresh_analytics_rollups",
+            "schedule": 600.0,  # every 10 minutes
+        },
+        "rebuild-analytics-rollups": {
+            "task": "app.tasks.analytics.refresh_analytics_rollups",
+            "schedule": crontab(hour=4, minute=30),
+            "kwargs": {"rebuild": True},
+        },
         "summarize-conversations": {
             "task": "app.tasks.analytics.summarize_conversations",
             "schedule": crontab(minute=0),  # every hour
@@ -81,3 +99,13 @@ celery_app.conf.update(
 
 # Auto-discover tasks
 celery_app.autodiscover_tasks(["app.tasks"])
+
+
+@worker_process_shutdown.connect
+def _close_http_clients(**kwargs):
+    """Close pooled outbound HTTP and Redis clients held by this worker process."""
+    from app.core.redis import redis_pools
+    from app.core.resilience import http_clients
+
+    http_clients.close_all()
+    redis_pools.close_all()
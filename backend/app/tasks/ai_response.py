@@ -6,6 +6,7 @@ import uuid
 
 from celery import Task
 
+from app.config import settings
 from app.tasks import celery_app
 
 logger = logging.getLogger(__name__)
@@ -129,12 +130,24 @@ async def _run_ai_response(
                 db=db,
                 consultation_service=task.consultation_service,
                 translation_chain=task.translation_chain,
+                deferred_delivery=settings.ai_deferred_delivery,
+                session_factory=async_session_factory
+                if settings.ai_concurrent_side_work
+                else None,
+                deferred_analytics=settings.ai_deferred_analytics,
             )
             await service.generate_response(
                 message_id=message_id,
                 conversation_id=conversation_id,
             )
             await db.commit()
+
+            # Send after commit so the delivery task can see the saved reply;
+            # the typing delay is served by the broker countdown, not this worker.
+            if service.pending_delivery:
+                service.pending_delivery.schedule()
+            if service.pending_analytics:
+                service.pending_analytics.schedule()
             return {"status": "success", "message_id": str(message_id)}
         except Exception:
             await db.rollback()
@@ -1,11 +1,15 @@
-"""Celery tasks for periodic analytics: performance, settlements, conversation summaries."""
+"""Celery tasks for analytics: performance, settlements, rollups,
+conversation summaries, AI reply analysis.
+"""
 
 import asyncio
 import logging
+import uuid
 from datetime import datetime, timezone
 
 from celery import Task
 
+from app.config import settings
 from app.tasks import celery_app
 
 logger = logging.getLogger(__name__)
@@ -31,11 +35,29 @@ class AnalyticsTask(Task):
     soft_time_limit=300,
     time_limit=360,
 )
-def calculate_monthly_performance(self: AnalyticsTask) -> dict:
-    """Monthly task (1st of month): calculate previous month's consultation performance."""
-    logger.info("Monthly performance calculation started")
+def calculate_monthly_performance(
+    self: AnalyticsTask,
+    year: int | None = None,
+    month: int | None = None,
+    shard: int | None = None,
+) -> dict:
+    """Monthly task (1st of month): calculate previous month's consultation performance.
+
+    With settings.month_end_shards > 1 the beat run only fans out one task
+    per clinic shard.
+    """
+    if year is None or month is None:
+        year, month = _previous_month()
+    if shard is None and settings.month_end_shards > 1:
+        for i in range(settings.month_end_shards):
+            calculate_monthly_performance.delay(year, month, shard=i)
+        return {"year": year, "month": month, "shards": settings.month_end_shards}
+
+    logger.info("Monthly performance calculation started: shard=%s", shard)
     try:
-        result = self.loop.run_until_complete(_calculate_monthly_performance())
+        result = self.loop.run_until_complete(
+            _calculate_monthly_performance(year, month, shard or 0)
+        )
         logger.info("Monthly performance done: %s", result)
         return result
     except Exception as exc:
@@ -51,11 +73,28 @@ def calculate_monthly_performance(self: AnalyticsTask) -> dict:
     soft_time_limit=300,
     time_limit=360,
 )
-def generate_monthly_settlements(self: AnalyticsTask) -> dict:
-    """Monthly task (1st of month): generate previous month's settlements for all clinics."""
-    logger.info("Monthly settlements generation started")
+def generate_monthly_settlements(
+    self: AnalyticsTask,
+    year: int | None = None,
+    month: int | None = None,
+    shard: int | None = None,
+) -> dict:
+    """Monthly task (1st of month): generate previous month's settlements for all clinics.
+
+    Sharded like calculate_monthly_performance.
+    """
+    if year is None or month is None:
+        year, month = _previous_month()
+    if shard is None and settings.month_end_shards > 1:
+        for i in range(settings.month_end_shards):
+            generate_monthly_settlements.delay(year, month, shard=i)
+        return {"year": year, "month": month, "shards": settings.month_end_shards}
+
+    logger.info("Monthly settlements generation started: shard=%s", shard)
     try:
-        result = self.loop.run_until_complete(_generate_monthly_settlements())
+        result = self.loop.run_until_complete(
+            _generate_monthly_settlements(year, month, shard or 0)
+        )
         logger.info("Monthly settlements done: %s", result)
         return result
     except Exception as exc:
@@ -63,6 +102,55 @@ def generate_monthly_settlements(self: AnalyticsTask) -> dict:
         raise self.retry(exc=exc, countdown=120)
 
 
+@celery_app.task(
+    base=AnalyticsTask,
+    bind=True,
+    name="app.tasks.analytics.render_settlement_invoices",
+    max_retries=2,
+    soft_time_limit=1800,
+    time_limit=1900,
+)
+def render_settlement_invoices(
+    self: AnalyticsTask, year: int | None = None, month: int | None = None
+) -> dict:
+    """Daily task: pre-render invoice PDFs of a period's confirmed/paid settlements.
+
+    Defaults to the previous month. Invoices whose stored PDF is still
+    current are skipped, so repeated runs only render what changed.
+    """
+    if year is None or month is None:
+        year, month = _previous_month()
+    try:
+        result = self.loop.run_until_complete(_render_settlement_invoices(year, month))
+        logger.info("Settlement invoices rendered: %s", result)
+        return result
+    except Exception as exc:
+        logger.exception("Settlement invoice rendering failed")
+        raise self.retry(exc=exc, countdown=120)
+
+
+@celery_app.task(
+    base=AnalyticsTask,
+    bind=True,
+    name="app.tasks.analytics.refresh_analytics_rollups",
+    max_retries=1,
+    soft_time_limit=300,
+    time_limit=360,
+)
+def refresh_analytics_rollups(self: AnalyticsTask, rebuild: bool = False) -> dict:
+    """Every 10 minutes: refresh rollup days touched since the last run.
+
+    With rebuild=True (nightly), recompute the whole trailing window instead.
+    """
+    try:
+        result = self.loop.run_until_complete(_refresh_analytics_rollups(rebuild))
+        logger.info("Analytics rollup refresh done: %s", result)
+        return result
+    except Exception as exc:
+        logger.exception("Analytics rollup refresh failed")
+        raise self.retry(exc=exc, countdown=60)
+
+
 @celery_app.task(
     base=AnalyticsTask,
     bind=True,
@@ -83,59 +171,125 @@ def summarize_conversations(self: AnalyticsTask) -> dict:
         raise self.retry(exc=exc, countdown=60)
 
 
-async def _calculate_monthly_performance() -> dict:
+@celery_app.task(
+    base=AnalyticsTask,
+    bind=True,
+    name="app.tasks.analytics.analyze_ai_reply",
+    max_retries=1,
+    soft_time_limit=120,
+    time_limit=180,
+)
+def analyze_ai_reply(
+    self: AnalyticsTask,
+    conversation_id: str,
+    message_id: str,
+    ab_test_id: str | None = None,
+    ab_variant_id: str | None = None,
+) -> dict:
+    """Low-priority task: post-reply analytics for an AI response.
+
+    Satisfaction scoring, auto-summarization and A/B outcome recording, moved
+    off the reply path by AIResponseService in deferred-analytics mode.
+    """
+    try:
+        return self.loop.run_until_complete(
+            _analyze_ai_reply(conversation_id, message_id, ab_test_id, ab_variant_id)
+        )
+    except Exception as exc:
+        logger.exception("AI reply analytics failed: conversation=%s", conversation_id)
+        raise self.retry(exc=exc, countdown=60)
+
+
+async def _analyze_ai_reply(
+    conversation_id: str,
+    message_id: str,
+    ab_test_id: str | None,
+    ab_variant_id: str | None,
+) -> dict:
     from sqlalchemy import select
 
+    from app.ai.usage_tracker import UsageTracker
     from app.core.database import async_session_factory
-    from app.models.clinic import Clinic
-    from app.services.performance_service import PerformanceService
-
-    now = datetime.now(timezone.utc)
-    # Previous month
-    if now.month == 1:
-        year, month = now.year - 1, 12
-    else:
-        year, month = now.year, now.month - 1
+    from app.models.conversation import Conversation
+    from app.services.ai_response_service import AIResponseService
 
-    count = 0
     async with async_session_factory() as db:
         try:
             result = await db.execute(
-                select(Clinic).where(Clinic.is_active.is_(True))
+                select(Conversation).where(
+                    Conversation.id == uuid.UUID(conversation_id)
+                )
             )
-            clinics = result.scalars().all()
+            conversation = result.scalar_one_or_none()
+            if conversation is None:
+                return {"status": "skipped", "reason": "conversation_not_found"}
+
+            ab_variant = None
+            if ab_test_id and ab_variant_id:
+                ab_variant = {
+                    "test_id": uuid.UUID(ab_test_id),
+                    "variant_id": uuid.UUID(ab_variant_id),
+                }
+
+            tracker = UsageTracker(
+                db, conversation.clinic_id, conversation.id, uuid.UUID(message_id)
+            )
+            service = AIResponseService(db, consultation_service=None)
+            await service.analyze_reply(conversation, ab_variant, tracker=tracker)
+            await tracker.flush()
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
 
-            service = PerformanceService(db)
-            for clinic in clinics:
-                await service.calculate_performance(clinic.id, year, month)
-                count += 1
+    return {"status": "success", "conversation_id": conversation_id}
+
+
+def _previous_month() -> tuple[int, int]:
+    now = datetime.now(timezone.utc)
+    if now.month == 1:
+        return now.year - 1, 12
+    return now.year, now.month - 1
 
+
+async def _calculate_monthly_performance(year: int, month: int, shard: int = 0) -> dict:
+    from app.core.database import async_session_factory
+    from app.services.performance_service import PerformanceService
+
+    async with async_session_factory() as db:
+        try:
+            service = PerformanceService(db)
+            performances = await service.calculate_all_performance(
+                year, month, shard=shard, shards=settings.month_end_shards
+            )
             await db.commit()
         except Exception:
             await db.rollback()
             raise
 
-    return {"year": year, "month": month, "clinics_processed": count}
+    return {
+        "year": year,
+        "month": month,
+        "shard": shard,
+        "clinics_processed": len(performances),
+    }
 
 
-async def _generate_monthly_settlements() -> dict:
+async def _generate_monthly_settlements(year: int, month: int, shard: int = 0) -> dict:
     from app.core.database import async_session_factory
     from app.services.settlement_service import SettlementService
 
-    now = datetime.now(timezone.utc)
-    if now.month == 1:
-        year, month = now.year - 1, 12
-    else:
-        year, month = now.year, now.month - 1
-
     async with async_session_factory() as db:
         try:
             service = SettlementService(db)
-            settlements = await service.generate_all_settlements(year, month)
+            settlements = await service.generate_all_settlements(
+                year, month, shard=shard, shards=settings.month_end_shards
+            )
             await db.commit()
             return {
                 "year": year,
                 "month": month,
+                "shard": shard,
                 "settlements_generated": len(settlements),
             }
         except Exception:
@@ -143,6 +297,74 @@ async def _generate_monthly_settlements() -> dict:
             raise
 
 
+async def _render_settlement_invoices(year: int, month: int) -> dict:
+    from sqlalchemy import select
+    from sqlalchemy.orm import joinedload
+
+    from app.core.database import async_session_factory
+    from app.models.settlement import Settlement
+    from app.services.invoice_service import InvoiceService
+
+    # Already a separate worker process: render in-process, no pool
+    service = InvoiceService()
+    rendered = 0
+    async with async_session_factory() as db:
+        result = await db.execute(
+            select(Settlement)
+            .options(joinedload(Settlement.clinic))
+            .where(
+                Settlement.period_year == year,
+                Settlement.period_month == month,
+                Settlement.status.in_(("confirmed", "paid")),
+            )
+        )
+        settlements = result.scalars().all()
+        for settlement in settlements:
+            try:
+                if await service.store_pdf(settlement, settlement.clinic):
+                    # Keep each stored PDF even if a later one fails
+                    await db.commit()
+                    rendered += 1
+            except Exception:
+                await db.rollback()
+                raise
+
+    return {
+        "year": year,
+        "month": month,
+        "settlements": len(settlements),
+        "rendered": rendered,
+    }
+
+
+async def _refresh_analytics_rollups(rebuild: bool = False) -> dict:
+    from app.core.cache import invalidate_tags
+    from app.core.database import async_session_factory
+    from app.services.analytics_rollup_service import AnalyticsRollupService
+
+    async with async_session_factory() as db:
+        try:
+            service = AnalyticsRollupService(db)
+            if rebuild:
+                days = await service.rebuild()
+            else:
+                days = await service.refresh_changed()
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+    # New data landed: drop cached dashboard figures for the affected clinics
+    if service.refreshed_clinic_ids is None:
+        await invalidate_tags("analytics")
+    elif service.refreshed_clinic_ids:
+        await invalidate_tags(
+            *(f"analytics:{clinic_id}" for clinic_id in service.refreshed_clinic_ids)
+        )
+
+    return {"rebuild": rebuild, "days_refreshed": days}
+
+
 async def _summarize_conversations() -> dict:
     from sqlalchemy import func, select
 
@@ -6,6 +6,7 @@ import uuid
 
 from celery import Task
 
+from app.core.resilience import RateLimiter
 from app.tasks import celery_app
 
 logger = logging.getLogger(__name__)
@@ -34,7 +35,7 @@ class CRMExecutionTask(Task):
 def execute_due_events(self: CRMExecutionTask) -> dict:
     """Periodic task: find and execute all due CRM events.
 
-    Runs every 5 minutes via Celery Beat.
+    Runs every 5 minutes via Celery Beat; safe to run on several workers at once.
     """
     logger.info("CRM execution sweep started")
     try:
@@ -71,113 +72,118 @@ def schedule_crm_for_payment(self: CRMExecutionTask, payment_id: str) -> dict:
 
 
 async def _execute_due_events() -> dict:
-    """Async implementation: query due events and send messages."""
-    from sqlalchemy import select
-    from sqlalchemy.orm import selectinload
+    """Async implementation: dispatch due events batch by batch.
 
+    Each batch is claimed with FOR UPDATE SKIP LOCKED inside its own
+    transaction, so any number of workers can sweep at once without sending
+    an event twice. Targets are preloaded in one query, sends run
+    concurrently under per-messenger rate limits, and outcomes are written
+    back with one UPDATE before the batch commits and releases its locks.
+    """
+    from app.config import settings
     from app.core.database import async_session_factory
-    from app.messenger.factory import MessengerAdapterFactory
-    from app.models.conversation import Conversation
-    from app.models.crm_event import CRMEvent
     from app.services.crm_service import CRMService
 
     sent = 0
     failed = 0
+    limiters: dict[str, RateLimiter] = {}
+
+    for _ in range(settings.crm_dispatch_max_batches):
+        async with async_session_factory() as db:
+            try:
+                service = CRMService(db)
+                events = await service.claim_due_events(settings.crm_dispatch_batch_size)
+                if not events:
+                    await db.commit()
+                    break
+
+                targets = await service.load_dispatch_targets(events)
+                outcomes = await _send_batch(events, targets, limiters)
+                await service.record_outcomes(outcomes)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
 
-    async with async_session_factory() as db:
+        delivered = [event for event in events if outcomes[event.id] is None]
+        sent += len(delivered)
+        failed += len(events) - len(delivered)
+        await _broadcast_sent(delivered)
+
+        if len(events) < settings.crm_dispatch_batch_size:
+            break
+
+    return {"sent": sent, "failed": failed}
+
+
+async def _send_batch(events, targets, limiters: dict[str, RateLimiter]) -> dict:
+    """Send a claimed batch concurrently; returns event id -> error (None if sent)."""
+    from app.config import settings
+    from app.messenger.factory import MessengerAdapterFactory
+
+    slots = asyncio.Semaphore(settings.crm_dispatch_concurrency)
+
+    def limiter_for(messenger_type: str) -> RateLimiter:
+        if messenger_type not in limiters:
+            limiters[messenger_type] = RateLimiter(
+                settings.crm_dispatch_rate_per_second.get(
+                    messenger_type, settings.crm_dispatch_default_rate_per_second
+                )
+            )
+        return limiters[messenger_type]
+
+    async def send(event) -> tuple[uuid.UUID, str | None]:
+        conversation = targets.get((event.clinic_id, event.customer_id))
+        if conversation is None:
+            logger.warning(
+                "No conversation found for CRM event %s (customer=%s)",
+                event.id,
+                event.customer_id,
+            )
+            return event.id, "No conversation found for customer"
+
+        customer = conversation.customer
+        account = conversation.messenger_account
+        message_text = event.message_content or _build_default_message(
+            event.event_type, customer.name or customer.display_name
+        )
         try:
-            service = CRMService(db)
-            due_events = await service.get_due_events()
+            adapter = MessengerAdapterFactory.get_adapter(account.messenger_type)
+            async with slots:
+                await limiter_for(account.messenger_type).acquire()
+                await adapter.send_message(
+                    account=account,
+                    recipient_id=customer.messenger_user_id,
+                    text=message_text,
+                )
+        except Exception as e:
+            logger.exception("Failed to execute CRM event %s: %s", event.id, e)
+            return event.id, str(e) or type(e).__name__
 
-            if not due_events:
-                await db.commit()
-                return {"sent": 0, "failed": 0}
-
-            for event in due_events:
-                try:
-                    # Find the customer's most recent conversation to get messenger info
-                    conv_result = await db.execute(
-                        select(Conversation)
-                        .options(
-                            selectinload(Conversation.customer),
-                            selectinload(Conversation.messenger_account),
-                        )
-                        .where(
-                            Conversation.customer_id == event.customer_id,
-                            Conversation.clinic_id == event.clinic_id,
-                        )
-                        .order_by(Conversation.last_message_at.desc().nulls_last())
-                        .limit(1)
-                    )
-                    conversation = conv_result.scalar_one_or_none()
-
-                    if conversation is None:
-                        logger.warning(
-                            "No conversation found for CRM event %s (customer=%s)",
-                            event.id,
-                            event.customer_id,
-                        )
-                        await service.mark_failed(
-                            event.id, "No conversation found for customer"
-                        )
-                        failed += 1
-                        continue
-
-                    customer = conversation.customer
-                    account = conversation.messenger_account
-
-                    # Build message content
-                    message_text = event.message_content or _build_default_message(
-                        event.event_type, customer.name or customer.display_name
-                    )
-
-                    # Send via messenger adapter
-                    adapter = MessengerAdapterFactory.get_adapter(
-                        account.messenger_type
-                    )
-                    await adapter.send_message(
-                        account=account,
-                        recipient_id=customer.messenger_user_id,
-                        text=message_text,
-                    )
-
-                    await service.mark_sent(event.id)
-                    sent += 1
-                    logger.info(
-                        "CRM event %s (%s) sent to customer %s",
-                        event.id,
-                        event.event_type,
-                        event.customer_id,
-                    )
-
-                    # Broadcast CRM event sent via WebSocket
-                    from app.websocket.manager import manager as ws_manager
-
-                    await ws_manager.broadcast_to_clinic(event.clinic_id, {
-                        "type": "crm_event_sent",
-                        "event_id": str(event.id),
-                        "event_type": event.event_type,
-                        "customer_id": str(event.customer_id),
-                    })
-
-                except Exception as e:
-                    logger.exception(
-                        "Failed to execute CRM event %s: %s", event.id, e
-                    )
-                    try:
-                        await service.mark_failed(event.id, str(e))
-                    except Exception:
-                        logger.exception(
-                            "Failed to mark CRM event %s as failed", event.id
-                        )
-                    failed += 1
+        logger.info(
+            "CRM event %s (%s) sent to customer %s",
+            event.id,
+            event.event_type,
+            event.customer_id,
+        )
+        return event.id, None
 
-            await db.commit()
-        except Exception:
-            await db.rollback()
-            raise
+    return dict(await asyncio.gather(*(send(event) for event in events)))
 
-    return {"sent": sent, "failed": failed}
+
+async def _broadcast_sent(events) -> None:
+    """Broadcast CRM event sent via WebSocket."""
+    from app.websocket.manager import manager as ws_manager
+
+    await asyncio.gather(*(
+        ws_manager.broadcast_to_clinic(event.clinic_id, {
+            "type": "crm_event_sent",
+            "event_id": str(event.id),
+            "event_type": event.event_type,
+            "customer_id": str(event.customer_id),
+        })
+        for event in events
+    ))
 
 
 async def _schedule_crm_for_payment(payment_id: uuid.UUID) -> dict:
@@ -0,0 +1,129 @@
+"""Celery tasks for image derivatives.
+
+Routed to the "media" queue. The compose workers consume it alongside the
+other queues, so image work shares their prefork processes; a deployment
+that needs to isolate it can run a separate ``--queues=media`` worker.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+
+from celery import Task
+
+from app.tasks import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+class MediaTask(Task):
+    """Base task class for image processing."""
+
+    _loop = None
+
+    @property
+    def loop(self):
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop
+
+
+@celery_app.task(
+    base=MediaTask,
+    bind=True,
+    name="app.tasks.media.generate_photo_derivatives",
+    max_retries=3,
+    soft_time_limit=60,
+    time_limit=90,
+)
+def generate_photo_derivatives(self: MediaTask, photo_id: str) -> dict:
+    """Render and store the thumb/medium variants of a treatment photo."""
+    from PIL import UnidentifiedImageError
+
+    from app.services.photo_derivatives import render_variants
+
+    try:
+        photo = self.loop.run_until_complete(_load_photo(uuid.UUID(photo_id)))
+        if photo is None:
+            return {"status": "missing"}
+        photo_url, clinic_id, original = photo
+
+        # CPU-bound: runs in this worker process, outside the event loop
+        try:
+            variants = render_variants(original)
+        except UnidentifiedImageError:
+            # Not an image Pillow can read: a retry would fail the same way
+            logger.warning("Unreadable image, no derivatives for treatment photo=%s", photo_id)
+            return {"status": "unreadable"}
+
+        urls = self.loop.run_until_complete(
+            _store_variants(uuid.UUID(photo_id), photo_url, clinic_id, variants)
+        )
+        return {"status": "ok", **urls}
+    except Exception as exc:
+        logger.exception("Derivatives failed for treatment photo=%s", photo_id)
+        raise self.retry(exc=exc, countdown=30)
+
+
+async def _load_photo(photo_id: uuid.UUID) -> tuple[str, uuid.UUID, bytes] | None:
+    from app.core.database import async_session_factory
+    from app.models.treatment_photo import TreatmentPhoto
+    from app.services.storage_service import storage_service
+
+    async with async_session_factory() as db:
+        photo = await db.get(TreatmentPhoto, photo_id)
+        if photo is None:
+            return None
+        photo_url, clinic_id = photo.photo_url, photo.clinic_id
+
+    return photo_url, clinic_id, await storage_service.read(photo_url)
+
+
+async def _store_variants(
+    photo_id: uuid.UUID, photo_url: str, clinic_id: uuid.UUID, variants
+) -> dict:
+    from app.core.database import async_session_factory
+    from app.models.treatment_photo import TreatmentPhoto
+    from app.services.storage_service import storage_service
+
+    stem = os.path.splitext(os.path.basename(photo_url))[0]
+    urls = {}
+    try:
+        for variant in variants:
+            urls[variant.name] = await storage_service.upload(
+                variant.data,
+                f"{stem}-{variant.name}{variant.extension}",
+                variant.content_type,
+                clinic_id,
+                category=f"treatment-photos/{variant.name}",
+            )
+
+        async with async_session_factory() as db:
+            photo = await db.get(TreatmentPhoto, photo_id)
+            if photo is None:
+                # Deleted while rendering
+                await _delete_quietly(urls.values())
+                return urls
+            replaced = [photo.thumbnail_url, photo.medium_url]
+            photo.thumbnail_url = urls.get("thumb")
+            photo.medium_url = urls.get("medium")
+            await db.commit()
+    except Exception:
+        # Blob names are unique per upload, so a retry would orphan these
+        await _delete_quietly(urls.values())
+        raise
+
+    # Derivatives of an earlier run of this task
+    await _delete_quietly(url for url in replaced if url and url != photo_url)
+    return urls
+
+
+async def _delete_quietly(urls) -> None:
+    from app.services.storage_service import storage_service
+
+    for url in list(urls):
+        try:
+            await storage_service.delete(url)
+        except Exception:
+            logger.debug("Failed to delete derivative %s", url)
@@ -1,4 +1,4 @@
-"""Celery task for retrying failed messenger message deliveries."""
+"""Celery tasks for scheduled and retried messenger message deliveries."""
 
 import asyncio
 import logging
@@ -64,6 +64,107 @@ def retry_message_delivery(
             raise
 
 
+@celery_app.task(
+    bind=True,
+    name="app.tasks.message_delivery.deliver_ai_message",
+    acks_late=True,
+)
+def deliver_ai_message(
+    self,
+    message_id: str,
+    account_id: str,
+    recipient_id: str,
+    messenger_type: str,
+):
+    """Send a persisted AI reply once its human-like typing delay has elapsed.
+
+    Scheduled with a countdown by the AI response worker so the delay does not
+    hold an ``ai`` queue slot. Send failures are handed to retry_message_delivery.
+    """
+    try:
+        loop = asyncio.get_event_loop()
+        if loop.is_closed():
+            loop = asyncio.new_event_loop()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+
+    return loop.run_until_complete(
+        _deliver_scheduled(message_id, account_id, recipient_id, messenger_type)
+    )
+
+
+async def _deliver_scheduled(
+    message_id: str,
+    account_id: str,
+    recipient_id: str,
+    messenger_type: str,
+) -> dict:
+    """Send a saved AI message, record its messenger id and broadcast it."""
+    from sqlalchemy import select
+
+    from app.core.database import async_session_factory
+    from app.messenger.factory import MessengerAdapterFactory
+    from app.models.message import Message
+    from app.models.messenger_account import MessengerAccount
+    from app.websocket.manager import manager
+
+    async with async_session_factory() as db:
+        msg_result = await db.execute(
+            select(Message).where(Message.id == uuid.UUID(message_id))
+        )
+        message = msg_result.scalar_one_or_none()
+        if message is None:
+            logger.warning("Scheduled delivery skipped: message %s not found", message_id)
+            return {"message_id": message_id, "status": "missing"}
+
+        # Redelivered task (acks_late) — already sent
+        if message.messenger_message_id:
+            return {"message_id": message_id, "status": "already_sent"}
+
+        result = await db.execute(
+            select(MessengerAccount).where(
+                MessengerAccount.id == uuid.UUID(account_id)
+            )
+        )
+        account = result.scalar_one_or_none()
+
+        try:
+            if account is None:
+                raise ValueError(f"MessengerAccount {account_id} not found")
+            adapter = MessengerAdapterFactory.get_adapter(messenger_type)
+            await adapter.send_typing_indicator(account, recipient_id)
+            message.messenger_message_id = await adapter.send_message(
+                account, recipient_id, message.content
+            )
+            await db.commit()
+            status = "sent"
+        except Exception:
+            logger.exception("Scheduled delivery failed for message %s", message_id)
+            retry_message_delivery.delay(
+                message_id, account_id, recipient_id, message.content, messenger_type
+            )
+            status = "retry_queued"
+
+        await manager.broadcast_to_clinic(
+            message.clinic_id,
+            {
+                "type": "new_message",
+                "conversation_id": str(message.conversation_id),
+                "message": {
+                    "id": str(message.id),
+                    "sender_type": message.sender_type,
+                    "content": message.content,
+                    "content_type": message.content_type,
+                    "created_at": message.created_at.isoformat()
+                    if message.created_at
+                    else None,
+                },
+            },
+        )
+
+    return {"message_id": message_id, "status": status}
+
+
 async def _deliver(
     message_id: str,
     account_id: str,
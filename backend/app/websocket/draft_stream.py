@@ -0,0 +1,101 @@
+"""Live AI reply drafts for the staff dashboard.
+
+While the final LLM stage of a consultation generates, its tokens are
+published on the clinic channel as ``ai_draft_delta`` events so staff
+supervising AI mode see the reply forming. Tokens are coalesced into frames
+of ai_draft_frame_ms to bound pub/sub volume:
+
+    {"type": "ai_draft_delta", "conversation_id": ..., "draft_id": ...,
+     "seq": 0, "delta": "...", "done": false}
+
+The last frame has done=true; discarded=true means the draft will not be
+sent (escalation or failure) and should be cleared. The committed reply
+still arrives as the usual new_message event. Customers never see drafts.
+"""
+
+import asyncio
+import contextlib
+import logging
+import uuid
+
+from app.config import settings
+from app.websocket.manager import manager
+
+logger = logging.getLogger(__name__)
+
+
+class DraftStream:
+    """Coalesces reply tokens into ai_draft_delta frames for one conversation."""
+
+    def __init__(
+        self,
+        clinic_id: uuid.UUID,
+        conversation_id: uuid.UUID,
+        frame_ms: int | None = None,
+    ):
+        self.clinic_id = clinic_id
+        self.conversation_id = conversation_id
+        self.draft_id = uuid.uuid4()
+        self.frame_seconds = (frame_ms or settings.ai_draft_frame_ms) / 1000
+        self._buffer: list[str] = []
+        self._seq = 0
+        self._closed = False
+        self._closing = asyncio.Event()
+        self._flusher: asyncio.Task | None = None
+
+    def push(self, text: str) -> None:
+        """Queue generated text; it goes out with the next frame."""
+        if self._closed or not text:
+            return
+        self._buffer.append(text)
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_frames())
+
+    async def close(self, discarded: bool = False) -> None:
+        """Send the remaining text as the final frame.
+
+        Nothing is published for a draft that never received text.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._closing.set()
+        if self._flusher is not None:
+            await self._flusher
+        if self._seq == 0 and not self._buffer:
+            return
+        if discarded:
+            self._buffer.clear()
+        await self._send(done=True, discarded=discarded)
+
+    async def _flush_frames(self):
+        try:
+            while self._buffer and not self._closed:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._closing.wait(), self.frame_seconds)
+                if self._closed:
+                    break  # close() sends the remainder
+                await self._send(done=False)
+        finally:
+            self._flusher = None
+
+    async def _send(self, done: bool, discarded: bool = False):
+        delta = "".join(self._buffer)
+        self._buffer.clear()
+        event = {
+            "type": "ai_draft_delta",
+            "conversation_id": str(self.conversation_id),
+            "draft_id": str(self.draft_id),
+            "seq": self._seq,
+            "delta": delta,
+            "done": done,
+        }
+        if discarded:
+            event["discarded"] = True
+        self._seq += 1
+        try:
+            await manager.broadcast_to_clinic(self.clinic_id, event)
+        except Exception:
+            logger.debug(
+                "AI draft frame publish failed for conversation=%s", self.conversation_id
+            )
@@ -8,7 +8,7 @@ from collections import defaultdict
 
 from fastapi import WebSocket
 
-from app.config import settings
+from app.core.redis import get_listener_redis, pipelined
 
 logger = logging.getLogger(__name__)
 
@@ -24,24 +24,12 @@ class ConnectionManager:
 
     def __init__(self):
         self._connections: dict[uuid.UUID, list[WebSocket]] = defaultdict(list)
-        self._redis = None
         self._pubsub = None
         self._listener_task: asyncio.Task | None = None
 
-    async def _get_redis(self):
-        """Lazy-init Redis connection."""
-        if self._redis is None:
-            import redis.asyncio as aioredis
-
-            self._redis = aioredis.from_url(
-                settings.redis_url, decode_responses=True
-            )
-        return self._redis
-
     async def start_listener(self):
         """Start the Redis Pub/Sub listener background task."""
-        redis = await self._get_redis()
-        self._pubsub = redis.pubsub()
+        self._pubsub = get_listener_redis().pubsub()
         # Subscribe to pattern for all clinic channels
         await self._pubsub.psubscribe(f"{self.CHANNEL_PREFIX}*")
         self._listener_task = asyncio.create_task(self._listen())
@@ -57,9 +45,7 @@ class ConnectionManager:
                 pass
         if self._pubsub:
             await self._pubsub.punsubscribe()
-            await self._pubsub.close()
-        if self._redis:
-            await self._redis.close()
+            await self._pubsub.aclose()
         logger.info("WebSocket Redis Pub/Sub listener stopped")
 
     async def _listen(self):
@@ -108,9 +94,9 @@ class ConnectionManager:
     async def broadcast_to_clinic(self, clinic_id: uuid.UUID, data: dict):
         """Publish message via Redis so all instances receive it."""
         try:
-            redis = await self._get_redis()
             channel = f"{self.CHANNEL_PREFIX}{clinic_id}"
-            await redis.publish(channel, json.dumps(data, default=str))
+            # Auto-pipelined with other publishes and reads made concurrently
+            await pipelined("publish", channel, json.dumps(data, default=str))
         except Exception:
             # Fallback: send directly to local connections if Redis is down
             logger.warning(
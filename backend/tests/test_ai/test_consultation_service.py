@@ -131,3 +131,62 @@ class TestConsultationService:
         mock_escalation_detector.detect.assert_called_once_with(
             consultation_context["query"], use_llm=True
         )
+
+
+class TestConcurrentEscalation:
+    async def test_llm_classification_overlaps_generation(
+        self, mock_response_chain, consultation_context
+    ):
+        """The escalation LLM call no longer adds to the reply latency."""
+        import asyncio
+        import time
+
+        async def _slow_detect(*args, **kwargs):
+            await asyncio.sleep(0.3)
+            return EscalationLevel.NONE
+
+        async def _slow_generate(**kwargs):
+            await asyncio.sleep(0.3)
+            return "답변"
+
+        detector = AsyncMock()
+        detector.detect.side_effect = _slow_detect
+        mock_response_chain.ainvoke.side_effect = _slow_generate
+        service = ConsultationService(mock_response_chain, detector)
+
+        started = time.perf_counter()
+        result = await service.consult(**consultation_context)
+
+        assert time.perf_counter() - started < 0.5
+        assert result.response == "답변"
+        assert result.escalated is False
+
+    async def test_llm_escalation_cancels_generation(
+        self, mock_response_chain, consultation_context
+    ):
+        """A late ESCALATE verdict discards the in-flight response."""
+        import asyncio
+
+        cancelled = asyncio.Event()
+
+        async def _slow_detect(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return EscalationLevel.ESCALATE
+
+        async def _never_finishes(**kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        detector = AsyncMock()
+        detector.detect.side_effect = _slow_detect
+        mock_response_chain.ainvoke.side_effect = _never_finishes
+        service = ConsultationService(mock_response_chain, detector)
+
+        result = await service.consult(**consultation_context)
+
+        assert result.escalated is True
+        assert "미소" in result.response
+        assert cancelled.is_set()
@@ -0,0 +1,123 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from app.ai.chains.fused_response_chain import (
+    FusedResponseChain,
+    ReplyStreamFilter,
+    extract_reply,
+)
+
+
+@pytest.fixture
+def cultural_profile():
+    return {
+        "country_name": "일본",
+        "style_prompt": "정중한 일본어",
+        "preferred_expressions": ["ございます"],
+        "avoided_expressions": [],
+        "emoji_level": "low",
+        "formality_level": "formal",
+    }
+
+
+@pytest.fixture
+def sales_context():
+    return {
+        "top_procedures": ["보톡스"],
+        "active_events": ["초회 한정 20% 할인"],
+        "cross_sell_options": [],
+    }
+
+
+def _fake_llm(content: str) -> GenericFakeChatModel:
+    return GenericFakeChatModel(messages=iter([AIMessage(content=content)]))
+
+
+class TestFusedResponseChain:
+    async def test_returns_reply_section_only(self, cultural_profile, sales_context):
+        chain = FusedResponseChain(llm=_fake_llm(
+            "<facts>보톡스 효과 3-6개월</facts>\n"
+            "<reply>ボトックスの効果は3〜6ヶ月でございます。</reply>"
+        ))
+
+        result = await chain.ainvoke(
+            query="ボトックスの効果はどのくらいですか？",
+            rag_results="보톡스 효과 3-6개월",
+            clinic_manual="",
+            country_code="JP",
+            language_code="ja",
+            cultural_profile=cultural_profile,
+            persona={"name": "미소"},
+            conversation_history="",
+            sales_context=sales_context,
+        )
+
+        assert result == "ボトックスの効果は3〜6ヶ月でございます。"
+
+    async def test_accepts_extracted_knowledge(self, cultural_profile, sales_context):
+        chain = FusedResponseChain(llm=_fake_llm(
+            "<facts>초회 20% 할인</facts><reply>初回は20%OFFでございます。</reply>"
+        ))
+
+        result = await chain.ainvoke(
+            query="割引はありますか？",
+            knowledge_output="보톡스 초회 20% 할인",
+            country_code="JP",
+            language_code="ja",
+            cultural_profile=cultural_profile,
+            persona={},
+            conversation_history="",
+            sales_context=sales_context,
+        )
+
+        assert result == "初回は20%OFFでございます。"
+
+
+    async def test_streams_reply_without_facts(self, cultural_profile, sales_context):
+        chain = FusedResponseChain(llm=_fake_llm(
+            "<facts>보톡스 효과 3-6개월</facts> <reply>効果は 3〜6ヶ月 です。</reply>"
+        ))
+        tokens = []
+
+        result = await chain.ainvoke(
+            query="効果は？",
+            rag_results="보톡스 효과 3-6개월",
+            country_code="JP",
+            language_code="ja",
+            cultural_profile=cultural_profile,
+            persona={},
+            conversation_history="",
+            sales_context=sales_context,
+            on_token=tokens.append,
+        )
+
+        assert result == "効果は 3〜6ヶ月 です。"
+        assert len(tokens) > 1
+        assert "".join(tokens) == result
+
+
+class TestReplyStreamFilter:
+    def test_tag_split_across_chunks(self):
+        tokens = []
+        stream = ReplyStreamFilter(tokens.append)
+        for chunk in ["<facts>x</fa", "cts><rep", "ly>\nHel", "lo</re", "ply>"]:
+            stream(chunk)
+        assert "".join(tokens) == "Hello"
+
+    def test_nothing_forwarded_without_reply_tag(self):
+        tokens = []
+        stream = ReplyStreamFilter(tokens.append)
+        stream("<facts>내부 정보</facts>")
+        assert tokens == []
+
+
+class TestExtractReply:
+    def test_unclosed_reply_tag(self):
+        assert extract_reply("<facts>x</facts><reply>Hello") == "Hello"
+
+    def test_untagged_output_drops_facts(self):
+        assert extract_reply("<facts>내부</facts>\nHello there") == "Hello there"
+
+    def test_plain_output_passes_through(self):
+        assert extract_reply("Hello there") == "Hello there"
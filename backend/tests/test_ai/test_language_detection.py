@@ -0,0 +1,80 @@
+"""Tests for offline language detection and the LLM fallback."""
+
+from pathlib import Path
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from app.ai.chains.language_detection import detect_language
+from app.ai.chains.translation_chain import SUPPORTED_LANGUAGES, LanguageDetector
+from app.config import settings
+
+CORPUS = [
+    tuple(line.split("\t", 1))
+    for line in (Path(__file__).parent / "language_corpus.tsv")
+    .read_text(encoding="utf-8")
+    .splitlines()
+    if line and not line.startswith("#")
+]
+
+
+class TestDetectLanguage:
+    @pytest.mark.parametrize(
+        "text,expected",
+        [
+            ("보톡스 얼마예요?", "ko"),
+            ("ボトックスはいくらですか？", "ja"),
+            ("予約をキャンセルしたいです", "ja"),
+            ("肉毒素多少钱？", "zh-CN"),
+            ("肉毒桿菌多少錢？", "zh-TW"),
+            ("โบท็อกซ์ราคาเท่าไหร่คะ", "th"),
+            ("Tôi muốn hủy lịch hẹn", "vi"),
+        ],
+    )
+    def test_script_decides(self, text, expected):
+        language, confidence = detect_language(text)
+        assert language == expected
+        assert confidence >= settings.language_detection_min_confidence
+
+    @pytest.mark.parametrize(
+        "text",
+        ["ok", "filler", "多少", "보톡스 botox price"],
+    )
+    def test_ambiguous_text_has_low_confidence(self, text):
+        _, confidence = detect_language(text)
+        assert confidence < settings.language_detection_min_confidence
+
+    def test_no_letters(self):
+        assert detect_language("👍 123") == (None, 0.0)
+
+
+class TestLanguageDetectorFallback:
+    async def test_confident_detection_skips_llm(self):
+        # An empty fake model raises if it is ever invoked
+        detector = LanguageDetector(GenericFakeChatModel(messages=iter([])))
+        assert await detector.detect("Apakah klinik punya tempat parkir?") == "id"
+
+    async def test_ambiguous_detection_asks_llm(self):
+        detector = LanguageDetector(
+            GenericFakeChatModel(messages=iter([AIMessage(content="zh-TW")]))
+        )
+        assert await detector.detect("多少") == "zh-TW"
+
+
+def test_labelled_corpus_accuracy():
+    assert {language for language, _ in CORPUS} == set(SUPPORTED_LANGUAGES)
+
+    results = [(expected, detect_language(text)) for expected, text in CORPUS]
+    confident = [
+        (expected, language)
+        for expected, (language, confidence) in results
+        if confidence >= settings.language_detection_min_confidence
+    ]
+    coverage = len(confident) / len(CORPUS)
+    accuracy = sum(expected == language for expected, language in confident) / len(
+        confident
+    )
+
+    assert coverage >= 0.95
+    assert accuracy >= 0.98
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from app.ai.pipeline_benchmark import (
+    RecordedTurn,
+    TurnRun,
+    compare_modes,
+    figure_recall,
+    load_turns,
+    summarize,
+)
+
+LAYERED_REPLY = "ボトックスは1回3万円、効果は3〜6ヶ月です。ご予約はいかがですか？"
+FUSED_REPLY = "ボトックスは1回3万円で、効果は3〜6ヶ月続きます。ご予約はいかがですか？"
+
+
+def _message(content: str) -> AIMessage:
+    return AIMessage(
+        content=content,
+        usage_metadata={"input_tokens": 1000, "output_tokens": 200, "total_tokens": 1200},
+        response_metadata={"model_name": "claude-sonnet-4-20250514"},
+    )
+
+
+@pytest.fixture
+def turn():
+    return RecordedTurn.from_dict({
+        "id": "t1",
+        "query": "ボトックスの料金は？",
+        "country_code": "JP",
+        "language_code": "ja",
+        "rag_results": "보톡스 효과 3-6개월",
+        "clinic_manual": "보톡스 1회 3만엔",
+    })
+
+
+@pytest.fixture
+def fake_llm():
+    # layered: knowledge, style, sales; fused: one call
+    return GenericFakeChatModel(messages=iter([
+        _message("보톡스 1회 3만엔, 효과 3-6개월"),
+        _message(LAYERED_REPLY),
+        _message(LAYERED_REPLY),
+        _message(f"<facts>1회 3만엔</facts><reply>{FUSED_REPLY}</reply>"),
+    ]))
+
+
+class TestCompareModes:
+    async def test_counts_calls_tokens_and_parity(self, fake_llm, turn):
+        summaries, runs = await compare_modes(fake_llm, [turn], ["layered", "fused"])
+
+        layered, fused = summaries
+        assert layered.llm_calls == 3
+        assert fused.llm_calls == 1
+        assert fused.input_tokens == 1000
+        assert 0 < fused.cost_usd < layered.cost_usd
+        assert layered.similarity == 1.0
+        assert 0.5 < fused.similarity < 1.0
+        assert fused.figure_recall == 1.0
+        assert runs["fused"][0].reply == FUSED_REPLY
+
+    async def test_unknown_mode_rejected(self, fake_llm, turn):
+        with pytest.raises(ValueError):
+            await compare_modes(fake_llm, [turn], ["single"])
+
+
+class TestParity:
+    def test_figure_recall(self):
+        assert figure_recall("3万円、6ヶ月", "1回3万円、3〜6ヶ月") == pytest.approx(2 / 3)
+        assert figure_recall("anything", "no figures") == 1.0
+
+    def test_summary_latency_percentiles(self):
+        runs = [
+            TurnRun(str(i), "fused", "ok", float(ms), 1, 10, 5, 0.0)
+            for i, ms in enumerate(range(100, 2100, 100))
+        ]
+        summary = summarize(runs, runs)
+        assert summary.p50_ms == 1000
+        assert summary.p95_ms == 1900
+        assert summary.turns == 20
+
+
+def test_load_turns(tmp_path, turn):
+    path = tmp_path / "turns.jsonl"
+    path.write_text(
+        json.dumps({"query": "hi", "language_code": "en"}) + "\n\n"
+        + json.dumps({"id": "t1", "query": "ボトックスの料金は？"}) + "\n",
+        encoding="utf-8",
+    )
+
+    turns = load_turns(path)
+
+    assert [t.id for t in turns] == ["0", "t1"]
+    assert turns[0].language_code == "en"
+    assert turns[1].country_code == "KR"
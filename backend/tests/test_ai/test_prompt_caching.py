@@ -0,0 +1,109 @@
+"""Prompt-prefix stability and provider prompt caching for consultation prompts."""
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from app.ai.agents.consultation_agent import AGENT_HUMAN_PROMPT, AGENT_SYSTEM_PROMPT
+from app.ai.chains.fused_response_chain import FUSED_PROMPT
+from app.ai.chains.knowledge_chain import KNOWLEDGE_PROMPT
+from app.ai.chains.sales_skill_chain import SALES_PROMPT
+from app.ai.llm_router import PromptCachingChatAnthropic
+
+MANUAL = "Q: 보톡스 가격은?\nA: 부위별 10만원부터입니다."
+
+FUSED_STABLE = {
+    "clinic_name": "강남의원",
+    "persona_name": "미소",
+    "persona_personality": "친절",
+    "clinic_manual": MANUAL,
+    "country_name": "일본",
+    "style_prompt": "정중한 일본어",
+    "preferred_expressions": "(없음)",
+    "avoided_expressions": "(없음)",
+    "emoji_level": "low",
+    "formality_level": "formal",
+    "top_procedures": "(없음)",
+    "active_events": "(없음)",
+    "cross_sell_options": "(없음)",
+    "language_code": "ja",
+}
+
+
+def _system(prompt, **variables) -> str:
+    messages = prompt.format_messages(**variables)
+    assert isinstance(messages[0], SystemMessage)
+    return messages[0].content
+
+
+class TestStablePrefix:
+    def test_knowledge_prompt_system_varies_only_by_clinic(self):
+        first = _system(
+            KNOWLEDGE_PROMPT,
+            clinic_name="강남의원", clinic_manual=MANUAL,
+            rag_results="[시술 정보]\n보톡스", query="보톡스 가격?",
+        )
+        second = _system(
+            KNOWLEDGE_PROMPT,
+            clinic_name="강남의원", clinic_manual=MANUAL,
+            rag_results="[시술 정보]\n필러", query="필러 부작용?",
+        )
+        assert first == second
+        assert MANUAL in first
+        assert "보톡스 가격?" not in first
+
+    def test_fused_prompt_keeps_turn_input_out_of_system(self):
+        first = _system(
+            FUSED_PROMPT, **FUSED_STABLE,
+            knowledge="[검색된 의학 정보]\n보톡스", conversation_history="(새 대화)",
+            query="ボトックスの料金は？",
+        )
+        second = _system(
+            FUSED_PROMPT, **FUSED_STABLE,
+            knowledge="[추출된 의학 정보]\n필러", conversation_history="고객: 안녕하세요",
+            query="フィラーは？",
+        )
+        assert first == second
+        assert MANUAL in first
+
+    def test_sales_prompt_history_in_human_turn(self):
+        variables = {
+            "top_procedures": "(없음)",
+            "active_events": "(없음)",
+            "cross_sell_options": "(없음)",
+            "styled_output": "답변",
+        }
+        first = SALES_PROMPT.format_messages(conversation_history="고객: A", **variables)
+        second = SALES_PROMPT.format_messages(conversation_history="고객: B", **variables)
+        assert first[0].content == second[0].content
+        assert "고객: B" in second[1].content
+
+    def test_agent_system_prompt_has_no_retrieved_knowledge(self):
+        assert "{rag_results}" not in AGENT_SYSTEM_PROMPT
+        assert "{rag_results}" in AGENT_HUMAN_PROMPT
+
+
+class TestPromptCachingChatAnthropic:
+    def _llm(self):
+        return PromptCachingChatAnthropic(model="claude-sonnet-4-5-20250929", api_key="test")
+
+    def test_system_prompt_gets_cache_breakpoint(self):
+        payload = self._llm()._get_request_payload(
+            [SystemMessage("규칙과 매뉴얼"), HumanMessage("질문")]
+        )
+        assert payload["system"] == [{
+            "type": "text",
+            "text": "규칙과 매뉴얼",
+            "cache_control": {"type": "ephemeral"},
+        }]
+        assert payload["messages"] == [{"role": "user", "content": "질문"}]
+
+    def test_last_system_block_is_marked(self):
+        payload = self._llm()._get_request_payload([
+            SystemMessage([{"type": "text", "text": "a"}, {"type": "text", "text": "b"}]),
+            HumanMessage("질문"),
+        ])
+        assert "cache_control" not in payload["system"][0]
+        assert payload["system"][1]["cache_control"] == {"type": "ephemeral"}
+
+    def test_no_system_prompt_unchanged(self):
+        payload = self._llm()._get_request_payload([HumanMessage("질문")])
+        assert "system" not in payload
@@ -6,6 +6,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.ai.rag.embedding_cache import EmbeddingCache, normalize_query
 from app.ai.rag.retriever import VectorRetriever
 from app.models.clinic import Clinic
 from app.models.medical_term import MedicalTerm
@@ -167,3 +168,57 @@ async def test_empty_table_returns_empty(
     retriever = VectorRetriever(db)
     results = await retriever.search_response_library(clinic.id, "anything")
     assert results == []
+
+
+@pytest.mark.asyncio
+@patch("app.ai.rag.retriever.get_embeddings")
+async def test_precomputed_embedding_skips_embed_call(
+    mock_get_embeddings, db: AsyncSession, clinic: Clinic, indexed_faqs, indexed_terms
+):
+    """A supplied query_embedding should be reused without calling the embedding API."""
+    mock_emb = MagicMock()
+    mock_emb.aembed_query = AsyncMock(return_value=FAKE_QUERY_EMBEDDING)
+    mock_get_embeddings.return_value = mock_emb
+
+    retriever = VectorRetriever(db, cache=EmbeddingCache())
+    faqs = await retriever.search_response_library(
+        clinic.id, "보톡스", query_embedding=FAKE_QUERY_EMBEDDING
+    )
+    terms = await retriever.search_medical_terms(
+        clinic.id, "보톡스", query_embedding=FAKE_QUERY_EMBEDDING
+    )
+    assert len(faqs) == 2
+    assert len(terms) == 1
+    mock_emb.aembed_query.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.ai.rag.retriever.get_embeddings")
+async def test_embed_query_cached_by_normalized_text(
+    mock_get_embeddings, db: AsyncSession
+):
+    """Repeated questions differing only in spacing/punctuation embed once."""
+    mock_emb = MagicMock()
+    mock_emb.aembed_query = AsyncMock(return_value=FAKE_QUERY_EMBEDDING)
+    mock_get_embeddings.return_value = mock_emb
+
+    retriever = VectorRetriever(db, cache=EmbeddingCache())
+    first = await retriever.embed_query("가격이 얼마예요?")
+    second = await retriever.embed_query("  가격이   얼마예요 ")
+
+    assert first == second == FAKE_QUERY_EMBEDDING
+    mock_emb.aembed_query.assert_called_once()
+
+
+def test_embedding_cache_evicts_least_recently_used():
+    """Local tier should stay bounded and evict the oldest entry."""
+    cache = EmbeddingCache(max_size=2)
+    cache._remember("a", [1.0])
+    cache._remember("b", [2.0])
+    cache._remember("c", [3.0])
+    assert list(cache._local) == ["b", "c"]
+
+
+def test_normalize_query():
+    assert normalize_query("  Botox   PRICE?? ") == "botox price"
+    assert normalize_query("가격이 얼마예요？") == "가격이 얼마예요"
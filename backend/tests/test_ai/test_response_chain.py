@@ -171,3 +171,121 @@ class TestResponseChain:
         )
         # Final result should be from sales chain
         assert result == mock_sales_chain.ainvoke.return_value
+
+
+@pytest.fixture
+def mock_fused_chain():
+    mock = AsyncMock()
+    mock.ainvoke.return_value = "ボトックスの効果は3〜6ヶ月です。ご予約はいかがでしょうか？"
+    return mock
+
+
+def _chain(mode, knowledge, style, sales, fused):
+    return ResponseChain(
+        knowledge_chain=knowledge,
+        style_chain=style,
+        sales_chain=sales,
+        fused_chain=fused,
+        mode=mode,
+    )
+
+
+async def _invoke(chain, cultural_profile, persona, sales_context):
+    return await chain.ainvoke(
+        query="보톡스 효과는 얼마나 가나요?",
+        rag_results="보톡스 효과 3-6개월",
+        clinic_manual="앨러간 보톡스 사용",
+        country_code="JP",
+        language_code="ja",
+        cultural_profile=cultural_profile,
+        persona=persona,
+        conversation_history="",
+        sales_context=sales_context,
+    )
+
+
+class TestPipelineModes:
+    async def test_fused_mode_makes_a_single_call(
+        self,
+        mock_knowledge_chain,
+        mock_style_chain,
+        mock_sales_chain,
+        mock_fused_chain,
+        cultural_profile,
+        persona,
+        sales_context,
+    ):
+        chain = _chain(
+            "fused", mock_knowledge_chain, mock_style_chain, mock_sales_chain, mock_fused_chain
+        )
+
+        result = await _invoke(chain, cultural_profile, persona, sales_context)
+
+        assert result == mock_fused_chain.ainvoke.return_value
+        kwargs = mock_fused_chain.ainvoke.call_args.kwargs
+        assert kwargs["rag_results"] == "보톡스 효과 3-6개월"
+        assert kwargs["clinic_manual"] == "앨러간 보톡스 사용"
+        mock_knowledge_chain.ainvoke.assert_not_called()
+        mock_style_chain.ainvoke.assert_not_called()
+        mock_sales_chain.ainvoke.assert_not_called()
+
+    async def test_two_pass_mode_grounds_fused_call_on_knowledge(
+        self,
+        mock_knowledge_chain,
+        mock_style_chain,
+        mock_sales_chain,
+        mock_fused_chain,
+        cultural_profile,
+        persona,
+        sales_context,
+    ):
+        chain = _chain(
+            "two_pass", mock_knowledge_chain, mock_style_chain, mock_sales_chain, mock_fused_chain
+        )
+
+        result = await _invoke(chain, cultural_profile, persona, sales_context)
+
+        assert result == mock_fused_chain.ainvoke.return_value
+        mock_knowledge_chain.ainvoke.assert_called_once()
+        kwargs = mock_fused_chain.ainvoke.call_args.kwargs
+        assert kwargs["knowledge_output"] == mock_knowledge_chain.ainvoke.return_value
+        mock_style_chain.ainvoke.assert_not_called()
+        mock_sales_chain.ainvoke.assert_not_called()
+
+    async def test_final_stage_receives_token_callback(
+        self,
+        mock_knowledge_chain,
+        mock_style_chain,
+        mock_sales_chain,
+        mock_fused_chain,
+        cultural_profile,
+        persona,
+        sales_context,
+    ):
+        tokens = []
+        for mode, final_chain in [("layered", mock_sales_chain), ("fused", mock_fused_chain)]:
+            chain = _chain(
+                mode, mock_knowledge_chain, mock_style_chain, mock_sales_chain, mock_fused_chain
+            )
+            await chain.ainvoke(
+                query="보톡스",
+                rag_results="",
+                clinic_manual="",
+                country_code="JP",
+                language_code="ja",
+                cultural_profile=cultural_profile,
+                persona=persona,
+                conversation_history="",
+                sales_context=sales_context,
+                on_token=tokens.append,
+            )
+            assert final_chain.ainvoke.call_args.kwargs["on_token"] == tokens.append
+        assert "on_token" not in mock_style_chain.ainvoke.call_args.kwargs
+
+    def test_unknown_mode_rejected(self, mock_knowledge_chain, mock_fused_chain):
+        with pytest.raises(ValueError, match="Unknown pipeline mode"):
+            _chain("single", mock_knowledge_chain, None, None, mock_fused_chain)
+
+    def test_fused_modes_require_fused_chain(self, mock_knowledge_chain):
+        with pytest.raises(ValueError, match="requires a fused chain"):
+            _chain("fused", mock_knowledge_chain, None, None, None)
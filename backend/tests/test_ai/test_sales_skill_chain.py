@@ -80,3 +80,19 @@ class TestSalesSkillChain:
 
     def test_chain_has_prompt_template(self, sales_chain):
         assert sales_chain.prompt is not None
+
+    async def test_streams_tokens_to_callback(self, sales_context):
+        chain = SalesSkillChain(llm=GenericFakeChatModel(
+            messages=iter([
+                AIMessage(content="Botox starts at 100,000 won. Shall I book a consultation?"),
+            ])
+        ))
+        tokens = []
+        result = await chain.ainvoke(
+            styled_output="Botox starts at 100,000 won.",
+            conversation_history="",
+            sales_context=sales_context,
+            on_token=tokens.append,
+        )
+        assert len(tokens) > 1
+        assert "".join(tokens) == result
@@ -1,3 +1,7 @@
+import random
+import string
+import time
+
 import pytest
 from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
 from langchain_core.messages import AIMessage
@@ -111,6 +115,75 @@ class TestMedicalTermMatcher:
         result = matcher.replace_terms(text, "xx")
         assert result == text
 
+    def test_longest_term_wins(self):
+        matcher = MedicalTermMatcher(
+            {"en": {"botox": "보톡스", "botox lift": "보톡스 리프팅", "lift": "리프팅"}}
+        )
+        result = matcher.replace_terms("Botox lift or a lift?", "en")
+        assert result == "[TERM:보톡스 리프팅] or a [TERM:리프팅]?"
+
+    def test_regex_metacharacters_are_literal(self):
+        matcher = MedicalTermMatcher({"en": {"C++ (laser)": "레이저", "a.b": "에이비"}})
+        assert matcher.replace_terms("C++ (laser) axb a.b", "en") == (
+            "[TERM:레이저] axb [TERM:에이비]"
+        )
+
+    def test_compiles_each_language_once(self, matcher):
+        matcher.replace_terms("botox", "en")
+        compiled = matcher._compiled["en"]
+        matcher.replace_terms("filler", "en")
+        assert matcher._compiled["en"] is compiled
+        assert "ja" not in matcher._compiled
+
+    def test_rebuild_reuses_unchanged_languages(self, matcher, term_dict):
+        matcher.replace_terms("botox", "en")
+        matcher.replace_terms("ボトックス", "ja")
+
+        changed = {**term_dict, "ja": {**term_dict["ja"], "フィラー": "필러"}}
+        rebuilt = MedicalTermMatcher(changed, previous=matcher)
+
+        assert rebuilt._compiled["en"] is matcher._compiled["en"]
+        assert "ja" not in rebuilt._compiled
+        assert rebuilt.replace_terms("フィラー", "ja") == "[TERM:필러]"
+
+    def test_benchmark_5k_terms_8_languages(self):
+        """A 5k-term glossary per language: compile once, then one pass per message."""
+        rng = random.Random(7)
+        alphabets = {
+            "en": string.ascii_letters,
+            "id": string.ascii_lowercase,
+            "vi": "abcdeghiklmnopqrstuvxyăâđêôơư",
+            "ja": "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホ",
+            "zh-CN": "的一是不了人我在有他这为之大来以个中上们到说国和地",
+            "zh-TW": "的一是不了人我在有他這為之大來以個中上們到說國和地",
+            "th": "กขคงจฉชซญดตถทนบปผพฟมยรลวศสหอ",
+            "ko": "가나다라마바사아자차카타파하",
+        }
+        term_dict = {
+            lang: {
+                "".join(rng.choice(alphabet) for _ in range(rng.randint(3, 12))): f"용어{i}"
+                for i in range(5000)
+            }
+            for lang, alphabet in alphabets.items()
+        }
+        matcher = MedicalTermMatcher(term_dict)
+
+        started = time.perf_counter()
+        for lang in alphabets:
+            matcher.replace_terms("", lang)
+        compile_seconds = time.perf_counter() - started
+
+        terms = list(term_dict["en"])
+        text = " ".join(terms[i] if i % 10 == 0 else "word" for i in range(60))
+        started = time.perf_counter()
+        for _ in range(100):
+            result = matcher.replace_terms(text, "en")
+        per_message = (time.perf_counter() - started) / 100
+
+        assert result.count("[TERM:") >= 6
+        assert compile_seconds < 20
+        assert per_message < 0.01
+
 
 # --- TranslationChain ---
 
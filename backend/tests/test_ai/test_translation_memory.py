@@ -0,0 +1,127 @@
+"""Tests for the translation memory and its use in TranslationChain."""
+
+import uuid
+from unittest.mock import patch
+
+import orjson
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from app.ai.chains import translation_memory as memory_module
+from app.ai.chains.translation_chain import TranslationChain
+from app.ai.chains.translation_memory import TranslationMemory, normalize_text
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the mget/set commands the memory issues."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.ttls: dict[str, int] = {}
+        self.reads = 0
+
+    async def pipelined(self, command, *keys):
+        assert command == "mget"
+        self.reads += 1
+        return [self.data.get(k) for k in keys]
+
+    async def cache_set(self, key, value, ttl_seconds=300):
+        self.data[key] = orjson.dumps(value)
+        self.ttls[key] = ttl_seconds
+
+
+@pytest.fixture
+def fake_redis():
+    redis = FakeRedis()
+    with (
+        patch.object(memory_module, "pipelined", redis.pipelined),
+        patch.object(memory_module, "cache_set", redis.cache_set),
+    ):
+        yield redis
+
+
+def _chain(memory, replies):
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content=r) for r in replies]))
+    return TranslationChain(
+        translation_llm=llm,
+        detection_llm=GenericFakeChatModel(messages=iter([])),
+        term_dict={"ja": {"ボトックス": "보톡스"}},
+        memory=memory,
+    )
+
+
+def test_normalize_text_folds_width_and_whitespace():
+    assert normalize_text("  ＡＢＣ\n  12 ") == "ABC 12"
+
+
+class TestTranslationMemory:
+    async def test_miss_then_shared_hit(self, fake_redis):
+        await TranslationMemory().set("안녕하세요", "ko", "ja", "こんにちは")
+
+        # A fresh instance stands in for another worker
+        memory = TranslationMemory()
+        assert await memory.get("안녕하세요 ", "ko", "ja") == "こんにちは"
+        assert await memory.get("안녕하세요", "ko", "en") is None
+
+    async def test_local_tier_skips_redis(self, fake_redis):
+        memory = TranslationMemory()
+        await memory.set("안녕하세요", "ko", "ja", "こんにちは")
+        reads = fake_redis.reads
+
+        assert await memory.get("안녕하세요", "ko", "ja") == "こんにちは"
+        assert fake_redis.reads == reads
+
+    async def test_local_tier_is_bounded(self, fake_redis):
+        memory = TranslationMemory(max_size=2)
+        for i in range(5):
+            await memory.set(f"문장 {i}", "ko", "en", f"sentence {i}")
+        assert len(memory._local) == 2
+
+    async def test_correction_wins_for_its_clinic_only(self, fake_redis):
+        clinic_id, other_clinic = uuid.uuid4(), uuid.uuid4()
+        await TranslationMemory().set("보톡스", "ko", "en", "Botox shot")
+        await TranslationMemory().correct(
+            "보톡스", "ko", "en", "Botulinum toxin injection", clinic_id
+        )
+
+        memory = TranslationMemory()
+        assert await memory.get("보톡스", "ko", "en", clinic_id) == (
+            "Botulinum toxin injection"
+        )
+        assert await memory.get("보톡스", "ko", "en", other_clinic) == "Botox shot"
+
+    async def test_redis_down_is_a_miss(self):
+        async def down(*args):
+            raise ConnectionError
+
+        with patch.object(memory_module, "pipelined", down):
+            assert await TranslationMemory().get("안녕하세요", "ko", "ja") is None
+
+
+class TestChainUsesMemory:
+    async def test_repeated_outgoing_text_skips_llm(self, fake_redis):
+        chain = _chain(TranslationMemory(), ["ご予約ありがとうございます。"])
+
+        first = await chain.translate_outgoing("예약해 주셔서 감사합니다.", "ja")
+        # The fake LLM has no second reply, so this must come from memory
+        second = await chain.translate_outgoing("예약해 주셔서 감사합니다.", "ja")
+
+        assert first.from_memory is False
+        assert second.from_memory is True
+        assert second.translated_text == "ご予約ありがとうございます。"
+
+    async def test_incoming_is_keyed_after_term_markup(self, fake_redis):
+        clinic_id = uuid.uuid4()
+        memory = TranslationMemory()
+        await memory.correct(
+            "[TERM:보톡스]はいくらですか？", "ja", "ko", "보톡스는 얼마인가요?", clinic_id
+        )
+        chain = _chain(memory, [])
+
+        result = await chain.translate_incoming(
+            "ボトックスはいくらですか？", known_language="ja", clinic_id=clinic_id
+        )
+
+        assert result.from_memory is True
+        assert result.translated_text == "보톡스는 얼마인가요?"
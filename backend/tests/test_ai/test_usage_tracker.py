@@ -1,12 +1,17 @@
-"""Tests for LLM usage tracker, cost calculation, and tracked_ainvoke."""
+"""Tests for LLM usage tracker, cost calculation, tracked_ainvoke and track_usage."""
 
+import asyncio
 import uuid
 from dataclasses import dataclass
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
 
-from app.ai.tracked_llm import tracked_ainvoke
+from app.ai.tracked_llm import UsageCallbackHandler, track_usage, tracked_ainvoke, tracked_as
 from app.ai.usage_tracker import UsageTracker, calculate_cost
 
 
@@ -35,6 +40,17 @@ class TestCalculateCost:
         cost = calculate_cost("gpt-4o", 0, 0)
         assert cost == 0.0
 
+    def test_claude_cache_reads_and_writes(self):
+        # 10000 input of which 8000 read from cache and 1000 written to it:
+        # (1000 + 8000 * 0.1 + 1000 * 1.25) * 0.003/1000 = 0.00915
+        cost = calculate_cost("claude-sonnet-4-5-20250929", 10000, 0, 8000, 1000)
+        assert abs(cost - 0.00915) < 1e-8
+        assert cost < calculate_cost("claude-sonnet-4-5-20250929", 10000, 0)
+
+    def test_gpt_cache_reads_half_price(self):
+        cost = calculate_cost("gpt-4o", 2000, 0, cache_read_tokens=2000)
+        assert abs(cost - 0.0025) < 1e-8
+
 
 class TestUsageTracker:
     @pytest.fixture
@@ -67,6 +83,21 @@ class TestUsageTracker:
         assert rec.cost_usd > 0
         assert rec.success is True
 
+    def test_record_keeps_cache_tokens_separate(self, tracker):
+        tracker.record(
+            provider="anthropic",
+            model_name="claude-sonnet-4-5",
+            operation="consultation",
+            input_tokens=5000,
+            output_tokens=200,
+            cache_read_tokens=4000,
+        )
+        rec = tracker._records[0]
+        assert rec.input_tokens == 5000
+        assert rec.cache_read_tokens == 4000
+        assert rec.cache_write_tokens == 0
+        assert rec.cost_usd == calculate_cost("claude-sonnet-4-5", 5000, 200, 4000, 0)
+
     def test_record_failure(self, tracker):
         tracker.record(
             provider="anthropic",
@@ -137,6 +168,23 @@ class TestTrackedAinvoke:
         assert call_kwargs["output_tokens"] == 50
         assert call_kwargs["success"] is True
 
+    async def test_cache_token_details_recorded(self, mock_tracker):
+        result = MagicMock()
+        result.usage_metadata = {
+            "input_tokens": 3000,
+            "output_tokens": 100,
+            "input_token_details": {"cache_read": 2500, "cache_creation": 0},
+        }
+        result.response_metadata = {"model": "claude-sonnet-4-5-20250929"}
+        llm = AsyncMock()
+        llm.ainvoke.return_value = result
+
+        await tracked_ainvoke(llm, "prompt", tracker=mock_tracker, operation="consultation")
+
+        call_kwargs = mock_tracker.record.call_args.kwargs
+        assert call_kwargs["cache_read_tokens"] == 2500
+        assert call_kwargs["cache_write_tokens"] == 0
+
     async def test_failure_records_error_and_reraises(self, mock_tracker):
         llm = AsyncMock()
         llm.ainvoke.side_effect = RuntimeError("LLM failed")
@@ -151,3 +199,70 @@ class TestTrackedAinvoke:
         call_kwargs = mock_tracker.record.call_args.kwargs
         assert call_kwargs["success"] is False
         assert "LLM failed" in call_kwargs["error_message"]
+
+
+class TestTrackUsage:
+    @pytest.fixture
+    def mock_tracker(self):
+        return MagicMock(spec=UsageTracker)
+
+    @staticmethod
+    def _chain():
+        reply = AIMessage(
+            content="안녕하세요",
+            usage_metadata={
+                "input_tokens": 3000,
+                "output_tokens": 40,
+                "total_tokens": 3040,
+                "input_token_details": {"cache_read": 2500, "cache_creation": 0},
+            },
+            response_metadata={"model_name": "claude-sonnet-4-5-20250929"},
+        )
+        llm = GenericFakeChatModel(messages=iter([reply]))
+        return ChatPromptTemplate.from_messages([("human", "{query}")]) | llm | StrOutputParser()
+
+    async def test_records_llm_calls_inside_spawned_tasks(self, mock_tracker):
+        chain = self._chain()
+        with track_usage(mock_tracker, "consultation"):
+            # ConsultationService runs generation in its own task
+            await asyncio.create_task(chain.ainvoke({"query": "보톡스 가격"}))
+
+        mock_tracker.record.assert_called_once()
+        call_kwargs = mock_tracker.record.call_args.kwargs
+        assert call_kwargs["operation"] == "consultation"
+        assert call_kwargs["provider"] == "anthropic"
+        assert call_kwargs["input_tokens"] == 3000
+        assert call_kwargs["cache_read_tokens"] == 2500
+        assert call_kwargs["success"] is True
+
+    async def test_nothing_recorded_outside_the_block(self, mock_tracker):
+        with track_usage(mock_tracker, "consultation"):
+            pass
+        await self._chain().ainvoke({"query": "보톡스 가격"})
+
+        mock_tracker.record.assert_not_called()
+
+    async def test_tracked_as_tags_spawned_work(self, mock_tracker):
+        with track_usage(mock_tracker, "consultation"):
+            with tracked_as("escalation"):
+                escalation = asyncio.create_task(self._chain().ainvoke({"query": "부작용"}))
+            generation = asyncio.create_task(self._chain().ainvoke({"query": "부작용"}))
+            await asyncio.gather(escalation, generation)
+
+        operations = sorted(c.kwargs["operation"] for c in mock_tracker.record.call_args_list)
+        assert operations == ["consultation", "escalation"]
+
+    async def test_tracked_as_without_tracking_records_nothing(self, mock_tracker):
+        with tracked_as("escalation"):
+            await self._chain().ainvoke({"query": "부작용"})
+
+        mock_tracker.record.assert_not_called()
+
+    def test_cancelled_call_is_not_an_error(self, mock_tracker):
+        handler = UsageCallbackHandler(mock_tracker, "consultation")
+        run_id = uuid.uuid4()
+        handler.on_chat_model_start({}, [], run_id=run_id)
+
+        handler.on_llm_error(asyncio.CancelledError(), run_id=run_id)
+
+        mock_tracker.record.assert_not_called()
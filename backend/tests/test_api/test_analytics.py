@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 from decimal import Decimal
+from unittest.mock import patch
 
 import pytest_asyncio
 from httpx import AsyncClient
@@ -15,6 +16,14 @@ from app.models.customer import Customer
 from app.models.messenger_account import MessengerAccount
 from app.models.payment import Payment
 from app.models.user import User
+from tests.conftest import test_session_factory
+
+
+@pytest_asyncio.fixture(autouse=True)
+def overview_session_factory():
+    # The cached overview loader opens its own session
+    with patch("app.core.database.async_session_factory", test_session_factory):
+        yield
 
 
 @pytest_asyncio.fixture
@@ -15,6 +15,7 @@ from app.models.customer import Customer
 from app.models.payment import Payment
 from app.models.procedure import Procedure
 from app.models.user import User
+from app.services.analytics_rollup_service import AnalyticsRollupService
 
 
 @pytest_asyncio.fixture
@@ -122,6 +123,10 @@ async def rev_data(db: AsyncSession, rev_clinic: Clinic):
         db.add(payment)
 
     await db.commit()
+
+    # Endpoints read the daily rollups
+    await AnalyticsRollupService(db).rebuild(days=3)
+    await db.commit()
     return {"proc": proc, "cp": cp, "customers": [customer1, customer2]}
 
 
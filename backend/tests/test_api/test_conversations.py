@@ -1,11 +1,14 @@
 import uuid
+from datetime import datetime, timedelta, timezone
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import create_access_token, hash_password
 from app.models import Clinic, Conversation, Customer, Message, MessengerAccount, User
+from tests.conftest import test_engine
 
 
 # --- Fixtures ---
@@ -120,6 +123,7 @@ async def conv_messages(
             original_language="ja",
             translated_content="보톡스 얼마예요?",
             translated_language="ko",
+            created_at=datetime(2026, 3, 1, 10, 0, tzinfo=timezone.utc),
         ),
         Message(
             id=uuid.uuid4(),
@@ -128,6 +132,7 @@ async def conv_messages(
             sender_type="ai",
             content="보톡스 가격을 안내드리겠습니다.",
             content_type="text",
+            created_at=datetime(2026, 3, 1, 10, 1, tzinfo=timezone.utc),
         ),
     ]
     db.add_all(msgs)
@@ -173,6 +178,81 @@ class TestListConversations:
         assert response.status_code == 401
 
 
+class TestListConversationsCursor:
+    @pytest.fixture
+    async def inbox(
+        self,
+        db: AsyncSession,
+        conv_clinic: Clinic,
+        conv_customer: Customer,
+        conv_account: MessengerAccount,
+    ) -> list[Conversation]:
+        base = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        # Ties on last_message_at and conversations without messages
+        times = [base, base, base + timedelta(hours=1), None, base - timedelta(days=1), None, base]
+        convs = [
+            Conversation(
+                id=uuid.uuid4(),
+                clinic_id=conv_clinic.id,
+                customer_id=conv_customer.id,
+                messenger_account_id=conv_account.id,
+                status="active",
+                last_message_at=t,
+            )
+            for t in times
+        ]
+        db.add_all(convs)
+        await db.commit()
+        return convs
+
+    async def test_walks_inbox_in_offset_order(
+        self, client: AsyncClient, auth_headers: dict, inbox: list[Conversation]
+    ):
+        offset_page = await client.get(
+            "/api/v1/conversations?limit=100", headers=auth_headers
+        )
+        expected = [item["id"] for item in offset_page.json()["items"]]
+
+        seen, cursor = [], ""
+        while cursor is not None:
+            response = await client.get(
+                "/api/v1/conversations",
+                params={"limit": 3, "cursor": cursor},
+                headers=auth_headers,
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert "offset" not in data and data["total"] is None
+            seen += [item["id"] for item in data["items"]]
+            cursor = data["next_cursor"]
+
+        assert seen == expected
+        assert len(seen) == len(inbox)
+
+    async def test_optional_totals(
+        self, client: AsyncClient, auth_headers: dict, inbox: list[Conversation]
+    ):
+        exact = await client.get(
+            "/api/v1/conversations",
+            params={"cursor": "", "limit": 2, "total": "exact"},
+            headers=auth_headers,
+        )
+        assert exact.json()["total"] == len(inbox)
+
+        estimate = await client.get(
+            "/api/v1/conversations",
+            params={"cursor": "", "total": "estimate"},
+            headers=auth_headers,
+        )
+        assert isinstance(estimate.json()["total"], int)
+
+    async def test_invalid_cursor(self, client: AsyncClient, auth_headers: dict):
+        response = await client.get(
+            "/api/v1/conversations?cursor=not-a-cursor", headers=auth_headers
+        )
+        assert response.status_code == 400
+
+
 # --- GET /api/v1/conversations/{id} ---
 
 class TestGetConversation:
@@ -241,6 +321,166 @@ class TestGetMessages:
         assert conv_response.json()["unread_count"] == 0
 
 
+class TestMessageHistoryWindow:
+    @pytest.fixture
+    async def thread(
+        self,
+        db: AsyncSession,
+        conv_conversation: Conversation,
+        conv_clinic: Clinic,
+        conv_customer: Customer,
+    ) -> list[Message]:
+        start = datetime(2026, 3, 1, 10, 0, tzinfo=timezone.utc)
+        msgs = [
+            Message(
+                id=uuid.uuid4(),
+                conversation_id=conv_conversation.id,
+                clinic_id=conv_clinic.id,
+                sender_type="customer",
+                sender_id=conv_customer.id,
+                content=f"message {i}",
+                content_type="text",
+                created_at=start + timedelta(minutes=i),
+            )
+            for i in range(7)
+        ]
+        db.add_all(msgs)
+        await db.commit()
+        return msgs
+
+    @staticmethod
+    async def _get(client: AsyncClient, headers: dict, conv: Conversation, **params):
+        return await client.get(
+            f"/api/v1/conversations/{conv.id}/messages", params=params, headers=headers
+        )
+
+    async def test_latest_window_and_older_pages(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        conv_conversation: Conversation,
+        thread: list[Message],
+    ):
+        response = await self._get(client, auth_headers, conv_conversation, limit=3)
+        assert [m["content"] for m in response.json()] == [
+            "message 4", "message 5", "message 6"
+        ]
+        assert response.headers["X-Has-More"] == "true"
+
+        history = response.json()
+        while response.headers["X-Has-More"] == "true":
+            response = await self._get(
+                client, auth_headers, conv_conversation, limit=3, before=history[0]["id"]
+            )
+            history = response.json() + history
+
+        assert [m["id"] for m in history] == [str(m.id) for m in thread]
+
+    async def test_since_returns_only_newer_messages(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        conv_conversation: Conversation,
+        thread: list[Message],
+    ):
+        response = await self._get(
+            client, auth_headers, conv_conversation, limit=1, since=str(thread[4].id)
+        )
+
+        # A delta is not cut to the page size
+        assert [m["content"] for m in response.json()] == ["message 5", "message 6"]
+        assert response.headers["X-Has-More"] == "false"
+
+    async def test_since_picks_up_late_commits(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        db: AsyncSession,
+        conv_conversation: Conversation,
+        thread: list[Message],
+    ):
+        # Stamped before message 6 but committed after the client fetched it
+        late = Message(
+            id=uuid.uuid4(),
+            conversation_id=conv_conversation.id,
+            clinic_id=conv_conversation.clinic_id,
+            sender_type="ai",
+            content="late reply",
+            content_type="text",
+            created_at=thread[6].created_at - timedelta(seconds=5),
+        )
+        db.add(late)
+        await db.commit()
+
+        response = await self._get(
+            client, auth_headers, conv_conversation, since=str(thread[6].id)
+        )
+
+        assert [m["content"] for m in response.json()] == ["late reply"]
+
+    async def test_after_pages_forward(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        conv_conversation: Conversation,
+        thread: list[Message],
+    ):
+        response = await self._get(
+            client, auth_headers, conv_conversation, limit=2, after=str(thread[1].id)
+        )
+
+        assert [m["content"] for m in response.json()] == ["message 2", "message 3"]
+        assert response.headers["X-Has-More"] == "true"
+
+    async def test_invalid_cursors(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        conv_conversation: Conversation,
+        thread: list[Message],
+    ):
+        both = await self._get(
+            client,
+            auth_headers,
+            conv_conversation,
+            before=str(thread[3].id),
+            since=str(thread[1].id),
+        )
+        assert both.status_code == 400
+
+        unknown = await self._get(
+            client, auth_headers, conv_conversation, before=str(uuid.uuid4())
+        )
+        assert unknown.status_code == 404
+
+    async def test_read_marker_written_only_on_change(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        conv_conversation: Conversation,
+        thread: list[Message],
+    ):
+        updates = []
+
+        def record(conn, cursor, statement, *args):
+            if statement.startswith("UPDATE conversations"):
+                updates.append(statement)
+
+        event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            # Reading older history leaves the thread unread
+            await self._get(
+                client, auth_headers, conv_conversation, before=str(thread[3].id)
+            )
+            assert updates == []
+
+            await self._get(client, auth_headers, conv_conversation)
+            await self._get(client, auth_headers, conv_conversation)
+            assert len(updates) == 1
+        finally:
+            event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+
 # --- POST /api/v1/conversations/{id}/messages ---
 
 class TestSendMessage:
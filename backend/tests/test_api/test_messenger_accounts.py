@@ -181,6 +181,39 @@ class TestUpdateMessengerAccount:
         assert data["is_active"] is False
 
 
+    async def test_update_evicts_cached_webhook_account(
+        self,
+        client: AsyncClient,
+        auth_headers: dict,
+        db: AsyncSession,
+        account_clinic: Clinic,
+    ):
+        acc = MessengerAccount(
+            id=uuid.uuid4(),
+            clinic_id=account_clinic.id,
+            messenger_type="telegram",
+            account_name="cached_bot",
+            credentials={"bot_token": "test"},
+            webhook_secret="secret",
+            is_active=True,
+        )
+        db.add(acc)
+        await db.commit()
+
+        # Loads the account into the webhook cache
+        webhook = f"/api/webhooks/telegram/{acc.id}"
+        headers = {"X-Telegram-Bot-Api-Secret-Token": "secret"}
+        assert (await client.post(webhook, json={}, headers=headers)).status_code == 200
+
+        await client.patch(
+            f"/api/v1/messenger-accounts/{acc.id}",
+            json={"is_active": False},
+            headers=auth_headers,
+        )
+
+        assert (await client.post(webhook, json={}, headers=headers)).status_code == 403
+
+
 class TestDeleteMessengerAccount:
     """DELETE /api/v1/messenger-accounts/{id}"""
 
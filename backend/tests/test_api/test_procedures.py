@@ -1,4 +1,5 @@
 import uuid
+from unittest.mock import AsyncMock, patch
 
 import pytest
 import pytest_asyncio
@@ -233,3 +234,18 @@ class TestUpdateProcedure:
         )
         assert resp.status_code == 200
         assert resp.json()["is_active"] is False
+
+    @pytest.mark.asyncio
+    async def test_update_publishes_knowledge_changed(
+        self, client: AsyncClient, auth_headers: dict, base_procedure: Procedure
+    ):
+        with patch(
+            "app.api.v1.procedures.publish_knowledge_changed", new_callable=AsyncMock
+        ) as mock_publish:
+            resp = await client.patch(
+                f"/api/v1/procedures/{base_procedure.id}",
+                json={"description_ko": "업데이트된 설명"},
+                headers=auth_headers,
+            )
+        assert resp.status_code == 200
+        mock_publish.assert_awaited_once_with(None)
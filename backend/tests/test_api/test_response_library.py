@@ -193,3 +193,21 @@ async def test_delete_response_library(
 async def test_unauthorized_access(client: AsyncClient, sample_entry: ResponseLibrary):
     resp = await client.get("/api/v1/response-library")
     assert resp.status_code in (401, 403)
+
+
+@pytest.mark.asyncio
+async def test_mutation_publishes_knowledge_changed(
+    client: AsyncClient, auth_token: str, sample_entry: ResponseLibrary
+):
+    from unittest.mock import AsyncMock, patch
+
+    with patch(
+        "app.api.v1.response_library.publish_knowledge_changed", new_callable=AsyncMock
+    ) as mock_publish:
+        resp = await client.patch(
+            f"/api/v1/response-library/{sample_entry.id}",
+            json={"answer": "12만원부터"},
+            headers={"Authorization": f"Bearer {auth_token}"},
+        )
+    assert resp.status_code == 200
+    mock_publish.assert_awaited_once_with(sample_entry.clinic_id)
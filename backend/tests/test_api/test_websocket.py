@@ -99,26 +99,25 @@ class TestWebSocketBroadcast:
     async def test_broadcast_publishes_to_redis(self):
         """Broadcasting should publish message via Redis Pub/Sub."""
         mgr = ConnectionManager()
-        mock_redis = AsyncMock()
-        mgr._redis = mock_redis
-
         clinic_id = uuid.uuid4()
         data = {"type": "new_message", "conversation_id": str(uuid.uuid4())}
-        await mgr.broadcast_to_clinic(clinic_id, data)
+        with patch("app.websocket.manager.pipelined", new_callable=AsyncMock) as mock:
+            await mgr.broadcast_to_clinic(clinic_id, data)
 
-        mock_redis.publish.assert_called_once()
-        call_args = mock_redis.publish.call_args
-        assert f"ws:clinic:{clinic_id}" == call_args[0][0]
+        mock.assert_called_once()
+        command, channel, _payload = mock.call_args[0]
+        assert command == "publish"
+        assert channel == f"ws:clinic:{clinic_id}"
 
     async def test_broadcast_falls_back_to_local_on_redis_error(self):
         """If Redis publish fails, should fall back to local delivery."""
         mgr = ConnectionManager()
-        mock_redis = AsyncMock()
-        mock_redis.publish.side_effect = Exception("Redis down")
-        mgr._redis = mock_redis
-
-        # Should not raise
-        await mgr.broadcast_to_clinic(
-            uuid.uuid4(),
-            {"type": "new_message", "conversation_id": str(uuid.uuid4())},
-        )
+        with patch(
+            "app.websocket.manager.pipelined",
+            AsyncMock(side_effect=Exception("Redis down")),
+        ):
+            # Should not raise
+            await mgr.broadcast_to_clinic(
+                uuid.uuid4(),
+                {"type": "new_message", "conversation_id": str(uuid.uuid4())},
+            )
@@ -0,0 +1,251 @@
+"""Tests for the two-tier application cache."""
+
+import asyncio
+import time
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import ENTRY_PREFIX, LOCK_PREFIX, Cache, CacheEntry, cached
+from app.middleware.metrics import CACHE_REQUESTS
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio commands the cache uses."""
+
+    def __init__(self):
+        self.data: dict[str, str | bytes] = {}
+        self.commands: list[str] = []
+
+    async def get(self, key):
+        self.commands.append("get")
+        return self.data.get(key)
+
+    async def mget(self, *keys):
+        self.commands.append("mget")
+        return [self.data.get(k) for k in keys]
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        self.commands.append("set")
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, *keys):
+        self.commands.append("delete")
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def incr(self, key):
+        value = int(self.data.get(key, 0)) + 1
+        self.data[key] = str(value)
+        return value
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def incr(self, key):
+        self.ops.append(key)
+
+    async def execute(self):
+        self.redis.commands.append("pipeline")
+        return [await self.redis.incr(key) for key in self.ops]
+
+
+@pytest.fixture
+def fake_redis():
+    redis = FakeRedis()
+    with patch.object(cache_module, "_get_redis", AsyncMock(return_value=redis)):
+        yield redis
+
+
+def _counter(loader_value="v", delay=0.0):
+    calls = {"n": 0}
+
+    async def loader():
+        calls["n"] += 1
+        if delay:
+            await asyncio.sleep(delay)
+        return {"value": loader_value, "n": calls["n"]}
+
+    return loader, calls
+
+
+class TestTwoTiers:
+    async def test_miss_then_local_hit(self, fake_redis):
+        c = Cache()
+        loader, calls = _counter()
+
+        assert await c.get_or_load("k", loader) == {"value": "v", "n": 1}
+        fake_redis.commands.clear()
+        assert await c.get_or_load("k", loader) == {"value": "v", "n": 1}
+
+        assert calls["n"] == 1
+        assert fake_redis.commands == []  # served from process memory
+
+    async def test_redis_hit_shared_across_processes(self, fake_redis):
+        loader, calls = _counter()
+        await Cache().get_or_load("k", loader)
+
+        # A second Cache stands in for another worker process
+        assert await Cache().get_or_load("k", loader) == {"value": "v", "n": 1}
+        assert calls["n"] == 1
+
+    async def test_single_round_trip_with_tags(self, fake_redis):
+        loader, _ = _counter()
+        await Cache().get_or_load("k", loader, tags=["a", "b"])
+
+        fake_redis.commands.clear()
+        await Cache().get_or_load("k", loader, tags=["a", "b"])
+        assert fake_redis.commands == ["mget"]
+
+    async def test_redis_down_still_loads(self):
+        c = Cache()
+        loader, calls = _counter()
+        with patch.object(
+            cache_module, "_get_redis", AsyncMock(side_effect=ConnectionError)
+        ):
+            assert await c.get_or_load("k", loader) == {"value": "v", "n": 1}
+            assert await c.get_or_load("k", loader) == {"value": "v", "n": 1}
+        assert calls["n"] == 1
+
+
+class TestSingleFlight:
+    async def test_concurrent_misses_load_once(self, fake_redis):
+        c = Cache()
+        loader, calls = _counter(delay=0.05)
+
+        results = await asyncio.gather(*(c.get_or_load("k", loader) for _ in range(20)))
+
+        assert calls["n"] == 1
+        assert all(r == results[0] for r in results)
+
+    async def test_other_process_waits_for_lock_holder(self, fake_redis):
+        loader_a, calls_a = _counter("from-a", delay=0.1)
+        loader_b, calls_b = _counter("from-b")
+
+        a = asyncio.create_task(Cache().get_or_load("k", loader_a))
+        await asyncio.sleep(0.01)
+        assert f"{LOCK_PREFIX}k" in fake_redis.data
+
+        result_b = await Cache().get_or_load("k", loader_b)
+
+        assert (await a)["value"] == "from-a"
+        assert result_b["value"] == "from-a"
+        assert calls_b["n"] == 0
+        assert f"{LOCK_PREFIX}k" not in fake_redis.data
+
+    async def test_loader_error_propagates_and_is_not_cached(self, fake_redis):
+        c = Cache()
+
+        async def failing():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await c.get_or_load("k", failing)
+        loader, calls = _counter()
+        assert (await c.get_or_load("k", loader))["n"] == 1
+
+
+class TestStaleWhileRevalidate:
+    async def test_serves_stale_and_refreshes_in_background(self, fake_redis):
+        fake_redis.data[f"{ENTRY_PREFIX}k"] = CacheEntry(
+            value={"value": "old"}, fresh_until=time.time() - 1
+        ).encode()
+        c = Cache()
+        loader, calls = _counter("new", delay=0.02)
+
+        assert await c.get_or_load("k", loader, ttl=60, stale_ttl=30) == {"value": "old"}
+        await asyncio.sleep(0.05)
+
+        assert calls["n"] == 1
+        assert (await c.get_or_load("k", loader, ttl=60, stale_ttl=30))["value"] == "new"
+
+    async def test_expired_without_stale_window_reloads(self, fake_redis):
+        fake_redis.data[f"{ENTRY_PREFIX}k"] = CacheEntry(
+            value={"value": "old"}, fresh_until=time.time() - 1
+        ).encode()
+        loader, _ = _counter("new")
+
+        assert (await Cache().get_or_load("k", loader))["value"] == "new"
+
+
+class TestTags:
+    async def test_invalidate_retires_local_and_shared_entries(self, fake_redis):
+        c = Cache()
+        loader, calls = _counter()
+        await c.get_or_load("k1", loader, tags=["clinic:1"])
+        await c.get_or_load("k2", loader, tags=["clinic:2"])
+
+        await c.invalidate_tags("clinic:1")
+
+        assert (await c.get_or_load("k1", loader, tags=["clinic:1"]))["n"] == 3
+        assert (await c.get_or_load("k2", loader, tags=["clinic:2"]))["n"] == 2
+
+    async def test_invalidation_from_another_process(self, fake_redis):
+        loader, calls = _counter()
+        await Cache().get_or_load("k", loader, tags=["clinic:1"])
+
+        await Cache().invalidate_tags("clinic:1")
+
+        assert (await Cache().get_or_load("k", loader, tags=["clinic:1"]))["n"] == 2
+
+    async def test_invalidated_entry_is_not_served_stale(self, fake_redis):
+        loader, _ = _counter()
+        await Cache().get_or_load("k", loader, tags=["t"], stale_ttl=60)
+        await Cache().invalidate_tags("t")
+
+        assert (await Cache().get_or_load("k", loader, tags=["t"], stale_ttl=60))["n"] == 2
+
+
+class TestCachedDecorator:
+    async def test_key_and_tags_from_arguments(self, fake_redis):
+        calls = []
+        clinic_id = uuid.uuid4()
+
+        @cached("report:{clinic_id}:{days}", tags=["clinic:{clinic_id}"])
+        async def report(clinic_id, days=30):
+            calls.append((clinic_id, days))
+            return {"clinic_id": clinic_id, "days": days}
+
+        cache_module.app_cache.clear_local()
+        first = await report(clinic_id)
+        assert await report(clinic_id, days=30) == first
+        await report(clinic_id, 7)
+
+        assert len(calls) == 2
+        assert first == {"clinic_id": str(clinic_id), "days": 30}
+        assert f"{ENTRY_PREFIX}report:{clinic_id}:30" in fake_redis.data
+
+        await cache_module.invalidate_tags(f"clinic:{clinic_id}")
+        await report(clinic_id)
+        assert len(calls) == 3
+
+    async def test_counts_hits_and_misses(self, fake_redis):
+        @cached("counted:{n}")
+        async def counted(n):
+            return n
+
+        def value(result):
+            return CACHE_REQUESTS.labels(cache="counted", result=result)._value.get()
+
+        misses, local_hits = value("miss"), value("local_hit")
+        await counted(1)
+        await counted(1)
+        assert value("miss") == misses + 1
+        assert value("local_hit") == local_hits + 1
@@ -0,0 +1,56 @@
+"""Tests for keyset pagination cursors and predicates."""
+
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.exceptions import BadRequestError
+from app.core.pagination import Keyset
+from app.models.conversation import Conversation
+from app.models.translation_report import TranslationReport
+
+REPORTS = Keyset(TranslationReport.created_at, TranslationReport.id)
+INBOX = Keyset(Conversation.last_message_at, Conversation.id, nulls_last=True)
+
+
+def _sql(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+
+class TestKeyset:
+    def test_cursor_round_trip(self):
+        row = SimpleNamespace(
+            created_at=datetime(2026, 3, 1, 9, 30, 0, 123456, tzinfo=timezone.utc),
+            id=uuid.uuid4(),
+        )
+
+        key, id_ = REPORTS._decode(REPORTS.cursor_for(row))
+
+        assert (key, id_) == (row.created_at, row.id)
+
+    def test_row_value_predicate(self):
+        row = SimpleNamespace(created_at=datetime.now(timezone.utc), id=uuid.uuid4())
+
+        sql = _sql(REPORTS.after(REPORTS.cursor_for(row)))
+
+        assert "(translation_reports.created_at, translation_reports.id) <" in sql
+
+    def test_nulls_last_predicates(self):
+        dated = SimpleNamespace(last_message_at=datetime.now(timezone.utc), id=uuid.uuid4())
+        undated = SimpleNamespace(last_message_at=None, id=uuid.uuid4())
+
+        # Rows without a key follow every dated row ...
+        assert "conversations.last_message_at IS NULL" in _sql(
+            INBOX.after(INBOX.cursor_for(dated))
+        )
+        # ... and within that tail only the id orders them
+        sql = _sql(INBOX.after(INBOX.cursor_for(undated)))
+        assert "conversations.last_message_at IS NULL AND conversations.id <" in sql
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "bnVsbA", "WyJ4IiwgInkiXQ"])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(BadRequestError):
+            REPORTS.after(cursor)
@@ -0,0 +1,142 @@
+"""Tests for app.core.redis: shared pools and auto-pipelining."""
+
+import asyncio
+
+import pytest
+import redis.asyncio as aioredis
+
+from app.core.redis import AutoPipeline, RedisPoolRegistry
+
+
+class FakePipeline:
+    def __init__(self, client: "FakeClient"):
+        self.client = client
+        self.commands: list[tuple] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, command):
+        def queue(*args, **kwargs):
+            self.commands.append((command, *args))
+
+        return queue
+
+    async def execute(self, raise_on_error=True):
+        self.client.round_trips.append(self.commands)
+        if self.client.down:
+            raise ConnectionError("Redis down")
+        return [
+            ValueError("bad") if args == ["boom"] else f"{command}:{','.join(args)}"
+            for command, *args in self.commands
+        ]
+
+
+class FakeClient:
+    def __init__(self, down=False):
+        self.down = down
+        self.round_trips: list[list[tuple]] = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class TestAutoPipeline:
+    async def test_concurrent_commands_share_one_round_trip(self):
+        client = FakeClient()
+        pipe = AutoPipeline(client)
+
+        results = await asyncio.gather(
+            pipe.execute("publish", "ws:clinic:1", "a"),
+            pipe.execute("get", "k"),
+            pipe.execute("mget", "v1", "v2"),
+        )
+
+        assert results == ["publish:ws:clinic:1,a", "get:k", "mget:v1,v2"]
+        assert len(client.round_trips) == 1
+
+    async def test_sequential_commands_are_not_delayed(self):
+        client = FakeClient()
+        pipe = AutoPipeline(client)
+
+        assert await pipe.execute("get", "a") == "get:a"
+        assert await pipe.execute("get", "b") == "get:b"
+        assert len(client.round_trips) == 2
+
+    async def test_command_error_only_fails_its_caller(self):
+        pipe = AutoPipeline(FakeClient())
+
+        ok, failed = await asyncio.gather(
+            pipe.execute("get", "a"),
+            pipe.execute("get", "boom"),
+            return_exceptions=True,
+        )
+
+        assert ok == "get:a"
+        assert isinstance(failed, ValueError)
+
+    async def test_connection_error_fails_every_caller(self):
+        pipe = AutoPipeline(FakeClient(down=True))
+
+        results = await asyncio.gather(
+            pipe.execute("get", "a"), pipe.execute("get", "b"), return_exceptions=True
+        )
+        assert all(isinstance(r, ConnectionError) for r in results)
+
+        # The next batch starts fresh
+        with pytest.raises(ConnectionError):
+            await pipe.execute("get", "c")
+
+
+class TestRedisPoolRegistry:
+    async def test_one_bounded_pool_per_loop(self):
+        registry = RedisPoolRegistry()
+
+        client = registry.client()
+        assert registry.client() is client
+        assert isinstance(client.connection_pool, aioredis.BlockingConnectionPool)
+        assert client.connection_pool.max_connections == 50
+        assert registry.auto_pipeline() is registry.auto_pipeline()
+
+        await registry.aclose()
+        assert registry.client() is not client
+        await registry.aclose()
+
+    async def test_listeners_get_their_own_pool(self):
+        registry = RedisPoolRegistry()
+
+        listener = registry.listener_client()
+        assert registry.listener_client() is listener
+        assert listener.connection_pool is not registry.client().connection_pool
+        assert listener.connection_pool.max_connections == 16
+        assert registry.connection_count("max") == 50
+
+        await registry.aclose()
+        assert registry.listener_client() is not listener
+        await registry.aclose()
+
+    def test_clients_are_per_event_loop(self):
+        registry = RedisPoolRegistry()
+
+        async def get():
+            return registry.client()
+
+        loop_a, loop_b = asyncio.new_event_loop(), asyncio.new_event_loop()
+        try:
+            client_a = loop_a.run_until_complete(get())
+            client_b = loop_b.run_until_complete(get())
+            assert client_a is not client_b
+            assert registry.connection_count("max") == 100
+        finally:
+            registry.close_all()
+            loop_a.close()
+            loop_b.close()
+        assert registry.connection_count("max") == 0
+
+    def test_sync_pool_is_shared(self):
+        registry = RedisPoolRegistry()
+        assert registry.sync_pool() is registry.sync_pool()
+        registry.close_all()
@@ -1,5 +1,6 @@
-"""Tests for app.core.resilience: CircuitBreaker, retry_async, get_http_client."""
+"""Tests for app.core.resilience: CircuitBreaker, RateLimiter, retry_async, HTTP clients."""
 
+import asyncio
 import time
 from unittest.mock import AsyncMock, patch
 
@@ -10,6 +11,8 @@ from app.core.resilience import (
     CircuitBreaker,
     CircuitBreakerOpenError,
     CircuitState,
+    HTTPClientRegistry,
+    RateLimiter,
     get_http_client,
     retry_async,
 )
@@ -93,6 +96,22 @@ class TestCircuitBreaker:
 # ──────────────────────────────────────────────
 # retry_async
 # ──────────────────────────────────────────────
+# ──────────────────────────────────────────────
+# RateLimiter
+# ──────────────────────────────────────────────
+class TestRateLimiter:
+    @pytest.mark.asyncio
+    async def test_burst_then_paced(self):
+        limiter = RateLimiter(rate=50, burst=5)
+
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.acquire() for _ in range(10)))
+        elapsed = time.monotonic() - start
+
+        # 5 immediately, the other 5 at 50/s
+        assert 0.08 <= elapsed < 0.5
+
+
 class TestRetryAsync:
     async def test_retries_on_transient_error_then_succeeds(self):
         call_count = 0
@@ -149,3 +168,64 @@ class TestGetHttpClient:
         assert client.timeout.connect == 15
         assert client.timeout.read == 15
         await client.aclose()
+
+
+# ──────────────────────────────────────────────
+# HTTPClientRegistry
+# ──────────────────────────────────────────────
+class TestHTTPClientRegistry:
+    async def test_reuses_client_per_name(self):
+        registry = HTTPClientRegistry()
+        first = registry.get("telegram")
+        assert registry.get("telegram") is first
+        assert registry.get("line") is not first
+        await registry.aclose()
+
+    async def test_applies_pool_limits(self):
+        registry = HTTPClientRegistry()
+        with patch("app.core.resilience.settings") as mock_settings:
+            mock_settings.http_timeout_seconds = 10
+            mock_settings.http_pool_max_connections = 7
+            mock_settings.http_pool_max_keepalive = 3
+            mock_settings.http_keepalive_expiry_seconds = 5.0
+            mock_settings.http2_enabled = False
+            client = registry.get("meta_graph_api")
+
+        pool = client._transport._pool
+        assert pool._max_connections == 7
+        assert pool._max_keepalive_connections == 3
+        assert pool._keepalive_expiry == 5.0
+        await registry.aclose()
+
+    async def test_aclose_closes_and_forgets_clients(self):
+        registry = HTTPClientRegistry()
+        client = registry.get("kakao")
+        await registry.aclose()
+
+        assert client.is_closed
+        assert registry.get("kakao") is not client
+        await registry.aclose()
+
+    def test_clients_are_per_event_loop(self):
+        """Celery task classes run separate loops; each gets its own client."""
+        import asyncio
+
+        registry = HTTPClientRegistry()
+
+        async def _get():
+            return registry.get("telegram")
+
+        loop_a = asyncio.new_event_loop()
+        loop_b = asyncio.new_event_loop()
+        try:
+            client_a = loop_a.run_until_complete(_get())
+            client_b = loop_b.run_until_complete(_get())
+            assert client_a is not client_b
+            assert loop_a.run_until_complete(_get()) is client_a
+
+            registry.close_all()
+            assert client_a.is_closed
+            assert client_b.is_closed
+        finally:
+            loop_a.close()
+            loop_b.close()
@@ -135,11 +135,10 @@ class TestKakaoSendMessage:
         mock_response.status_code = 200
         mock_response.json.return_value = {"result_code": 0}
 
-        with patch("app.messenger.kakao.httpx.AsyncClient") as MockClient:
+        with patch("app.messenger.kakao.http_clients") as mock_clients:
             mock_client = AsyncMock()
             mock_client.post.return_value = mock_response
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_clients.get.return_value = mock_client
 
             msg_id = await kakao_adapter.send_message(
                 kakao_account, "kakao_user_123", "안녕하세요!"
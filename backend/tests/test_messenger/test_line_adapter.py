@@ -158,11 +158,10 @@ class TestLineSendMessage:
         mock_response.status_code = 200
         mock_response.json.return_value = {}
 
-        with patch("app.messenger.line.httpx.AsyncClient") as MockClient:
+        with patch("app.messenger.line.http_clients") as mock_clients:
             mock_client = AsyncMock()
             mock_client.post.return_value = mock_response
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_clients.get.return_value = mock_client
 
             msg_id = await line_adapter.send_message(
                 line_account, "Uabc123def456", "こんにちは！"
@@ -196,11 +196,10 @@ class TestInstagramSendMessage:
         mock_response.status_code = 200
         mock_response.json.return_value = {"recipient_id": "9876543210", "message_id": "m_sent1"}
 
-        with patch("app.messenger.meta.httpx.AsyncClient") as MockClient:
+        with patch("app.messenger.meta.http_clients") as mock_clients:
             mock_client = AsyncMock()
             mock_client.post.return_value = mock_response
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_clients.get.return_value = mock_client
 
             msg_id = await instagram_adapter.send_message(
                 ig_account, "9876543210", "안녕하세요!"
@@ -364,11 +363,10 @@ class TestWhatsAppSendMessage:
             "messages": [{"id": "wamid.sent1"}],
         }
 
-        with patch("app.messenger.meta.httpx.AsyncClient") as MockClient:
+        with patch("app.messenger.meta.http_clients") as mock_clients:
             mock_client = AsyncMock()
             mock_client.post.return_value = mock_response
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_clients.get.return_value = mock_client
 
             msg_id = await whatsapp_adapter.send_message(
                 wa_account, "819012345678", "안녕하세요!"
@@ -390,3 +388,10 @@ class TestMetaFactoryRegistration:
         assert "instagram" in supported
         assert "facebook" in supported
         assert "whatsapp" in supported
+
+    def test_get_adapter_returns_shared_instance(self):
+        from app.messenger.factory import MessengerAdapterFactory
+
+        adapter = MessengerAdapterFactory.get_adapter("instagram")
+        assert MessengerAdapterFactory.get_adapter("instagram") is adapter
+        assert MessengerAdapterFactory.get_adapter("facebook") is not adapter
@@ -162,11 +162,10 @@ class TestTelegramSendMessage:
             "result": {"message_id": 100},
         }
 
-        with patch("app.messenger.telegram.httpx.AsyncClient") as MockClient:
+        with patch("app.messenger.telegram.http_clients") as mock_clients:
             mock_client = AsyncMock()
             mock_client.post.return_value = mock_response
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_clients.get.return_value = mock_client
 
             message_id = await telegram_adapter.send_message(
                 mock_account, "987654321", "안녕하세요!"
@@ -184,11 +183,10 @@ class TestTelegramSendMessage:
         mock_response.status_code = 200
         mock_response.json.return_value = {"ok": True}
 
-        with patch("app.messenger.telegram.httpx.AsyncClient") as MockClient:
+        with patch("app.messenger.telegram.http_clients") as mock_clients:
             mock_client = AsyncMock()
             mock_client.post.return_value = mock_response
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_clients.get.return_value = mock_client
 
             await telegram_adapter.send_typing_indicator(mock_account, "987654321")
 
@@ -213,11 +211,10 @@ class TestTelegramGetUserProfile:
             },
         }
 
-        with patch("app.messenger.telegram.httpx.AsyncClient") as MockClient:
+        with patch("app.messenger.telegram.http_clients") as mock_clients:
             mock_client = AsyncMock()
             mock_client.get.return_value = mock_response
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_clients.get.return_value = mock_client
 
             profile = await telegram_adapter.get_user_profile(mock_account, "987654321")
 
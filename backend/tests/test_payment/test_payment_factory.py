@@ -12,6 +12,12 @@ class TestGetProvider:
         provider = PaymentProviderFactory.get_provider("stub")
         assert isinstance(provider, StubProvider)
 
+    def test_returns_shared_instance(self):
+        provider = PaymentProviderFactory.get_provider("kingorder")
+        assert PaymentProviderFactory.get_provider("kingorder") is provider
+        _, routed = PaymentProviderFactory.get_provider_for("KR", "card")
+        assert routed is provider
+
     def test_get_unsupported_raises(self):
         with pytest.raises(ValueError, match="Unsupported payment provider"):
             PaymentProviderFactory.get_provider("nonexistent")
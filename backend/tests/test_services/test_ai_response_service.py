@@ -1,5 +1,6 @@
 """Tests for AIResponseService — all LLM/messenger calls mocked."""
 
+import asyncio
 import uuid
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -581,3 +582,315 @@ async def test_ab_test_outcome_recorded(
     outcomes = result.scalars().all()
     assert len(outcomes) >= 1
     assert outcomes[0].variant_id == variant.id
+
+
+# --- Deferred delivery ---
+
+
+@pytest.mark.asyncio
+@patch("app.services.ai_response_service.asyncio.sleep", new_callable=AsyncMock)
+@patch("app.services.ai_response_service.MessengerAdapterFactory")
+@patch("app.services.ai_response_service.manager", new_callable=AsyncMock)
+async def test_deferred_delivery_skips_sleep_and_send(
+    mock_manager, mock_factory, mock_sleep,
+    db, clinic, customer, messenger_account, conversation, incoming_message,
+    mock_consultation_service, mock_adapter,
+):
+    """Deferred mode should save the reply and describe the send instead of doing it."""
+    mock_factory.get_adapter.return_value = mock_adapter
+
+    svc = AIResponseService(db, mock_consultation_service, deferred_delivery=True)
+    result = await svc.generate_response(incoming_message.id, conversation.id)
+
+    assert result is not None
+    mock_sleep.assert_not_called()
+    mock_adapter.send_message.assert_not_called()
+
+    pending = svc.pending_delivery
+    assert pending is not None
+    assert pending.message_id == result.id
+    assert pending.account_id == messenger_account.id
+    assert pending.recipient_id == customer.messenger_user_id
+    assert 1.0 <= pending.delay_seconds <= 8.0
+
+    # new_message is broadcast by the delivery task, not here
+    calls = mock_manager.broadcast_to_clinic.call_args_list
+    assert not [c for c in calls if c[0][1].get("type") == "new_message"]
+
+
+@patch("app.tasks.message_delivery.deliver_ai_message")
+def test_pending_delivery_schedules_with_countdown(mock_task):
+    """PendingDelivery.schedule should enqueue the delivery task after the delay."""
+    from app.services.ai_response_service import PendingDelivery
+
+    pending = PendingDelivery(
+        message_id=uuid.uuid4(),
+        account_id=uuid.uuid4(),
+        recipient_id="user_123",
+        messenger_type="telegram",
+        delay_seconds=3.5,
+    )
+    pending.schedule()
+
+    mock_task.apply_async.assert_called_once()
+    kwargs = mock_task.apply_async.call_args.kwargs
+    assert kwargs["countdown"] == 3.5
+    assert kwargs["args"][0] == str(pending.message_id)
+
+
+@pytest.mark.asyncio
+@patch("app.services.ai_response_service.HumanLikeDelay.calculate_delay", return_value=5.0)
+@patch("app.services.ai_response_service.asyncio.sleep", new_callable=AsyncMock)
+@patch("app.services.ai_response_service.MessengerAdapterFactory")
+@patch("app.services.ai_response_service.manager", new_callable=AsyncMock)
+async def test_deferred_delivery_moves_typing_delay_to_broker(
+    mock_manager, mock_factory, mock_sleep, mock_delay,
+    db, clinic, customer, messenger_account, conversation, incoming_message,
+    mock_consultation_service, mock_adapter,
+):
+    """The worker no longer waits out the typing delay; the task countdown does."""
+    mock_factory.get_adapter.return_value = mock_adapter
+
+    inline = AIResponseService(db, mock_consultation_service, deferred_delivery=False)
+    await inline.generate_response(incoming_message.id, conversation.id)
+    mock_sleep.assert_awaited_once_with(5.0)
+    mock_adapter.send_message.assert_awaited_once()
+
+    mock_sleep.reset_mock()
+    mock_adapter.send_message.reset_mock()
+    deferred = AIResponseService(db, mock_consultation_service, deferred_delivery=True)
+    await deferred.generate_response(incoming_message.id, conversation.id)
+    mock_sleep.assert_not_awaited()
+    mock_adapter.send_message.assert_not_awaited()
+
+    with patch("app.tasks.message_delivery.deliver_ai_message") as mock_task:
+        deferred.pending_delivery.schedule()
+    mock_task.apply_async.assert_called_once()
+    assert mock_task.apply_async.call_args.kwargs["countdown"] == 5.0
+
+
+# --- Pipeline concurrency ---
+
+
+def _slow(seconds: float, result=None):
+    async def _call(*args, **kwargs):
+        await asyncio.sleep(seconds)
+        return result
+
+    return _call
+
+
+@pytest.mark.asyncio
+@patch("app.services.ai_response_service.manager", new_callable=AsyncMock)
+async def test_side_work_runs_off_critical_path(
+    mock_manager,
+    db, clinic, customer, messenger_account, conversation, incoming_message,
+    mock_consultation_service,
+):
+    """Staff-alert checks overlap consultation instead of preceding it."""
+    from tests.conftest import test_session_factory
+
+    side_effect_alert = {"matched_keywords": ["붓기"], "severity": "urgent"}
+    mock_consultation_service.consult.side_effect = _slow(
+        0.3, mock_consultation_service.consult.return_value
+    )
+
+    async def _run(session_factory) -> dict:
+        svc = AIResponseService(
+            db,
+            mock_consultation_service,
+            deferred_delivery=True,
+            session_factory=session_factory,
+        )
+        result = await svc.generate_response(incoming_message.id, conversation.id)
+        assert result is not None
+        return svc.stage_timings
+
+    with patch(
+        "app.services.followup_service.FollowupService.check_side_effects",
+        new=AsyncMock(side_effect=_slow(0.3, side_effect_alert)),
+    ), patch(
+        "app.services.contraindication_screening_service."
+        "ContraindicationScreeningService.screen_message",
+        new=AsyncMock(side_effect=_slow(0.3)),
+    ):
+        sequential = await _run(None)
+        concurrent = await _run(test_session_factory)
+
+    assert sequential["reply_ready"] >= 0.9
+    assert concurrent["reply_ready"] < 0.6
+    assert concurrent["side_work"] >= 0.3
+    for stage in ("knowledge", "consult", "side_work", "total"):
+        assert stage in concurrent
+
+    alerts = [
+        c for c in mock_manager.broadcast_to_clinic.call_args_list
+        if c[0][1].get("type") == "side_effect_alert"
+    ]
+    assert len(alerts) == 2
+
+
+@pytest.mark.asyncio
+@patch("app.services.ai_response_service.manager", new_callable=AsyncMock)
+async def test_side_work_failure_does_not_block_reply(
+    mock_manager,
+    db, clinic, customer, messenger_account, conversation, incoming_message,
+    mock_consultation_service,
+):
+    """A failing side check on its own session is logged, not raised."""
+    from tests.conftest import test_session_factory
+
+    with patch(
+        "app.services.followup_service.FollowupService.check_side_effects",
+        new=AsyncMock(side_effect=RuntimeError("db down")),
+    ), patch(
+        "app.services.contraindication_screening_service."
+        "ContraindicationScreeningService.screen_message",
+        new=AsyncMock(return_value=None),
+    ):
+        svc = AIResponseService(
+            db,
+            mock_consultation_service,
+            deferred_delivery=True,
+            session_factory=test_session_factory,
+        )
+        result = await svc.generate_response(incoming_message.id, conversation.id)
+
+    assert result is not None
+    assert svc.pending_delivery is not None
+
+
+@pytest.mark.asyncio
+@patch("app.services.ai_response_service.manager", new_callable=AsyncMock)
+async def test_deferred_analytics_skips_inline_scoring(
+    mock_manager,
+    db, clinic, customer, messenger_account, conversation, incoming_message,
+    mock_consultation_service,
+):
+    """Deferred analytics leaves satisfaction to the low-priority task."""
+    svc = AIResponseService(
+        db,
+        mock_consultation_service,
+        deferred_delivery=True,
+        deferred_analytics=True,
+    )
+    with patch.object(svc, "_update_satisfaction", new=AsyncMock()) as mock_update:
+        await svc.generate_response(incoming_message.id, conversation.id)
+
+    mock_update.assert_not_called()
+    assert "analytics" not in svc.stage_timings
+    pending = svc.pending_analytics
+    assert pending is not None
+    assert pending.conversation_id == conversation.id
+    assert pending.message_id == incoming_message.id
+    assert pending.ab_test_id is None
+
+
+@patch("app.tasks.analytics.analyze_ai_reply")
+def test_pending_analytics_schedules_task(mock_task):
+    """PendingAnalytics.schedule should enqueue the analytics task."""
+    from app.services.ai_response_service import PendingAnalytics
+
+    pending = PendingAnalytics(
+        conversation_id=uuid.uuid4(),
+        message_id=uuid.uuid4(),
+        ab_test_id=uuid.uuid4(),
+        ab_variant_id=uuid.uuid4(),
+    )
+    pending.schedule()
+
+    mock_task.delay.assert_called_once_with(
+        str(pending.conversation_id),
+        str(pending.message_id),
+        str(pending.ab_test_id),
+        str(pending.ab_variant_id),
+    )
+
+
+def test_analyze_ai_reply_routed_to_low_queue():
+    """Post-reply analytics must not compete with replies on the ai queue."""
+    from app.tasks import celery_app
+    from app.tasks.analytics import analyze_ai_reply
+
+    route = celery_app.amqp.router.route({}, analyze_ai_reply.name)
+    assert route["queue"].name == "low"
+
+
+@pytest.mark.asyncio
+@patch("app.services.ai_response_service.asyncio.sleep", new_callable=AsyncMock)
+@patch("app.services.ai_response_service.MessengerAdapterFactory")
+@patch("app.services.ai_response_service.manager", new_callable=AsyncMock)
+async def test_reply_draft_streams_before_new_message(
+    mock_manager, mock_factory, mock_sleep,
+    db, clinic, customer, messenger_account, conversation, incoming_message,
+    mock_adapter,
+):
+    published = mock_manager.broadcast_to_clinic
+    order = []
+    published.side_effect = lambda clinic_id, data: order.append(data)
+    mock_factory.get_adapter.return_value = mock_adapter
+
+    async def consult(**kwargs):
+        for token in ["보톡스는 ", "10만원부터 ", "시작합니다."]:
+            kwargs["on_token"](token)
+        return ConsultationResult(
+            response="보톡스는 10만원부터 시작합니다.",
+            escalated=False,
+            escalation_level=EscalationLevel.NONE,
+            language="ko",
+        )
+
+    consultation_service = AsyncMock()
+    consultation_service.consult = AsyncMock(side_effect=consult)
+
+    svc = AIResponseService(db, consultation_service)
+    with patch("app.websocket.draft_stream.manager", mock_manager):
+        await svc.generate_response(incoming_message.id, conversation.id)
+
+    types = [event["type"] for event in order]
+    drafts = [event for event in order if event["type"] == "ai_draft_delta"]
+    assert "".join(f["delta"] for f in drafts) == "보톡스는 10만원부터 시작합니다."
+    assert drafts[-1]["done"] is True
+    assert drafts[-1]["conversation_id"] == str(conversation.id)
+    assert types.index("new_message") > types.index("ai_draft_delta")
+
+
+@pytest.mark.asyncio
+@patch("app.services.ai_response_service.asyncio.sleep", new_callable=AsyncMock)
+@patch("app.services.ai_response_service.MessengerAdapterFactory")
+@patch("app.services.ai_response_service.manager", new_callable=AsyncMock)
+async def test_draft_streaming_can_be_disabled(
+    mock_manager, mock_factory, mock_sleep,
+    db, clinic, customer, messenger_account, conversation, incoming_message,
+    mock_consultation_service, mock_adapter,
+):
+    mock_factory.get_adapter.return_value = mock_adapter
+
+    with patch("app.config.settings.ai_draft_streaming", False):
+        svc = AIResponseService(db, mock_consultation_service)
+        await svc.generate_response(incoming_message.id, conversation.id)
+
+    assert mock_consultation_service.consult.call_args.kwargs["on_token"] is None
+
+
+# --- Knowledge assembly ---
+
+
+@pytest.mark.asyncio
+async def test_knowledge_service_uses_vector_retriever(db, mock_consultation_service):
+    from app.ai.rag.retriever import VectorRetriever
+
+    with patch("app.ai.rag.retriever.get_embeddings"):
+        knowledge_svc = AIResponseService(db, mock_consultation_service)._knowledge_service()
+
+    assert isinstance(knowledge_svc._retriever, VectorRetriever)
+
+
+@pytest.mark.asyncio
+async def test_knowledge_service_keyword_only_without_embeddings(db, mock_consultation_service):
+    with patch(
+        "app.ai.rag.retriever.get_embeddings", side_effect=ValueError("no credentials")
+    ):
+        knowledge_svc = AIResponseService(db, mock_consultation_service)._knowledge_service()
+
+    assert knowledge_svc._retriever is None
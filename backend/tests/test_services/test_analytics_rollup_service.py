@@ -0,0 +1,383 @@
+"""Tests for analytics rollup maintenance and the rollup-backed analytics endpoints."""
+
+import asyncio
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import create_access_token
+from app.models.analytics_rollup import (
+    DailyClinicStats,
+    DailyCustomerRevenue,
+    DailyFunnelStats,
+    DailyProcedureStats,
+    HourlyRevenueStats,
+)
+from app.models.booking import Booking
+from app.models.clinic import Clinic
+from app.models.clinic_procedure import ClinicProcedure
+from app.models.conversation import Conversation
+from app.models.customer import Customer
+from app.models.message import Message
+from app.models.messenger_account import MessengerAccount
+from app.models.payment import Payment
+from app.models.procedure import Procedure
+from app.models.user import User
+from app.services.analytics_rollup_service import AnalyticsRollupService
+from tests.conftest import test_session_factory
+
+
+@pytest.fixture
+async def auth_headers(test_user: User) -> dict:
+    token = create_access_token(
+        {"sub": str(test_user.id), "clinic_id": str(test_user.clinic_id)}
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def activity(db: AsyncSession, test_clinic: Clinic) -> dict:
+    """Today's activity: three customers over two channels, two paid bookings."""
+    telegram = MessengerAccount(
+        id=uuid.uuid4(), clinic_id=test_clinic.id, messenger_type="telegram",
+        account_name="tg", credentials={},
+    )
+    line = MessengerAccount(
+        id=uuid.uuid4(), clinic_id=test_clinic.id, messenger_type="line",
+        account_name="line", credentials={},
+    )
+    proc = Procedure(id=uuid.uuid4(), name_ko="보톡스", slug="rollup-botox")
+    db.add_all([telegram, line, proc])
+    await db.flush()
+    cp = ClinicProcedure(
+        id=uuid.uuid4(), clinic_id=test_clinic.id, procedure_id=proc.id,
+        material_cost=Decimal("50000"),
+    )
+    kr, jp, unknown = (
+        Customer(
+            id=uuid.uuid4(), clinic_id=test_clinic.id, messenger_type="telegram",
+            messenger_user_id=f"rollup-{code}", name=f"고객{code}", country_code=code,
+        )
+        for code in ("KR", "JP", None)
+    )
+    db.add_all([cp, kr, jp, unknown])
+    await db.flush()
+
+    conv_kr = Conversation(
+        id=uuid.uuid4(), clinic_id=test_clinic.id, customer_id=kr.id,
+        messenger_account_id=telegram.id, status="active", ai_mode=True,
+        satisfaction_score=80,
+    )
+    conv_jp = Conversation(
+        id=uuid.uuid4(), clinic_id=test_clinic.id, customer_id=jp.id,
+        messenger_account_id=line.id, status="resolved", ai_mode=False,
+    )
+    conv_unknown = Conversation(
+        id=uuid.uuid4(), clinic_id=test_clinic.id, customer_id=unknown.id,
+        messenger_account_id=telegram.id, status="active", ai_mode=True,
+    )
+    db.add_all([conv_kr, conv_jp, conv_unknown])
+    await db.flush()
+
+    for conv, count in ((conv_kr, 3), (conv_jp, 1)):
+        for n in range(count):
+            db.add(Message(
+                id=uuid.uuid4(), conversation_id=conv.id, clinic_id=test_clinic.id,
+                sender_type="customer", content=f"메시지 {n}",
+            ))
+
+    booking_kr = Booking(
+        id=uuid.uuid4(), clinic_id=test_clinic.id, customer_id=kr.id,
+        conversation_id=conv_kr.id, clinic_procedure_id=cp.id,
+        booking_date=date.today(), booking_time=time(10, 0), status="completed",
+    )
+    # Walk-in booking: no conversation, so no channel
+    booking_jp = Booking(
+        id=uuid.uuid4(), clinic_id=test_clinic.id, customer_id=jp.id,
+        clinic_procedure_id=cp.id,
+        booking_date=date.today(), booking_time=time(11, 0), status="completed",
+    )
+    db.add_all([booking_kr, booking_jp])
+    await db.flush()
+
+    paid_at = datetime.now(timezone.utc)
+    db.add_all([
+        Payment(
+            id=uuid.uuid4(), clinic_id=test_clinic.id, booking_id=booking_kr.id,
+            customer_id=kr.id, payment_type="full", amount=Decimal("500000"),
+            status="completed", paid_at=paid_at,
+        ),
+        Payment(
+            id=uuid.uuid4(), clinic_id=test_clinic.id, booking_id=booking_jp.id,
+            customer_id=jp.id, payment_type="full", amount=Decimal("300000"),
+            status="completed", paid_at=paid_at,
+        ),
+        Payment(
+            id=uuid.uuid4(), clinic_id=test_clinic.id, customer_id=unknown.id,
+            payment_type="deposit", amount=Decimal("100000"), status="pending",
+        ),
+    ])
+    await db.commit()
+    return {"clinic": test_clinic, "cp": cp, "customers": (kr, jp, unknown)}
+
+
+class TestRefreshDay:
+    async def test_clinic_stats(self, db: AsyncSession, activity):
+        await AnalyticsRollupService(db).refresh_days([date.today()])
+        await db.commit()
+
+        stats = (await db.execute(select(DailyClinicStats))).scalar_one()
+        assert stats.clinic_id == activity["clinic"].id
+        assert stats.conversations == 3
+        assert stats.ai_mode_conversations == 2
+        assert stats.manual_conversations == 1
+        assert stats.status_counts == {"active": 2, "resolved": 1}
+        assert stats.conversations_with_messages == 2
+        assert stats.messages == 4
+        assert (stats.satisfaction_sum, stats.satisfaction_count) == (80, 1)
+        assert stats.bookings == 2
+        assert (stats.payments, stats.payment_amount) == (2, Decimal("800000"))
+        assert (stats.paid_count, stats.paid_amount) == (2, Decimal("800000"))
+
+    async def test_funnel_procedure_hourly_customer(self, db: AsyncSession, activity):
+        await AnalyticsRollupService(db).refresh_days([date.today()])
+        await db.commit()
+
+        funnel = {
+            (r.country_code, r.channel): (r.conversations, r.bookings, r.payments)
+            for r in (await db.execute(select(DailyFunnelStats))).scalars()
+        }
+        assert funnel == {
+            ("KR", "telegram"): (1, 1, 1),
+            ("JP", "line"): (1, 0, 0),
+            ("JP", None): (0, 1, 1),
+            ("unknown", "telegram"): (1, 0, 0),
+        }
+
+        proc = (await db.execute(select(DailyProcedureStats))).scalar_one()
+        assert proc.clinic_procedure_id == activity["cp"].id
+        assert (proc.case_count, proc.revenue) == (2, Decimal("800000"))
+
+        hourly = (await db.execute(select(HourlyRevenueStats))).scalars().all()
+        assert sum(h.payment_count for h in hourly) == 2
+
+        revenue = (await db.execute(select(DailyCustomerRevenue))).scalars().all()
+        assert sorted(r.booked_amount for r in revenue) == [
+            Decimal("300000"), Decimal("500000")
+        ]
+
+    async def test_refresh_is_idempotent(self, db: AsyncSession, activity):
+        service = AnalyticsRollupService(db)
+        await service.refresh_days([date.today()])
+        await service.refresh_days([date.today()])
+        await db.commit()
+
+        rows = (await db.execute(select(DailyFunnelStats))).scalars().all()
+        assert len(rows) == 4
+
+
+    async def test_concurrent_refreshes_of_a_day_are_serialized(
+        self, db: AsyncSession, activity
+    ):
+        clinic_id = activity["clinic"].id
+        async with test_session_factory() as first, test_session_factory() as second:
+            await AnalyticsRollupService(first).refresh_days([date.today()], {clinic_id})
+
+            # Another clinic's refresh of the same day does not wait
+            await AnalyticsRollupService(second).refresh_days([date.today()], {uuid.uuid4()})
+            await second.rollback()
+
+            waiting = asyncio.create_task(
+                AnalyticsRollupService(second).refresh_days([date.today()], {clinic_id})
+            )
+            await asyncio.sleep(0.2)
+            assert not waiting.done()
+
+            await first.commit()
+            await waiting
+            await second.commit()
+
+        rows = (await db.execute(select(DailyFunnelStats))).scalars().all()
+        assert len(rows) == 4
+
+class TestIncrementalRefresh:
+    async def test_first_run_rebuilds(self, db: AsyncSession, activity):
+        service = AnalyticsRollupService(db)
+        assert await service.watermark() is None
+
+        await service.refresh_changed()
+        await db.commit()
+
+        assert await service.watermark() is not None
+        stats = (await db.execute(select(DailyClinicStats))).scalar_one()
+        assert stats.conversations == 3
+
+    async def test_picks_up_changes_since_watermark(self, db: AsyncSession, activity):
+        service = AnalyticsRollupService(db)
+        await service.refresh_changed()
+        await db.commit()
+
+        kr = activity["customers"][0]
+        conv = (await db.execute(
+            select(Conversation).where(Conversation.customer_id == kr.id)
+        )).scalar_one()
+        db.add(Conversation(
+            id=uuid.uuid4(), clinic_id=activity["clinic"].id, customer_id=kr.id,
+            messenger_account_id=conv.messenger_account_id, status="active",
+        ))
+        await db.commit()
+
+        assert await service.refresh_changed() == 1
+        await db.commit()
+
+        stats = (await db.execute(select(DailyClinicStats))).scalar_one()
+        assert stats.conversations == 4
+
+    async def test_watermark_advances_without_changes(self, db: AsyncSession):
+        # No activity at all: the first run writes no rollup rows but still
+        # records how far it read, so later runs stay incremental
+        service = AnalyticsRollupService(db)
+        await service.refresh_changed()
+        await db.commit()
+        first = await service.watermark()
+        assert first is not None
+
+        with patch.object(service, "rebuild", side_effect=AssertionError("rebuilt")):
+            assert await service.refresh_changed() == 0
+        await db.commit()
+
+        assert await service.watermark() > first
+
+    async def test_untouched_days_not_changed(self, db: AsyncSession, activity):
+        kr = activity["customers"][0]
+        conv = (await db.execute(
+            select(Conversation).where(Conversation.customer_id == kr.id)
+        )).scalar_one()
+        old = datetime.now(timezone.utc) - timedelta(days=10)
+        db.add(Conversation(
+            id=uuid.uuid4(), clinic_id=activity["clinic"].id, customer_id=kr.id,
+            messenger_account_id=conv.messenger_account_id,
+            created_at=old, updated_at=old,
+        ))
+        await db.commit()
+
+        changed = await AnalyticsRollupService(db).changed_days(
+            datetime.now(timezone.utc) - timedelta(days=1)
+        )
+        assert changed == {date.today(): {activity["clinic"].id}}
+
+
+class TestRollupBackedEndpoints:
+    async def _refresh(self, db: AsyncSession):
+        await AnalyticsRollupService(db).rebuild(days=2)
+        await db.commit()
+
+    async def test_conversations(self, client: AsyncClient, db, activity, auth_headers):
+        await self._refresh(db)
+        resp = await client.get("/api/v1/analytics/conversations", headers=auth_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["daily"] == [
+            {"date": str(date.today()), "total": 3, "ai_mode": 2, "manual_mode": 1}
+        ]
+        assert data["status_distribution"] == {"active": 2, "resolved": 1}
+        assert data["avg_messages_per_conversation"] == 2.0
+        assert data["avg_satisfaction_score"] == 80.0
+
+    async def test_sales_performance(self, client: AsyncClient, db, activity, auth_headers):
+        await self._refresh(db)
+        resp = await client.get("/api/v1/analytics/sales-performance", headers=auth_headers)
+        data = resp.json()
+        assert data["funnel"]["conversations"] == 3
+        assert data["funnel"]["bookings"] == 2
+        assert data["funnel"]["payments"] == 2
+        assert data["revenue"]["total_amount"] == 800000.0
+
+    @pytest.mark.parametrize(
+        "group_by, expected",
+        [
+            ("nationality", {"JP": (1, 1, 1), "KR": (1, 1, 1), "unknown": (1, 0, 0)}),
+            ("channel", {"line": (1, 0, 0), "telegram": (2, 1, 1)}),
+            ("both", {"JP|line": (1, 0, 0), "KR|telegram": (1, 1, 1),
+                      "unknown|telegram": (1, 0, 0)}),
+        ],
+    )
+    async def test_conversion_funnel(
+        self, client: AsyncClient, db, activity, auth_headers, group_by, expected
+    ):
+        await self._refresh(db)
+        resp = await client.get(
+            "/api/v1/analytics/conversion-funnel",
+            params={"group_by": group_by},
+            headers=auth_headers,
+        )
+        groups = {
+            g["dimension"]: (g["conversations"], g["bookings"], g["payments"])
+            for g in resp.json()["groups"]
+        }
+        assert groups == expected
+
+    async def test_funnel_counts_customers_once_per_period(
+        self, client: AsyncClient, db, activity, auth_headers
+    ):
+        kr = activity["customers"][0]
+        conv = (await db.execute(
+            select(Conversation).where(Conversation.customer_id == kr.id)
+        )).scalar_one()
+        yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+        db.add(Conversation(
+            id=uuid.uuid4(), clinic_id=activity["clinic"].id, customer_id=kr.id,
+            messenger_account_id=conv.messenger_account_id,
+            created_at=yesterday, updated_at=yesterday,
+        ))
+        await db.commit()
+        await self._refresh(db)
+
+        resp = await client.get(
+            "/api/v1/analytics/conversion-funnel",
+            params={"group_by": "nationality"},
+            headers=auth_headers,
+        )
+        groups = {g["dimension"]: g["conversations"] for g in resp.json()["groups"]}
+        assert groups["KR"] == 1
+
+    async def test_customer_lifetime_value(
+        self, client: AsyncClient, db, activity, auth_headers
+    ):
+        await self._refresh(db)
+        resp = await client.get(
+            "/api/v1/analytics/customer-lifetime-value", headers=auth_headers
+        )
+        data = resp.json()
+        top = data["customers"][0]
+        assert top["country_code"] == "KR"
+        assert top["total_payments"] == 500000.0
+        assert top["visit_count"] == 1
+        assert top["last_visit"] == str(date.today())
+        assert {n["country_code"]: n["avg_clv"] for n in data["nationality_avg"]} == {
+            "JP": 300000.0,
+            "KR": 500000.0,
+        }
+
+    async def test_stale_until_refreshed(
+        self, client: AsyncClient, db, activity, auth_headers
+    ):
+        resp = await client.get("/api/v1/analytics/conversations", headers=auth_headers)
+        assert resp.json()["daily"] == []
+
+
+class TestRollupSchedule:
+    def test_beat_schedule(self):
+        from app.tasks import celery_app
+
+        schedule = celery_app.conf.beat_schedule
+        assert schedule["refresh-analytics-rollups"]["task"] == (
+            "app.tasks.analytics.refresh_analytics_rollups"
+        )
+        assert schedule["rebuild-analytics-rollups"]["kwargs"] == {"rebuild": True}
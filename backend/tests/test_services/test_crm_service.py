@@ -170,6 +170,72 @@ class TestGetDueEvents:
         assert "receipt" in due_types
 
 
+class TestClaimDueEvents:
+    @pytest.mark.asyncio
+    async def test_concurrent_claims_skip_locked_rows(
+        self, db: AsyncSession, cs_payment: Payment
+    ):
+        from tests.conftest import test_session_factory
+
+        await CRMService(db).schedule_crm_timeline(cs_payment.id)
+        await db.commit()
+
+        async with test_session_factory() as first, test_session_factory() as second:
+            claimed = await CRMService(first).claim_due_events(limit=10)
+            claimed_ids = [e.id for e in claimed]
+            assert [e.event_type for e in claimed] == ["receipt"]
+
+            # The other worker's open batch holds the due rows
+            assert await CRMService(second).claim_due_events(limit=10) == []
+            await first.rollback()
+            reclaimed = await CRMService(second).claim_due_events(limit=10)
+            assert [e.id for e in reclaimed] == claimed_ids
+            await second.rollback()
+
+
+class TestRecordOutcomes:
+    @pytest.mark.asyncio
+    async def test_bulk_update(self, db: AsyncSession, cs_payment: Payment):
+        service = CRMService(db)
+        events = await service.schedule_crm_timeline(cs_payment.id)
+
+        await service.record_outcomes(
+            {events[0].id: None, events[1].id: "Connection timeout"}
+        )
+
+        rows = {
+            e.id: e
+            for e in (
+                await db.execute(
+                    select(CRMEvent).execution_options(populate_existing=True)
+                )
+            ).scalars()
+        }
+        assert rows[events[0].id].status == "sent"
+        assert rows[events[0].id].response is None
+        assert rows[events[1].id].status == "failed"
+        assert rows[events[1].id].response == {"error": "Connection timeout"}
+        assert rows[events[1].id].executed_at is not None
+        assert rows[events[2].id].status == "scheduled"
+
+    @pytest.mark.asyncio
+    async def test_empty_error_is_failure(self, db: AsyncSession, cs_payment: Payment):
+        service = CRMService(db)
+        events = await service.schedule_crm_timeline(cs_payment.id)
+
+        await service.record_outcomes({events[0].id: ""})
+
+        event = (
+            await db.execute(
+                select(CRMEvent)
+                .where(CRMEvent.id == events[0].id)
+                .execution_options(populate_existing=True)
+            )
+        ).scalar_one()
+        assert event.status == "failed"
+        assert event.response == {"error": ""}
+
+
 class TestMarkSent:
     @pytest.mark.asyncio
     async def test_mark_sent(
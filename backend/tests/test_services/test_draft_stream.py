@@ -0,0 +1,71 @@
+"""Tests for DraftStream — AI reply drafts on the clinic WebSocket channel."""
+
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.websocket.draft_stream import DraftStream
+
+
+@pytest.fixture
+def published():
+    with patch("app.websocket.draft_stream.manager") as manager:
+        manager.broadcast_to_clinic = AsyncMock()
+        yield manager.broadcast_to_clinic
+
+
+def _frames(published) -> list[dict]:
+    return [call.args[1] for call in published.call_args_list]
+
+
+class TestDraftStream:
+    async def test_tokens_are_coalesced_into_frames(self, published):
+        draft = DraftStream(uuid.uuid4(), uuid.uuid4(), frame_ms=50)
+
+        for token in ["ボト", "ックス", "は"]:
+            draft.push(token)
+        await asyncio.sleep(0.08)
+        draft.push("安全です")
+        await draft.close()
+
+        frames = _frames(published)
+        assert [f["delta"] for f in frames] == ["ボトックスは", "安全です"]
+        assert [f["seq"] for f in frames] == [0, 1]
+        assert [f["done"] for f in frames] == [False, True]
+        assert {f["type"] for f in frames} == {"ai_draft_delta"}
+        assert len({f["draft_id"] for f in frames}) == 1
+
+    async def test_close_does_not_wait_for_frame_interval(self, published):
+        draft = DraftStream(uuid.uuid4(), uuid.uuid4(), frame_ms=10_000)
+        draft.push("hello")
+
+        await asyncio.wait_for(draft.close(), timeout=1)
+
+        assert _frames(published)[0]["delta"] == "hello"
+
+    async def test_discarded_draft_is_cleared(self, published):
+        draft = DraftStream(uuid.uuid4(), uuid.uuid4(), frame_ms=10)
+        draft.push("partial")
+        await asyncio.sleep(0.03)
+
+        await draft.close(discarded=True)
+        draft.push("late")
+
+        final = _frames(published)[-1]
+        assert final["done"] is True
+        assert final["discarded"] is True
+        assert final["delta"] == ""
+        assert published.await_count == 2
+
+    async def test_empty_draft_publishes_nothing(self, published):
+        draft = DraftStream(uuid.uuid4(), uuid.uuid4())
+        await draft.close()
+        published.assert_not_called()
+
+    async def test_publish_failure_is_silent(self, published):
+        published.side_effect = ConnectionError("redis down")
+        draft = DraftStream(uuid.uuid4(), uuid.uuid4())
+        draft.push("hello")
+        await draft.close()
@@ -0,0 +1,114 @@
+"""Tests for invoice rendering and the stored-PDF cache."""
+
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from app.models.clinic import Clinic
+from app.models.settlement import Settlement
+from app.services.invoice_service import (
+    InvoiceData,
+    InvoiceRenderer,
+    InvoiceService,
+    render_invoice,
+)
+from app.services.storage_service import LocalStorageBackend, StorageService
+
+
+def _settlement(clinic: Clinic, **overrides) -> Settlement:
+    values = {
+        "id": uuid.uuid4(),
+        "clinic_id": clinic.id,
+        "period_year": 2026,
+        "period_month": 1,
+        "total_payment_amount": Decimal("300000.00"),
+        "commission_rate": Decimal("10.00"),
+        "commission_amount": Decimal("30000.00"),
+        "vat_amount": Decimal("3000.00"),
+        "total_settlement": Decimal("33000.00"),
+        "total_payment_count": 3,
+        "status": "confirmed",
+        "confirmed_at": datetime(2026, 2, 3, tzinfo=timezone.utc),
+    }
+    values.update(overrides)
+    return Settlement(**values)
+
+
+@pytest.fixture
+def clinic() -> Clinic:
+    return Clinic(id=uuid.uuid4(), name="정산의원", slug="inv-clinic")
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = StorageService(backend=LocalStorageBackend(root=str(tmp_path)))
+    with patch("app.services.invoice_service.storage_service", storage):
+        yield storage
+
+
+class TestRenderInvoice:
+    def test_output_is_deterministic(self, clinic):
+        data = InvoiceData.from_settlement(_settlement(clinic), clinic)
+
+        pdf = render_invoice(data)
+
+        assert pdf.startswith(b"%PDF")
+        assert render_invoice(data) == pdf
+
+    def test_digest_follows_content(self, clinic):
+        settlement = _settlement(clinic)
+        before = InvoiceData.from_settlement(settlement, clinic).digest()
+        assert InvoiceData.from_settlement(settlement, clinic).digest() == before
+
+        settlement.notes = "Adjusted for refund"
+        assert InvoiceData.from_settlement(settlement, clinic).digest() != before
+
+    async def test_process_pool_matches_inline(self, clinic):
+        data = InvoiceData.from_settlement(_settlement(clinic), clinic)
+        renderer = InvoiceRenderer(max_workers=1)
+        try:
+            assert await renderer.render(data) == render_invoice(data)
+        finally:
+            renderer.shutdown()
+
+
+class TestStoredInvoice:
+    async def test_unchanged_invoice_is_served_from_storage(self, clinic, storage):
+        settlement = _settlement(clinic)
+        service = InvoiceService()
+
+        pdf = await service.get_pdf(settlement, clinic)
+        assert settlement.invoice_url and settlement.invoice_digest
+
+        with patch(
+            "app.services.invoice_service.render_invoice",
+            side_effect=AssertionError("re-rendered"),
+        ):
+            assert await service.get_pdf(settlement, clinic) == pdf
+            assert await service.store_pdf(settlement, clinic) is False
+
+    async def test_changed_settlement_is_re_rendered(self, clinic, storage):
+        settlement = _settlement(clinic)
+        service = InvoiceService()
+        old_pdf = await service.get_pdf(settlement, clinic)
+        old_url = settlement.invoice_url
+
+        settlement.notes = "Adjusted for refund"
+        new_pdf = await service.get_pdf(settlement, clinic)
+
+        assert new_pdf != old_pdf
+        assert settlement.invoice_url != old_url
+        with pytest.raises(FileNotFoundError):
+            await storage.read(old_url)
+
+    async def test_missing_stored_file_is_re_rendered(self, clinic, storage):
+        settlement = _settlement(clinic)
+        service = InvoiceService()
+        pdf = await service.get_pdf(settlement, clinic)
+        await storage.delete(settlement.invoice_url)
+
+        assert await service.get_pdf(settlement, clinic) == pdf
+        assert await storage.read(settlement.invoice_url) == pdf
@@ -192,3 +192,186 @@ async def test_empty_clinic_default_manual(db: AsyncSession):
     svc = KnowledgeService(db)
     manual = await svc._load_clinic_manual(empty_clinic_id)
     assert "등록되지 않았습니다" in manual
+
+
+@pytest.mark.asyncio
+async def test_vector_searches_share_one_embedding(db: AsyncSession, clinic: Clinic):
+    """assemble_knowledge should embed the query once for all three vector searches."""
+    from unittest.mock import AsyncMock, MagicMock
+
+    vector = [0.2] * 1536
+    retriever = MagicMock()
+    retriever.embed_query = AsyncMock(return_value=vector)
+    retriever.search_response_library = AsyncMock(return_value=[])
+    retriever.search_procedures = AsyncMock(return_value=[])
+    retriever.search_medical_terms = AsyncMock(return_value=[])
+
+    svc = KnowledgeService(db, vector_retriever=retriever)
+    await svc.assemble_knowledge(clinic.id, "보톡스 가격")
+
+    retriever.embed_query.assert_awaited_once_with("보톡스 가격")
+    for search in (
+        retriever.search_response_library,
+        retriever.search_procedures,
+        retriever.search_medical_terms,
+    ):
+        assert search.call_args.kwargs["query_embedding"] is vector
+
+
+@pytest.mark.asyncio
+async def test_concurrent_assembly_matches_sequential(
+    db: AsyncSession, clinic: Clinic, faq_entries, procedure_data, medical_terms
+):
+    """Concurrent mode should assemble the same context as the sequential path."""
+    from tests.conftest import test_session_factory
+
+    sequential = await KnowledgeService(db).assemble_knowledge(clinic.id, "보톡스")
+    concurrent = await KnowledgeService(
+        db, session_factory=test_session_factory
+    ).assemble_knowledge(clinic.id, "보톡스")
+
+    assert concurrent == sequential
+
+
+@pytest.mark.asyncio
+async def test_concurrent_assembly_partial_result_on_timeout(
+    db: AsyncSession, clinic: Clinic, faq_entries
+):
+    """A source exceeding its timeout should be dropped, keeping the others."""
+    import asyncio
+    from unittest.mock import patch
+
+    from tests.conftest import test_session_factory
+
+    async def slow_terms(self, clinic_id, query, query_embedding=None):
+        await asyncio.sleep(1)
+        return []
+
+    svc = KnowledgeService(db, session_factory=test_session_factory, source_timeout=0.1)
+    with patch.object(KnowledgeService, "_search_medical_terms", slow_terms):
+        result = await svc.assemble_knowledge(clinic.id, "보톡스 가격")
+
+    assert "5만원" in result["rag_results"]
+    assert "진료시간" in result["clinic_manual"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_assembly_keyword_fallback_on_slow_embedding(
+    db: AsyncSession, clinic: Clinic, faq_entries
+):
+    """A slow query embedding is bounded like a source; keyword search still runs."""
+    import asyncio
+    from unittest.mock import AsyncMock, MagicMock
+
+    from tests.conftest import test_session_factory
+
+    async def slow_embed(query):
+        await asyncio.sleep(1)
+        return [0.2] * 1536
+
+    retriever = MagicMock()
+    retriever.embed_query = slow_embed
+    retriever.bind.return_value = retriever
+    retriever.search_response_library = AsyncMock(return_value=[])
+
+    svc = KnowledgeService(
+        db, vector_retriever=retriever, session_factory=test_session_factory, source_timeout=0.1
+    )
+    result = await asyncio.wait_for(svc.assemble_knowledge(clinic.id, "보톡스 가격"), 0.5)
+
+    assert "5만원" in result["rag_results"]
+    retriever.search_response_library.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_assembly_matches_database(
+    db: AsyncSession, clinic: Clinic, faq_entries, procedure_data, medical_terms
+):
+    """Snapshot-backed keyword search should produce the same context as SQL."""
+    from app.services.knowledge_snapshot import KnowledgeSnapshotStore
+
+    direct = await KnowledgeService(db).assemble_knowledge(clinic.id, "보톡스 가격")
+    store = KnowledgeSnapshotStore()
+    cached = await KnowledgeService(db, snapshot_store=store).assemble_knowledge(
+        clinic.id, "보톡스 가격"
+    )
+
+    assert cached == direct
+
+
+@pytest.mark.asyncio
+async def test_snapshot_served_from_memory_until_invalidated(
+    db: AsyncSession, clinic: Clinic, faq_entries
+):
+    """A cached snapshot should be reused, and reloaded after invalidation."""
+    from unittest.mock import AsyncMock, patch
+
+    from app.services.knowledge_snapshot import KnowledgeSnapshotStore
+
+    store = KnowledgeSnapshotStore()
+    with patch.object(store, "_read_version", AsyncMock(return_value=(0, 0))):
+        first = await store.get(db, clinic.id)
+        assert await store.get(db, clinic.id) is first
+
+        db.add(
+            ResponseLibrary(
+                clinic_id=clinic.id,
+                category="general",
+                question="주차 가능한가요?",
+                answer="건물 지하 주차장 이용 가능합니다.",
+            )
+        )
+        await db.commit()
+
+        store.invalidate(clinic.id)
+        reloaded = await store.get(db, clinic.id)
+
+    assert reloaded is not first
+    assert "주차" in reloaded.manual
+    assert "주차" not in first.manual
+
+
+@pytest.mark.asyncio
+async def test_snapshot_reloaded_when_version_changes(
+    db: AsyncSession, clinic: Clinic, faq_entries
+):
+    """Without a listener, a bumped Redis version should force a reload."""
+    from unittest.mock import AsyncMock, patch
+
+    from app.services.knowledge_snapshot import KnowledgeSnapshotStore
+
+    store = KnowledgeSnapshotStore()
+    with patch.object(store, "_read_version", AsyncMock(return_value=(0, 1))):
+        first = await store.get(db, clinic.id)
+    with patch.object(store, "_read_version", AsyncMock(return_value=(0, 2))):
+        second = await store.get(db, clinic.id)
+
+    assert second is not first
+    assert second.version == (0, 2)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_carries_compiled_glossary(
+    db: AsyncSession, clinic: Clinic, medical_terms
+):
+    """The snapshot's term matcher survives invalidation for unchanged languages."""
+    from unittest.mock import AsyncMock, patch
+
+    from app.services.knowledge_snapshot import KnowledgeSnapshotStore
+
+    store = KnowledgeSnapshotStore()
+    with patch.object(store, "_read_version", AsyncMock(return_value=(0, 0))):
+        first = (await store.get(db, clinic.id)).term_matcher
+        assert first.replace_terms("Botox and filler", "en") == (
+            "[TERM:보톡스] and [TERM:필러]"
+        )
+        assert first.replace_terms("ボトックス", "ja") == "[TERM:보톡스]"
+
+        medical_terms[0].translations = {"en": "Botox", "ja": "ボトックス注射"}
+        await db.commit()
+        store.invalidate(clinic.id)
+        second = (await store.get(db, clinic.id)).term_matcher
+
+    assert second is not first
+    assert second._compiled["en"] is first._compiled["en"]
+    assert second.replace_terms("ボトックス注射", "ja") == "[TERM:보톡스]"
@@ -0,0 +1,110 @@
+"""Tests for the webhook-side MessengerAccount cache."""
+
+import base64
+import hashlib
+import hmac
+import uuid
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.messenger.line import LineAdapter
+from app.messenger.meta import InstagramAdapter
+from app.models import Clinic, MessengerAccount
+from app.services.messenger_account_cache import (
+    MessengerAccountCache,
+    MessengerAccountSnapshot,
+    publish_messenger_account_changed,
+)
+
+BODY = b'{"object": "instagram", "entry": []}'
+
+
+@pytest.fixture
+async def cached_account(db: AsyncSession) -> MessengerAccount:
+    clinic = Clinic(id=uuid.uuid4(), name="캐시의원", slug="cache-clinic")
+    account = MessengerAccount(
+        id=uuid.uuid4(),
+        clinic_id=clinic.id,
+        messenger_type="instagram",
+        account_name="cache_ig",
+        credentials={"app_secret": "ig-secret", "access_token": "token"},
+        is_active=True,
+    )
+    db.add_all([clinic, account])
+    await db.commit()
+    return account
+
+
+class TestMessengerAccountCache:
+    async def test_serves_cached_snapshot_until_invalidated(
+        self, db: AsyncSession, cached_account: MessengerAccount
+    ):
+        cache = MessengerAccountCache()
+        first = await cache.get(db, cached_account.id)
+        assert first.credentials["app_secret"] == "ig-secret"
+
+        await db.execute(
+            update(MessengerAccount)
+            .where(MessengerAccount.id == cached_account.id)
+            .values(is_active=False)
+        )
+        await db.commit()
+        assert await cache.get(db, cached_account.id) is first
+
+        cache.invalidate(cached_account.id)
+        assert (await cache.get(db, cached_account.id)).is_active is False
+
+    async def test_expired_entry_is_reloaded(
+        self, db: AsyncSession, cached_account: MessengerAccount
+    ):
+        cache = MessengerAccountCache(ttl_seconds=60)
+        first = await cache.get(db, cached_account.id)
+        object.__setattr__(first, "loaded_at", first.loaded_at - 61)
+
+        assert await cache.get(db, cached_account.id) is not first
+
+    async def test_unknown_account(self, db: AsyncSession):
+        assert await MessengerAccountCache().get(db, uuid.uuid4()) is None
+
+    async def test_publish_evicts_local_entry(
+        self, db: AsyncSession, cached_account: MessengerAccount
+    ):
+        from app.services.messenger_account_cache import messenger_accounts
+
+        first = await messenger_accounts.get(db, cached_account.id)
+        await publish_messenger_account_changed(cached_account.id)
+
+        assert await messenger_accounts.get(db, cached_account.id) is not first
+
+
+class TestSigningKey:
+    async def test_meta_signature_with_cached_key(self, cached_account: MessengerAccount):
+        snapshot = MessengerAccountSnapshot.from_account(cached_account)
+        signature = "sha256=" + hmac.new(b"ig-secret", BODY, hashlib.sha256).hexdigest()
+        adapter = InstagramAdapter()
+
+        for _ in range(2):  # the shared key object is never consumed
+            assert await adapter.verify_webhook(
+                BODY, {"x-hub-signature-256": signature}, signing_key=snapshot.signing_key
+            )
+        assert not await adapter.verify_webhook(
+            BODY + b" ", {"x-hub-signature-256": signature}, signing_key=snapshot.signing_key
+        )
+
+    async def test_line_signature_with_cached_key(self, cached_account: MessengerAccount):
+        cached_account.messenger_type = "line"
+        cached_account.credentials = {"channel_secret": "line-secret"}
+        snapshot = MessengerAccountSnapshot.from_account(cached_account)
+        signature = base64.b64encode(
+            hmac.new(b"line-secret", BODY, hashlib.sha256).digest()
+        ).decode()
+
+        assert await LineAdapter().verify_webhook(
+            BODY, {"x-line-signature": signature}, signing_key=snapshot.signing_key
+        )
+
+    def test_token_platforms_have_no_key(self, cached_account: MessengerAccount):
+        cached_account.messenger_type = "telegram"
+        assert MessengerAccountSnapshot.from_account(cached_account).signing_key is None
@@ -193,3 +193,40 @@ class TestCalculatePerformance:
         assert perf.total_bookings == 0
         assert perf.total_payments == 0
         assert perf.booking_conversion_rate == Decimal("0.00")
+
+
+class TestCalculateAllPerformance:
+    @pytest.mark.asyncio
+    async def test_matches_single_clinic_calculation(
+        self, db: AsyncSession, perf_clinic: Clinic, perf_data: dict
+    ):
+        idle = Clinic(id=uuid.uuid4(), name="한가한의원", slug="idle-clinic")
+        db.add(idle)
+        await db.commit()
+
+        service = PerformanceService(db)
+        performances = {
+            p.clinic_id: p for p in await service.calculate_all_performance(2026, 1)
+        }
+
+        perf = performances[perf_clinic.id]
+        assert (perf.total_consultations, perf.total_bookings, perf.total_payments) == (
+            10, 8, 6,
+        )
+        assert perf.booking_conversion_rate == Decimal("80.00")
+        assert perf.payment_conversion_score == Decimal("10")
+        assert performances[idle.id].total_consultations == 0
+
+    @pytest.mark.asyncio
+    async def test_keeps_existing_rows(
+        self, db: AsyncSession, perf_clinic: Clinic, perf_data: dict
+    ):
+        service = PerformanceService(db)
+        existing = await service.calculate_performance(perf_clinic.id, 2026, 1)
+        await db.commit()
+
+        performances = await service.calculate_all_performance(2026, 1)
+
+        assert [p.id for p in performances if p.clinic_id == perf_clinic.id] == [
+            existing.id
+        ]
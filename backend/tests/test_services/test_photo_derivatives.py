@@ -0,0 +1,61 @@
+"""Tests for treatment photo derivatives."""
+
+import io
+import random
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from app.services.photo_derivatives import VARIANT_EDGES, render_variants, variant_url
+
+
+def _camera_photo(width=3000, height=2000) -> bytes:
+    """A noisy JPEG with EXIF orientation and a camera/GPS-style tag."""
+    rng = random.Random(0)
+    noise = bytes(rng.getrandbits(8) for _ in range(width * height * 3 // 100))
+    image = Image.frombytes("RGB", (width // 10, height // 10), noise).resize((width, height))
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90° clockwise for display
+    exif[0x010F] = "PhoneMaker"
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=95, exif=exif)
+    return buffer.getvalue()
+
+
+class TestRenderVariants:
+    @pytest.mark.parametrize(
+        "image_format,content_type", [("WEBP", "image/webp"), ("JPEG", "image/jpeg")]
+    )
+    def test_variants_are_resized_rotated_and_stripped(self, image_format, content_type):
+        original = _camera_photo()
+
+        variants = render_variants(original, image_format)
+
+        assert [v.name for v in variants] == list(VARIANT_EDGES)
+        for variant in variants:
+            assert variant.content_type == content_type
+            with Image.open(io.BytesIO(variant.data)) as image:
+                # Portrait after applying the EXIF orientation
+                assert image.height == VARIANT_EDGES[variant.name]
+                assert image.width < image.height
+                assert not image.getexif()
+
+    def test_thumbnail_is_an_order_of_magnitude_smaller(self):
+        original = _camera_photo()
+        thumb = next(v for v in render_variants(original) if v.name == "thumb")
+        assert len(thumb.data) * 10 < len(original)
+
+
+class TestVariantUrl:
+    def test_smallest_adequate_variant(self):
+        photo = SimpleNamespace(
+            photo_url="/o.jpg", medium_url="/m.webp", thumbnail_url="/t.webp"
+        )
+        assert variant_url(photo, "thumb") == "/t.webp"
+        assert variant_url(photo, "medium") == "/m.webp"
+        assert variant_url(photo, "original") == "/o.jpg"
+
+    def test_falls_back_while_derivatives_are_pending(self):
+        photo = SimpleNamespace(photo_url="/o.jpg", medium_url=None, thumbnail_url=None)
+        assert variant_url(photo, "thumb") == "/o.jpg"
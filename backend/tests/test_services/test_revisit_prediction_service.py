@@ -1,21 +1,52 @@
 """Tests for RevisitPredictionService risk score calculation."""
 
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from datetime import time as dtime
+from decimal import Decimal
+
+import numpy as np
 import pytest
+from sqlalchemy import event, insert, select, text
 
+from app.models.booking import Booking
+from app.models.clinic import Clinic
+from app.models.clinic_procedure import ClinicProcedure
+from app.models.customer import Customer
+from app.models.payment import Payment
+from app.models.procedure import Procedure
+from app.models.satisfaction_survey import SatisfactionSurvey
 from app.services.revisit_prediction_service import RevisitPredictionService
 
 
+def _risk_score(
+    *,
+    days_since_last_visit: int,
+    expected_revisit_days: int | None,
+    visit_count: int,
+    revisit_intention: str | None,
+) -> int:
+    """Score a single customer through the array scorer."""
+    scores = RevisitPredictionService._calculate_risk_scores(
+        days_since_last_visit=np.array([days_since_last_visit]),
+        expected_revisit_days=np.array([expected_revisit_days or 0]),
+        visit_count=np.array([visit_count]),
+        revisit_intention=np.array([revisit_intention], dtype=object),
+    )
+    return int(scores[0])
+
+
 class TestRiskScoreCalculation:
-    """Test the static _calculate_risk_score method."""
+    """Test the static _calculate_risk_scores method, one customer at a time."""
 
     def test_high_risk_overdue_single_visit_no_intent(self):
         """Customer way overdue, single visit, said won't return → max risk."""
-        score = RevisitPredictionService._calculate_risk_score(
+        score = _risk_score(
             days_since_last_visit=200,
             expected_revisit_days=90,
             visit_count=1,
             revisit_intention="no",
-            total_payments=100000,
         )
         # overdue_ratio = 200/90 ≈ 2.2 → 40pts
         # visit_count = 1 → 20pts
@@ -26,12 +57,11 @@ class TestRiskScoreCalculation:
 
     def test_low_risk_loyal_customer(self):
         """Frequent visitor, recently visited, says will return → low risk."""
-        score = RevisitPredictionService._calculate_risk_score(
+        score = _risk_score(
             days_since_last_visit=15,
             expected_revisit_days=90,
             visit_count=10,
             revisit_intention="yes",
-            total_payments=5000000,
         )
         # overdue_ratio = 15/90 ≈ 0.17 → 0pts
         # visit_count = 10 → 0pts
@@ -41,12 +71,11 @@ class TestRiskScoreCalculation:
 
     def test_medium_risk_approaching_due(self):
         """Approaching revisit deadline, moderate visit count."""
-        score = RevisitPredictionService._calculate_risk_score(
+        score = _risk_score(
             days_since_last_visit=80,
             expected_revisit_days=90,
             visit_count=2,
             revisit_intention="maybe",
-            total_payments=300000,
         )
         # overdue_ratio = 80/90 ≈ 0.89 → 10pts
         # visit_count = 2 → 12pts
@@ -56,12 +85,11 @@ class TestRiskScoreCalculation:
 
     def test_no_interval_data_uses_default(self):
         """No procedure interval → uses 90-day default."""
-        score = RevisitPredictionService._calculate_risk_score(
+        score = _risk_score(
             days_since_last_visit=100,
             expected_revisit_days=None,
             visit_count=3,
             revisit_intention=None,
-            total_payments=200000,
         )
         # default 90-day: 100 > 90 → 20pts
         # visit_count = 3 → 5pts
@@ -71,24 +99,22 @@ class TestRiskScoreCalculation:
 
     def test_unknown_revisit_intention_some_risk(self):
         """Unknown intention = 8 points of risk."""
-        score = RevisitPredictionService._calculate_risk_score(
+        score = _risk_score(
             days_since_last_visit=10,
             expected_revisit_days=90,
             visit_count=5,
             revisit_intention=None,
-            total_payments=100000,
         )
         # overdue: 0, visit: 0 (5+), revisit: 8, recency: 0
         assert score == 8
 
     def test_score_capped_at_100(self):
         """Score should never exceed 100."""
-        score = RevisitPredictionService._calculate_risk_score(
+        score = _risk_score(
             days_since_last_visit=400,
             expected_revisit_days=30,
             visit_count=1,
             revisit_intention="no",
-            total_payments=50000,
         )
         assert score <= 100
 
@@ -109,3 +135,208 @@ class TestRiskLevel:
     def test_low(self):
         assert RevisitPredictionService._risk_level(0) == "low"
         assert RevisitPredictionService._risk_level(29) == "low"
+
+
+_INTENTIONS = [None, "yes", "maybe", "no"]
+
+
+async def _seed_churn_dataset(db, n_customers: int) -> Clinic:
+    """Insert a clinic with n customers, 1-3 completed visits each, surveys and payments.
+
+    Deterministic: customer i's features are a function of i.
+    """
+    clinic = Clinic(id=uuid.uuid4(), name="이탈분석의원", slug=f"churn-{uuid.uuid4().hex[:8]}")
+    db.add(clinic)
+    await db.flush()
+
+    proc_ids = [uuid.uuid4() for _ in range(3)]
+    await db.execute(insert(Procedure), [
+        {
+            "id": pid,
+            "name_ko": f"시술{n}",
+            "slug": f"proc-{pid.hex[:12]}",
+            "min_interval_days": interval,
+        }
+        for n, (pid, interval) in enumerate(zip(proc_ids, [30, 90, None]))
+    ])
+    cp_ids = [uuid.uuid4() for _ in proc_ids]
+    await db.execute(insert(ClinicProcedure), [
+        {"id": cp_id, "clinic_id": clinic.id, "procedure_id": pid}
+        for cp_id, pid in zip(cp_ids, proc_ids)
+    ])
+
+    today = date.today()
+    customers, bookings, surveys, payments = [], [], [], []
+    for i in range(n_customers):
+        cid = uuid.uuid4()
+        customers.append({
+            "id": cid,
+            "clinic_id": clinic.id,
+            "messenger_type": "telegram",
+            "messenger_user_id": f"user-{i}",
+            "name": f"고객{i}",
+            "country_code": "JP",
+        })
+        for v in range(i % 3 + 1):
+            bookings.append({
+                "id": uuid.uuid4(),
+                "clinic_id": clinic.id,
+                "customer_id": cid,
+                "clinic_procedure_id": cp_ids[(i + v) % 3],
+                "booking_date": today - timedelta(days=(i % 400) + v * 45),
+                "booking_time": dtime(10, 0),
+                "status": "completed",
+            })
+        # A cancelled booking must not count as a visit
+        bookings.append({
+            "id": uuid.uuid4(),
+            "clinic_id": clinic.id,
+            "customer_id": cid,
+            "clinic_procedure_id": cp_ids[0],
+            "booking_date": today,
+            "booking_time": dtime(11, 0),
+            "status": "cancelled",
+        })
+        if i % 5:
+            base = datetime.now(timezone.utc) - timedelta(days=30)
+            surveys.append({
+                "id": uuid.uuid4(),
+                "clinic_id": clinic.id,
+                "customer_id": cid,
+                "survey_round": 1,
+                "revisit_intention": _INTENTIONS[(i + 1) % 4],
+                "created_at": base,
+            })
+            surveys.append({
+                "id": uuid.uuid4(),
+                "clinic_id": clinic.id,
+                "customer_id": cid,
+                "survey_round": 2,
+                "revisit_intention": _INTENTIONS[i % 4],
+                "created_at": base + timedelta(days=7),
+            })
+        payments.append({
+            "id": uuid.uuid4(),
+            "clinic_id": clinic.id,
+            "customer_id": cid,
+            "payment_type": "full",
+            "amount": Decimal("100000"),
+        })
+
+    for table, rows in (
+        (Customer, customers),
+        (Booking, bookings),
+        (SatisfactionSurvey, surveys),
+        (Payment, payments),
+    ):
+        for start in range(0, len(rows), 2000):
+            await db.execute(insert(table), rows[start:start + 2000])
+    await db.commit()
+    # Give the planner real statistics, as production tables would have
+    for table in (Customer, Booking, SatisfactionSurvey, Payment):
+        await db.execute(text(f"ANALYZE {table.__tablename__}"))
+    return clinic
+
+
+def _expected_features(i: int) -> dict:
+    """Mirror of _seed_churn_dataset's per-customer features."""
+    visits = i % 3 + 1
+    intervals = [30, 90, None]
+    return {
+        "days_since_last_visit": i % 400,
+        "visit_count": visits,
+        # Most recent completed visit is v=0
+        "expected_revisit_days": intervals[i % 3],
+        # Latest non-null answer: round 2 unless it was skipped, then round 1
+        "revisit_intention": (
+            (_INTENTIONS[i % 4] or _INTENTIONS[(i + 1) % 4]) if i % 5 else None
+        ),
+    }
+
+
+@pytest.fixture
+async def churn_benchmark_clinic(db) -> Clinic:
+    """Benchmark fixture: a clinic with 10k customers."""
+    return await _seed_churn_dataset(db, 10_000)
+
+
+class TestChurnRiskCustomers:
+    async def test_features_and_scores(self, db):
+        clinic = await _seed_churn_dataset(db, 40)
+        svc = RevisitPredictionService(db)
+
+        customers = await svc.get_churn_risk_customers(clinic.id, min_risk=0, limit=1000)
+        await db.commit()
+
+        assert len(customers) == 40
+        scores = [c["churn_risk_score"] for c in customers]
+        assert scores == sorted(scores, reverse=True)
+
+        for c in customers:
+            i = int(c["customer_name"].removeprefix("고객"))
+            expected = _expected_features(i)
+            for key, value in expected.items():
+                assert c[key] == value, (i, key)
+            assert c["total_payments"] == 100000.0
+            assert c["churn_risk_score"] == _risk_score(**expected)
+
+        stored = dict((await db.execute(
+            select(Customer.id, Customer.churn_risk_score)
+            .where(Customer.clinic_id == clinic.id)
+        )).all())
+        for c in customers:
+            assert stored[c["customer_id"]] == c["churn_risk_score"]
+
+    async def test_min_risk_and_limit(self, db):
+        clinic = await _seed_churn_dataset(db, 40)
+        svc = RevisitPredictionService(db)
+
+        customers = await svc.get_churn_risk_customers(clinic.id, min_risk=50, limit=5)
+        await db.commit()
+
+        assert len(customers) <= 5
+        assert all(c["churn_risk_score"] >= 50 for c in customers)
+
+        updated = (await db.execute(
+            select(Customer.id).where(
+                Customer.clinic_id == clinic.id,
+                Customer.churn_risk_score.isnot(None),
+            )
+        )).scalars().all()
+        assert set(updated) == {c["customer_id"] for c in customers}
+
+    async def test_clinic_without_bookings(self, db):
+        clinic = Clinic(id=uuid.uuid4(), name="빈의원", slug="empty-churn")
+        db.add(clinic)
+        await db.commit()
+
+        svc = RevisitPredictionService(db)
+        assert await svc.get_churn_risk_customers(clinic.id) == []
+        summary = await svc.get_revisit_summary(clinic.id)
+        assert summary["total_customers"] == 0
+
+    async def test_benchmark_10k_customers(self, db, churn_benchmark_clinic):
+        """10k customers are scored with one SELECT and one UPDATE."""
+        from tests.conftest import test_engine
+
+        statements = []
+
+        def _count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(test_engine.sync_engine, "before_cursor_execute", _count)
+        try:
+            svc = RevisitPredictionService(db)
+            started = time.perf_counter()
+            summary = await svc.get_revisit_summary(churn_benchmark_clinic.id)
+            elapsed = time.perf_counter() - started
+            await db.commit()
+        finally:
+            event.remove(test_engine.sync_engine, "before_cursor_execute", _count)
+
+        assert summary["total_customers"] == 1000
+        data_statements = [
+            s for s in statements if s.lstrip().upper().startswith(("SELECT", "UPDATE"))
+        ]
+        assert len(data_statements) == 2
+        assert elapsed < 10
@@ -4,6 +4,7 @@ from decimal import Decimal
 
 import pytest
 import pytest_asyncio
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.booking import Booking
@@ -213,3 +214,81 @@ class TestGenerateAllSettlements:
         assert len(settlements) >= 1
         clinic_ids = {s.clinic_id for s in settlements}
         assert stl_clinic.id in clinic_ids
+
+    @pytest.mark.asyncio
+    async def test_bulk_amounts_match_single_clinic(
+        self,
+        db: AsyncSession,
+        stl_clinic: Clinic,
+        stl_clinic_b: Clinic,
+        stl_payments: list[Payment],
+    ):
+        service = SettlementService(db)
+        settlements = {
+            s.clinic_id: s for s in await service.generate_all_settlements(2026, 1)
+        }
+
+        settlement = settlements[stl_clinic.id]
+        assert settlement.total_payment_amount == Decimal("300000.00")
+        assert settlement.total_payment_count == 3
+        assert settlement.total_settlement == Decimal("33000.00")
+        # Clinic B has no January payments but still gets a zero settlement
+        assert settlements[stl_clinic_b.id].total_payment_count == 0
+        assert settlements[stl_clinic_b.id].commission_rate == Decimal("15.00")
+
+    @pytest.mark.asyncio
+    async def test_keeps_existing_settlements(
+        self, db: AsyncSession, stl_clinic: Clinic, stl_payments: list[Payment]
+    ):
+        service = SettlementService(db)
+        existing = await service.generate_monthly_settlement(stl_clinic.id, 2026, 1)
+        await db.commit()
+
+        first = await service.generate_all_settlements(2026, 1)
+        second = await service.generate_all_settlements(2026, 1)
+
+        ids = [s.id for s in first if s.clinic_id == stl_clinic.id]
+        assert ids == [existing.id]
+        assert {s.id for s in first} == {s.id for s in second}
+
+    @pytest.mark.asyncio
+    async def test_month_range_is_half_open(
+        self, db: AsyncSession, stl_clinic: Clinic, stl_customer: Customer
+    ):
+        for paid_at in (
+            datetime(2025, 11, 30, 23, 59, 59, tzinfo=timezone.utc),
+            datetime(2025, 12, 1, tzinfo=timezone.utc),
+            datetime(2025, 12, 31, 23, 59, 59, tzinfo=timezone.utc),
+            datetime(2026, 1, 1, tzinfo=timezone.utc),
+        ):
+            db.add(
+                Payment(
+                    id=uuid.uuid4(),
+                    clinic_id=stl_clinic.id,
+                    customer_id=stl_customer.id,
+                    payment_type="full",
+                    amount=Decimal("1000.00"),
+                    currency="KRW",
+                    status="completed",
+                    paid_at=paid_at,
+                )
+            )
+        await db.commit()
+        await db.execute(text("SET TIME ZONE 'UTC'"))
+
+        settlements = await SettlementService(db).generate_all_settlements(2025, 12)
+
+        assert [s.total_payment_count for s in settlements] == [2]
+
+    @pytest.mark.asyncio
+    async def test_shards_partition_clinics(
+        self, db: AsyncSession, stl_clinic: Clinic, stl_clinic_b: Clinic
+    ):
+        service = SettlementService(db)
+        shards = [
+            {s.clinic_id for s in await service.generate_all_settlements(2026, 1, i, 3)}
+            for i in range(3)
+        ]
+
+        assert sum(len(ids) for ids in shards) == 2
+        assert set().union(*shards) == {stl_clinic.id, stl_clinic_b.id}
@@ -0,0 +1,137 @@
+"""Tests for the streaming StorageService and its backends."""
+
+import asyncio
+import os
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from app.services.storage_service import (
+    AzureBlobBackend,
+    FileTooLargeError,
+    LocalStorageBackend,
+    StorageService,
+)
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+@pytest.fixture
+def local(tmp_path):
+    return LocalStorageBackend(root=str(tmp_path), url_prefix="/static/uploads/")
+
+
+class TestLocalBackend:
+    async def test_stream_upload_and_delete(self, local, tmp_path):
+        svc = StorageService(backend=local)
+
+        url = await svc.upload_stream(
+            _chunks(b"abc", b"def"), "photo.JPG", "image/jpeg", uuid.uuid4(), "images"
+        )
+
+        assert url.startswith("/static/uploads/") and url.endswith(".jpg")
+        path = tmp_path / url.removeprefix("/static/uploads/")
+        assert path.read_bytes() == b"abcdef"
+
+        await svc.delete(url)
+        assert not path.exists()
+
+    async def test_bytes_upload_still_supported(self, local, tmp_path):
+        url = await StorageService(backend=local).upload(
+            b"hello", "a.txt", "text/plain", uuid.uuid4()
+        )
+        assert (tmp_path / url.removeprefix("/static/uploads/")).read_bytes() == b"hello"
+
+    async def test_oversized_stream_leaves_nothing_behind(self, local, tmp_path):
+        svc = StorageService(backend=local)
+
+        with pytest.raises(FileTooLargeError):
+            await svc.upload_stream(
+                _chunks(b"x" * 6, b"x" * 6), "big.bin", "application/pdf",
+                uuid.uuid4(), max_size=10,
+            )
+
+        assert [files for _, _, files in os.walk(tmp_path) if files] == []
+
+
+class FakeBlobClient:
+    url = "https://acct.blob.core.windows.net/uploads/blob"
+
+    def __init__(self):
+        self.uploaded: bytes | None = None
+        self.staged: dict[str, bytes] = {}
+        self.committed: list[str] | None = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def upload_blob(self, data, overwrite, content_settings):
+        self.uploaded = data
+
+    async def stage_block(self, block_id, data):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.staged[block_id] = data
+        self.in_flight -= 1
+
+    async def commit_block_list(self, block_ids, content_settings):
+        self.committed = block_ids
+
+
+class FakeContainerClient:
+    def __init__(self, blob):
+        self.blob = blob
+
+    def get_blob_client(self, name):
+        return self.blob
+
+
+class TestAzureBackend:
+    @pytest.fixture
+    def blob(self):
+        blob = FakeBlobClient()
+        with patch.object(
+            AzureBlobBackend, "_container_client", lambda self: FakeContainerClient(blob)
+        ):
+            yield blob
+
+    async def test_small_file_is_a_single_request(self, blob):
+        with patch("app.services.storage_service.settings.storage_block_size_bytes", 8):
+            url = await AzureBlobBackend("conn", "uploads").write(
+                "b", _chunks(b"abc", b"de"), "image/png"
+            )
+
+        assert url == blob.url
+        assert blob.uploaded == b"abcde"
+        assert blob.committed is None
+
+    async def test_large_file_stages_blocks_in_parallel(self, blob):
+        parts = [bytes([i]) * 3 for i in range(10)]
+        with (
+            patch("app.services.storage_service.settings.storage_block_size_bytes", 4),
+            patch("app.services.storage_service.settings.storage_upload_concurrency", 3),
+        ):
+            await AzureBlobBackend("conn", "uploads").write(
+                "b", _chunks(*parts), "application/pdf"
+            )
+
+        assert blob.uploaded is None
+        assert b"".join(blob.staged[i] for i in blob.committed) == b"".join(parts)
+        assert all(len(blob.staged[i]) == 4 for i in blob.committed[:-1])
+        assert 1 < blob.max_in_flight <= 3
+
+    async def test_failed_block_aborts_without_commit(self, blob):
+        async def fail(block_id, data):
+            raise ConnectionError("reset")
+
+        blob.stage_block = fail
+        with patch("app.services.storage_service.settings.storage_block_size_bytes", 2):
+            with pytest.raises(ConnectionError):
+                await AzureBlobBackend("conn", "uploads").write(
+                    "b", _chunks(b"abcdefgh"), "application/pdf"
+                )
+        assert blob.committed is None
@@ -1,7 +1,7 @@
 """Tests for TranslationReportService."""
 
 import uuid
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -114,3 +114,36 @@ class TestTranslationReportService:
         await svc.delete_report(uuid.uuid4(), clinic_id)
 
         db.delete.assert_awaited_once_with(report)
+
+    @pytest.mark.asyncio
+    async def test_seed_translation_memory_marks_incoming_terms(self, clinic_id):
+        from app.ai.chains.translation_chain import MedicalTermMatcher
+
+        report = MagicMock(
+            clinic_id=clinic_id,
+            status="resolved",
+            source_language="ja",
+            target_language="ko",
+            original_text="ボトックスはいくらですか？",
+            corrected_text="보톡스는 얼마인가요?",
+        )
+        matcher = MedicalTermMatcher({"ja": {"ボトックス": "보톡스"}})
+        svc = TranslationReportService(AsyncMock())
+
+        with (
+            patch(
+                "app.services.translation_report_service.clinic_term_matcher",
+                AsyncMock(return_value=matcher),
+            ),
+            patch(
+                "app.services.translation_report_service.translation_memory.correct",
+                AsyncMock(),
+            ) as correct,
+        ):
+            await svc.seed_translation_memory(report)
+            report.status = "dismissed"
+            await svc.seed_translation_memory(report)
+
+        correct.assert_awaited_once_with(
+            "[TERM:보톡스]はいくらですか？", "ja", "ko", "보톡스는 얼마인가요?", clinic_id
+        )
@@ -0,0 +1,273 @@
+"""Tests for fast-ack webhook ingestion through the Redis stream."""
+
+import asyncio
+import time
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import orjson
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Clinic, MessengerAccount
+from app.models.conversation import Conversation
+from app.models.customer import Customer
+from app.models.message import Message
+from app.services.message_service import MessageService
+from app.services.webhook_ingest import WEBHOOK_STREAM, WebhookConsumer, enqueue_webhook
+from tests.conftest import test_session_factory
+
+
+class FakeStreamRedis:
+    def __init__(self):
+        self.entries: list[tuple[str, dict]] = []
+
+    async def xadd(self, name, fields, maxlen=None, approximate=True):
+        assert name == WEBHOOK_STREAM
+        entry_id = f"{len(self.entries) + 1}-0"
+        self.entries.append((entry_id, dict(fields)))
+        return entry_id
+
+
+@pytest.fixture
+async def ingest_account(db: AsyncSession) -> MessengerAccount:
+    clinic = Clinic(id=uuid.uuid4(), name="인제스트의원", slug="ingest-clinic")
+    account = MessengerAccount(
+        id=uuid.uuid4(),
+        clinic_id=clinic.id,
+        messenger_type="telegram",
+        account_name="ingest_bot",
+        credentials={"bot_token": "123456:ABC-DEF"},
+        webhook_secret="test-secret",
+        is_active=True,
+        is_connected=True,
+    )
+    db.add_all([clinic, account])
+    await db.commit()
+    return account
+
+
+@pytest.fixture
+def stream():
+    redis = FakeStreamRedis()
+    with (
+        patch("app.services.webhook_ingest.get_redis", return_value=redis),
+        patch("app.config.settings.webhook_ingest_mode", "stream"),
+    ):
+        yield redis
+
+
+@pytest.fixture
+def dispatch():
+    with (
+        patch(
+            "app.services.webhook_ingest.broadcast_incoming_message",
+            new_callable=AsyncMock,
+        ) as broadcast,
+        patch("app.tasks.ai_response.generate_ai_response") as ai_task,
+        patch("app.core.database.async_session_factory", test_session_factory),
+    ):
+        yield broadcast, ai_task
+
+
+def _update(message_id: int, user_id: int = 987654321) -> dict:
+    return {
+        "update_id": message_id,
+        "message": {
+            "message_id": message_id,
+            "from": {"id": user_id, "first_name": "Yuko", "language_code": "ja"},
+            "chat": {"id": user_id, "type": "private"},
+            "date": 1700000000,
+            "text": "ボトックスの料金を教えてください",
+        },
+    }
+
+
+async def _post(client: AsyncClient, account: MessengerAccount, payload: dict):
+    return await client.post(
+        f"/api/webhooks/telegram/{account.id}",
+        json=payload,
+        headers={"X-Telegram-Bot-Api-Secret-Token": "test-secret"},
+    )
+
+
+async def _message_count(db: AsyncSession) -> int:
+    return (await db.execute(select(func.count(Message.id)))).scalar()
+
+
+class TestStreamIngestion:
+    async def test_webhook_acks_after_queueing(
+        self, client: AsyncClient, db: AsyncSession, ingest_account, stream
+    ):
+        response = await _post(client, ingest_account, _update(42))
+
+        assert response.status_code == 200
+        assert len(stream.entries) == 1
+        fields = stream.entries[0][1]
+        assert fields["provider"] == "telegram"
+        assert fields["account_id"] == str(ingest_account.id)
+        assert await _message_count(db) == 0
+
+    async def test_invalid_signature_is_not_queued(
+        self, client: AsyncClient, ingest_account, stream
+    ):
+        response = await client.post(
+            f"/api/webhooks/telegram/{ingest_account.id}",
+            json=_update(42),
+            headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"},
+        )
+
+        assert response.status_code == 403
+        assert stream.entries == []
+
+    async def test_consumer_persists_and_dispatches(
+        self, client: AsyncClient, db: AsyncSession, ingest_account, stream, dispatch
+    ):
+        broadcast, ai_task = dispatch
+        await _post(client, ingest_account, _update(42))
+        await _post(client, ingest_account, _update(43))
+
+        stored = await WebhookConsumer().process_batch(stream.entries)
+
+        assert stored == 2
+        assert await _message_count(db) == 2
+        assert broadcast.await_count == 2
+        keys = [call.kwargs["idempotency_key"] for call in ai_task.delay.call_args_list]
+        assert all(key.startswith("telegram-") for key in keys)
+
+    async def test_platform_retries_are_deduplicated(
+        self, client: AsyncClient, db: AsyncSession, ingest_account, stream, dispatch
+    ):
+        # A retry inside the same batch and one arriving after the first was stored
+        for _ in range(2):
+            await _post(client, ingest_account, _update(42))
+        assert await WebhookConsumer().process_batch(stream.entries) == 1
+
+        await _post(client, ingest_account, _update(42))
+        assert await WebhookConsumer().process_batch(stream.entries[-1:]) == 0
+
+        # Telegram message ids are per chat: another user's 42 is a new message
+        await _post(client, ingest_account, _update(42, user_id=111))
+        assert await WebhookConsumer().process_batch(stream.entries[-1:]) == 1
+        assert await _message_count(db) == 2
+
+    async def test_concurrent_consumers_store_a_message_once(
+        self, client: AsyncClient, db: AsyncSession, ingest_account, stream, dispatch
+    ):
+        await _post(client, ingest_account, _update(42))
+        await _post(client, ingest_account, _update(42))
+
+        results = await asyncio.gather(
+            WebhookConsumer().process_batch(stream.entries[:1]),
+            WebhookConsumer().process_batch(stream.entries[1:]),
+        )
+
+        assert sorted(results) == [0, 1]
+        assert await _message_count(db) == 1
+
+    async def test_concurrent_consumers_share_one_customer(
+        self, client: AsyncClient, db: AsyncSession, ingest_account, stream, dispatch
+    ):
+        # One user's burst split across consumers: the upserts must not race
+        await _post(client, ingest_account, _update(42))
+        await _post(client, ingest_account, _update(43))
+
+        results = await asyncio.gather(
+            WebhookConsumer().process_batch(stream.entries[:1]),
+            WebhookConsumer().process_batch(stream.entries[1:]),
+        )
+
+        assert results == [1, 1]
+        assert await _message_count(db) == 2
+        assert (await db.execute(select(func.count(Customer.id)))).scalar() == 1
+        assert (await db.execute(select(func.count(Conversation.id)))).scalar() == 1
+
+    async def test_failed_entry_is_left_pending(
+        self, client: AsyncClient, db: AsyncSession, ingest_account, stream, dispatch
+    ):
+        await _post(client, ingest_account, _update(42, user_id=111))
+        await _post(client, ingest_account, _update(43, user_id=222))
+        original = MessageService.process_incoming
+
+        async def flaky(service, msg):
+            if msg.messenger_user_id == "111":
+                raise ConnectionError("db hiccup")
+            return await original(service, msg)
+
+        with patch.object(MessageService, "process_incoming", flaky):
+            stored, failed = await WebhookConsumer()._process_batch(stream.entries)
+
+        assert stored == 1
+        assert failed == {stream.entries[0][0]}
+
+        # Redelivered, the entry is stored; the other one is not duplicated
+        stored, failed = await WebhookConsumer()._process_batch(stream.entries)
+        assert (stored, failed) == (1, set())
+        assert await _message_count(db) == 2
+
+    async def test_failed_entry_is_dropped_after_max_deliveries(self, stream):
+        stream.xpending_range = AsyncMock(side_effect=[
+            [{"message_id": "1-0", "times_delivered": 2}],
+            [{"message_id": "2-0", "times_delivered": 5}],
+        ])
+
+        with patch("app.config.settings.webhook_ingest_max_deliveries", 5):
+            assert await WebhookConsumer()._exhausted(["1-0", "2-0"]) == ["2-0"]
+
+    async def test_unparseable_entry_does_not_block_batch(
+        self, client: AsyncClient, db: AsyncSession, ingest_account, stream, dispatch
+    ):
+        await _post(client, ingest_account, _update(42))
+        stream.entries.insert(
+            0,
+            ("0-1", {
+                "provider": "telegram",
+                "account_id": str(ingest_account.id),
+                "body": "{not json",
+                "received_at": repr(time.time()),
+            }),
+        )
+
+        assert await WebhookConsumer().process_batch(stream.entries) == 1
+
+    async def test_kakao_backlog_is_not_collapsed(
+        self, db: AsyncSession, ingest_account, stream, dispatch
+    ):
+        # Kakao IDs are synthetic: two turns queued in the same second are distinct
+        ingest_account.messenger_type = "kakao"
+        await db.commit()
+        for utterance in ("보톡스 가격", "예약 가능한가요"):
+            body = orjson.dumps({
+                "userRequest": {
+                    "block": {"id": "block_id"},
+                    "utterance": utterance,
+                    "user": {"id": "kakao_user_123"},
+                },
+            })
+            await enqueue_webhook("kakao", ingest_account.id, body)
+
+        assert await WebhookConsumer().process_batch(stream.entries) == 2
+        # A reclaimed entry maps to the same ID and is not stored twice
+        assert await WebhookConsumer().process_batch(stream.entries[:1]) == 0
+
+        result = await db.execute(select(Message.messenger_message_id))
+        assert sorted(result.scalars().all()) == ["kakao_block_id_1-0", "kakao_block_id_2-0"]
+
+
+async def test_burst_is_fully_queued(client: AsyncClient, ingest_account):
+    """Bursts of 40 concurrent deliveries (200 in total) are all acked and queued."""
+    redis = FakeStreamRedis()
+    with (
+        patch("app.services.webhook_ingest.get_redis", return_value=redis),
+        patch("app.config.settings.webhook_ingest_mode", "stream"),
+    ):
+        for wave in range(5):
+            responses = await asyncio.gather(*(
+                _post(client, ingest_account, _update(wave * 40 + i, user_id=wave * 40 + i))
+                for i in range(40)
+            ))
+            assert all(response.status_code == 200 for response in responses)
+
+    assert len(redis.entries) == 200
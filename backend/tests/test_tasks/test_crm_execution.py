@@ -258,6 +258,39 @@ class TestExecuteDueEvents:
             await db.refresh(crm_due_event)
             assert crm_due_event.status == "failed"
 
+    @pytest.mark.asyncio
+    async def test_messageless_error_is_recorded_as_failed(
+        self,
+        db: AsyncSession,
+        crm_due_event: CRMEvent,
+        crm_conversation: Conversation,
+    ):
+        """A send error with an empty message is still a failure."""
+        mock_adapter = AsyncMock()
+        mock_adapter.send_message = AsyncMock(side_effect=TimeoutError())
+
+        mock_session_cm = AsyncMock()
+        mock_session_cm.__aenter__ = AsyncMock(return_value=db)
+        mock_session_cm.__aexit__ = AsyncMock(return_value=False)
+
+        with (
+            patch(
+                "app.core.database.async_session_factory",
+                return_value=mock_session_cm,
+            ),
+            patch(
+                "app.messenger.factory.MessengerAdapterFactory"
+            ) as mock_factory,
+        ):
+            mock_factory.get_adapter.return_value = mock_adapter
+
+            result = await _execute_due_events()
+            assert result["failed"] == 1
+
+            await db.refresh(crm_due_event)
+            assert crm_due_event.status == "failed"
+            assert crm_due_event.response == {"error": "TimeoutError"}
+
     @pytest.mark.asyncio
     async def test_uses_custom_message_content(
         self,
@@ -303,3 +336,80 @@ class TestExecuteDueEvents:
             # Verify custom message was sent
             call_kwargs = mock_adapter.send_message.call_args
             assert call_kwargs[1]["text"] == custom_msg or call_kwargs.kwargs["text"] == custom_msg
+
+    @pytest.mark.asyncio
+    async def test_batch_sends_concurrently_and_records_each_outcome(
+        self,
+        db: AsyncSession,
+        crm_clinic: Clinic,
+        crm_account: MessengerAccount,
+        crm_conversation: Conversation,
+    ):
+        """A batch mixes successes, send errors and customers without conversations."""
+        lonely = Customer(
+            id=uuid.uuid4(),
+            clinic_id=crm_clinic.id,
+            messenger_type="telegram",
+            messenger_user_id="crm-tg-user-2",
+        )
+        db.add(lonely)
+        events = [
+            CRMEvent(
+                id=uuid.uuid4(),
+                clinic_id=crm_clinic.id,
+                customer_id=crm_conversation.customer_id,
+                event_type="receipt",
+                scheduled_at=datetime.now(timezone.utc) - timedelta(minutes=i + 1),
+                status="scheduled",
+                message_content="fail" if i == 0 else f"hello {i}",
+            )
+            for i in range(5)
+        ]
+        events.append(
+            CRMEvent(
+                id=uuid.uuid4(),
+                clinic_id=crm_clinic.id,
+                customer_id=lonely.id,
+                event_type="receipt",
+                scheduled_at=datetime.now(timezone.utc) - timedelta(minutes=1),
+                status="scheduled",
+            )
+        )
+        db.add_all(events)
+        await db.commit()
+
+        async def send_message(account, recipient_id, text):
+            if text == "fail":
+                raise Exception("Telegram API error")
+            return "msg"
+
+        mock_adapter = AsyncMock()
+        mock_adapter.send_message = AsyncMock(side_effect=send_message)
+
+        mock_session_cm = AsyncMock()
+        mock_session_cm.__aenter__ = AsyncMock(return_value=db)
+        mock_session_cm.__aexit__ = AsyncMock(return_value=False)
+
+        with (
+            patch(
+                "app.core.database.async_session_factory",
+                return_value=mock_session_cm,
+            ),
+            patch(
+                "app.messenger.factory.MessengerAdapterFactory"
+            ) as mock_factory,
+            patch("app.config.settings.crm_dispatch_batch_size", 4),
+        ):
+            mock_factory.get_adapter.return_value = mock_adapter
+
+            result = await _execute_due_events()
+
+        assert result == {"sent": 4, "failed": 2}
+        assert mock_adapter.send_message.await_count == 5
+        statuses = {}
+        for event in events:
+            await db.refresh(event)
+            statuses[event.id] = event.status
+        assert statuses[events[0].id] == "failed"
+        assert statuses[events[-1].id] == "failed"
+        assert [statuses[e.id] for e in events[1:-1]] == ["sent"] * 4
@@ -0,0 +1,99 @@
+"""Tests for treatment photo derivative tasks."""
+
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.clinic import Clinic
+from app.models.customer import Customer
+from app.models.treatment_photo import TreatmentPhoto
+from app.services.photo_derivatives import Variant
+from app.services.storage_service import storage_service
+from app.tasks.media import _store_variants, generate_photo_derivatives
+from tests.conftest import test_session_factory
+
+VARIANTS = [
+    Variant(name=name, data=b"img", content_type="image/webp", extension=".webp")
+    for name in ("thumb", "medium")
+]
+
+
+@pytest_asyncio.fixture
+async def photo(db: AsyncSession) -> TreatmentPhoto:
+    clinic = Clinic(id=uuid.uuid4(), name="미디어의원", slug="media-clinic")
+    customer = Customer(
+        id=uuid.uuid4(),
+        clinic_id=clinic.id,
+        messenger_type="telegram",
+        messenger_user_id="media-user",
+    )
+    photo = TreatmentPhoto(
+        id=uuid.uuid4(),
+        clinic_id=clinic.id,
+        customer_id=customer.id,
+        photo_type="before",
+        photo_url="/uploads/before.jpg",
+        thumbnail_url="/uploads/old-thumb.webp",
+        medium_url="/uploads/old-medium.webp",
+    )
+    db.add(clinic)
+    await db.flush()
+    db.add(customer)
+    await db.flush()
+    db.add(photo)
+    await db.commit()
+    return photo
+
+
+@pytest.fixture
+def storage():
+    with (
+        patch.object(storage_service, "upload", new_callable=AsyncMock) as upload,
+        patch.object(storage_service, "delete", new_callable=AsyncMock) as delete,
+        patch("app.core.database.async_session_factory", test_session_factory),
+    ):
+        upload.side_effect = lambda data, name, *args, **kwargs: f"/uploads/{name}"
+        yield upload, delete
+
+
+class TestStoreVariants:
+    @pytest.mark.asyncio
+    async def test_replaces_earlier_derivatives(self, photo, storage):
+        _, delete = storage
+
+        urls = await _store_variants(photo.id, photo.photo_url, photo.clinic_id, VARIANTS)
+
+        assert urls == {
+            "thumb": "/uploads/before-thumb.webp",
+            "medium": "/uploads/before-medium.webp",
+        }
+        deleted = [call.args[0] for call in delete.await_args_list]
+        assert deleted == ["/uploads/old-thumb.webp", "/uploads/old-medium.webp"]
+
+    @pytest.mark.asyncio
+    async def test_failed_attempt_removes_its_uploads(self, photo, storage):
+        upload, delete = storage
+        upload.side_effect = ["/uploads/before-thumb.webp", ConnectionError("blob down")]
+
+        with pytest.raises(ConnectionError):
+            await _store_variants(photo.id, photo.photo_url, photo.clinic_id, VARIANTS)
+
+        delete.assert_awaited_once_with("/uploads/before-thumb.webp")
+
+
+class TestGeneratePhotoDerivatives:
+    def test_unreadable_image_is_not_retried(self):
+        photo_id = uuid.uuid4()
+        loaded = ("/uploads/broken.jpg", uuid.uuid4(), b"not an image")
+
+        with (
+            patch("app.tasks.media._load_photo", new=AsyncMock(return_value=loaded)),
+            patch.object(generate_photo_derivatives, "retry") as retry,
+        ):
+            result = generate_photo_derivatives.run(str(photo_id))
+
+        assert result == {"status": "unreadable"}
+        retry.assert_not_called()
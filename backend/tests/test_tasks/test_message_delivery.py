@@ -1,11 +1,25 @@
 """Tests for message delivery retry task."""
 
 import uuid
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.tasks.message_delivery import retry_message_delivery
+from app.models.clinic import Clinic
+from app.models.conversation import Conversation
+from app.models.customer import Customer
+from app.models.message import Message
+from app.models.messenger_account import MessengerAccount
+from app.tasks.message_delivery import (
+    _deliver_scheduled,
+    deliver_ai_message,
+    retry_message_delivery,
+)
+from tests.conftest import test_session_factory
 
 
 @pytest.fixture
@@ -105,3 +119,173 @@ class TestRetryMessageDelivery:
             assert actual_countdown == expected_countdown, (
                 f"Retry {retry_num}: expected {expected_countdown}, got {actual_countdown}"
             )
+
+
+class TestDeliverAIMessage:
+    @patch("app.tasks.message_delivery._deliver_scheduled", new_callable=AsyncMock)
+    def test_scheduled_delivery_runs(self, mock_deliver):
+        """Scheduled AI reply delivery runs the async sender."""
+        mock_deliver.return_value = {"message_id": "msg-1", "status": "sent"}
+
+        result = deliver_ai_message(
+            "msg-1",
+            str(uuid.uuid4()),
+            "recipient-1",
+            "telegram",
+        )
+
+        mock_deliver.assert_called_once()
+        assert result["status"] == "sent"
+
+    def test_routed_to_default_queue(self):
+        """Delivery must not occupy the ai queue while waiting for its countdown."""
+        from app.tasks import celery_app
+
+        route = celery_app.amqp.router.route({}, deliver_ai_message.name)
+        assert route["queue"].name == "default"
+
+
+# --- _deliver_scheduled ---
+@pytest_asyncio.fixture
+async def ai_reply(db: AsyncSession) -> Message:
+    """A saved, not yet delivered AI reply."""
+    clinic = Clinic(id=uuid.uuid4(), name="배송테스트의원", slug="delivery-clinic")
+    account = MessengerAccount(
+        id=uuid.uuid4(),
+        clinic_id=clinic.id,
+        messenger_type="telegram",
+        account_name="delivery-bot",
+        credentials={"bot_token": "test-token"},
+        is_active=True,
+        is_connected=True,
+    )
+    customer = Customer(
+        id=uuid.uuid4(),
+        clinic_id=clinic.id,
+        messenger_type="telegram",
+        messenger_user_id="delivery-tg-user",
+    )
+    conversation = Conversation(
+        id=uuid.uuid4(),
+        clinic_id=clinic.id,
+        customer_id=customer.id,
+        messenger_account_id=account.id,
+        status="active",
+    )
+    message = Message(
+        id=uuid.uuid4(),
+        conversation_id=conversation.id,
+        clinic_id=clinic.id,
+        sender_type="ai",
+        content="예약 도와드릴게요",
+        content_type="text",
+        messenger_type="telegram",
+    )
+    db.add(clinic)
+    await db.flush()
+    db.add_all([account, customer])
+    await db.flush()
+    db.add(conversation)
+    await db.flush()
+    db.add(message)
+    await db.commit()
+    return message
+
+
+@pytest.fixture
+def delivery():
+    """Patched adapter, WebSocket broadcast and retry task."""
+    adapter = MagicMock()
+    adapter.send_typing_indicator = AsyncMock()
+    adapter.send_message = AsyncMock(return_value="tg-msg-1")
+    with (
+        patch("app.core.database.async_session_factory", test_session_factory),
+        patch(
+            "app.messenger.factory.MessengerAdapterFactory.get_adapter",
+            return_value=adapter,
+        ),
+        patch(
+            "app.websocket.manager.manager.broadcast_to_clinic", new_callable=AsyncMock
+        ) as broadcast,
+        patch("app.tasks.message_delivery.retry_message_delivery") as retry_task,
+    ):
+        yield SimpleNamespace(adapter=adapter, broadcast=broadcast, retry_task=retry_task)
+
+
+async def _deliver(message_id, account_id) -> dict:
+    return await _deliver_scheduled(
+        str(message_id), str(account_id), "delivery-tg-user", "telegram"
+    )
+
+
+async def _account_id(db: AsyncSession, message: Message) -> uuid.UUID:
+    conversation = await db.get(Conversation, message.conversation_id)
+    return conversation.messenger_account_id
+
+
+class TestDeliverScheduled:
+    async def test_sends_and_records_messenger_id(
+        self, db: AsyncSession, ai_reply: Message, delivery
+    ):
+        result = await _deliver(ai_reply.id, await _account_id(db, ai_reply))
+
+        assert result["status"] == "sent"
+        delivery.adapter.send_message.assert_awaited_once()
+        stored = await db.scalar(
+            select(Message.messenger_message_id).where(Message.id == ai_reply.id)
+        )
+        assert stored == "tg-msg-1"
+        event = delivery.broadcast.await_args.args[1]
+        assert event["type"] == "new_message"
+        assert event["message"]["id"] == str(ai_reply.id)
+
+    async def test_already_sent_is_skipped(
+        self, db: AsyncSession, ai_reply: Message, delivery
+    ):
+        # A redelivered task (acks_late) must not send the reply twice
+        ai_reply.messenger_message_id = "tg-msg-0"
+        await db.commit()
+
+        result = await _deliver(ai_reply.id, await _account_id(db, ai_reply))
+
+        assert result["status"] == "already_sent"
+        delivery.adapter.send_message.assert_not_awaited()
+        delivery.broadcast.assert_not_awaited()
+
+    async def test_missing_message_is_skipped(self, ai_reply: Message, delivery):
+        result = await _deliver(uuid.uuid4(), uuid.uuid4())
+
+        assert result["status"] == "missing"
+        delivery.adapter.send_message.assert_not_awaited()
+        delivery.retry_task.delay.assert_not_called()
+
+    async def test_deleted_message_is_skipped(
+        self, db: AsyncSession, ai_reply: Message, delivery
+    ):
+        account_id = await _account_id(db, ai_reply)
+        await db.delete(ai_reply)
+        await db.commit()
+
+        result = await _deliver(ai_reply.id, account_id)
+
+        assert result["status"] == "missing"
+        delivery.adapter.send_message.assert_not_awaited()
+
+    async def test_send_failure_queues_retry(
+        self, db: AsyncSession, ai_reply: Message, delivery
+    ):
+        delivery.adapter.send_message.side_effect = ConnectionError("telegram down")
+        account_id = await _account_id(db, ai_reply)
+
+        result = await _deliver(ai_reply.id, account_id)
+
+        assert result["status"] == "retry_queued"
+        delivery.retry_task.delay.assert_called_once_with(
+            str(ai_reply.id),
+            str(account_id),
+            "delivery-tg-user",
+            "예약 도와드릴게요",
+            "telegram",
+        )
+        # Staff still see the reply while delivery is retried
+        delivery.broadcast.assert_awaited_once()
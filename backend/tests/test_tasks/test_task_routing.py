@@ -0,0 +1,34 @@
+"""Tests that every routed Celery queue has a worker consuming it."""
+
+import re
+from pathlib import Path
+
+import pytest
+
+from app.tasks import celery_app
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+COMPOSE_FILES = ["docker-compose.dev.yml", "docker-compose.prod.yml"]
+
+
+def _consumed_queues(compose_file: Path) -> set[str]:
+    queues = set()
+    for match in re.finditer(r"--queues=(\S+)", compose_file.read_text(encoding="utf-8")):
+        queues.update(match.group(1).split(","))
+    return queues
+
+
+def test_settlement_invoices_routed_to_media():
+    route = celery_app.conf.task_routes["app.tasks.analytics.render_settlement_invoices"]
+    assert route["queue"] == "media"
+
+
+@pytest.mark.parametrize("compose_name", COMPOSE_FILES)
+def test_every_routed_queue_has_consumer(compose_name):
+    compose_file = REPO_ROOT / compose_name
+    if not compose_file.exists():
+        pytest.skip(f"{compose_name} not present")
+
+    routed = {route["queue"] for route in celery_app.conf.task_routes.values()}
+    missing = routed - _consumed_queues(compose_file)
+    assert not missing, f"{compose_name} has no worker for queues: {sorted(missing)}"
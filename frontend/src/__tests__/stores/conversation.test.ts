@@ -3,11 +3,13 @@ import { afterEach, beforeEach, describe, expect, it, vi } from "vitest";
 import { useConversationStore } from "@/stores/conversation";
 
 const mockGet = vi.fn();
+const mockGetWithHeaders = vi.fn();
 const mockPost = vi.fn();
 
 vi.mock("@/lib/api", () => ({
   api: {
     get: (...args: unknown[]) => mockGet(...args),
+    getWithHeaders: (...args: unknown[]) => mockGetWithHeaders(...args),
     post: (...args: unknown[]) => mockPost(...args),
   },
   buildPaginationParams: (page: number, pageSize: number) =>
@@ -44,6 +46,14 @@ const FAKE_MESSAGE = {
   created_at: "2026-01-01T00:00:00Z",
 };
 
+function windowOf(data: unknown[], hasMore = false) {
+  return { data, headers: new Headers({ "X-Has-More": hasMore ? "true" : "false" }) };
+}
+
+function fakeMessage(id: string, createdAt: string) {
+  return { ...FAKE_MESSAGE, id, created_at: createdAt };
+}
+
 describe("useConversationStore", () => {
   beforeEach(() => {
     useConversationStore.setState({
@@ -51,6 +61,9 @@ describe("useConversationStore", () => {
       selectedId: null,
       selectedDetail: null,
       messages: [],
+      hasOlderMessages: false,
+      isLoadingOlder: false,
+      draft: null,
       customer: null,
       isLoading: false,
       page: 1,
@@ -118,6 +131,72 @@ describe("useConversationStore", () => {
     });
   });
 
+  describe("message windows", () => {
+    it("loads the latest window and pages back with before", async () => {
+      mockGet.mockResolvedValue(FAKE_CONVERSATION);
+      mockGetWithHeaders.mockResolvedValueOnce(
+        windowOf([fakeMessage("msg-2", "2026-01-01T00:00:02Z")], true),
+      );
+
+      await useConversationStore.getState().selectConversation(FAKE_TOKEN, "conv-1");
+
+      expect(mockGetWithHeaders).toHaveBeenCalledWith(
+        "/api/v1/conversations/conv-1/messages?limit=50",
+        { token: FAKE_TOKEN },
+      );
+      expect(useConversationStore.getState().hasOlderMessages).toBe(true);
+
+      mockGetWithHeaders.mockResolvedValueOnce(
+        windowOf([fakeMessage("msg-1", "2026-01-01T00:00:01Z")]),
+      );
+      await useConversationStore.getState().fetchOlderMessages(FAKE_TOKEN);
+
+      expect(mockGetWithHeaders).toHaveBeenLastCalledWith(
+        "/api/v1/conversations/conv-1/messages?limit=50&before=msg-2",
+        { token: FAKE_TOKEN },
+      );
+      const state = useConversationStore.getState();
+      expect(state.messages.map((m) => m.id)).toEqual(["msg-1", "msg-2"]);
+      expect(state.hasOlderMessages).toBe(false);
+    });
+
+    it("syncs the delta since the last message and drops repeats", async () => {
+      useConversationStore.setState({
+        selectedId: "conv-1",
+        messages: [fakeMessage("msg-1", "2026-01-01T00:00:01Z")],
+      });
+      mockGetWithHeaders
+        .mockResolvedValueOnce(
+          windowOf(
+            [
+              fakeMessage("msg-1", "2026-01-01T00:00:01Z"),
+              fakeMessage("msg-2", "2026-01-01T00:00:02Z"),
+            ],
+            true,
+          ),
+        )
+        .mockResolvedValueOnce(windowOf([fakeMessage("msg-3", "2026-01-01T00:00:03Z")]));
+
+      await useConversationStore.getState().syncMessages(FAKE_TOKEN);
+
+      expect(mockGetWithHeaders).toHaveBeenNthCalledWith(
+        1,
+        "/api/v1/conversations/conv-1/messages?limit=50&since=msg-1",
+        { token: FAKE_TOKEN },
+      );
+      expect(mockGetWithHeaders).toHaveBeenNthCalledWith(
+        2,
+        "/api/v1/conversations/conv-1/messages?limit=50&after=msg-2",
+        { token: FAKE_TOKEN },
+      );
+      expect(useConversationStore.getState().messages.map((m) => m.id)).toEqual([
+        "msg-1",
+        "msg-2",
+        "msg-3",
+      ]);
+    });
+  });
+
   describe("onNewMessage (WebSocket)", () => {
     it("adds message to current conversation", () => {
       useConversationStore.setState({
@@ -151,6 +230,58 @@ describe("useConversationStore", () => {
     });
   });
 
+  describe("onAiDraftDelta (WebSocket)", () => {
+    function frame(seq: number, delta: string, extra: Record<string, unknown> = {}) {
+      return {
+        conversation_id: "conv-1",
+        draft_id: "draft-1",
+        seq,
+        delta,
+        done: false,
+        ...extra,
+      };
+    }
+
+    it("builds the draft of the open conversation from its frames", () => {
+      useConversationStore.setState({ selectedId: "conv-1" });
+      const { onAiDraftDelta } = useConversationStore.getState();
+
+      onAiDraftDelta(frame(0, "ボトックスは"));
+      onAiDraftDelta(frame(0, "ボトックスは"));
+      onAiDraftDelta(frame(1, "5万円です", { done: true }));
+      onAiDraftDelta({ ...frame(0, "other"), conversation_id: "conv-2" });
+
+      expect(useConversationStore.getState().draft).toEqual({
+        conversationId: "conv-1",
+        draftId: "draft-1",
+        seq: 1,
+        content: "ボトックスは5万円です",
+        done: true,
+      });
+    });
+
+    it("clears a discarded draft", () => {
+      useConversationStore.setState({ selectedId: "conv-1" });
+      const { onAiDraftDelta } = useConversationStore.getState();
+
+      onAiDraftDelta(frame(0, "draft"));
+      onAiDraftDelta(frame(1, "", { done: true, discarded: true }));
+
+      expect(useConversationStore.getState().draft).toBeNull();
+    });
+
+    it("is replaced by the committed AI reply", () => {
+      useConversationStore.setState({ selectedId: "conv-1", conversations: [FAKE_CONVERSATION] });
+      const { onAiDraftDelta, onNewMessage } = useConversationStore.getState();
+
+      onAiDraftDelta(frame(0, "draft", { done: true }));
+      onNewMessage({ ...FAKE_MESSAGE, id: "msg-ai", sender_type: "ai" });
+
+      expect(useConversationStore.getState().draft).toBeNull();
+      expect(useConversationStore.getState().messages.map((m) => m.id)).toEqual(["msg-ai"]);
+    });
+  });
+
   describe("toggleAi", () => {
     it("toggles AI mode", async () => {
       const toggled = { ...FAKE_CONVERSATION, ai_mode: false };
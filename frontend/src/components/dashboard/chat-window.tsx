@@ -16,7 +16,11 @@ export function ChatWindow() {
     selectedId,
     selectedDetail,
     messages,
+    draft,
+    hasOlderMessages,
+    isLoadingOlder,
     isLoading,
+    fetchOlderMessages,
     sendMessage,
     toggleAi,
     resolveConversation,
@@ -40,9 +44,12 @@ export function ChatWindow() {
     }
   };
 
+  // Follow new messages and the live draft, but stay put when older history is prepended
+  const lastMessageId = messages[messages.length - 1]?.id;
+  const draftLength = draft?.content.length ?? 0;
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
-  }, [messages]);
+  }, [lastMessageId, draftLength]);
 
   if (!selectedId || !selectedDetail) {
     return (
@@ -73,6 +80,10 @@ export function ChatWindow() {
     if (accessToken) resolveConversation(accessToken, selectedId);
   };
 
+  const handleLoadOlder = () => {
+    if (accessToken) fetchOlderMessages(accessToken);
+  };
+
   const handleBack = () => {
     useConversationStore.setState({ selectedId: null, selectedDetail: null });
   };
@@ -128,6 +139,18 @@ export function ChatWindow() {
 
       {/* Messages */}
       <div className="flex-1 overflow-y-auto p-4 space-y-3">
+        {!isLoading && hasOlderMessages && (
+          <div className="flex justify-center">
+            <Button
+              variant="ghost"
+              size="sm"
+              onClick={handleLoadOlder}
+              disabled={isLoadingOlder}
+            >
+              {isLoadingOlder ? "로딩 중..." : "이전 메시지 보기"}
+            </Button>
+          </div>
+        )}
         {isLoading ? (
           <div className="flex items-center justify-center py-8 text-muted-foreground">
             로딩 중...
@@ -219,6 +242,21 @@ export function ChatWindow() {
             </div>
           ))
         )}
+        {!isLoading && draft && draft.conversationId === selectedId && (
+          <div className="flex justify-end">
+            <div
+              className="max-w-[85%] sm:max-w-[70%] rounded-lg border border-dashed border-primary/40 bg-primary/5 px-3 py-2 text-foreground"
+              aria-live="polite"
+            >
+              <div className="mb-0.5 flex items-center gap-1">
+                <span className="text-[10px] text-primary">
+                  <Bot className="inline h-3 w-3" /> AI {draft.done ? "전송 대기" : "작성 중..."}
+                </span>
+              </div>
+              <p className="text-sm whitespace-pre-wrap text-muted-foreground">{draft.content}</p>
+            </div>
+          </div>
+        )}
         <div ref={messagesEndRef} />
       </div>
 
@@ -5,7 +5,7 @@ import { useCallback, useEffect, useRef } from "react";
 import { useAuthStore } from "@/stores/auth";
 import { useConversationStore } from "@/stores/conversation";
 import { useNotificationStore } from "@/stores/notification";
-import type { Message } from "@/types/conversation";
+import type { AiDraftDelta, Message } from "@/types/conversation";
 
 const WS_BASE_URL =
   (process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000")
@@ -18,10 +18,12 @@ const MAX_DELAY_MS = 30000;
 
 export function useWebSocket() {
   const { accessToken } = useAuthStore();
-  const { onNewMessage, onConversationUpdate } = useConversationStore();
+  const { onNewMessage, onAiDraftDelta, onConversationUpdate, syncMessages } =
+    useConversationStore();
   const addNotification = useNotificationStore((s) => s.addNotification);
   const wsRef = useRef<WebSocket | null>(null);
   const retriesRef = useRef(0);
+  const hasConnectedRef = useRef(false);
   const reconnectTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
 
   const connect = useCallback(() => {
@@ -33,6 +35,11 @@ export function useWebSocket() {
 
     ws.onopen = () => {
       retriesRef.current = 0;
+      // Events sent while disconnected were missed; fetch the open thread's delta
+      if (hasConnectedRef.current) {
+        syncMessages(accessToken).catch(() => {});
+      }
+      hasConnectedRef.current = true;
     };
 
     ws.onmessage = (event) => {
@@ -47,6 +54,9 @@ export function useWebSocket() {
               onNewMessage(data.message as Message);
             }
             break;
+          case "ai_draft_delta":
+            onAiDraftDelta(data as AiDraftDelta);
+            break;
           case "conversation_update":
             if (data.conversation) {
               onConversationUpdate(data.conversation);
@@ -111,7 +121,14 @@ export function useWebSocket() {
         reconnectTimerRef.current = setTimeout(connect, delay);
       }
     };
-  }, [accessToken, onNewMessage, onConversationUpdate, addNotification]);
+  }, [
+    accessToken,
+    onNewMessage,
+    onAiDraftDelta,
+    onConversationUpdate,
+    syncMessages,
+    addNotification,
+  ]);
 
   useEffect(() => {
     connect();
@@ -21,6 +21,13 @@ async function request<T>(
   path: string,
   options: FetchOptions = {},
 ): Promise<T> {
+  return (await requestWithHeaders<T>(path, options)).data;
+}
+
+async function requestWithHeaders<T>(
+  path: string,
+  options: FetchOptions = {},
+): Promise<{ data: T; headers: Headers }> {
   const { token, headers, ...rest } = options;
 
   let lastError: Error | null = null;
@@ -48,10 +55,10 @@ async function request<T>(
       }
 
       if (res.status === 204) {
-        return undefined as T;
+        return { data: undefined as T, headers: res.headers };
       }
 
-      return res.json();
+      return { data: await res.json(), headers: res.headers };
     } catch (err) {
       if (err instanceof ApiError && err.status < 500) {
         throw err;
@@ -78,6 +85,10 @@ export const api = {
   get: <T>(path: string, options?: FetchOptions) =>
     request<T>(path, { ...options, method: "GET" }),
 
+  /** GET that also returns the response headers (e.g. X-Has-More). */
+  getWithHeaders: <T>(path: string, options?: FetchOptions) =>
+    requestWithHeaders<T>(path, { ...options, method: "GET" }),
+
   post: <T>(path: string, body: unknown, options?: FetchOptions) =>
     request<T>(path, { ...options, method: "POST", body: JSON.stringify(body) }),
 
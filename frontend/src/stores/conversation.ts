@@ -2,6 +2,8 @@ import { create } from "zustand";
 
 import { api, buildPaginationParams } from "@/lib/api";
 import type {
+  AiDraft,
+  AiDraftDelta,
   Conversation,
   ConversationDetail,
   Customer,
@@ -10,11 +12,35 @@ import type {
 import type { PaginatedResponse } from "@/types/api";
 import { DEFAULT_PAGE_SIZE } from "@/types/pagination";
 
+const MESSAGE_WINDOW_SIZE = 50;
+
+function messagesPath(conversationId: string, params: Record<string, string> = {}): string {
+  const query = new URLSearchParams({ limit: String(MESSAGE_WINDOW_SIZE), ...params });
+  return `/api/v1/conversations/${conversationId}/messages?${query}`;
+}
+
+function hasMore(headers: Headers): boolean {
+  return headers.get("X-Has-More") === "true";
+}
+
+// Merge by id in thread order: delta syncs and WebSocket events can overlap
+function mergeMessages(current: Message[], incoming: Message[]): Message[] {
+  const known = new Set(current.map((m) => m.id));
+  const added = incoming.filter((m) => !known.has(m.id));
+  if (added.length === 0) return current;
+  return [...current, ...added].sort(
+    (a, b) => new Date(a.created_at).getTime() - new Date(b.created_at).getTime(),
+  );
+}
+
 interface ConversationState {
   conversations: Conversation[];
   selectedId: string | null;
   selectedDetail: ConversationDetail | null;
   messages: Message[];
+  hasOlderMessages: boolean;
+  isLoadingOlder: boolean;
+  draft: AiDraft | null;
   customer: Customer | null;
   isLoading: boolean;
   page: number;
@@ -25,6 +51,8 @@ interface ConversationState {
   setPage: (page: number) => void;
   selectConversation: (token: string, id: string) => Promise<void>;
   fetchMessages: (token: string, conversationId: string) => Promise<void>;
+  fetchOlderMessages: (token: string) => Promise<void>;
+  syncMessages: (token: string) => Promise<void>;
   fetchCustomer: (token: string, customerId: string) => Promise<void>;
   sendMessage: (token: string, conversationId: string, content: string) => Promise<void>;
   toggleAi: (token: string, conversationId: string) => Promise<void>;
@@ -32,6 +60,7 @@ interface ConversationState {
 
   // WebSocket event handlers
   onNewMessage: (message: Message) => void;
+  onAiDraftDelta: (event: AiDraftDelta) => void;
   onConversationUpdate: (conversation: Partial<Conversation> & { id: string }) => void;
 }
 
@@ -40,6 +69,9 @@ export const useConversationStore = create<ConversationState>((set, get) => ({
   selectedId: null,
   selectedDetail: null,
   messages: [],
+  hasOlderMessages: false,
+  isLoadingOlder: false,
+  draft: null,
   customer: null,
   isLoading: false,
   page: 1,
@@ -60,12 +92,17 @@ export const useConversationStore = create<ConversationState>((set, get) => ({
   setPage: (page) => set({ page }),
 
   selectConversation: async (token, id) => {
-    set({ selectedId: id, isLoading: true });
-    const [detail, messages] = await Promise.all([
+    set({ selectedId: id, isLoading: true, draft: null });
+    const [detail, thread] = await Promise.all([
       api.get<ConversationDetail>(`/api/v1/conversations/${id}`, { token }),
-      api.get<Message[]>(`/api/v1/conversations/${id}/messages`, { token }),
+      api.getWithHeaders<Message[]>(messagesPath(id), { token }),
     ]);
-    set({ selectedDetail: detail, messages, isLoading: false });
+    set({
+      selectedDetail: detail,
+      messages: thread.data,
+      hasOlderMessages: hasMore(thread.headers),
+      isLoading: false,
+    });
 
     // Fetch customer
     get().fetchCustomer(token, detail.customer_id);
@@ -79,11 +116,52 @@ export const useConversationStore = create<ConversationState>((set, get) => ({
   },
 
   fetchMessages: async (token, conversationId) => {
-    const messages = await api.get<Message[]>(
-      `/api/v1/conversations/${conversationId}/messages`,
+    const { data, headers } = await api.getWithHeaders<Message[]>(
+      messagesPath(conversationId),
       { token },
     );
-    set({ messages });
+    set({ messages: data, hasOlderMessages: hasMore(headers) });
+  },
+
+  fetchOlderMessages: async (token) => {
+    const { selectedId, messages, hasOlderMessages, isLoadingOlder } = get();
+    if (!selectedId || !hasOlderMessages || isLoadingOlder || messages.length === 0) return;
+    set({ isLoadingOlder: true });
+    try {
+      const { data, headers } = await api.getWithHeaders<Message[]>(
+        messagesPath(selectedId, { before: messages[0].id }),
+        { token },
+      );
+      if (get().selectedId !== selectedId) return;
+      set((state) => ({
+        messages: mergeMessages(state.messages, data),
+        hasOlderMessages: hasMore(headers),
+      }));
+    } finally {
+      set({ isLoadingOlder: false });
+    }
+  },
+
+  // Catch up on messages missed while the WebSocket was disconnected
+  syncMessages: async (token) => {
+    const { selectedId, messages } = get();
+    if (!selectedId) return;
+    if (messages.length === 0) {
+      await get().fetchMessages(token, selectedId);
+      return;
+    }
+
+    let params: Record<string, string> = { since: messages[messages.length - 1].id };
+    for (;;) {
+      const { data, headers } = await api.getWithHeaders<Message[]>(
+        messagesPath(selectedId, params),
+        { token },
+      );
+      if (get().selectedId !== selectedId) return;
+      set((state) => ({ messages: mergeMessages(state.messages, data) }));
+      if (!hasMore(headers) || data.length === 0) return;
+      params = { after: data[data.length - 1].id };
+    }
   },
 
   fetchCustomer: async (token, customerId) => {
@@ -100,7 +178,7 @@ export const useConversationStore = create<ConversationState>((set, get) => ({
       { content },
       { token },
     );
-    set((state) => ({ messages: [...state.messages, message] }));
+    set((state) => ({ messages: mergeMessages(state.messages, [message]) }));
   },
 
   toggleAi: async (token, conversationId) => {
@@ -134,7 +212,11 @@ export const useConversationStore = create<ConversationState>((set, get) => ({
   onNewMessage: (message) => {
     const { selectedId } = get();
     if (message.conversation_id === selectedId) {
-      set((state) => ({ messages: [...state.messages, message] }));
+      set((state) => ({
+        messages: mergeMessages(state.messages, [message]),
+        // The committed AI reply replaces its live draft
+        draft: message.sender_type === "ai" ? null : state.draft,
+      }));
     }
     // Update conversation list preview
     set((state) => ({
@@ -154,6 +236,28 @@ export const useConversationStore = create<ConversationState>((set, get) => ({
     }));
   },
 
+  onAiDraftDelta: (event) => {
+    if (event.conversation_id !== get().selectedId) return;
+    if (event.discarded) {
+      set((state) => (state.draft?.draftId === event.draft_id ? { draft: null } : {}));
+      return;
+    }
+    set((state) => {
+      const current = state.draft?.draftId === event.draft_id ? state.draft : null;
+      // Frames of one draft arrive in order; drop a replayed or stale one
+      if (current && event.seq <= current.seq) return {};
+      return {
+        draft: {
+          conversationId: event.conversation_id,
+          draftId: event.draft_id,
+          seq: event.seq,
+          content: (current?.content ?? "") + event.delta,
+          done: event.done,
+        },
+      };
+    });
+  },
+
   onConversationUpdate: (update) => {
     set((state) => ({
       conversations: state.conversations.map((c) =>
@@ -53,6 +53,24 @@ export interface Message {
   created_at: string;
 }
 
+// Live AI reply draft streamed to the dashboard (ai_draft_delta events)
+export interface AiDraftDelta {
+  conversation_id: string;
+  draft_id: string;
+  seq: number;
+  delta: string;
+  done: boolean;
+  discarded?: boolean;
+}
+
+export interface AiDraft {
+  conversationId: string;
+  draftId: string;
+  seq: number;
+  content: string;
+  done: boolean;
+}
+
 export interface Customer {
   id: string;
   clinic_id: string;